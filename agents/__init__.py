@@ -6,6 +6,7 @@
 
 from agents.parsing_agent import parsing_agent
 from agents.planner_agent import planner_agent
+from agents.parse_plan_agent import parse_plan_agent
 from agents.explanation_agent import explanation_agent
 from agents.geogebra_command_agent import geogebra_command_agent
 from agents.geogebra_command_retrieval_agent import geogebra_command_retrieval_agent
@@ -14,6 +15,7 @@ from agents.command_regeneration_agent import command_regeneration_agent
 __all__ = [
     "parsing_agent",
     "planner_agent",
+    "parse_plan_agent",
     "explanation_agent",
     "geogebra_command_agent",
     "geogebra_command_retrieval_agent",
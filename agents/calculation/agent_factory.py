@@ -0,0 +1,260 @@
+"""
+계산 에이전트 팩토리
+
+삼각형/원/각도/길이/면적/좌표 계산 에이전트는 도구 목록, 프롬프트, LLM 프로필만 다르고
+작업 선택 → 결정적 계산 → LLM 에이전트 실행 → 결과 저장 흐름은 같습니다.
+각 모듈은 CalculationAgentSpec 을 등록하고, 공통 흐름은 run_calculation_agent 가 담당합니다.
+
+StructuredTool(인자 스키마 포함), 파서 형식 지침, 조립된 프롬프트, AgentExecutor 는
+요청과 무관하므로 (task_type, 도구 묶음) 별로 한 번만 만들어 모든 요청이 공유합니다.
+AgentExecutor.invoke 는 실행별 상태를 인스턴스에 저장하지 않으므로 동시 요청에서도 안전합니다.
+
+- register_calculation_agent(spec): 계산 유형 등록 (각 에이전트 모듈 import 시)
+- get_calculation_runtime(task_type, toolset): 지연 생성 + 잠금으로 한 번만 빌드된 런타임
+- prebuild_calculation_agents(): 서버 시작 시 미리 빌드 (CALCULATION_AGENT_PREBUILD)
+- build_calculation_runtime(spec, toolset): 캐시 없이 빌드 (벤치마크용)
+"""
+
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from langchain.agents import AgentExecutor, create_openai_functions_agent
+from langchain_core.output_parsers import JsonOutputParser
+
+from models.calculation_result_model import CalculationResult
+from models.state_models import CalculationTask, GeometryState
+from geo_prompts.assembly import assemble_prompt
+from agents.calculation.deterministic_engine import try_deterministic_calculation
+from agents.calculation.utils.result_utils import update_calculation_results
+from utils.json_parser import safe_parse_llm_json_output
+from utils.structured_output import FAILED, NATIVE, REPAIRED, record_parse
+from utils.prompt_context import build_prompt_context
+from utils.tracing import trace_tools
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+Toolset = Tuple[str, ...]
+
+
+class CalculationAgentSpec(NamedTuple):
+    """계산 유형별 에이전트 정의"""
+    task_type: str
+    prompt: Any                                      # i18n ChatPromptTemplate
+    json_template: str
+    get_llm: Callable[[], Any]                       # LLMManager.get_<type>_calculation_llm
+    build_tools: Callable[[Toolset], List[Any]]      # 도구 묶음 -> StructuredTool 목록
+    # 의존 작업 결과에서 작업 파라미터로 복사할 키
+    dependency_keys: Tuple[str, ...] = ("coordinates",)
+    # 키 복사 대신 사용할 파라미터 보강 함수 (enhanced_task, task_dependencies)
+    prepare_parameters: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None
+    # 작업의 available_tools 중 도구 목록을 바꾸는 그룹 이름 (좌표: math_tools/validation_tools)
+    tool_groups: Tuple[str, ...] = ()
+
+
+class CalculationRuntime(NamedTuple):
+    """요청 간에 공유되는 빌드 결과"""
+    tools: List[Any]
+    prompt: Any
+    executor: AgentExecutor
+    build_seconds: float
+
+
+_specs: Dict[str, CalculationAgentSpec] = {}
+_runtimes: Dict[Tuple[str, Toolset], CalculationRuntime] = {}
+_build_lock = threading.Lock()
+
+
+def register_calculation_agent(spec: CalculationAgentSpec) -> CalculationAgentSpec:
+    """계산 유형 등록"""
+    _specs[spec.task_type] = spec
+    return spec
+
+
+def build_calculation_runtime(spec: CalculationAgentSpec, toolset: Toolset = ()) -> CalculationRuntime:
+    """도구, 프롬프트, 에이전트 실행기를 새로 빌드 (캐시 없음)"""
+    started = time.perf_counter()
+    tools = trace_tools(spec.build_tools(toolset))
+    output_parser = JsonOutputParser(pydantic_object=CalculationResult)
+    llm = spec.get_llm()
+    # 파서 지침과 JSON 템플릿은 캐시 가능한 정적 앞부분에 포함
+    prompt = assemble_prompt(
+        f"{spec.task_type}_calculation", spec.prompt, llm.system_message,
+        json_template=spec.json_template,
+        format_instructions=output_parser.get_format_instructions(),
+    )
+    agent = create_openai_functions_agent(llm, tools, prompt)
+    executor = AgentExecutor(agent=agent, tools=tools)
+    return CalculationRuntime(tools, prompt, executor, time.perf_counter() - started)
+
+
+def get_calculation_runtime(task_type: str, toolset: Toolset = ()) -> CalculationRuntime:
+    """(task_type, toolset) 별로 한 번만 빌드된 런타임 반환"""
+    key = (task_type, toolset)
+    runtime = _runtimes.get(key)
+    if runtime is not None:
+        return runtime
+    with _build_lock:
+        runtime = _runtimes.get(key)
+        if runtime is None:
+            runtime = build_calculation_runtime(_specs[task_type], toolset)
+            _runtimes[key] = runtime
+            logger.debug("Built %s calculation agent (toolset=%s) in %.1f ms",
+                         task_type, toolset, runtime.build_seconds * 1000)
+    return runtime
+
+
+def prebuild_calculation_agents() -> Dict[str, float]:
+    """등록된 모든 계산 유형의 기본 런타임을 미리 빌드하고 유형별 빌드 시간(ms) 반환"""
+    import agents.calculation  # noqa: F401  각 에이전트 모듈이 import 될 때 등록된다
+    return {task_type: round(get_calculation_runtime(task_type).build_seconds * 1000, 1)
+            for task_type in list(_specs)}
+
+
+def _select_toolset(spec: CalculationAgentSpec, task: CalculationTask) -> Toolset:
+    available_tools = task.available_tools or {}
+    return tuple(group for group in spec.tool_groups if group in available_tools)
+
+
+def _find_current_task(state: GeometryState, task_type: str) -> Optional[CalculationTask]:
+    queue = state.calculation_queue
+    current_task_id = queue.current_task_id
+    logger.debug("Current task ID: %s", current_task_id)
+
+    if not current_task_id:
+        logger.debug("No current_task_id set. Finding a pending %s task.", task_type)
+        for task in queue.tasks:
+            if task.task_type == task_type and task.status == "pending":
+                queue.current_task_id = task.task_id
+                task.status = "running"
+                current_task_id = task.task_id
+                logger.debug("Set current_task_id to %s", current_task_id)
+                break
+
+    for task in queue.tasks:
+        if task.task_id == current_task_id:
+            return task if task.task_type == task_type else None
+    return None
+
+
+def _enhance_task(spec: CalculationAgentSpec, task: CalculationTask,
+                  task_dependencies: Dict[str, Any]) -> Dict[str, Any]:
+    """의존 작업 결과를 작업 파라미터에 추가한 작업 dict"""
+    enhanced_task = task.model_dump()
+    if task.parameters and task_dependencies:
+        if spec.prepare_parameters is not None:
+            spec.prepare_parameters(enhanced_task, task_dependencies)
+        else:
+            for dep_data in task_dependencies.values():
+                for key in spec.dependency_keys:
+                    if key in dep_data:
+                        enhanced_task["parameters"][key] = dep_data[key]
+    return enhanced_task
+
+
+def _extract_output(result: Any) -> Any:
+    if isinstance(result, dict) and "output" in result:
+        return result["output"]
+    if hasattr(result, "output"):
+        return result.output
+    if hasattr(result, "content"):
+        return result.content
+    return result
+
+
+def _parse_result(result: Any) -> Dict[str, Any]:
+    """
+    에이전트 출력을 작업 결과 dict 로 변환 (실패 시 raw_output 과 success=False)
+
+    도구 호출 에이전트의 최종 응답은 구조화 출력 모드를 쓸 수 없으므로 로컬에서 복구하고,
+    결과는 "calculation" 단계의 파싱 통계로 기록한다.
+    """
+    try:
+        result_output = _extract_output(result)
+        logger.debug("파싱을 시작합니다: 출력 타입 = %s", type(result_output))
+        if isinstance(result_output, dict):
+            record_parse("calculation", NATIVE)
+            return result_output
+
+        parsed_result = safe_parse_llm_json_output(result_output, dict)
+        if not parsed_result:
+            record_parse("calculation", FAILED)
+            logger.warning("파싱 결과가 없어 원본 출력을 raw_output으로 저장")
+            return {"raw_output": str(result_output), "success": False}
+        record_parse("calculation", NATIVE if _is_json_object(result_output) else REPAIRED)
+        return parsed_result if isinstance(parsed_result, dict) else parsed_result.to_dict()
+    except Exception as e:
+        record_parse("calculation", FAILED)
+        logger.error("계산 결과 파싱 중 오류 발생: %s", e)
+        raw_output = result["output"] if isinstance(result, dict) and "output" in result else str(result)
+        return {"raw_output": raw_output, "success": False, "error": str(e)}
+
+
+def _is_json_object(text: Any) -> bool:
+    try:
+        return isinstance(json.loads(text), dict)
+    except (TypeError, ValueError):
+        return False
+
+
+def _complete_task(state: GeometryState, task: CalculationTask) -> None:
+    """작업을 완료 처리하고 큐에서 제거한 뒤 전체 계산 결과에 반영"""
+    task.status = "completed"
+    queue = state.calculation_queue
+    if task.task_id not in queue.completed_task_ids:
+        queue.completed_task_ids.append(task.task_id)
+    queue.tasks = [t for t in queue.tasks if t.task_id != task.task_id]
+    queue.current_task_id = None
+    update_calculation_results(state, task)
+
+
+def run_calculation_agent(task_type: str, state: GeometryState) -> GeometryState:
+    """
+    계산 에이전트 공통 흐름
+
+    Args:
+        task_type: 계산 유형 (triangle, circle, angle, length, area, coordinate)
+        state: 현재 상태 객체
+
+    Returns:
+        업데이트된 상태 객체
+    """
+    logger.debug("Starting %s_calculation_agent", task_type)
+    spec = _specs[task_type]
+
+    current_task = _find_current_task(state, task_type)
+    if current_task is None:
+        logger.debug("No %s task found. Returning state.", task_type)
+        return state
+
+    # operation_type/parameters 로 도구가 정해지는 작업은 LLM 없이 바로 계산
+    if try_deterministic_calculation(state, current_task):
+        return state
+
+    runtime = get_calculation_runtime(task_type, _select_toolset(spec, current_task))
+
+    # 종속성 데이터 준비
+    task_dependencies = {
+        dep_id: state.calculation_results[dep_id]
+        for dep_id in current_task.dependencies or []
+        if dep_id in state.calculation_results
+    }
+    enhanced_task = _enhance_task(spec, current_task, task_dependencies)
+
+    # 에이전트 실행
+    result = runtime.executor.invoke({
+        "problem": state.input_problem,
+        **build_prompt_context(
+            "calculation",
+            current_task=enhanced_task,
+            calculation_results=state.calculation_results,
+            dependencies=task_dependencies,
+        ),
+        "agent_scratchpad": ""
+    })
+
+    current_task.result = _parse_result(result)
+    _complete_task(state, current_task)
+    return state
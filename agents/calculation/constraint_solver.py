@@ -0,0 +1,641 @@
+"""
+기하 조건 수치 풀이기
+
+parsed_elements 의 도형/관계/조건(길이, 각도, 평행/수직, 중점, 점-직선/원 결합,
+공선, 같은 길이/각, 정다각형)을 잔차 방정식으로 바꾸고, 해석적 야코비안을 쓰는
+Levenberg–Marquardt 법으로 모든 점의 좌표를 한 번에 구합니다.
+
+게이지 고정: 첫 점은 원점, 두 번째 점은 +x 축 위에 둡니다. 길이 조건이 하나도 없으면
+두 번째 점까지의 거리도 DEFAULT_SCALE 로 고정합니다. 조건이 부족한 문제(예: 각 하나만
+주어진 삼각형, 어떤 조건에도 나오지 않는 점)는 해가 하나로 정해지지 않으므로 좌표를 쓰지 않습니다.
+"""
+
+import math
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import CONSTRAINT_SOLVER_ENABLED
+from models.calculation_result_model import CalculationResult
+from models.state_models import CalculationTask, GeometryState
+from agents.calculation.utils.result_utils import update_calculation_results
+from utils.geogebra_evaluator import collect_constraints
+from utils.tracing import KIND_TOOL, span
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+SOLVER_TASK_ID = "constraint_solver"
+
+DEFAULT_SCALE = 4.0
+MAX_ITERATIONS = 200
+MAX_RESTARTS = 6
+RESIDUAL_TOLERANCE = 1e-12  # 반복 종료
+ACCEPT_TOLERANCE = 1e-8  # 해로 인정하는 최대 잔차
+RANK_TOLERANCE = 1e-8  # 야코비안 특잇값이 최대 특잇값의 이 비율 이하이면 계수 부족
+EPS = 1e-12
+
+# 잔차 항: 좌표 배열 (n, 2) -> (잔차, [(점 인덱스, d잔차/d점)])
+Term = Callable[[np.ndarray], Tuple[float, List[Tuple[int, np.ndarray]]]]
+
+_LABEL = re.compile(r"[A-Z][0-9]*'*")
+_STRIP_PREFIXES = ("∠", "angle", "segment", "line", "ray", "线段", "直线", "射线", "△", "triangle", "⊙", "circle_", "circle", "圆")
+
+
+# ----------------------------------------------------------------------
+# 점/원 수집
+# ----------------------------------------------------------------------
+def _split_labels(token: Any, known: Sequence[str]) -> Optional[List[str]]:
+    """'AB', '∠ABC', ['A', 'B'] -> 점 라벨 목록 (알려진 라벨 우선, 그다음 대문자 라벨 규칙)"""
+    if isinstance(token, (list, tuple)):
+        labels: List[str] = []
+        for item in token:
+            resolved = _split_labels(item, known)
+            if resolved is None:
+                return None
+            labels.extend(resolved)
+        return labels
+    text = str(token).strip()
+    if text in known:
+        return [text]
+    for prefix in _STRIP_PREFIXES:
+        if text.lower().startswith(prefix):
+            text = text[len(prefix):].strip()
+    text = re.sub(r"[\s\-_,]", "", text)
+    ordered = sorted(known, key=len, reverse=True)
+    labels, position = [], 0
+    while position < len(text):
+        for label in ordered:
+            if text.startswith(label, position):
+                labels.append(label)
+                position += len(label)
+                break
+        else:
+            match = _LABEL.match(text, position)
+            if not match:
+                return None
+            labels.append(match.group())
+            position = match.end()
+    return labels or None
+
+
+def collect_points(parsed_elements: Dict[str, Any]) -> List[str]:
+    """
+    풀이 대상 점 라벨 (첫 다각형의 꼭짓점이 앞에 오도록 정렬)
+
+    첫 두 점이 게이지 고정점이 되므로, 삼각형 ABC 가 있으면 A 가 원점, B 가 x 축 위에 놓인다.
+    """
+    polygon_points: List[str] = []
+    other_points: List[str] = []
+
+    def add(target: List[str], labels: Optional[List[str]]):
+        for label in labels or []:
+            if label not in polygon_points and label not in other_points:
+                target.append(label)
+
+    objects = parsed_elements.get("geometric_objects") or {}
+    if isinstance(objects, dict):
+        for key, obj in objects.items():
+            if not isinstance(obj, dict):
+                continue
+            if str(obj.get("type", "")).lower() == "point" and _LABEL.fullmatch(str(key)):
+                add(other_points, [str(key)])
+            if obj.get("vertices"):
+                add(polygon_points, _split_labels(obj["vertices"], []))
+            for field in ("points", "center"):
+                if obj.get(field):
+                    add(other_points, _split_labels(obj[field], []))
+
+    for section in ("relations", "conditions"):
+        items = parsed_elements.get(section) or {}
+        if isinstance(items, list):
+            items = dict(enumerate(items))
+        for item in items.values():
+            if not isinstance(item, dict):
+                continue
+            for element in item.get("elements") or []:
+                if _circle_key(element, parsed_elements) is None:
+                    add(other_points, _split_labels(element, []))
+    return polygon_points + other_points
+
+
+def _circle_key(token: Any, parsed_elements: Dict[str, Any]) -> Optional[str]:
+    objects = parsed_elements.get("geometric_objects") or {}
+    if not isinstance(objects, dict) or not isinstance(token, str):
+        return None
+    obj = objects.get(token)
+    if isinstance(obj, dict) and obj.get("center"):
+        return token
+    text = token.strip()
+    for prefix in ("⊙", "circle_", "circle", "圆"):
+        if text.lower().startswith(prefix):
+            text = text[len(prefix):].strip()
+            for key, obj in objects.items():
+                if isinstance(obj, dict) and obj.get("center") == text:
+                    return key
+    return None
+
+
+# ----------------------------------------------------------------------
+# 잔차 항 (해석적 야코비안)
+# ----------------------------------------------------------------------
+def _perp(v: np.ndarray) -> np.ndarray:
+    return np.array([-v[1], v[0]])
+
+
+def _cos_sin(u: np.ndarray, v: np.ndarray):
+    """두 벡터 사이 각의 cos, sin 과 각각의 u, v 에 대한 기울기"""
+    nu2, nv2 = max(u @ u, EPS), max(v @ v, EPS)
+    norm = math.sqrt(nu2 * nv2)
+    cos = (u @ v) / norm
+    sin = (u[0] * v[1] - u[1] * v[0]) / norm
+    dcos_du, dcos_dv = v / norm - cos * u / nu2, u / norm - cos * v / nv2
+    dsin_du, dsin_dv = -_perp(v) / norm - sin * u / nu2, _perp(u) / norm - sin * v / nv2
+    return cos, sin, (dcos_du, dcos_dv), (dsin_du, dsin_dv)
+
+
+def _length_term(i: int, j: int, length: float) -> Term:
+    # (|PQ|² - L²) / 2L: 점이 겹쳐도 기울기가 정의되고 해 근처에서는 |PQ| - L 과 같다
+    def term(P):
+        d = P[i] - P[j]
+        return (d @ d - length * length) / (2 * length), [(i, d / length), (j, -d / length)]
+    return term
+
+
+def _equal_length_term(a: Tuple[int, int], b: Tuple[int, int], scale: float) -> Term:
+    def term(P):
+        d1, d2 = P[a[0]] - P[a[1]], P[b[0]] - P[b[1]]
+        g1, g2 = d1 / scale, -d2 / scale
+        return (d1 @ d1 - d2 @ d2) / (2 * scale), [(a[0], g1), (a[1], -g1), (b[0], g2), (b[1], -g2)]
+    return term
+
+
+def _cos_at(P: np.ndarray, a: int, b: int, c: int):
+    cos, _, (du, dv), _ = _cos_sin(P[a] - P[b], P[c] - P[b])
+    return cos, [(a, du), (c, dv), (b, -(du + dv))]
+
+
+def _angle_term(a: int, b: int, c: int, radians: float) -> Term:
+    target = math.cos(radians)
+
+    def term(P):
+        cos, grads = _cos_at(P, a, b, c)
+        return cos - target, grads
+    return term
+
+
+def _equal_angle_term(first: Tuple[int, int, int], second: Tuple[int, int, int]) -> Term:
+    def term(P):
+        cos1, grads1 = _cos_at(P, *first)
+        cos2, grads2 = _cos_at(P, *second)
+        return cos1 - cos2, grads1 + [(k, -g) for k, g in grads2]
+    return term
+
+
+def _line_pair_term(l1: Tuple[int, int], l2: Tuple[int, int], kind: str, radians: float = 0.0) -> Term:
+    """두 직선 방향의 평행(sin=0), 수직(cos=0), 또는 사잇각(cos² = cos²θ) 조건"""
+    target = math.cos(radians) ** 2
+
+    def term(P):
+        cos, sin, (dc_du, dc_dv), (ds_du, ds_dv) = _cos_sin(P[l1[1]] - P[l1[0]], P[l2[1]] - P[l2[0]])
+        if kind == "parallel":
+            value, du, dv = sin, ds_du, ds_dv
+        elif kind == "perpendicular":
+            value, du, dv = cos, dc_du, dc_dv
+        else:
+            value, du, dv = cos * cos - target, 2 * cos * dc_du, 2 * cos * dc_dv
+        return value, [(l1[1], du), (l1[0], -du), (l2[1], dv), (l2[0], -dv)]
+    return term
+
+
+def _on_line_term(p: int, a: int, b: int) -> Term:
+    # 직선 AB 까지의 부호 있는 거리: cross(B-A, P-A) / |B-A|
+    def term(P):
+        u, w = P[b] - P[a], P[p] - P[a]
+        norm = math.sqrt(max(u @ u, EPS))
+        cross = u[0] * w[1] - u[1] * w[0]
+        dw = _perp(u) / norm
+        du = -_perp(w) / norm - cross * u / norm ** 3
+        return cross / norm, [(p, dw), (b, du), (a, -(du + dw))]
+    return term
+
+
+def _midpoint_terms(m: int, a: int, b: int) -> List[Term]:
+    terms = []
+    for axis in (0, 1):
+        unit = np.eye(2)[axis]
+
+        def term(P, axis=axis, unit=unit):
+            return P[m][axis] - (P[a][axis] + P[b][axis]) / 2, [(m, unit), (a, -unit / 2), (b, -unit / 2)]
+        terms.append(term)
+    return terms
+
+
+# ----------------------------------------------------------------------
+# 조건 -> 잔차 항
+# ----------------------------------------------------------------------
+class _Builder:
+    def __init__(self, parsed_elements: Dict[str, Any], labels: List[str], scale: float):
+        self.parsed_elements = parsed_elements
+        self.labels = labels
+        self.index = {label: i for i, label in enumerate(labels)}
+        self.scale = scale
+        self.terms: List[Term] = []
+        self.segments: List[Tuple[int, int, int]] = []  # (점, 끝점1, 끝점2): 선분 위 점 배치/확인용
+        self.midpoints: List[Tuple[int, int, int]] = []
+        self.circles = self._collect_circles()
+        self.polygons = self._collect_polygons()
+
+    def _collect_circles(self) -> Dict[str, Dict[str, Any]]:
+        circles = {}
+        objects = self.parsed_elements.get("geometric_objects") or {}
+        for key, obj in (objects.items() if isinstance(objects, dict) else []):
+            if isinstance(obj, dict) and obj.get("center") in self.index:
+                on_points = [p for p in (_split_labels(obj.get("points") or [], self.labels) or []) if p in self.index]
+                circles[key] = {"center": self.index[obj["center"]], "radius": obj.get("radius"), "points": on_points}
+        return circles
+
+    def _collect_polygons(self) -> List[List[int]]:
+        polygons = []
+        objects = self.parsed_elements.get("geometric_objects") or {}
+        for obj in (objects.values() if isinstance(objects, dict) else []):
+            if isinstance(obj, dict) and obj.get("vertices"):
+                vertices = self.points(obj["vertices"])
+                if vertices and len(vertices) >= 3:
+                    polygons.append(vertices)
+        return polygons
+
+    def vertex_angle(self, token: Any) -> Optional[List[int]]:
+        """'∠A' 처럼 꼭짓점 하나로 쓴 각: 그 점을 꼭짓점으로 갖는 다각형의 이웃 꼭짓점으로 확장"""
+        vertex = self.points(token, 1)
+        for polygon in self.polygons if vertex else []:
+            if vertex[0] in polygon:
+                k = polygon.index(vertex[0])
+                return [polygon[k - 1], vertex[0], polygon[(k + 1) % len(polygon)]]
+        return None
+
+    def points(self, token: Any, count: Optional[int] = None) -> Optional[List[int]]:
+        labels = _split_labels(token, self.labels)
+        if not labels or any(label not in self.index for label in labels):
+            return None
+        if count is not None and len(labels) != count:
+            return None
+        return [self.index[label] for label in labels]
+
+    def lines(self, elements: List[Any]) -> Optional[List[Tuple[int, int]]]:
+        if len(elements) == 2:
+            pair = [self.points(e, 2) for e in elements]
+            if all(pair):
+                return [tuple(p) for p in pair]
+        flat = self.points(elements, 4)
+        return [(flat[0], flat[1]), (flat[2], flat[3])] if flat else None
+
+    def add(self, constraint: Dict[str, Any]) -> bool:
+        """조건을 잔차 항으로 추가 (해석할 수 없으면 False)"""
+        kind, elements, value = constraint["kind"], constraint["elements"], constraint["value"]
+        if kind == "length":
+            ends = self.points(elements, 2)
+            if ends and float(value) > 0:
+                self.terms.append(_length_term(ends[0], ends[1], float(value)))
+                return True
+        elif kind == "angle":
+            radians = float(value) if "rad" in constraint["unit"] else math.radians(float(value))
+            if radians > math.pi:
+                radians = 2 * math.pi - radians
+            vertex = self.points(elements, 3) or self.vertex_angle(elements)
+            if vertex:
+                self.terms.append(_angle_term(*vertex, radians))
+                return True
+            lines = self.lines(elements)
+            if lines:
+                self.terms.append(_line_pair_term(*lines, "angle", radians))
+                return True
+        elif kind in ("parallel", "perpendicular"):
+            lines = self.lines(elements)
+            if lines:
+                self.terms.append(_line_pair_term(*lines, kind))
+                return True
+        elif kind == "midpoint":
+            points = self.points(elements, 3)
+            if points:
+                self.terms.extend(_midpoint_terms(*points))
+                self.midpoints.append(tuple(points))
+                return True
+        elif kind in ("incidence", "intersection"):
+            point = self.points(elements[0], 1) if elements else None
+            if not point or len(elements) < 2:
+                return False
+            for other in elements[1:]:
+                if not self._add_incidence(point[0], other):
+                    return False
+            return True
+        elif kind == "collinear":
+            points = self.points(elements)
+            if points and len(points) >= 3:
+                self.terms.extend(_on_line_term(p, points[0], points[1]) for p in points[2:])
+                return True
+        elif kind == "equal":
+            if len(elements) == 2:
+                groups = [self.points(e) for e in elements]
+                if all(groups) and all(len(g) == 2 for g in groups):
+                    self.terms.append(_equal_length_term(tuple(groups[0]), tuple(groups[1]), self.scale))
+                    return True
+                if all(groups) and all(len(g) == 3 for g in groups):
+                    self.terms.append(_equal_angle_term(tuple(groups[0]), tuple(groups[1])))
+                    return True
+        elif kind == "circle":
+            # 반지름은 원 위의 점 조건(incidence)에서 쓰인다
+            return bool(self.points(elements[0], 1)) if elements else False
+        elif kind == "equal_sides":
+            points = self.points(elements)
+            if points and len(points) >= 3:
+                sides = [(points[i], points[(i + 1) % len(points)]) for i in range(len(points))]
+                self.terms.extend(_equal_length_term(sides[0], side, self.scale) for side in sides[1:])
+                return True
+        elif kind == "right_angles":
+            points = self.points(elements, 4)
+            if points:
+                self.terms.extend(_angle_term(points[i - 1], points[i], points[(i + 1) % 4], math.pi / 2)
+                                  for i in range(4))
+                return True
+        return False
+
+    def _add_incidence(self, point: int, other: Any) -> bool:
+        circle_key = _circle_key(other, self.parsed_elements)
+        if circle_key in self.circles:
+            circle = self.circles[circle_key]
+            center = circle["center"]
+            if circle.get("radius"):
+                self.terms.append(_length_term(point, center, float(circle["radius"])))
+                return True
+            anchors = [p for p in circle["points"] if p != point]
+            if anchors:
+                self.terms.append(_equal_length_term((point, center), (anchors[0], center), self.scale))
+                return True
+            return False
+        ends = self.points(other, 2)
+        if not ends:
+            return False
+        self.terms.append(_on_line_term(point, *ends))
+        if not isinstance(other, str) or not other.lower().startswith(("line", "直线", "ray", "射线")):
+            self.segments.append((point, ends[0], ends[1]))
+        return True
+
+
+# ----------------------------------------------------------------------
+# Levenberg–Marquardt
+# ----------------------------------------------------------------------
+def _evaluate(terms: List[Term], P: np.ndarray, free: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    residuals = np.empty(len(terms))
+    jacobian = np.zeros((len(terms), P.size))
+    for row, term in enumerate(terms):
+        residuals[row], grads = term(P)
+        for point, grad in grads:
+            jacobian[row, 2 * point:2 * point + 2] += grad
+    return residuals, jacobian[:, free]
+
+
+def _levenberg_marquardt(terms: List[Term], P: np.ndarray, free: np.ndarray) -> Tuple[np.ndarray, float, int]:
+    x = P.ravel().copy()
+    residuals, jacobian = _evaluate(terms, x.reshape(-1, 2), free)
+    cost = residuals @ residuals
+    damping = 1e-3
+    for iteration in range(1, MAX_ITERATIONS + 1):
+        if np.max(np.abs(residuals)) <= RESIDUAL_TOLERANCE:
+            return x.reshape(-1, 2), float(np.max(np.abs(residuals))), iteration
+        normal = jacobian.T @ jacobian
+        gradient = jacobian.T @ residuals
+        while True:
+            if damping > 1e12:
+                return x.reshape(-1, 2), float(np.max(np.abs(residuals))), iteration
+            try:
+                step = np.linalg.solve(normal + damping * (np.diag(np.diag(normal)) + np.eye(len(free))), -gradient)
+            except np.linalg.LinAlgError:
+                damping *= 10
+                continue
+            candidate = x.copy()
+            candidate[free] += step
+            new_residuals, new_jacobian = _evaluate(terms, candidate.reshape(-1, 2), free)
+            new_cost = new_residuals @ new_residuals
+            if new_cost < cost:
+                x, residuals, jacobian, cost = candidate, new_residuals, new_jacobian, new_cost
+                damping = max(damping / 3, 1e-12)
+                break
+            damping *= 4
+        if np.linalg.norm(step) <= 1e-14 * (1 + np.linalg.norm(x)):
+            break
+    return x.reshape(-1, 2), float(np.max(np.abs(residuals))), MAX_ITERATIONS
+
+
+def _constrained_points(terms: List[Term], P: np.ndarray) -> set:
+    """잔차 항에 한 번이라도 나오는 점 인덱스"""
+    return {point for term in terms for point, _ in term(P)[1]}
+
+
+def _rank_deficient(terms: List[Term], P: np.ndarray, free: np.ndarray) -> bool:
+    """해에서 자유 좌표에 대한 야코비안의 계수가 자유 좌표 수보다 작은지 (해가 국소적으로 유일하지 않음)"""
+    _, jacobian = _evaluate(terms, P, free)
+    if jacobian.shape[0] < jacobian.shape[1]:
+        return True
+    singular = np.linalg.svd(jacobian, compute_uv=False)
+    return singular.size == 0 or singular[-1] <= RANK_TOLERANCE * max(singular[0], 1.0)
+
+
+def _initial_layout(count: int, polygon_size: int, scale: float, rng: Optional[np.random.Generator]) -> np.ndarray:
+    """첫 다각형은 AB 를 밑변으로 하는 정다각형, 나머지 점은 그 중심 근처에 배치"""
+    P = np.zeros((count, 2))
+    sides = max(polygon_size, 3)
+    heading = 0.0
+    for i in range(1, min(max(polygon_size, 2), count)):
+        P[i] = P[i - 1] + scale * np.array([math.cos(heading), math.sin(heading)])
+        heading += 2 * math.pi / sides
+    anchor = P[:max(polygon_size, 2)].mean(axis=0) if count > 1 else P[0]
+    for k, i in enumerate(range(max(polygon_size, 2), count)):
+        phase = 2 * math.pi * (k + 0.5) / max(count - polygon_size, 1)
+        P[i] = anchor + 0.3 * scale * np.array([math.cos(phase), math.sin(phase)])
+    if rng is not None:
+        P[2:] += rng.normal(scale=0.3 * scale, size=P[2:].shape)
+        if count > 1:
+            P[1, 0] = scale * (1 + 0.3 * rng.normal())
+    return P
+
+
+def _seed_dependent_points(P: np.ndarray, builder: _Builder, rng: Optional[np.random.Generator]) -> None:
+    """선분 위 점은 선분을 나누는 위치에, 중점은 두 점의 가운데에 미리 놓는다 (겹친 해로 수렴하는 것을 줄임)"""
+    by_segment: Dict[Tuple[int, int], List[int]] = {}
+    for p, a, b in builder.segments:
+        if p > 1:
+            by_segment.setdefault((a, b), []).append(p)
+    for (a, b), points in by_segment.items():
+        if rng is None:
+            ts = [(k + 1) / (len(points) + 1) for k in range(len(points))]
+        else:
+            ts = sorted(rng.uniform(0.1, 0.9, size=len(points)))
+        for p, t in zip(points, ts):
+            P[p] = P[a] + t * (P[b] - P[a])
+    for _ in range(2):  # 중점의 중점 같은 연쇄
+        for m, a, b in builder.midpoints:
+            if m > 1:
+                P[m] = (P[a] + P[b]) / 2
+
+
+def _degenerate(P: np.ndarray, polygon_size: int, segments: List[Tuple[int, int, int]], scale: float) -> bool:
+    """점이 겹치거나, 첫 다각형이 납작하거나, 선분 위 점이 선분 밖에 있는 해"""
+    tolerance = 1e-6 * scale
+    for i in range(len(P)):
+        for j in range(i + 1, len(P)):
+            if np.linalg.norm(P[i] - P[j]) <= tolerance:
+                return True
+    if polygon_size >= 3:
+        x, y = P[:polygon_size, 0], P[:polygon_size, 1]
+        if abs(x @ np.roll(y, -1) - y @ np.roll(x, -1)) / 2 <= tolerance * scale:
+            return True
+    for p, a, b in segments:
+        u = P[b] - P[a]
+        t = (P[p] - P[a]) @ u / max(u @ u, EPS)
+        if t < -1e-9 or t > 1 + 1e-9:
+            return True
+    return False
+
+
+def _first_polygon_size(parsed_elements: Dict[str, Any], labels: List[str]) -> int:
+    objects = parsed_elements.get("geometric_objects") or {}
+    for obj in (objects.values() if isinstance(objects, dict) else []):
+        if isinstance(obj, dict) and obj.get("vertices"):
+            vertices = _split_labels(obj["vertices"], labels) or []
+            if vertices and vertices == labels[:len(vertices)]:
+                return len(vertices)
+            return 0
+    return 0
+
+
+def solve_constraints(parsed_elements: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    parsed_elements 의 조건을 만족하는 좌표를 계산
+
+    Returns:
+        converged: 모든 잔차가 허용 오차 안이고 퇴화되지 않은 해를 찾았는지
+        determined: 모든 점이 조건에 나오고 해에서 야코비안이 자유 좌표에 대해 최대 계수인지
+        coordinates: 라벨 -> [x, y]
+        unsupported: 해석하지 못한 조건 (분류하지 못한 조건 포함)
+        unconstrained: 어떤 조건에도 나오지 않는 점 라벨
+        residual / iterations / restarts / constraints / elapsed_ms
+    """
+    started = time.perf_counter()
+    parsed_elements = parsed_elements if isinstance(parsed_elements, dict) else {}
+    labels = collect_points(parsed_elements)
+    constraint_set = collect_constraints(parsed_elements)
+    constraints = constraint_set.constraints
+    report: Dict[str, Any] = {
+        "converged": False,
+        "determined": False,
+        "coordinates": {},
+        "residual": None,
+        "iterations": 0,
+        "restarts": 0,
+        "constraints": len(constraints),
+        "unsupported": [item["source"] for item in constraint_set.unsupported],
+        "unconstrained": [],
+    }
+    if len(labels) < 2:
+        report["reason"] = "fewer than two points"
+        return report
+
+    lengths = [float(c["value"]) for c in constraints if c["kind"] in ("length", "circle") and c["value"]]
+    scale = float(np.mean(lengths)) if lengths else DEFAULT_SCALE
+    builder = _Builder(parsed_elements, labels, scale)
+    for constraint in constraints:
+        try:
+            supported = builder.add(constraint)
+        except (TypeError, ValueError):
+            supported = False
+        if not supported:
+            report["unsupported"].append(constraint["source"])
+    if not builder.terms:
+        report["reason"] = "no solvable constraints"
+        return report
+
+    # 게이지 고정: P0 = (0, 0), P1.y = 0, 길이 조건이 없으면 P1.x = scale 도 고정
+    fixed = {0, 1, 3} if lengths else {0, 1, 2, 3}
+    free = np.array([k for k in range(2 * len(labels)) if k not in fixed])
+    polygon_size = _first_polygon_size(parsed_elements, labels)
+    rng = np.random.default_rng(0)
+
+    best = None
+    for attempt in range(MAX_RESTARTS + 1):
+        P0 = _initial_layout(len(labels), polygon_size, scale, rng if attempt else None)
+        _seed_dependent_points(P0, builder, rng if attempt else None)
+        P, residual, iterations = _levenberg_marquardt(builder.terms, P0, free)
+        report["iterations"] += iterations
+        report["restarts"] = attempt
+        if best is None or residual < best[1]:
+            best = (P, residual)
+        if residual <= ACCEPT_TOLERANCE and not _degenerate(P, polygon_size, builder.segments, scale):
+            best = (P, residual)
+            report["converged"] = True
+            break
+
+    P, residual = best
+    constrained = _constrained_points(builder.terms, P)
+    report["unconstrained"] = [label for i, label in enumerate(labels) if i not in constrained]
+    report["determined"] = not report["unconstrained"] and not _rank_deficient(builder.terms, P, free)
+    # 방향 정규화: 첫 다각형(또는 x 축 밖의 첫 점)이 위쪽에 오도록 반사
+    off_axis = [y for y in P[2:, 1] if abs(y) > 1e-9 * scale]
+    if off_axis and off_axis[0] < 0:
+        P[:, 1] *= -1
+    P[np.abs(P) < 1e-12] = 0.0
+    report["coordinates"] = {label: [float(P[i, 0]), float(P[i, 1])] for i, label in enumerate(labels)}
+    report["residual"] = residual
+    report["elapsed_ms"] = (time.perf_counter() - started) * 1000
+    return report
+
+
+def try_constraint_solution(state: GeometryState) -> Optional[Dict[str, Any]]:
+    """
+    계산 관리자 첫 실행 시 호출: 조건을 모두 풀면 좌표를 calculation_results 에 기록하고 결과 반환
+
+    해석하지 못한 조건이 있으면 좌표가 그 조건을 어길 수 있고, 해가 하나로 정해지지 않으면(조건에 없는 점,
+    계수가 부족한 야코비안) 좌표가 임의의 초기 배치를 따르므로 사용하지 않는다.
+    """
+    if not CONSTRAINT_SOLVER_ENABLED or SOLVER_TASK_ID in state.calculation_results:
+        return None
+    try:
+        with span("constraint_solver", KIND_TOOL) as solver_span:
+            solution = solve_constraints(state.parsed_elements)
+            solver_span.set(converged=solution["converged"], determined=solution["determined"],
+                            constraints=solution["constraints"], unsupported=len(solution["unsupported"]),
+                            restarts=solution["restarts"])
+    except Exception as e:
+        logger.debug("Constraint solver failed: %s", e)
+        return None
+    if not solution["converged"] or not solution["determined"] or solution["unsupported"]:
+        logger.debug("Constraint solver not used (converged=%s, determined=%s, unsupported=%s, "
+                     "unconstrained=%s, reason=%s)", solution['converged'], solution['determined'],
+                     solution['unsupported'], solution['unconstrained'], solution.get('reason'))
+        return None
+
+    result = CalculationResult(
+        task_id=SOLVER_TASK_ID,
+        success=True,
+        coordinates=solution["coordinates"],
+        explanation=f"Coordinates solved from {solution['constraints']} parsed constraints "
+                    f"(max residual {solution['residual']:.2e})",
+        extras={"engine": "constraint_solver",
+                "iterations": solution["iterations"],
+                "restarts": solution["restarts"]},
+    ).to_dict()
+    task = CalculationTask(
+        task_id=SOLVER_TASK_ID,
+        task_type="coordinate",
+        operation_type="constraint_solve",
+        parameters={},
+        description="Solve coordinates of all points from parsed constraints",
+        result=result,
+        status="completed",
+    )
+    update_calculation_results(state, task)
+    logger.debug("Constraint solver placed %s points in %.1f ms", len(solution['coordinates']), solution['elapsed_ms'])
+    return result
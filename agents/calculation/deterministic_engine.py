@@ -0,0 +1,777 @@
+"""
+결정적 계산 엔진
+
+operation_type 과 parameters 만으로 어떤 도구를 호출할지 정해지는 계산 작업은
+LLM 에이전트를 거치지 않고 (task_type, operation_type) -> 도구 함수로 바로 실행합니다.
+좌표/길이 등 의존 값은 calculation_results 에서 찾아 채우고,
+해석할 수 없는 작업은 None 을 반환해 기존 LLM 에이전트로 넘깁니다.
+"""
+
+import math
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import DETERMINISTIC_CALCULATION_ENABLED
+from models.calculation_result_model import CalculationResult
+from models.state_models import CalculationTask, GeometryState
+from agents.calculation.tools import (
+    AngleTools,
+    AreaTools,
+    CircleTools,
+    CoordinateTools,
+    LengthTools,
+    TriangleTools,
+)
+from agents.calculation.utils.result_utils import update_calculation_results
+from utils.tracing import KIND_TOOL, span
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+Point = Tuple[float, float]
+
+
+class UnresolvedTask(Exception):
+    """파라미터가 부족하거나 해석할 수 없어 결정적으로 실행할 수 없는 작업"""
+    pass
+
+
+# (task_type, 정규화된 operation 이름) -> 처리 함수
+_DISPATCH: Dict[Tuple[str, str], Callable[["TaskParameters"], Dict[str, Any]]] = {}
+
+
+def _register(task_type: str, *operations: str):
+    def decorator(func):
+        for operation in operations:
+            _DISPATCH[(task_type, operation)] = func
+        return func
+    return decorator
+
+
+def normalize_operation(operation: Optional[str]) -> str:
+    """'calculateTriangleArea', 'calculate_triangle_area', 'triangle area' -> 'triangle_area'"""
+    if not operation:
+        return ""
+    name = re.sub(r"(?<=[a-z0-9])(?=[A-Z])", "_", operation.strip())
+    name = re.sub(r"[\s\-]+", "_", name).lower()
+    for prefix in ("calculate_", "compute_", "find_", "get_"):
+        if name.startswith(prefix):
+            name = name[len(prefix):]
+    return name
+
+
+# ----------------------------------------------------------------------
+# 파라미터 해석
+# ----------------------------------------------------------------------
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_point(value: Any) -> bool:
+    return isinstance(value, (list, tuple)) and len(value) == 2 and all(_is_number(v) for v in value)
+
+
+def collect_coordinates(task: CalculationTask, calculation_results: Dict[str, Any]) -> Dict[str, Point]:
+    """전체 결과, 의존 작업 결과, 작업 파라미터 순서로 라벨 -> 좌표를 모은다 (뒤에 온 값이 우선)"""
+    coordinates: Dict[str, Point] = {}
+
+    def merge(source: Any):
+        if isinstance(source, dict):
+            for label, value in source.items():
+                if _is_point(value):
+                    coordinates[str(label)] = (float(value[0]), float(value[1]))
+
+    merge(calculation_results.get("coordinates"))
+    for dep_id in task.dependencies:
+        dep_result = calculation_results.get(dep_id)
+        if isinstance(dep_result, dict):
+            merge(dep_result.get("coordinates"))
+    merge(task.parameters.get("coordinates"))
+    merge(task.parameters.get("points"))
+    return coordinates
+
+
+class TaskParameters:
+    """작업 파라미터 조회 도우미 (여러 별칭 키, 라벨 -> 좌표 변환)"""
+
+    def __init__(self, task: CalculationTask, calculation_results: Dict[str, Any]):
+        self.task = task
+        self.params = task.parameters or {}
+        self.coordinates = collect_coordinates(task, calculation_results)
+        self.lengths = dict(calculation_results.get("lengths") or {})
+        self.angles = dict(calculation_results.get("angles") or {})
+
+    def raw(self, *keys: str) -> Any:
+        for key in keys:
+            if self.params.get(key) is not None:
+                return self.params[key]
+        return None
+
+    def label(self, *keys: str, default: Optional[str] = None) -> Optional[str]:
+        value = self.raw(*keys, "result_label", "label", "name", "target")
+        # 설명 문장이 아닌 짧은 라벨만 사용
+        if isinstance(value, str) and value and len(value) <= 16 and not re.search(r"\s", value):
+            return value
+        return default
+
+    def point_label(self, *keys: str) -> str:
+        """결과 점 라벨 (명시되지 않으면 UnresolvedTask: 임의 라벨 M/P 는 다른 작업의 점을 덮어쓰고 문제의 라벨을 잃는다)"""
+        label = self.label(*keys)
+        if label is None:
+            raise UnresolvedTask(f"missing result label {keys[0] if keys else 'result_label'}")
+        return label
+
+    def to_point(self, value: Any) -> Point:
+        if _is_point(value):
+            return (float(value[0]), float(value[1]))
+        if isinstance(value, dict) and _is_number(value.get("x")) and _is_number(value.get("y")):
+            return (float(value["x"]), float(value["y"]))
+        if isinstance(value, str) and value.strip() in self.coordinates:
+            return self.coordinates[value.strip()]
+        raise UnresolvedTask(f"cannot resolve point {value!r}")
+
+    def point(self, *keys: str) -> Point:
+        value = self.raw(*keys)
+        if value is None:
+            raise UnresolvedTask(f"missing point parameter {keys[0]}")
+        return self.to_point(value)
+
+    def split_labels(self, text: str) -> List[str]:
+        """'ABC', '△ABC', 'A,B,C' 를 좌표가 알려진 점 라벨 목록으로 분리"""
+        text = re.sub(r"^(triangle|polygon|segment|line|angle|△|∠|⊙)\s*", "", text.strip(), flags=re.IGNORECASE)
+        parts = [p for p in re.split(r"[\s,，、]+", text) if p]
+        if len(parts) > 1:
+            return parts
+        labels = sorted(self.coordinates, key=len, reverse=True)
+        result, position = [], 0
+        while position < len(text):
+            for label in labels:
+                if text.startswith(label, position):
+                    result.append(label)
+                    position += len(label)
+                    break
+            else:
+                raise UnresolvedTask(f"cannot split {text!r} into known points")
+        return result
+
+    def points(self, *keys: str, count: Optional[int] = None) -> List[Point]:
+        value = self.raw(*keys)
+        if value is None:
+            raise UnresolvedTask(f"missing points parameter {keys[0]}")
+        if isinstance(value, str):
+            value = self.split_labels(value)
+        if isinstance(value, dict):
+            value = list(value.values())
+        if not isinstance(value, (list, tuple)):
+            raise UnresolvedTask(f"invalid points parameter {keys[0]}")
+        points = [self.to_point(v) for v in value]
+        if count is not None and len(points) != count:
+            raise UnresolvedTask(f"expected {count} points, got {len(points)}")
+        return points
+
+    def point_labels(self, *keys: str) -> List[str]:
+        value = self.raw(*keys)
+        if isinstance(value, str):
+            return self.split_labels(value)
+        if isinstance(value, (list, tuple)) and all(isinstance(v, str) for v in value):
+            return list(value)
+        return []
+
+    def result_point_labels(self, count: int, *keys: str) -> List[str]:
+        """결과 점 count 개의 라벨 (부족하면 UnresolvedTask)"""
+        labels = self.point_labels(*keys)
+        if len(labels) < count:
+            raise UnresolvedTask(f"expected {count} result labels, got {len(labels)}")
+        return labels
+
+    def number(self, *keys: str) -> float:
+        value = self.raw(*keys)
+        if _is_number(value):
+            return float(value)
+        if isinstance(value, str):
+            if value in self.lengths and _is_number(self.lengths[value]):
+                return float(self.lengths[value])
+            try:
+                return float(value)
+            except ValueError:
+                pass
+        raise UnresolvedTask(f"missing numeric parameter {keys[0]}")
+
+    def angle_rad(self, degree_keys: Tuple[str, ...] = ("angle", "angle_deg", "degrees", "measure"),
+                  radian_keys: Tuple[str, ...] = ("angle_rad", "radians")) -> float:
+        """각도 파라미터를 라디안으로 (기본 단위는 도)"""
+        value = self.raw(*radian_keys)
+        if _is_number(value):
+            return float(value)
+        value = self.raw(*degree_keys)
+        if _is_number(value):
+            return math.radians(float(value))
+        if isinstance(value, str) and value in self.angles and _is_number(self.angles[value]):
+            return math.radians(float(self.angles[value]))
+        raise UnresolvedTask("missing angle parameter")
+
+    def line(self, *keys: str) -> Tuple[float, float, float]:
+        """직선: [a, b, c] 계수 또는 두 점 ('AB', ['A', 'B'], [[x1, y1], [x2, y2]])"""
+        value = self.raw(*keys)
+        if isinstance(value, dict):
+            if all(_is_number(value.get(k)) for k in ("a", "b", "c")):
+                return (float(value["a"]), float(value["b"]), float(value["c"]))
+            value = value.get("points")
+        if isinstance(value, (list, tuple)) and len(value) == 3 and all(_is_number(v) for v in value):
+            return tuple(float(v) for v in value)
+        if isinstance(value, str):
+            value = self.split_labels(value)
+        if isinstance(value, (list, tuple)) and len(value) == 2:
+            p1, p2 = self.to_point(value[0]), self.to_point(value[1])
+            if p1 == p2:
+                raise UnresolvedTask("line defined by coincident points")
+            return CoordinateTools.calculate_line_equation(p1, p2)
+        raise UnresolvedTask(f"missing line parameter {keys[0] if keys else ''}")
+
+    def segment_name(self, *keys: str) -> str:
+        labels = self.point_labels(*keys)
+        return "".join(labels)
+
+
+def _pt(point: Point) -> List[float]:
+    return [float(point[0]), float(point[1])]
+
+
+# ----------------------------------------------------------------------
+# coordinate
+# ----------------------------------------------------------------------
+@_register("coordinate", "initial_setup", "point_coordinates", "polygon_coordinates", "set_coordinates", "coordinates")
+def _coordinate_setup(p: TaskParameters) -> Dict[str, Any]:
+    explicit = p.raw("coordinates", "points")
+    if isinstance(explicit, dict) and explicit and all(_is_point(v) for v in explicit.values()):
+        return {"coordinates": {k: _pt(v) for k, v in explicit.items()}}
+
+    # 정형화된 배치: 정삼각형 / 정사각형 / 직사각형 / 직각삼각형
+    labels = p.point_labels("vertices", "polygon", "triangle")
+    method = normalize_operation(p.task.specific_method or p.raw("shape", "type") or "")
+    if not labels:
+        raise UnresolvedTask("initial setup without explicit coordinates or vertices")
+    if len(labels) == 3 and "equilateral" in method:
+        s = p.number("side_length", "side", "length")
+        points = [(0.0, 0.0), (s, 0.0), (s / 2, s * math.sqrt(3) / 2)]
+    elif len(labels) == 4 and "square" in method:
+        s = p.number("side_length", "side", "length")
+        points = [(0.0, 0.0), (s, 0.0), (s, s), (0.0, s)]
+    elif len(labels) == 4 and "rectangle" in method:
+        w, h = p.number("width", "length"), p.number("height")
+        points = [(0.0, 0.0), (w, 0.0), (w, h), (0.0, h)]
+    elif len(labels) == 3 and "right" in method:
+        # 직각은 첫 번째 꼭짓점
+        a, b = p.number("leg1", "base", "a"), p.number("leg2", "height", "b")
+        points = [(0.0, 0.0), (a, 0.0), (0.0, b)]
+    else:
+        raise UnresolvedTask(f"no deterministic placement for {method or 'unspecified shape'}")
+    return {"coordinates": {label: _pt(point) for label, point in zip(labels, points)}}
+
+
+@_register("coordinate", "midpoint")
+def _coordinate_midpoint(p: TaskParameters) -> Dict[str, Any]:
+    if p.raw("segment") is not None:
+        p1, p2 = p.points("segment", count=2)
+    else:
+        p1, p2 = p.point("point1", "p1", "start", "A"), p.point("point2", "p2", "end", "B")
+    midpoint = CoordinateTools.calculate_midpoint(p1, p2)
+    return {"coordinates": {p.point_label("midpoint", "result_point"): _pt(midpoint)}}
+
+
+@_register("coordinate", "line_intersection", "intersection", "intersect", "intersection_point")
+def _coordinate_intersection(p: TaskParameters) -> Dict[str, Any]:
+    point = CoordinateTools.calculate_line_intersection(p.line("line1", "first_line"), p.line("line2", "second_line"))
+    if point is None:
+        raise UnresolvedTask("lines are parallel")
+    return {"coordinates": {p.point_label("intersection_point", "result_point"): _pt(point)}}
+
+
+@_register("coordinate", "internal_division_point", "internal_division", "segment_division", "division_point")
+def _coordinate_internal_division(p: TaskParameters) -> Dict[str, Any]:
+    p1, p2 = p.point("point1", "p1", "start"), p.point("point2", "p2", "end")
+    if p.raw("m") is not None and p.raw("n") is not None:
+        point = CoordinateTools.calculate_internal_division_point(p1, p2, p.number("m"), p.number("n"))
+    else:
+        point = CoordinateTools.calculate_segment_division(p1, p2, p.number("ratio", "t"))
+    return {"coordinates": {p.point_label("division_point", "result_point"): _pt(point)}}
+
+
+@_register("coordinate", "external_division_point", "external_division")
+def _coordinate_external_division(p: TaskParameters) -> Dict[str, Any]:
+    point = CoordinateTools.calculate_external_division_point(
+        p.point("point1", "p1", "start"), p.point("point2", "p2", "end"), p.number("m"), p.number("n")
+    )
+    return {"coordinates": {p.point_label("division_point", "result_point"): _pt(point)}}
+
+
+@_register("coordinate", "reflection_point", "reflection", "reflect")
+def _coordinate_reflection(p: TaskParameters) -> Dict[str, Any]:
+    point = CoordinateTools.calculate_reflection_point(p.point("point", "p"), p.line("line", "mirror", "axis"))
+    return {"coordinates": {p.point_label("reflected_point", "result_point"): _pt(point)}}
+
+
+@_register("coordinate", "foot_of_perpendicular", "perpendicular_foot", "projection")
+def _coordinate_perpendicular_foot(p: TaskParameters) -> Dict[str, Any]:
+    point = p.point("point", "p", "from_point")
+    a, b, c = p.line("line", "to_line", "segment")
+    t = (a * point[0] + b * point[1] + c) / (a * a + b * b)
+    foot = (point[0] - a * t, point[1] - b * t)
+    return {"coordinates": {p.point_label("foot", "foot_point", "result_point"): _pt(foot)}}
+
+
+@_register("coordinate", "rotation", "rotate", "rotation_point")
+def _coordinate_rotation(p: TaskParameters) -> Dict[str, Any]:
+    point = AngleTools.calculate_rotation(p.point("point", "p"), p.point("center", "origin"), p.angle_rad())
+    return {"coordinates": {p.point_label("rotated_point", "result_point"): _pt(point)}}
+
+
+@_register("coordinate", "vector")
+def _coordinate_vector(p: TaskParameters) -> Dict[str, Any]:
+    vector = CoordinateTools.calculate_vector(p.point("point1", "p1", "start"), p.point("point2", "p2", "end"))
+    return {"derived_data": {"vectors": {p.label(default="v"): _pt(vector)}}}
+
+
+@_register("coordinate", "slope")
+def _coordinate_slope(p: TaskParameters) -> Dict[str, Any]:
+    slope = CoordinateTools.calculate_slope(p.point("point1", "p1"), p.point("point2", "p2"))
+    return {"derived_data": {"slopes": {p.label(default="slope"): slope}}}
+
+
+@_register("coordinate", "line_equation")
+def _coordinate_line_equation(p: TaskParameters) -> Dict[str, Any]:
+    a, b, c = CoordinateTools.calculate_line_equation(p.point("point1", "p1"), p.point("point2", "p2"))
+    return {"derived_data": {"line_equations": {p.label(default="line"): {"a": a, "b": b, "c": c}}}}
+
+
+# ----------------------------------------------------------------------
+# length
+# ----------------------------------------------------------------------
+@_register("length", "distance_points", "distance_between_points", "distance", "segment_length", "length")
+def _length_distance(p: TaskParameters) -> Dict[str, Any]:
+    if p.raw("segment") is not None:
+        p1, p2 = p.points("segment", count=2)
+        name = p.segment_name("segment")
+    else:
+        p1, p2 = p.point("point1", "p1", "start"), p.point("point2", "p2", "end")
+        first, second = p.raw("point1", "p1", "start"), p.raw("point2", "p2", "end")
+        name = f"{first}{second}" if isinstance(first, str) and isinstance(second, str) else "distance"
+    return {"lengths": {p.label(default=name): LengthTools.calculate_distance_between_points(p1, p2)}}
+
+
+@_register("length", "distance_point_to_line", "point_line_distance")
+def _length_point_to_line(p: TaskParameters) -> Dict[str, Any]:
+    distance = LengthTools.calculate_distance_point_to_line(p.point("point", "p"), p.line("line", "segment"))
+    return {"lengths": {p.label(default="distance"): float(distance)}}
+
+
+@_register("length", "perimeter", "perimeter_triangle", "perimeter_quadrilateral", "perimeter_polygon")
+def _length_perimeter(p: TaskParameters) -> Dict[str, Any]:
+    vertices = p.points("vertices", "polygon", "triangle", "points")
+    name = p.segment_name("vertices", "polygon", "triangle", "points") or "polygon"
+    return {"lengths": {p.label(default=f"perimeter_{name}"): LengthTools.calculate_perimeter_polygon(vertices)}}
+
+
+@_register("length", "circumference")
+def _length_circumference(p: TaskParameters) -> Dict[str, Any]:
+    return {"lengths": {p.label(default="circumference"): float(LengthTools.calculate_circumference(p.number("radius", "r")))}}
+
+
+@_register("length", "chord_length")
+def _length_chord(p: TaskParameters) -> Dict[str, Any]:
+    chord = LengthTools.calculate_chord_length(p.number("radius", "r"), p.angle_rad())
+    return {"lengths": {p.label(default="chord"): float(chord)}}
+
+
+@_register("length", "arc_length")
+def _length_arc(p: TaskParameters) -> Dict[str, Any]:
+    arc = LengthTools.calculate_arc_length(p.number("radius", "r"), p.angle_rad())
+    return {"lengths": {p.label(default="arc"): float(arc)}}
+
+
+# ----------------------------------------------------------------------
+# angle (결과 angles 는 도 단위)
+# ----------------------------------------------------------------------
+@_register("angle", "angle_three_points", "angle", "angle_measure", "angle_between_points")
+def _angle_three_points(p: TaskParameters) -> Dict[str, Any]:
+    if p.raw("angle", "points") is not None and p.raw("vertex") is None:
+        labels = p.point_labels("angle", "points")
+        if len(labels) != 3:
+            raise UnresolvedTask("angle needs three points")
+        p1, vertex, p2 = (p.to_point(label) for label in labels)
+        name = "".join(labels)
+    else:
+        p1, vertex, p2 = p.point("point1", "p1"), p.point("vertex"), p.point("point2", "p2")
+        labels = [p.raw("point1", "p1"), p.raw("vertex"), p.raw("point2", "p2")]
+        name = "".join(labels) if all(isinstance(x, str) for x in labels) else "angle"
+    angle = AngleTools.calculate_angle_three_points(p1, vertex, p2)
+    return {"angles": {p.label(default=name): math.degrees(angle)}}
+
+
+@_register("angle", "interior_angles", "triangle_interior_angles", "interior_angles_triangle", "triangle_angles")
+def _angle_interior(p: TaskParameters) -> Dict[str, Any]:
+    labels = p.point_labels("vertices", "triangle")
+    vertices = p.points("vertices", "triangle", count=3)
+    angles = AngleTools.calculate_interior_angles_triangle(vertices)
+    # calculate_interior_angles_triangle 의 i 번째 값은 (i+1) 번째 꼭짓점의 각
+    names = [labels[(i + 1) % 3] for i in range(3)] if len(labels) == 3 else ["angle_2", "angle_3", "angle_1"]
+    return {"angles": {name: math.degrees(angle) for name, angle in zip(names, angles)}}
+
+
+@_register("angle", "angle_complement", "complement")
+def _angle_complement(p: TaskParameters) -> Dict[str, Any]:
+    return {"angles": {p.label(default="complement"): math.degrees(AngleTools.calculate_angle_complement(p.angle_rad()))}}
+
+
+@_register("angle", "angle_supplement", "supplement")
+def _angle_supplement(p: TaskParameters) -> Dict[str, Any]:
+    return {"angles": {p.label(default="supplement"): math.degrees(AngleTools.calculate_angle_supplement(p.angle_rad()))}}
+
+
+@_register("angle", "regular_polygon_angle", "regular_polygon_interior_angle")
+def _angle_regular_polygon(p: TaskParameters) -> Dict[str, Any]:
+    angle = AngleTools.calculate_regular_polygon_angle(int(p.number("sides", "n", "num_sides")))
+    return {"angles": {p.label(default="interior_angle"): math.degrees(angle)}}
+
+
+@_register("angle", "rotation", "rotate")
+def _angle_rotation(p: TaskParameters) -> Dict[str, Any]:
+    return _coordinate_rotation(p)
+
+
+# ----------------------------------------------------------------------
+# triangle
+# ----------------------------------------------------------------------
+def _triangle(p: TaskParameters) -> Tuple[List[Point], str]:
+    vertices = p.points("vertices", "triangle", "points", count=3)
+    return vertices, p.segment_name("vertices", "triangle", "points") or "ABC"
+
+
+@_register("triangle", "area", "triangle_area")
+def _triangle_area(p: TaskParameters) -> Dict[str, Any]:
+    vertices, name = _triangle(p)
+    return {"areas": {name: TriangleTools.calculate_area(vertices)}}
+
+
+@_register("triangle", "area_from_sides", "triangle_area_from_sides")
+def _triangle_area_from_sides(p: TaskParameters) -> Dict[str, Any]:
+    area = TriangleTools.calculate_area_from_sides(p.number("a", "side1"), p.number("b", "side2"), p.number("c", "side3"))
+    return {"areas": {p.label(default="triangle"): area}}
+
+
+@_register("triangle", "perimeter", "triangle_perimeter")
+def _triangle_perimeter(p: TaskParameters) -> Dict[str, Any]:
+    vertices, name = _triangle(p)
+    return {"lengths": {f"perimeter_{name}": TriangleTools.calculate_perimeter(vertices)}}
+
+
+@_register("triangle", "angles", "triangle_angles", "interior_angles")
+def _triangle_angles(p: TaskParameters) -> Dict[str, Any]:
+    vertices, name = _triangle(p)
+    angles = TriangleTools.calculate_angles(vertices)
+    names = list(name) if len(name) == 3 else ["A", "B", "C"]
+    return {"angles": {n: math.degrees(a) for n, a in zip(names, angles)}}
+
+
+def _triangle_center(method: Callable):
+    def handler(p: TaskParameters) -> Dict[str, Any]:
+        vertices, _ = _triangle(p)
+        center = method(vertices)
+        return {"coordinates": {p.point_label("center", "result_point"): _pt(center)}}
+    handler.__name__ = method.__name__
+    return handler
+
+
+_register("triangle", "centroid", "triangle_centroid")(_triangle_center(TriangleTools.calculate_centroid))
+_register("triangle", "circumcenter", "triangle_circumcenter")(_triangle_center(TriangleTools.calculate_circumcenter))
+_register("triangle", "incenter", "triangle_incenter")(_triangle_center(TriangleTools.calculate_incenter))
+_register("triangle", "orthocenter", "triangle_orthocenter")(_triangle_center(TriangleTools.calculate_orthocenter))
+
+
+@_register("triangle", "centers", "triangle_centers")
+def _triangle_centers(p: TaskParameters) -> Dict[str, Any]:
+    vertices, _ = _triangle(p)
+    centers = TriangleTools.calculate_triangle_centers(vertices)
+    return {"derived_data": {"triangle_centers": {k: _pt(v) for k, v in centers.items()}}}
+
+
+@_register("triangle", "inradius", "triangle_inradius")
+def _triangle_inradius(p: TaskParameters) -> Dict[str, Any]:
+    vertices, name = _triangle(p)
+    return {"lengths": {f"inradius_{name}": TriangleTools.calculate_inradius(vertices)}}
+
+
+@_register("triangle", "circumradius", "triangle_circumradius")
+def _triangle_circumradius(p: TaskParameters) -> Dict[str, Any]:
+    vertices, name = _triangle(p)
+    return {"lengths": {f"circumradius_{name}": TriangleTools.calculate_circumradius(vertices)}}
+
+
+@_register("triangle", "median_lengths", "triangle_median_lengths", "medians")
+def _triangle_medians(p: TaskParameters) -> Dict[str, Any]:
+    vertices, name = _triangle(p)
+    medians = TriangleTools.calculate_median_lengths(vertices)
+    return {"geometric_elements": {"medians": [float(m) for m in medians]}}
+
+
+@_register("triangle", "altitude_lengths", "triangle_altitude_lengths", "altitudes")
+def _triangle_altitudes(p: TaskParameters) -> Dict[str, Any]:
+    vertices, name = _triangle(p)
+    altitudes = TriangleTools.calculate_altitude_lengths(vertices)
+    return {"geometric_elements": {"altitudes": [float(a) for a in altitudes]}}
+
+
+@_register("triangle", "classification", "triangle_classification", "classify")
+def _triangle_classification(p: TaskParameters) -> Dict[str, Any]:
+    vertices, name = _triangle(p)
+    return {"derived_data": {"triangle_properties": {
+        "is_right": TriangleTools.is_right_triangle(vertices),
+        "is_isosceles": TriangleTools.is_isosceles_triangle(vertices),
+        "is_equilateral": TriangleTools.is_equilateral_triangle(vertices),
+    }}}
+
+
+# ----------------------------------------------------------------------
+# circle
+# ----------------------------------------------------------------------
+def _radius(p: TaskParameters) -> float:
+    if p.raw("radius", "r") is not None:
+        return p.number("radius", "r")
+    return CircleTools.calculate_distance(p.point("center"), p.point("point", "point_on_circle"))
+
+
+@_register("circle", "area", "circle_area")
+def _circle_area(p: TaskParameters) -> Dict[str, Any]:
+    return {"areas": {p.label(default="circle"): CircleTools.calculate_area(_radius(p))}}
+
+
+@_register("circle", "circumference", "circle_circumference")
+def _circle_circumference(p: TaskParameters) -> Dict[str, Any]:
+    return {"lengths": {p.label(default="circumference"): CircleTools.calculate_circumference(_radius(p))}}
+
+
+@_register("circle", "diameter", "circle_diameter")
+def _circle_diameter(p: TaskParameters) -> Dict[str, Any]:
+    return {"lengths": {p.label(default="diameter"): 2 * _radius(p)}}
+
+
+@_register("circle", "circle_from_three_points", "circumcircle", "from_three_points")
+def _circle_three_points(p: TaskParameters) -> Dict[str, Any]:
+    p1, p2, p3 = p.points("points", "vertices", count=3)
+    center, radius = CircleTools.calculate_circle_from_three_points(p1, p2, p3)
+    return {
+        "coordinates": {p.point_label("center_label"): _pt(center)},
+        "lengths": {"radius": radius},
+    }
+
+
+@_register("circle", "circle_from_center_and_point", "from_center_and_point", "radius", "circle_radius")
+def _circle_center_point(p: TaskParameters) -> Dict[str, Any]:
+    center, radius = CircleTools.calculate_circle_from_center_and_point(p.point("center"), p.point("point", "point_on_circle"))
+    return {"lengths": {p.label(default="radius"): radius}}
+
+
+@_register("circle", "central_angle")
+def _circle_central_angle(p: TaskParameters) -> Dict[str, Any]:
+    angle = CircleTools.calculate_central_angle(p.point("center"), p.point("point1", "p1"), p.point("point2", "p2"))
+    return {"angles": {p.label(default="central_angle"): math.degrees(angle)}}
+
+
+@_register("circle", "chord_length")
+def _circle_chord(p: TaskParameters) -> Dict[str, Any]:
+    return {"lengths": {p.label(default="chord"): CircleTools.calculate_chord_length(_radius(p), p.angle_rad())}}
+
+
+@_register("circle", "sector_area")
+def _circle_sector(p: TaskParameters) -> Dict[str, Any]:
+    return {"areas": {p.label(default="sector"): CircleTools.calculate_sector_area(_radius(p), p.angle_rad())}}
+
+
+@_register("circle", "segment_area")
+def _circle_segment(p: TaskParameters) -> Dict[str, Any]:
+    return {"areas": {p.label(default="segment"): CircleTools.calculate_segment_area(_radius(p), p.angle_rad())}}
+
+
+@_register("circle", "tangent_points")
+def _circle_tangent_points(p: TaskParameters) -> Dict[str, Any]:
+    points = CircleTools.calculate_tangent_points(p.point("center"), _radius(p), p.point("external_point", "point"))
+    labels = p.result_point_labels(len(points), "result_points", "labels")
+    return {"coordinates": {label: _pt(point) for label, point in zip(labels, points)}}
+
+
+@_register("circle", "circle_intersection", "intersection")
+def _circle_intersection(p: TaskParameters) -> Dict[str, Any]:
+    points = CircleTools.calculate_circle_intersection(
+        p.point("center1"), p.number("radius1", "r1"), p.point("center2"), p.number("radius2", "r2")
+    )
+    if not points:
+        raise UnresolvedTask("circles do not intersect")
+    labels = p.result_point_labels(len(points), "result_points", "labels")
+    return {"coordinates": {label: _pt(point) for label, point in zip(labels, points)}}
+
+
+# ----------------------------------------------------------------------
+# area
+# ----------------------------------------------------------------------
+def _polygon(p: TaskParameters) -> Tuple[List[Point], str]:
+    vertices = p.points("vertices", "polygon", "triangle", "points")
+    return vertices, p.segment_name("vertices", "polygon", "triangle", "points") or "polygon"
+
+
+@_register("area", "area_triangle", "triangle", "triangle_area")
+def _area_triangle(p: TaskParameters) -> Dict[str, Any]:
+    vertices, name = _polygon(p)
+    if len(vertices) != 3:
+        raise UnresolvedTask("triangle area needs three vertices")
+    return {"areas": {p.label(default=name): AreaTools.calculate_area_triangle(vertices)}}
+
+
+@_register("area", "area_polygon", "polygon", "polygon_area", "area_quadrilateral", "quadrilateral_area",
+           "area_rectangle_from_points", "area_parallelogram_from_points", "area_rhombus_from_points",
+           "area_trapezoid_from_points", "area")
+def _area_polygon(p: TaskParameters) -> Dict[str, Any]:
+    if p.raw("vertices", "polygon", "triangle", "points") is None:
+        if p.raw("radius", "r") is not None:
+            return _area_circle(p)
+        raise UnresolvedTask("area without vertices")
+    vertices, name = _polygon(p)
+    return {"areas": {p.label(default=name): AreaTools.calculate_polygon_area(vertices)}}
+
+
+@_register("area", "area_triangle_from_sides", "triangle_from_sides")
+def _area_triangle_sides(p: TaskParameters) -> Dict[str, Any]:
+    area = AreaTools.calculate_area_triangle_from_sides(p.number("a", "side1"), p.number("b", "side2"), p.number("c", "side3"))
+    return {"areas": {p.label(default="triangle"): area}}
+
+
+@_register("area", "area_triangle_from_base_height", "triangle_from_base_height")
+def _area_base_height(p: TaskParameters) -> Dict[str, Any]:
+    area = AreaTools.calculate_area_triangle_from_base_height(p.number("base"), p.number("height"))
+    return {"areas": {p.label(default="triangle"): area}}
+
+
+@_register("area", "area_rectangle", "rectangle")
+def _area_rectangle(p: TaskParameters) -> Dict[str, Any]:
+    return {"areas": {p.label(default="rectangle"): AreaTools.calculate_rectangle_area(p.number("length"), p.number("width"))}}
+
+
+@_register("area", "area_square", "square")
+def _area_square(p: TaskParameters) -> Dict[str, Any]:
+    return {"areas": {p.label(default="square"): AreaTools.calculate_square_area(p.number("side", "side_length"))}}
+
+
+@_register("area", "area_parallelogram", "parallelogram")
+def _area_parallelogram(p: TaskParameters) -> Dict[str, Any]:
+    return {"areas": {p.label(default="parallelogram"): AreaTools.calculate_parallelogram_area(p.number("base"), p.number("height"))}}
+
+
+@_register("area", "area_trapezoid", "trapezoid")
+def _area_trapezoid(p: TaskParameters) -> Dict[str, Any]:
+    area = AreaTools.calculate_trapezoid_area(p.number("a", "base1"), p.number("b", "base2"), p.number("height"))
+    return {"areas": {p.label(default="trapezoid"): area}}
+
+
+@_register("area", "area_rhombus", "rhombus")
+def _area_rhombus(p: TaskParameters) -> Dict[str, Any]:
+    return {"areas": {p.label(default="rhombus"): AreaTools.calculate_area_rhombus(p.number("diagonal1", "d1"), p.number("diagonal2", "d2"))}}
+
+
+@_register("area", "area_regular_polygon", "regular_polygon")
+def _area_regular_polygon(p: TaskParameters) -> Dict[str, Any]:
+    area = AreaTools.calculate_regular_polygon_area(p.number("side_length", "side"), int(p.number("num_sides", "sides", "n")))
+    return {"areas": {p.label(default="regular_polygon"): area}}
+
+
+@_register("area", "area_circle", "circle")
+def _area_circle(p: TaskParameters) -> Dict[str, Any]:
+    return {"areas": {p.label(default="circle"): AreaTools.calculate_area_circle(_radius(p))}}
+
+
+@_register("area", "area_sector", "sector")
+def _area_sector(p: TaskParameters) -> Dict[str, Any]:
+    return {"areas": {p.label(default="sector"): AreaTools.calculate_area_sector(_radius(p), p.angle_rad())}}
+
+
+@_register("area", "area_segment", "segment")
+def _area_segment(p: TaskParameters) -> Dict[str, Any]:
+    return {"areas": {p.label(default="segment"): AreaTools.calculate_area_segment(_radius(p), p.angle_rad())}}
+
+
+# ----------------------------------------------------------------------
+# 실행
+# ----------------------------------------------------------------------
+def resolve_handler(task: CalculationTask) -> Optional[Callable[[TaskParameters], Dict[str, Any]]]:
+    """operation_type, specific_method 순서로 처리 함수를 찾는다"""
+    for candidate in (task.operation_type, task.specific_method):
+        operation = normalize_operation(candidate)
+        if not operation:
+            continue
+        handler = _DISPATCH.get((task.task_type, operation))
+        if handler is None and operation.startswith(f"{task.task_type}_"):
+            handler = _DISPATCH.get((task.task_type, operation[len(task.task_type) + 1:]))
+        if handler is not None:
+            return handler
+    return None
+
+
+def has_deterministic_handler(task: CalculationTask) -> bool:
+    """결정적 엔진이 맡을 작업인지 (스케줄링 비용 추정용, 파라미터 해석 실패 가능성은 보지 않음)"""
+    return DETERMINISTIC_CALCULATION_ENABLED and resolve_handler(task) is not None
+
+
+def run_deterministic_calculation(task: CalculationTask, calculation_results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    작업을 결정적으로 실행
+
+    Returns:
+        CalculationResult 딕셔너리, 처리할 수 없으면 None (LLM 에이전트로 넘김)
+    """
+    handler = resolve_handler(task)
+    if handler is None:
+        return None
+    try:
+        fields = handler(TaskParameters(task, calculation_results or {}))
+    except UnresolvedTask as e:
+        logger.debug("Deterministic engine cannot resolve task %s: %s", task.task_id, e)
+        return None
+    except Exception as e:
+        # 퇴화된 입력 등 도구 오류: LLM 에이전트가 문맥을 보고 다시 판단하도록 넘긴다
+        logger.debug("Deterministic engine failed on task %s: %s", task.task_id, e)
+        return None
+    result = CalculationResult(
+        task_id=task.task_id,
+        success=True,
+        explanation=f"Computed deterministically by {handler.__name__.lstrip('_')} "
+                    f"for operation '{task.operation_type or task.specific_method}'",
+        extras={"engine": "deterministic"},
+        **fields,
+    )
+    return result.to_dict()
+
+
+def try_deterministic_calculation(state: GeometryState, task: CalculationTask) -> bool:
+    """
+    계산 에이전트 진입 시 호출: 결정적으로 처리되면 작업을 완료 처리하고 True 반환
+
+    LLM 경로와 같은 방식으로 큐에서 작업을 제거하고 calculation_results 를 갱신한다.
+    """
+    if not DETERMINISTIC_CALCULATION_ENABLED:
+        return False
+    with span("deterministic_engine", KIND_TOOL, task_id=task.task_id,
+              operation_type=task.operation_type) as engine_span:
+        result = run_deterministic_calculation(task, state.calculation_results)
+        engine_span.set(handled=result is not None)
+    if result is None:
+        return False
+
+    task.result = result
+    task.status = "completed"
+    queue = state.calculation_queue
+    if task.task_id not in queue.completed_task_ids:
+        queue.completed_task_ids.append(task.task_id)
+    queue.tasks = [t for t in queue.tasks if t.task_id != task.task_id]
+    queue.current_task_id = None
+    update_calculation_results(state, task)
+    logger.debug("Task %s completed by deterministic engine", task.task_id)
+    return True
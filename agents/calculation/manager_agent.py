@@ -10,15 +10,29 @@ from langchain.agents import AgentExecutor, create_openai_functions_agent
 from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import JsonOutputParser
 
-from models.state_models import GeometryState, CalculationTask, DependencyGraph, DependencyNode
+from models.state_models import GeometryState, CalculationTask, DependencyGraph, DependencyNode, TaskGraph
 from geo_prompts import CALCULATION_MANAGER_PROMPT, MANAGER_JSON_TEMPLATE
+from geo_prompts.assembly import assemble_prompt
 from utils.llm_manager import LLMManager
 from utils.json_parser import safe_parse_llm_json_output
+from utils.json_stream import stream_json
+from config import STREAMING_PIPELINE
+from agents.geogebra_command_retrieval_agent import prefetch_command_lookup
 from agents.calculation.utils import refine_calculation_manager_input
+from agents.calculation.constraint_solver import try_constraint_solution
+from agents.calculation.router_agent import estimate_task_cost
+from utils.prompt_context import build_prompt_context
+from utils.logger import get_logger, lazy
+
+logger = get_logger(__name__)
+
 
 def build_dependency_graph(tasks: List[CalculationTask]) -> DependencyGraph:
     """
     Build a dependency graph from a list of calculation tasks
+
+    The execution order is critical-path first (see TaskGraph). Dependencies on unknown
+    tasks and dependency cycles are reported here, before any task runs.
     
     Args:
         tasks: List of calculation tasks
@@ -26,44 +40,24 @@ def build_dependency_graph(tasks: List[CalculationTask]) -> DependencyGraph:
     Returns:
         A dependency graph object
     """
+    task_graph = TaskGraph(tasks, cost=estimate_task_cost)
+    if task_graph.dangling:
+        logger.info("Ignoring dependencies on unknown tasks: %s", task_graph.dangling)
+    for cycle in task_graph.cycles:
+        logger.warning("Dependency cycle in calculation tasks: %s", " -> ".join(cycle + cycle[:1]))
+
     graph = DependencyGraph(nodes={})
-    
-    # First pass: create nodes
     for task in tasks:
-        node = DependencyNode(
+        graph.nodes[task.task_id] = DependencyNode(
             task_id=task.task_id,
             dependencies=task.dependencies,
             status="completed" if task.status == "completed" else "pending"
         )
-        graph.nodes[task.task_id] = node
-    
-    # Second pass: determine execution order
-    available_tasks = set()
-    execution_order = []
-    completed_tasks = set()
-    
-    # Initialize with tasks that have no dependencies
-    for task_id, node in graph.nodes.items():
-        if not node.dependencies or all(dep in completed_tasks for dep in node.dependencies):
-            available_tasks.add(task_id)
-    
-    # Build execution order
-    while available_tasks:
-        # Choose a task (for now, just take any)
-        task_id = next(iter(available_tasks))
-        available_tasks.remove(task_id)
-        
-        # Add to execution order and mark as completed
-        execution_order.append(task_id)
-        completed_tasks.add(task_id)
-        
-        # Find new available tasks
-        for next_id, node in graph.nodes.items():
-            if next_id not in completed_tasks and next_id not in available_tasks:
-                if all(dep in completed_tasks for dep in node.dependencies):
-                    available_tasks.add(next_id)
-    
-    graph.execution_order = execution_order
+
+    # Finished tasks first (their results feed the merger), then the schedule
+    completed = [task_id for task_id in task_graph.tasks if task_id in task_graph.completed]
+    graph.execution_order = completed + task_graph.execution_order()
+    logger.debug("Critical path: %s", lazy(task_graph.critical_path))
     return graph
 
 def enhance_calculation_request(task: CalculationTask, results: Dict[str, Any]) -> CalculationTask:
@@ -138,6 +132,35 @@ def is_basic_geometry_task(task: CalculationTask) -> bool:
     
     return False
 
+def complete_coordinate_tasks_with_solution(state: GeometryState, solution: Dict[str, Any]) -> List[str]:
+    """
+    Mark basic coordinate setup tasks as completed with the constraint solver result
+
+    Args:
+        state: Current state object
+        solution: CalculationResult dict produced by the constraint solver
+
+    Returns:
+        IDs of the tasks that were completed
+    """
+    solved = set((solution.get("coordinates") or {}).keys())
+    completed = []
+    for task in state.calculation_queue.tasks:
+        if task.task_type != "coordinate" or task.status == "completed" or not is_basic_geometry_task(task):
+            continue
+        # 작업이 명시한 점이 있으면 모두 풀렸을 때만 대체
+        requested = task.parameters.get("points") or task.parameters.get("vertices")
+        if isinstance(requested, (list, tuple)) and not set(map(str, requested)) <= solved:
+            continue
+        task.status = "completed"
+        task.result = dict(solution, task_id=task.task_id)
+        if task.task_id not in state.calculation_queue.completed_task_ids:
+            state.calculation_queue.completed_task_ids.append(task.task_id)
+        completed.append(task.task_id)
+    if completed:
+        logger.debug("Coordinate tasks completed by constraint solver: %s", completed)
+    return completed
+
 def get_available_tools_for_task(task_type: str) -> Dict[str, List[str]]:
     """
     Get available tools for a specific task type
@@ -177,6 +200,11 @@ def get_available_tools_for_task(task_type: str) -> Dict[str, List[str]]:
     # Return tools for the specified task type or empty dictionary if not found
     return tools_by_task.get(task_type, {"math_tools": [], "validation_tools": []})
 
+def _prefetch_task_command(task_info: Dict[str, Any]) -> None:
+    """Start the command lookup for a streamed task that GeoGebra can do directly"""
+    if isinstance(task_info, dict) and task_info.get("geogebra_alternatives"):
+        prefetch_command_lookup(task_info.get("geogebra_command"))
+
 def calculation_manager_agent(state: GeometryState) -> GeometryState:
     """
     Enhanced calculation manager agent
@@ -192,34 +220,43 @@ def calculation_manager_agent(state: GeometryState) -> GeometryState:
     Returns:
         Updated state object
     """
-    print("[DEBUG] Starting calculation_manager_agent")
+    logger.debug("Starting calculation_manager_agent")
     
     # 이미 초기화된 경우 바로 라우터로 넘어감
     if getattr(state, 'is_manager_initialized', False):
-        print("[DEBUG] Manager already initialized. Routing to calculation_router_agent.")
+        logger.debug("Manager already initialized. Routing to calculation_router_agent.")
         return state
     
+    # 조건 풀이기로 기본 좌표를 먼저 계산 (성공하면 LLM 이 좌표를 이미 아는 상태로 작업을 계획)
+    solver_result = None
+    if not state.calculation_queue.tasks:
+        solver_result = try_constraint_solution(state)
+    
     # 입력 데이터 정제
     refined_input = refine_calculation_manager_input(state)
     
     # 상세 입력 로깅
-    print(f"[DEBUG] Refined Input: {str(refined_input)[:200]}...")
+    logger.debug("Refined Input: %s...", lazy(lambda: str(refined_input)[:200]))
     
     # LLM 초기화
     llm = LLMManager.get_calculation_manager_llm()
     
-    # 프롬프트 생성
-    prompt = CALCULATION_MANAGER_PROMPT
-    
     # 출력 파서 생성
     output_parser = JsonOutputParser()
     
+    # 프롬프트 생성 (JSON 템플릿과 파서 지침은 캐시 가능한 정적 앞부분에 포함)
+    prompt = assemble_prompt(
+        "calculation_manager", CALCULATION_MANAGER_PROMPT, llm.system_message,
+        json_template=MANAGER_JSON_TEMPLATE,
+        format_instructions=output_parser.get_format_instructions(),
+    )
+    
     # 첫 실행인지 확인 - 초기 계산 작업 생성 필요
     is_first_run = (not state.calculation_queue.tasks)
     
     # 첫 실행인 경우, Planner의 청사진으로부터 작업 생성
     if is_first_run and hasattr(state, 'problem_analysis') and state.problem_analysis.get('suggested_tasks_blueprint'):
-        print("[DEBUG] First run: Creating initial tasks from planner blueprint")
+        logger.debug("First run: Creating initial tasks from planner blueprint")
         
         blueprint = state.problem_analysis.get('suggested_tasks_blueprint', [])
         completed_task_ids = []
@@ -278,63 +315,67 @@ def calculation_manager_agent(state: GeometryState) -> GeometryState:
         if state.calculation_queue.tasks:
             state.calculation_queue.dependency_graph = build_dependency_graph(state.calculation_queue.tasks)
     
-    # 체인 생성
-    chain = prompt | llm | output_parser
-    
     # 에이전트 실행 - 정제된 입력 사용
-    result = chain.invoke({
+    chain_input = {
         "problem": refined_input["problem"],
-        "parsed_elements": str(refined_input["parsed_elements"]),
-        "problem_analysis": str(refined_input["problem_analysis"]),
-        "calculation_results": str(refined_input["calculation_results"]),
-        "calculation_queue": str(refined_input.get("calculation_queue", {})),
-        "json_template": MANAGER_JSON_TEMPLATE,
-        "format_instructions": output_parser.get_format_instructions()
-    })
+        **build_prompt_context(
+            "calculation_manager",
+            parsed_elements=refined_input["parsed_elements"],
+            problem_analysis=refined_input["problem_analysis"],
+            calculation_results=refined_input["calculation_results"],
+            calculation_queue=refined_input.get("calculation_queue", {}),
+        ),
+    }
+    if STREAMING_PIPELINE:
+        # 응답을 스트리밍으로 받으며 작업이 닫힐 때마다 GeoGebra 대체 명령어 검색을 미리 시작
+        # (누적된 메시지는 아래 파싱 로직이 처리)
+        result = stream_json(prompt | llm, chain_input, {("tasks",): _prefetch_task_command})
+    else:
+        result = (prompt | llm | output_parser).invoke(chain_input)
     
     # LLM 응답 로깅
-    print(f"[DEBUG] Manager Agent Raw Response: {str(result)[:200]}...")
+    logger.debug("Manager Agent Raw Response: %s...", lazy(lambda: str(result)[:200]))
     
     try:
         # 결과가 이미 딕셔너리 형태인지 확인
         if isinstance(result, dict):
-            print("[DEBUG] 결과가 이미 딕셔너리 형태입니다")
+            logger.debug("결과가 이미 딕셔너리 형태입니다")
             parsed_result = result
         else:
             # AIMessage 객체인지 확인하고 content 추출
             if hasattr(result, 'content'):
-                print("[DEBUG] AIMessage 객체에서 content 추출")
+                logger.debug("AIMessage 객체에서 content 추출")
                 result_content = result.content
             else:
                 result_content = result
-                print(f"[DEBUG] 결과를 그대로 사용합니다: {type(result_content)}")
+                logger.debug("결과를 그대로 사용합니다: %s", type(result_content))
                 
             # 개선된 JSON 파싱 로직
             try:
                 # 기존 출력 파서 시도
                 parsed_result = output_parser.parse(result_content)
-                print("[DEBUG] 기본 출력 파서로 파싱 성공")
+                logger.debug("기본 출력 파서로 파싱 성공")
             except Exception as parser_error:
-                print(f"[WARNING] 기본 출력 파서 실패: {parser_error}")
+                logger.warning("기본 출력 파서 실패: %s", parser_error)
                 
                 # 사용자 제공 JSON 직접 처리 시도
                 if isinstance(result_content, str) and result_content.strip().startswith('{'):
                     try:
                         import json
                         parsed_result = json.loads(result_content)
-                        print("[DEBUG] 직접 JSON 파싱 성공")
+                        logger.debug("직접 JSON 파싱 성공")
                     except json.JSONDecodeError as json_error:
-                        print(f"[WARNING] 직접 JSON 파싱 실패: {json_error}")
+                        logger.warning("직접 JSON 파싱 실패: %s", json_error)
                         # 안전한 파서 시도
                         parsed_result = safe_parse_llm_json_output(result_content, dict)
                 else:
                     # 안전한 파서 시도
-                    print("[DEBUG] 안전한 JSON 파서로 파싱 시도")
+                    logger.debug("안전한 JSON 파서로 파싱 시도")
                     parsed_result = safe_parse_llm_json_output(result_content, dict)
                 
                 # 안전한 파서도 실패하면 결과 문자열 직접 검사
                 if not parsed_result and isinstance(result_content, str):
-                    print("[DEBUG] 직접 JSON 추출 시도")
+                    logger.debug("직접 JSON 추출 시도")
                     # JSON 부분 직접 추출 시도
                     import re
                     json_pattern = r'```json\s*([\s\S]*?)\s*```'
@@ -344,9 +385,9 @@ def calculation_manager_agent(state: GeometryState) -> GeometryState:
                             import json
                             json_str = json_match.group(1).strip()
                             parsed_result = json.loads(json_str)
-                            print("[DEBUG] 마크다운 블록에서 JSON 추출 성공")
+                            logger.debug("마크다운 블록에서 JSON 추출 성공")
                         except Exception as direct_error:
-                            print(f"[ERROR] 마크다운 블록에서 JSON 추출 실패: {direct_error}")
+                            logger.error("마크다운 블록에서 JSON 추출 실패: %s", direct_error)
                             parsed_result = {}
                     else:
                         # 전체 JSON 객체 찾기 시도
@@ -356,22 +397,22 @@ def calculation_manager_agent(state: GeometryState) -> GeometryState:
                             try:
                                 json_str = json_obj_match.group(1).strip()
                                 parsed_result = json.loads(json_str)
-                                print("[DEBUG] 문자열에서 JSON 객체 추출 성공")
+                                logger.debug("문자열에서 JSON 객체 추출 성공")
                             except Exception as json_error:
-                                print(f"[ERROR] JSON 객체 추출 실패: {json_error}")
+                                logger.error("JSON 객체 추출 실패: %s", json_error)
                                 parsed_result = {}
                         else:
-                            print("[WARNING] 결과에서 JSON 콘텐츠를 찾을 수 없습니다")
+                            logger.warning("결과에서 JSON 콘텐츠를 찾을 수 없습니다")
                             parsed_result = {}
         
         if parsed_result:
-            print(f"[DEBUG] 파싱 결과 키: {parsed_result.keys() if parsed_result else 'None'}")
+            logger.debug("파싱 결과 키: %s", parsed_result.keys() if parsed_result else 'None')
         else:
-            print("[WARNING] 파싱 결과가 비어 있습니다")
+            logger.warning("파싱 결과가 비어 있습니다")
         
         # 확실한 null 체크 추가
         if parsed_result is None:
-            print("[WARNING] Manager 에이전트 응답 파싱 실패")
+            logger.warning("Manager 에이전트 응답 파싱 실패")
             # fallback 로직으로 직접 이동
             raise ValueError("Manager 응답 파싱 실패")
             
@@ -528,11 +569,11 @@ def calculation_manager_agent(state: GeometryState) -> GeometryState:
         setattr(state, 'is_manager_initialized', True)
         
     except Exception as e:
-        print(f"Error processing calculation manager result: {e}")
+        logger.error("Error processing calculation manager result: %s", e)
         
         # 기본 의존성 그래프 생성
         if state.calculation_queue and state.calculation_queue.tasks:
-            print("[DEBUG] Creating basic dependency graph as fallback")
+            logger.debug("Creating basic dependency graph as fallback")
             state.calculation_queue.dependency_graph = build_dependency_graph(state.calculation_queue.tasks)
             
             # 기본 도형 좌표 계산 작업 우선 순위 지정 (에러 발생해도 적용)
@@ -545,4 +586,8 @@ def calculation_manager_agent(state: GeometryState) -> GeometryState:
         # Manager 초기화 완료 표시 - 에러가 있어도 라우터가 처리하도록
         setattr(state, 'is_manager_initialized', True)
     
+    # 조건 풀이기 좌표로 대체 가능한 기본 좌표 작업은 실행하지 않음
+    if solver_result:
+        complete_coordinate_tasks_with_solution(state, solver_result)
+    
     return state 
\ No newline at end of file
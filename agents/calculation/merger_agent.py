@@ -7,10 +7,19 @@
 
 from models.state_models import GeometryState, ConstructionPlan, ConstructionStep
 from geo_prompts import RESULT_MERGER_PROMPT, MERGER_JSON_TEMPLATE
+from geo_prompts.assembly import assemble_prompt
 from utils.llm_manager import LLMManager
 from langchain_core.output_parsers import JsonOutputParser
 from utils.json_parser import safe_parse_llm_json_output
+from utils.prompt_context import build_prompt_context
+from utils.json_stream import stream_json
+from config import STREAMING_PIPELINE
+from agents.geogebra_command_retrieval_agent import prefetch_step_commands
 import re
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 
 def calculation_result_merger_agent(state: GeometryState) -> GeometryState:
     """
@@ -25,18 +34,19 @@ def calculation_result_merger_agent(state: GeometryState) -> GeometryState:
     Returns:
         Updated state object
     """
-    print("[DEBUG] Starting calculation_result_merger_agent")
+    logger.debug("Starting calculation_result_merger_agent")
     
     # Check if calculation queue exists
     if not state.calculation_queue:
-        print("[DEBUG] No calculation queue found. Returning state.")
+        logger.debug("No calculation queue found. Returning state.")
         return state
     
     # Initialize LLM
     llm = LLMManager.get_calculation_merger_llm()
     
-    # Create prompt
-    prompt = RESULT_MERGER_PROMPT
+    # Create prompt (the JSON template goes into the cacheable static prefix)
+    prompt = assemble_prompt("result_merger", RESULT_MERGER_PROMPT, llm.system_message,
+                             json_template=MERGER_JSON_TEMPLATE)
     
     # Initialize output parser
     output_parser = JsonOutputParser()
@@ -83,70 +93,77 @@ def calculation_result_merger_agent(state: GeometryState) -> GeometryState:
         geometric_constraints = state.geometric_constraints
     
     # Invoke the agent
-    result = chain.invoke({
+    chain_input = {
         "problem": state.input_problem,
-        "completed_tasks": str([task.model_dump() for task in completed_tasks]),
-        "calculation_results": str(state.calculation_results),
-        "problem_analysis": str(problem_analysis),
-        "dependency_graph": str(dependency_graph.model_dump() if dependency_graph else {}),
-        "geometric_constraints": str(geometric_constraints),
-        "geogebra_commands": str(geogebra_commands),
-        "json_template": MERGER_JSON_TEMPLATE,
+        **build_prompt_context(
+            "merger",
+            completed_tasks=[task.model_dump() for task in completed_tasks],
+            calculation_results=state.calculation_results,
+            problem_analysis=problem_analysis,
+            dependency_graph=dependency_graph.model_dump() if dependency_graph else {},
+            geometric_constraints=geometric_constraints,
+            geogebra_commands=geogebra_commands,
+        ),
         "agent_scratchpad": ""
-    })
+    }
+    if STREAMING_PIPELINE:
+        # Stream the response and start command retrieval as soon as each construction step closes
+        result = stream_json(chain, chain_input, {("construction_plan", "steps"): prefetch_step_commands})
+    else:
+        result = chain.invoke(chain_input)
     
     # Parse JSON result using safe parser
     try:
-        print(f"[DEBUG] 병합 에이전트 결과 파싱을 시작합니다: 출력 타입 = {type(result)}")
+        logger.debug("병합 에이전트 결과 파싱을 시작합니다: 출력 타입 = %s", type(result))
         
         # 결과가 이미 딕셔너리 형태인지 확인
         if isinstance(result, dict):
-            print("[DEBUG] 결과가 이미 딕셔너리 형태입니다")
+            logger.debug("결과가 이미 딕셔너리 형태입니다")
             final_results = result
         else:
             # 결과 콘텐츠 추출
             result_content = None
             if hasattr(result, 'content'):
-                print("[DEBUG] AIMessage 객체에서 content 추출")
+                logger.debug("AIMessage 객체에서 content 추출")
                 result_content = result.content
             elif hasattr(result, 'output'):
-                print("[DEBUG] 객체에서 output 추출")
+                logger.debug("객체에서 output 추출")
                 result_content = result.output
             else:
                 result_content = result
-                print(f"[DEBUG] 결과를 그대로 사용합니다: {type(result_content)}")
+                logger.debug("결과를 그대로 사용합니다: %s", type(result_content))
                 
             # JSON 파싱 로직
             try:
                 # 기존 출력 파서 시도
-                print("[DEBUG] 기본 출력 파서로 파싱 시도")
+                logger.debug("기본 출력 파서로 파싱 시도")
                 final_results = output_parser.parse(result_content)
-                print("[DEBUG] 기본 출력 파서로 파싱 성공")
+                logger.debug("기본 출력 파서로 파싱 성공")
             except Exception as parser_error:
-                print(f"[WARNING] 기본 출력 파서 실패: {parser_error}")
+                logger.warning("기본 출력 파서 실패: %s", parser_error)
                 
                 # 사용자 제공 JSON 직접 처리 시도
                 if isinstance(result_content, str) and result_content.strip().startswith('{'):
                     try:
-                        print("[DEBUG] 직접 JSON 파싱 시도")
+                        logger.debug("직접 JSON 파싱 시도")
                         import json
                         final_results = json.loads(result_content)
-                        print("[DEBUG] 직접 JSON 파싱 성공")
+                        logger.debug("직접 JSON 파싱 성공")
                     except json.JSONDecodeError as json_error:
-                        print(f"[WARNING] 직접 JSON 파싱 실패: {json_error}")
+                        logger.warning("직접 JSON 파싱 실패: %s", json_error)
                         # 안전한 파서 시도
-                        print("[DEBUG] 안전한 JSON 파서로 파싱 시도")
+                        logger.debug("안전한 JSON 파서로 파싱 시도")
                         final_results = safe_parse_llm_json_output(result_content, dict)
                 else:
                     # 안전한 파서 시도
-                    print("[DEBUG] 안전한 JSON 파서로 파싱 시도")
+                    logger.debug("안전한 JSON 파서로 파싱 시도")
                     final_results = safe_parse_llm_json_output(result_content, dict)
                 
-                print(f"[DEBUG] 최종 파싱 결과: {type(final_results)}")
+                logger.debug("최종 파싱 결과: %s", type(final_results))
                 
                 # 안전한 파서도 실패하면 결과 문자열 직접 검사
                 if not final_results and isinstance(result_content, str):
-                    print("[DEBUG] 직접 JSON 추출 시도")
+                    logger.debug("직접 JSON 추출 시도")
                     # JSON 부분 직접 추출 시도
                     import re
                     json_pattern = r'```json\s*([\s\S]*?)\s*```'
@@ -155,9 +172,9 @@ def calculation_result_merger_agent(state: GeometryState) -> GeometryState:
                         try:
                             json_str = json_match.group(1).strip()
                             final_results = json.loads(json_str)
-                            print("[DEBUG] 마크다운 블록에서 JSON 추출 성공")
+                            logger.debug("마크다운 블록에서 JSON 추출 성공")
                         except Exception as direct_error:
-                            print(f"[ERROR] 마크다운 블록에서 JSON 추출 실패: {direct_error}")
+                            logger.error("마크다운 블록에서 JSON 추출 실패: %s", direct_error)
                             final_results = {}
                     else:
                         # 전체 JSON 객체 찾기 시도
@@ -167,16 +184,16 @@ def calculation_result_merger_agent(state: GeometryState) -> GeometryState:
                             try:
                                 json_str = json_obj_match.group(1).strip()
                                 final_results = json.loads(json_str)
-                                print("[DEBUG] 문자열에서 JSON 객체 추출 성공")
+                                logger.debug("문자열에서 JSON 객체 추출 성공")
                             except Exception as json_error:
-                                print(f"[ERROR] JSON 객체 추출 실패: {json_error}")
+                                logger.error("JSON 객체 추출 실패: %s", json_error)
                                 final_results = {}
                         else:
-                            print("[WARNING] 결과에서 JSON 콘텐츠를 찾을 수 없습니다")
+                            logger.warning("결과에서 JSON 콘텐츠를 찾을 수 없습니다")
                             final_results = {}
         
         if final_results:
-            print(f"[DEBUG] 파싱 결과 키: {list(final_results.keys()) if isinstance(final_results, dict) else '리스트'}")
+            logger.debug("파싱 결과 키: %s", list(final_results.keys()) if isinstance(final_results, dict) else '리스트')
             # Extract construction plan
             construction_plan_data = final_results.pop("construction_plan", {})
             
@@ -222,11 +239,11 @@ def calculation_result_merger_agent(state: GeometryState) -> GeometryState:
             # Update state with merged calculations
             state.calculations = final_results
             
-            print("[DEBUG] Successfully merged calculation results and generated construction plan")
+            logger.debug("Successfully merged calculation results and generated construction plan")
         else:
-            print("[WARNING] Failed to parse merger agent result")
+            logger.warning("Failed to parse merger agent result")
     
     except Exception as e:
-        print(f"[ERROR] Error processing merger agent result: {e}")
+        logger.error("Error processing merger agent result: %s", e)
     
     return state 
\ No newline at end of file
@@ -2,11 +2,50 @@
 계산 라우터 에이전트 모듈
 
 이 모듈은 계산 태스크 간의 라우팅을 관리하고 흐름을 제어하는 에이전트를 구현합니다.
-Manager 에이전트에 의해 구축된 의존성 그래프를 바탕으로 다음에 실행할 계산 에이전트를 결정합니다.
+작업 의존성으로 만든 TaskGraph (진입 차수 카운터 + 준비 힙)를 바탕으로 다음에 실행할 계산 에이전트를
+결정합니다. 결정적 엔진이 맡는 작업은 싸고 LLM 에이전트 작업은 비싸다고 보고 임계 경로가 긴 작업부터
+실행합니다.
 """
 
 from typing import Dict, Any, List, Optional
-from models.state_models import GeometryState, CalculationTask
+from models.state_models import GeometryState, CalculationTask, CalculationQueue, TaskGraph
+from agents.calculation.deterministic_engine import has_deterministic_handler
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 작업 비용 추정 (LLM 에이전트 호출 1회 기준 상대값): 결정적 엔진이 맡는 작업은 거의 공짜
+LLM_TASK_COST = 1.0
+DETERMINISTIC_TASK_COST = 0.05
+
+
+def estimate_task_cost(task: CalculationTask) -> float:
+    """임계 경로 우선순위 계산에 쓰는 작업 비용 추정"""
+    if task.status == "completed":
+        return 0.0
+    return DETERMINISTIC_TASK_COST if has_deterministic_handler(task) else LLM_TASK_COST
+
+
+def fail_blocked_tasks(queue: CalculationQueue, graph: TaskGraph) -> None:
+    """
+    순환 의존성 때문에 영원히 실행될 수 없는 작업을 실패 처리
+
+    순환에 속한 작업과 그 뒤에 걸린 작업은 오류 결과와 함께 failed 상태가 되어
+    라우터가 다시 기다리지 않고, 나머지 작업은 그대로 진행된다.
+    """
+    cycle_of = {task_id: cycle for cycle in graph.cycles for task_id in cycle}
+    for task_id in graph.blocked:
+        task = graph.tasks[task_id]
+        if task.status != "pending":
+            continue
+        cycle = cycle_of.get(task_id)
+        if cycle:
+            error = "Dependency cycle: " + " -> ".join(cycle + cycle[:1])
+        else:
+            error = "Depends on tasks in a dependency cycle"
+        task.status = "failed"
+        task.result = {"task_id": task_id, "success": False, "error": error}
+        logger.warning("Task %s can never run: %s", task_id, error)
 
 
 def calculation_router_agent(state: GeometryState) -> GeometryState:
@@ -14,7 +53,7 @@ def calculation_router_agent(state: GeometryState) -> GeometryState:
     계산 라우터 에이전트
     
     계산 큐의 상태를 확인하고 다음 실행해야 할 계산 에이전트를 결정합니다.
-    의존성이 충족된 작업을 찾아 실행 대기열에 추가합니다.
+    큐를 TaskGraph 로 색인해 의존성이 충족된 작업 중 임계 경로가 가장 긴 작업을 고릅니다.
     
     Args:
         state: 현재 상태 객체
@@ -22,95 +61,49 @@ def calculation_router_agent(state: GeometryState) -> GeometryState:
     Returns:
         업데이트된 상태 객체
     """
-    print("[DEBUG] Starting calculation_router_agent")
+    logger.debug("Starting calculation_router_agent")
+    queue = state.calculation_queue
     
     # 현재 실행 중인 작업이 있고 완료되었으면 처리
-    if state.calculation_queue.current_task_id:
+    if queue.current_task_id:
         # 현재 작업 완료 처리
-        for task in state.calculation_queue.tasks:
-            if task.task_id == state.calculation_queue.current_task_id:
+        for task in queue.tasks:
+            if task.task_id == queue.current_task_id:
                 task.status = "completed"
-                if task.task_id not in state.calculation_queue.completed_task_ids:
-                    state.calculation_queue.completed_task_ids.append(task.task_id)
-                print(f"[DEBUG] Marked task {task.task_id} as completed")
+                if task.task_id not in queue.completed_task_ids:
+                    queue.completed_task_ids.append(task.task_id)
+                logger.debug("Marked task %s as completed", task.task_id)
                 break
         
         # 현재 작업 ID 초기화
-        state.calculation_queue.current_task_id = None
+        queue.current_task_id = None
     
-    # 모든 작업이 완료되었는지 확인
-    all_completed = True
-    for task in state.calculation_queue.tasks:
-        if task.status != "completed" and task.task_id not in state.calculation_queue.completed_task_ids:
-            all_completed = False
-            break
+    graph = queue.task_graph(estimate_task_cost)
+    if graph.dangling:
+        logger.debug("Ignoring dependencies on unknown tasks: %s", graph.dangling)
+    fail_blocked_tasks(queue, graph)
     
-    if all_completed:
-        print("[DEBUG] All calculations completed. Setting next_calculation to None for merger.")
+    next_task = graph.pop()
+    if next_task is None:
+        logger.debug("No more executable tasks. Setting next_calculation to None for merger.")
         state.next_calculation = None
         return state
     
-    # 의존성 그래프를 사용하여 다음 실행 가능한 작업 찾기
-    if state.calculation_queue.dependency_graph and state.calculation_queue.dependency_graph.execution_order:
-        for task_id in state.calculation_queue.dependency_graph.execution_order:
-            node = state.calculation_queue.dependency_graph.nodes.get(task_id)
-            if node and node.status != "completed":
-                # 이 작업이 이미 완료되었는지 확인
-                if task_id in state.calculation_queue.completed_task_ids:
-                    node.status = "completed"
-                    continue
-                
-                # 의존성이 충족되었는지 확인
-                deps_satisfied = True
-                for dep in node.dependencies:
-                    dep_satisfied = False
-                    for comp_id in state.calculation_queue.completed_task_ids:
-                        if dep == comp_id:
-                            dep_satisfied = True
-                            break
-                    
-                    if not dep_satisfied:
-                        deps_satisfied = False
-                        break
-                
-                if deps_satisfied:
-                    # 작업 찾기
-                    for task in state.calculation_queue.tasks:
-                        if task.task_id == task_id:
-                            # 작업 설정
-                            state.calculation_queue.current_task_id = task.task_id
-                            state.next_calculation = task.task_type
-                            task.status = "running"
-                            
-                            # 이전 계산 결과로 파라미터 향상
-                            enhance_task_with_results(task, state.calculation_results)
-                            
-                            print(f"[DEBUG] Selected task {task.task_id} of type {task.task_type} for execution")
-                            return state
+    queue.current_task_id = next_task.task_id
+    state.next_calculation = next_task.task_type
+    next_task.status = "running"
     
-    # 의존성 그래프가 없거나 사용할 수 없을 경우 fallback 메커니즘
-    print("[DEBUG] Using fallback mechanism to find next task")
-    next_task = find_next_task_fallback(state.calculation_queue.tasks, state.calculation_queue.completed_task_ids)
-    
-    if next_task:
-        state.calculation_queue.current_task_id = next_task.task_id
-        state.next_calculation = next_task.task_type
-        next_task.status = "running"
-        
-        # 이전 계산 결과로 파라미터 향상
-        enhance_task_with_results(next_task, state.calculation_results)
-        
-        print(f"[DEBUG] Fallback: Selected task {next_task.task_id} of type {next_task.task_type}")
-    else:
-        print("[DEBUG] No more executable tasks. Setting next_calculation to None for merger.")
-        state.next_calculation = None
+    # 이전 계산 결과로 파라미터 향상
+    enhance_task_with_results(next_task, state.calculation_results)
     
+    logger.debug("Selected task %s of type %s for execution (priority %.2f)",
+                 next_task.task_id, next_task.task_type, graph.priority[next_task.task_id])
     return state
 
 
 def find_next_task_fallback(tasks: List[CalculationTask], completed_task_ids: List[str]) -> Optional[CalculationTask]:
     """
-    의존성 그래프가 없을 때 다음 실행 가능한 작업을 찾는 fallback 함수
+    큐 객체 없이 작업 목록만으로 다음 실행 가능한 작업을 찾는 함수
     
     Args:
         tasks: 모든 계산 작업 목록
@@ -119,19 +112,7 @@ def find_next_task_fallback(tasks: List[CalculationTask], completed_task_ids: Li
     Returns:
         다음 실행할 작업 또는 None
     """
-    for task in tasks:
-        if task.status == "pending" and task.task_id not in completed_task_ids:
-            # 모든 의존성이 충족되었는지 확인
-            deps_satisfied = True
-            for dep in task.dependencies:
-                if dep not in completed_task_ids:
-                    deps_satisfied = False
-                    break
-            
-            if deps_satisfied:
-                return task
-    
-    return None
+    return TaskGraph(tasks, completed_task_ids, estimate_task_cost).pop()
 
 
 def enhance_task_with_results(task: CalculationTask, calculation_results: Dict[str, Any]) -> None:
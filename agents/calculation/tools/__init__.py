@@ -4,4 +4,12 @@ from agents.calculation.tools.angle_tools import AngleTools
 from agents.calculation.tools.length_tools import LengthTools
 from agents.calculation.tools.coordinate_tools import CoordinateTools
 from agents.calculation.tools.base_tools import GeometryToolBase
-from agents.calculation.tools.circle_tools import CircleTools 
\ No newline at end of file
+from agents.calculation.tools.circle_tools import CircleTools
+from agents.calculation.tools.batch_tools import (
+    BatchTriangleTools,
+    BatchCircleTools,
+    BatchAngleTools,
+    BatchCoordinateTools,
+    BatchAreaTools,
+    BatchLengthTools,
+)
@@ -5,7 +5,6 @@ This module defines the base class that all geometry tools inherit from.
 """
 
 from typing import Dict, Any, List, Tuple, Optional
-import numpy as np
 import math
 import json
 from langchain_core.tools import ToolException
@@ -53,24 +52,15 @@ class GeometryToolBase:
     @staticmethod
     def calculate_angle(p1: Tuple[float, float], p2: Tuple[float, float], p3: Tuple[float, float]) -> float:
         """세 점으로 이루어진 각도 계산 (라디안)"""
-        v1 = np.array([p1[0] - p2[0], p1[1] - p2[1]])
-        v2 = np.array([p3[0] - p2[0], p3[1] - p2[1]])
+        v1x, v1y = p1[0] - p2[0], p1[1] - p2[1]
+        v2x, v2y = p3[0] - p2[0], p3[1] - p2[1]
         
-        # 벡터 정규화
-        v1_norm = np.linalg.norm(v1)
-        v2_norm = np.linalg.norm(v2)
-        
-        if v1_norm == 0 or v2_norm == 0:
+        # 스칼라 계산이므로 NumPy 배열을 만들지 않는다 (배치 계산은 batch_tools 사용)
+        if (v1x == 0 and v1y == 0) or (v2x == 0 and v2y == 0):
             return 0
         
-        # 코사인 값 계산
-        cos_angle = np.dot(v1, v2) / (v1_norm * v2_norm)
-        
-        # 부동소수점 오차 처리
-        cos_angle = max(min(cos_angle, 1.0), -1.0)
-        
-        # 각도 계산 (라디안)
-        return np.arccos(cos_angle)
+        # atan2(|외적|, 내적): 0 과 π 근처에서도 arccos 보다 정확
+        return math.atan2(abs(v1x * v2y - v1y * v2x), v1x * v2x + v1y * v2y)
     
     @staticmethod
     def degrees_to_radians(degrees: float) -> float:
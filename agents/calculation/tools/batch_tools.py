@@ -0,0 +1,428 @@
+"""
+Vectorized batch geometry tools
+
+This module provides NumPy batch counterparts of the scalar tool classes for
+candidate search, constraint checking and bulk problem generation.
+
+Conventions:
+- Points are (N, 2) float arrays, triangles (N, 3, 2), polygons (N, K, 2),
+  lines (N, 3) coefficient arrays for ax + by + c = 0, radii/angles (N,).
+- Angles are in radians, as in the scalar tools.
+- Degenerate inputs never raise: the affected rows are NaN, and functions whose
+  result count varies (intersections, tangents) also return a boolean mask.
+"""
+
+from typing import Tuple
+import numpy as np
+
+EPS = 1e-10
+
+
+def _points(array) -> np.ndarray:
+    """Convert input to an (N, 2) float array (a single point becomes N=1)"""
+    array = np.asarray(array, dtype=float)
+    if array.ndim == 1:
+        array = array[np.newaxis, :]
+    if array.shape[-1] != 2:
+        raise ValueError(f"expected points with shape (N, 2), got {array.shape}")
+    return array
+
+
+def _polygons(array, vertices: int = None) -> np.ndarray:
+    """Convert input to an (N, K, 2) float array"""
+    array = np.asarray(array, dtype=float)
+    if array.ndim == 2:
+        array = array[np.newaxis, :, :]
+    if array.ndim != 3 or array.shape[-1] != 2 or (vertices is not None and array.shape[1] != vertices):
+        expected = f"(N, {vertices}, 2)" if vertices else "(N, K, 2)"
+        raise ValueError(f"expected polygons with shape {expected}, got {array.shape}")
+    return array
+
+
+def _lines(array) -> np.ndarray:
+    array = np.asarray(array, dtype=float)
+    if array.ndim == 1:
+        array = array[np.newaxis, :]
+    if array.shape[-1] != 3:
+        raise ValueError(f"expected lines with shape (N, 3), got {array.shape}")
+    return array
+
+
+def _cross(u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    return u[..., 0] * v[..., 1] - u[..., 1] * v[..., 0]
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Elementwise division with NaN where the denominator is (near) zero"""
+    denominator = np.asarray(denominator, dtype=float)
+    valid = np.abs(denominator) > EPS
+    out = np.full(np.broadcast(numerator, denominator).shape, np.nan)
+    np.divide(numerator, denominator, out=out, where=np.broadcast_to(valid, out.shape))
+    return out
+
+
+class BatchLengthTools:
+    """Batch length calculations"""
+
+    @staticmethod
+    def distances(p1, p2) -> np.ndarray:
+        """Distances between paired points, shape (N,)"""
+        return np.linalg.norm(_points(p2) - _points(p1), axis=-1)
+
+    @staticmethod
+    def distances_point_to_line(points, lines) -> np.ndarray:
+        """Distances from points to lines, NaN for degenerate lines (a = b = 0)"""
+        points, lines = _points(points), _lines(lines)
+        numerator = np.abs(lines[:, 0] * points[:, 0] + lines[:, 1] * points[:, 1] + lines[:, 2])
+        return _safe_divide(numerator, np.hypot(lines[:, 0], lines[:, 1]))
+
+    @staticmethod
+    def perimeters(polygons) -> np.ndarray:
+        """Perimeters of closed polygons, shape (N,)"""
+        polygons = _polygons(polygons)
+        edges = np.roll(polygons, -1, axis=1) - polygons
+        return np.linalg.norm(edges, axis=-1).sum(axis=1)
+
+    @staticmethod
+    def side_lengths(triangles) -> np.ndarray:
+        """Side lengths (a, b, c) opposite vertices (p1, p2, p3), shape (N, 3)"""
+        t = _polygons(triangles, 3)
+        a = np.linalg.norm(t[:, 2] - t[:, 1], axis=-1)
+        b = np.linalg.norm(t[:, 2] - t[:, 0], axis=-1)
+        c = np.linalg.norm(t[:, 1] - t[:, 0], axis=-1)
+        return np.stack([a, b, c], axis=1)
+
+
+class BatchAreaTools:
+    """Batch area calculations"""
+
+    @staticmethod
+    def polygon_areas(polygons) -> np.ndarray:
+        """Unsigned shoelace areas of polygons, shape (N,)"""
+        return np.abs(BatchAreaTools.signed_polygon_areas(polygons))
+
+    @staticmethod
+    def signed_polygon_areas(polygons) -> np.ndarray:
+        """Signed shoelace areas (positive for counterclockwise vertex order)"""
+        polygons = _polygons(polygons)
+        following = np.roll(polygons, -1, axis=1)
+        return 0.5 * _cross(polygons, following).sum(axis=1)
+
+    @staticmethod
+    def triangle_areas_from_sides(sides) -> np.ndarray:
+        """Heron's formula for (N, 3) side lengths, NaN where the triangle inequality fails"""
+        sides = np.asarray(sides, dtype=float).reshape(-1, 3)
+        s = sides.sum(axis=1) / 2
+        product = s * (s - sides[:, 0]) * (s - sides[:, 1]) * (s - sides[:, 2])
+        product = np.where(product > -EPS, np.maximum(product, 0.0), np.nan)
+        return np.sqrt(product)
+
+    @staticmethod
+    def circle_areas(radii) -> np.ndarray:
+        radii = np.asarray(radii, dtype=float)
+        return np.where(radii > 0, np.pi * radii ** 2, np.nan)
+
+    @staticmethod
+    def sector_areas(radii, angles) -> np.ndarray:
+        radii = np.asarray(radii, dtype=float)
+        return np.where(radii > 0, 0.5 * radii ** 2 * np.asarray(angles, dtype=float), np.nan)
+
+
+class BatchTriangleTools:
+    """Batch triangle calculations on (N, 3, 2) vertex arrays"""
+
+    @staticmethod
+    def degenerate_mask(triangles) -> np.ndarray:
+        """True where the three vertices are (nearly) collinear"""
+        t = _polygons(triangles, 3)
+        return np.abs(_cross(t[:, 1] - t[:, 0], t[:, 2] - t[:, 0])) < EPS
+
+    @staticmethod
+    def areas(triangles) -> np.ndarray:
+        return BatchAreaTools.polygon_areas(_polygons(triangles, 3))
+
+    @staticmethod
+    def perimeters(triangles) -> np.ndarray:
+        return BatchLengthTools.perimeters(_polygons(triangles, 3))
+
+    @staticmethod
+    def angles(triangles) -> np.ndarray:
+        """Interior angles at (p1, p2, p3), shape (N, 3), NaN rows for degenerate triangles"""
+        t = _polygons(triangles, 3)
+        result = np.stack([
+            BatchAngleTools.angles_three_points(t[:, 1], t[:, 0], t[:, 2]),
+            BatchAngleTools.angles_three_points(t[:, 0], t[:, 1], t[:, 2]),
+            BatchAngleTools.angles_three_points(t[:, 0], t[:, 2], t[:, 1]),
+        ], axis=1)
+        result[BatchTriangleTools.degenerate_mask(t)] = np.nan
+        return result
+
+    @staticmethod
+    def centroids(triangles) -> np.ndarray:
+        return _polygons(triangles, 3).mean(axis=1)
+
+    @staticmethod
+    def circumcenters(triangles) -> np.ndarray:
+        """Circumcenters, shape (N, 2), NaN for collinear vertices"""
+        t = _polygons(triangles, 3)
+        (x1, y1), (x2, y2), (x3, y3) = t[:, 0].T, t[:, 1].T, t[:, 2].T
+        d = 2 * (x1 * (y2 - y3) + x2 * (y3 - y1) + x3 * (y1 - y2))
+        s1, s2, s3 = x1 ** 2 + y1 ** 2, x2 ** 2 + y2 ** 2, x3 ** 2 + y3 ** 2
+        ux = _safe_divide(s1 * (y2 - y3) + s2 * (y3 - y1) + s3 * (y1 - y2), d)
+        uy = _safe_divide(s1 * (x3 - x2) + s2 * (x1 - x3) + s3 * (x2 - x1), d)
+        return np.stack([ux, uy], axis=1)
+
+    @staticmethod
+    def incenters(triangles) -> np.ndarray:
+        """Incenters (side-length weighted vertices), NaN when all vertices coincide"""
+        t = _polygons(triangles, 3)
+        sides = BatchLengthTools.side_lengths(t)
+        perimeter = sides.sum(axis=1)
+        weighted = (sides[:, :, np.newaxis] * t).sum(axis=1)
+        return _safe_divide(weighted, perimeter[:, np.newaxis])
+
+    @staticmethod
+    def orthocenters(triangles) -> np.ndarray:
+        """Orthocenters via H = A + B + C - 2O, NaN for collinear vertices"""
+        t = _polygons(triangles, 3)
+        return t.sum(axis=1) - 2 * BatchTriangleTools.circumcenters(t)
+
+    @staticmethod
+    def inradii(triangles) -> np.ndarray:
+        t = _polygons(triangles, 3)
+        return _safe_divide(2 * BatchTriangleTools.areas(t), BatchTriangleTools.perimeters(t))
+
+    @staticmethod
+    def circumradii(triangles) -> np.ndarray:
+        t = _polygons(triangles, 3)
+        sides = BatchLengthTools.side_lengths(t)
+        return _safe_divide(sides.prod(axis=1), 4 * BatchTriangleTools.areas(t))
+
+    @staticmethod
+    def median_lengths(triangles) -> np.ndarray:
+        """Median lengths from (p1, p2, p3), shape (N, 3)"""
+        t = _polygons(triangles, 3)
+        midpoints = (np.roll(t, -1, axis=1) + np.roll(t, -2, axis=1)) / 2
+        return np.linalg.norm(t - midpoints, axis=-1)
+
+    @staticmethod
+    def altitude_lengths(triangles) -> np.ndarray:
+        """Altitude lengths from (p1, p2, p3), shape (N, 3), NaN for zero-length bases"""
+        t = _polygons(triangles, 3)
+        return _safe_divide(2 * BatchTriangleTools.areas(t)[:, np.newaxis], BatchLengthTools.side_lengths(t))
+
+    @staticmethod
+    def is_right(triangles, tolerance: float = 1e-9) -> np.ndarray:
+        angles = BatchTriangleTools.angles(triangles)
+        return np.any(np.abs(angles - np.pi / 2) < tolerance, axis=1)
+
+    @staticmethod
+    def contains_points(points, triangles) -> np.ndarray:
+        """Whether each point lies inside (or on) its paired triangle"""
+        p, t = _points(points), _polygons(triangles, 3)
+        d1 = _cross(t[:, 1] - t[:, 0], p - t[:, 0])
+        d2 = _cross(t[:, 2] - t[:, 1], p - t[:, 1])
+        d3 = _cross(t[:, 0] - t[:, 2], p - t[:, 2])
+        has_negative = (d1 < 0) | (d2 < 0) | (d3 < 0)
+        has_positive = (d1 > 0) | (d2 > 0) | (d3 > 0)
+        return ~(has_negative & has_positive) & ~BatchTriangleTools.degenerate_mask(t)
+
+
+class BatchAngleTools:
+    """Batch angle calculations (radians)"""
+
+    @staticmethod
+    def angles_two_vectors(v1, v2) -> np.ndarray:
+        """Unsigned angles in [0, π], NaN for zero-length vectors"""
+        v1, v2 = _points(v1), _points(v2)
+        dot = (v1 * v2).sum(axis=-1)
+        # atan2(|cross|, dot) is accurate near 0 and π, unlike arccos
+        angles = np.arctan2(np.abs(_cross(v1, v2)), dot)
+        degenerate = (np.linalg.norm(v1, axis=-1) < EPS) | (np.linalg.norm(v2, axis=-1) < EPS)
+        return np.where(degenerate, np.nan, angles)
+
+    @staticmethod
+    def angles_three_points(p1, vertex, p3) -> np.ndarray:
+        vertex = _points(vertex)
+        return BatchAngleTools.angles_two_vectors(_points(p1) - vertex, _points(p3) - vertex)
+
+    @staticmethod
+    def directed_angles(p1, vertex, p3) -> np.ndarray:
+        """Counterclockwise angles from (p1 - vertex) to (p3 - vertex) in [0, 2π)"""
+        vertex = _points(vertex)
+        v1, v2 = _points(p1) - vertex, _points(p3) - vertex
+        angles = np.mod(np.arctan2(_cross(v1, v2), (v1 * v2).sum(axis=-1)), 2 * np.pi)
+        degenerate = (np.linalg.norm(v1, axis=-1) < EPS) | (np.linalg.norm(v2, axis=-1) < EPS)
+        return np.where(degenerate, np.nan, angles)
+
+    @staticmethod
+    def angles_two_lines(lines1, lines2) -> np.ndarray:
+        """Acute angles between lines in [0, π/2]"""
+        l1, l2 = _lines(lines1), _lines(lines2)
+        angles = BatchAngleTools.angles_two_vectors(l1[:, :2], l2[:, :2])
+        return np.minimum(angles, np.pi - angles)
+
+    @staticmethod
+    def rotate(points, centers, angles) -> np.ndarray:
+        """Rotate points counterclockwise around centers"""
+        points, centers = _points(points), _points(centers)
+        angles = np.asarray(angles, dtype=float)
+        cos_a, sin_a = np.cos(angles), np.sin(angles)
+        d = points - centers
+        return centers + np.stack([d[:, 0] * cos_a - d[:, 1] * sin_a, d[:, 0] * sin_a + d[:, 1] * cos_a], axis=1)
+
+
+class BatchCoordinateTools:
+    """Batch coordinate calculations"""
+
+    @staticmethod
+    def midpoints(p1, p2) -> np.ndarray:
+        return (_points(p1) + _points(p2)) / 2
+
+    @staticmethod
+    def line_equations(p1, p2) -> np.ndarray:
+        """Normalized (a, b, c) with a² + b² = 1, NaN rows for coincident points"""
+        p1, p2 = _points(p1), _points(p2)
+        d = p2 - p1
+        length = np.linalg.norm(d, axis=-1)
+        a = _safe_divide(-d[:, 1], length)
+        b = _safe_divide(d[:, 0], length)
+        c = -(a * p1[:, 0] + b * p1[:, 1])
+        return np.stack([a, b, c], axis=1)
+
+    @staticmethod
+    def line_intersections(lines1, lines2) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Intersections of paired lines
+
+        Returns:
+            (points (N, 2) with NaN rows, valid mask (N,) False for parallel lines)
+        """
+        l1, l2 = _lines(lines1), _lines(lines2)
+        det = l1[:, 0] * l2[:, 1] - l2[:, 0] * l1[:, 1]
+        x = _safe_divide(l1[:, 1] * l2[:, 2] - l2[:, 1] * l1[:, 2], det)
+        y = _safe_divide(l2[:, 0] * l1[:, 2] - l1[:, 0] * l2[:, 2], det)
+        points = np.stack([x, y], axis=1)
+        return points, ~np.isnan(x)
+
+    @staticmethod
+    def segment_intersections(a1, a2, b1, b2) -> Tuple[np.ndarray, np.ndarray]:
+        """Intersections of segments a1a2 and b1b2 (mask False when they do not cross or are parallel)"""
+        a1, a2, b1, b2 = _points(a1), _points(a2), _points(b1), _points(b2)
+        r, s = a2 - a1, b2 - b1
+        denom = _cross(r, s)
+        t = _safe_divide(_cross(b1 - a1, s), denom)
+        u = _safe_divide(_cross(b1 - a1, r), denom)
+        valid = (t >= -EPS) & (t <= 1 + EPS) & (u >= -EPS) & (u <= 1 + EPS)
+        points = a1 + t[:, np.newaxis] * r
+        points[~valid] = np.nan
+        return points, valid
+
+    @staticmethod
+    def reflect_points_over_lines(points, lines) -> np.ndarray:
+        """Reflect points across lines, NaN rows for degenerate lines"""
+        points, lines = _points(points), _lines(lines)
+        norm_sq = lines[:, 0] ** 2 + lines[:, 1] ** 2
+        k = _safe_divide(2 * (lines[:, 0] * points[:, 0] + lines[:, 1] * points[:, 1] + lines[:, 2]), norm_sq)
+        return points - k[:, np.newaxis] * lines[:, :2]
+
+    @staticmethod
+    def reflect_points_over_points(points, centers) -> np.ndarray:
+        return 2 * _points(centers) - _points(points)
+
+    @staticmethod
+    def project_points_onto_lines(points, lines) -> np.ndarray:
+        """Feet of perpendiculars from points to lines"""
+        points = _points(points)
+        return (points + BatchCoordinateTools.reflect_points_over_lines(points, lines)) / 2
+
+    @staticmethod
+    def collinear(p1, p2, p3, tolerance: float = EPS) -> np.ndarray:
+        p1 = _points(p1)
+        return np.abs(_cross(_points(p2) - p1, _points(p3) - p1)) < tolerance
+
+
+class BatchCircleTools:
+    """Batch circle calculations (centers (N, 2), radii (N,))"""
+
+    @staticmethod
+    def circles_from_three_points(p1, p2, p3) -> Tuple[np.ndarray, np.ndarray]:
+        """(centers, radii), NaN for collinear points"""
+        triangles = np.stack([_points(p1), _points(p2), _points(p3)], axis=1)
+        centers = BatchTriangleTools.circumcenters(triangles)
+        return centers, np.linalg.norm(triangles[:, 0] - centers, axis=-1)
+
+    @staticmethod
+    def circle_intersections(centers1, radii1, centers2, radii2) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Intersections of paired circles
+
+        Returns:
+            (points (N, 2, 2), mask (N, 2)); tangent circles have one valid point,
+            disjoint/concentric circles none
+        """
+        c1, c2 = _points(centers1), _points(centers2)
+        r1, r2 = np.asarray(radii1, dtype=float), np.asarray(radii2, dtype=float)
+        delta = c2 - c1
+        d = np.linalg.norm(delta, axis=-1)
+        reachable = (d > EPS) & (d <= r1 + r2 + EPS) & (d >= np.abs(r1 - r2) - EPS) & (r1 > 0) & (r2 > 0)
+        safe_d = np.where(reachable, d, 1.0)
+        a = (r1 ** 2 - r2 ** 2 + safe_d ** 2) / (2 * safe_d)
+        h = np.sqrt(np.maximum(r1 ** 2 - a ** 2, 0.0))
+        unit = delta / safe_d[:, np.newaxis]
+        base = c1 + a[:, np.newaxis] * unit
+        offset = h[:, np.newaxis] * np.stack([unit[:, 1], -unit[:, 0]], axis=1)
+        points = np.stack([base + offset, base - offset], axis=1)
+        mask = np.stack([reachable, reachable & (h > EPS)], axis=1)
+        points[~mask] = np.nan
+        return points, mask
+
+    @staticmethod
+    def line_circle_intersections(lines, centers, radii) -> Tuple[np.ndarray, np.ndarray]:
+        """Intersections of lines ax + by + c = 0 with circles, same layout as circle_intersections"""
+        lines, centers = _lines(lines), _points(centers)
+        radii = np.asarray(radii, dtype=float)
+        foot = BatchCoordinateTools.project_points_onto_lines(centers, lines)
+        distance = np.linalg.norm(foot - centers, axis=-1)
+        reachable = ~np.isnan(distance) & (distance <= radii + EPS) & (radii > 0)
+        half_chord = np.sqrt(np.maximum(radii ** 2 - np.where(reachable, distance, 0.0) ** 2, 0.0))
+        direction = np.stack([lines[:, 1], -lines[:, 0]], axis=1)
+        direction = direction / np.where(reachable, np.linalg.norm(direction, axis=-1), 1.0)[:, np.newaxis]
+        offset = half_chord[:, np.newaxis] * direction
+        points = np.stack([foot - offset, foot + offset], axis=1)
+        mask = np.stack([reachable, reachable & (half_chord > EPS)], axis=1)
+        points[~mask] = np.nan
+        return points, mask
+
+    @staticmethod
+    def tangent_points(centers, radii, external_points) -> Tuple[np.ndarray, np.ndarray]:
+        """Tangent points from external points, same layout as circle_intersections"""
+        centers, external = _points(centers), _points(external_points)
+        radii = np.asarray(radii, dtype=float)
+        delta = external - centers
+        d = np.linalg.norm(delta, axis=-1)
+        reachable = (d >= radii - EPS) & (radii > 0)
+        angle = np.arccos(np.clip(radii / np.where(reachable, d, 1.0), -1.0, 1.0))
+        base = np.arctan2(delta[:, 1], delta[:, 0])
+        points = np.stack([
+            centers + radii[:, np.newaxis] * np.stack([np.cos(base + angle), np.sin(base + angle)], axis=1),
+            centers + radii[:, np.newaxis] * np.stack([np.cos(base - angle), np.sin(base - angle)], axis=1),
+        ], axis=1)
+        mask = np.stack([reachable, reachable & (angle > EPS)], axis=1)
+        points[~mask] = np.nan
+        return points, mask
+
+    @staticmethod
+    def point_positions(centers, radii, points, tolerance: float = 1e-9) -> np.ndarray:
+        """-1 inside, 0 on the circle, 1 outside"""
+        d = np.linalg.norm(_points(points) - _points(centers), axis=-1) - np.asarray(radii, dtype=float)
+        return np.where(np.abs(d) <= tolerance, 0, np.sign(d)).astype(int)
+
+    @staticmethod
+    def circumferences(radii) -> np.ndarray:
+        radii = np.asarray(radii, dtype=float)
+        return np.where(radii > 0, 2 * np.pi * radii, np.nan)
+
+    @staticmethod
+    def chord_lengths(radii, angles) -> np.ndarray:
+        return 2 * np.asarray(radii, dtype=float) * np.sin(np.asarray(angles, dtype=float) / 2)
@@ -0,0 +1,216 @@
+"""
+Exact value recognition for calculation results
+
+Middle-school answers are usually rationals, quadratic surds or rational
+multiples of π. This module turns float results back into those closed forms
+so downstream agents can emit exact GeoGebra values (e.g. sqrt(3)/2, pi/3)
+instead of rounded decimals.
+
+The built-in recognizer (fractions only) covers:
+    p/q,  (p/q)·√n,  (a + b·√n)/d,  (p/q)·π
+Plain rationals need a small denominator (≤ 12) or a terminating decimal with
+at most three places; larger denominators would match almost any float.
+SymPy's nsimplify is used as a fallback for other forms when it is installed.
+Results are cached per rounded input value.
+"""
+
+import math
+from fractions import Fraction
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional
+
+try:
+    import sympy
+except ImportError:  # SymPy 는 선택 의존성
+    sympy = None
+
+# 인식 범위 (중학교 수준 답에 맞춘 상한)
+MAX_DENOMINATOR = 12
+DECIMAL_SCALE = 1000          # 소수 셋째 자리까지의 유한소수 (예: 1.92 = 48/25)
+MAX_PI_DENOMINATOR = 360
+MAX_SURD_DENOMINATOR = 100
+MAX_RADICAND = 200
+MAX_MIXED_RADICAND = 50
+MAX_MIXED_DENOMINATOR = 12
+MAX_MIXED_COEFFICIENT = 48
+RELATIVE_TOLERANCE = 1e-11  # 캐시 키 반올림(12자리)보다 크고 1e-10 차이는 구분
+
+
+class ExactValue(NamedTuple):
+    """A recognized closed form with its display and GeoGebra spellings"""
+    exact: str
+    geogebra: str
+    value: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"exact": self.exact, "geogebra": self.geogebra, "value": self.value}
+
+
+def _squarefree(n: int) -> bool:
+    return all(n % (k * k) for k in range(2, int(math.isqrt(n)) + 1))
+
+
+_RADICANDS = [n for n in range(2, MAX_RADICAND + 1) if _squarefree(n)]
+_MIXED_RADICANDS = [n for n in _RADICANDS if n <= MAX_MIXED_RADICAND]
+_MIXED_SCALE = math.lcm(*range(1, MAX_MIXED_DENOMINATOR + 1))
+
+
+def _close(a: float, b: float) -> bool:
+    return abs(a - b) <= RELATIVE_TOLERANCE * max(1.0, abs(a), abs(b))
+
+
+def _rational(x: float, max_denominator: int) -> Optional[Fraction]:
+    candidate = Fraction(x).limit_denominator(max_denominator)
+    return candidate if _close(float(candidate), x) else None
+
+
+def _decimal(x: float) -> Optional[Fraction]:
+    candidate = Fraction(round(x * DECIMAL_SCALE), DECIMAL_SCALE)
+    return candidate if _close(float(candidate), x) else None
+
+
+# ----------------------------------------------------------------------
+# 표기
+# ----------------------------------------------------------------------
+def _coefficient(value: Fraction, symbol: str, geogebra_symbol: str) -> ExactValue:
+    """(p/q)·symbol 표기 (symbol 이 빈 문자열이면 유리수)"""
+    sign = "-" if value < 0 else ""
+    p, q = abs(value.numerator), value.denominator
+    if not symbol:
+        text = f"{sign}{p}" if q == 1 else f"{sign}{p}/{q}"
+        return ExactValue(text, text, float(value))
+    numerator = symbol if p == 1 else f"{p}{symbol}"
+    geogebra_numerator = geogebra_symbol if p == 1 else f"{p}*{geogebra_symbol}"
+    if q != 1:
+        numerator += f"/{q}"
+        geogebra_numerator += f"/{q}"
+    return ExactValue(sign + numerator, sign + geogebra_numerator, 0.0)
+
+
+def _format_surd(value: Fraction, radicand: int) -> ExactValue:
+    form = _coefficient(value, f"√{radicand}", f"sqrt({radicand})")
+    return form._replace(value=float(value) * math.sqrt(radicand))
+
+
+def _format_pi(value: Fraction) -> ExactValue:
+    form = _coefficient(value, "π", "pi")
+    return form._replace(value=float(value) * math.pi)
+
+
+def _format_mixed(a: Fraction, b: Fraction, radicand: int) -> ExactValue:
+    """(A + B√n)/L (공통 분모로 묶은 표기)"""
+    denominator = a.denominator * b.denominator // math.gcd(a.denominator, b.denominator)
+    big_a, big_b = int(a * denominator), int(b * denominator)
+    surd = f"√{radicand}" if abs(big_b) == 1 else f"{abs(big_b)}√{radicand}"
+    geogebra_surd = f"sqrt({radicand})" if abs(big_b) == 1 else f"{abs(big_b)}*sqrt({radicand})"
+    operator = "+" if big_b > 0 else "-"
+    text = f"{big_a} {operator} {surd}"
+    geogebra = f"{big_a} {operator} {geogebra_surd}"
+    if denominator != 1:
+        text, geogebra = f"({text})/{denominator}", f"({geogebra})/{denominator}"
+    return ExactValue(text, geogebra, float(a) + float(b) * math.sqrt(radicand))
+
+
+# ----------------------------------------------------------------------
+# 인식
+# ----------------------------------------------------------------------
+def _recognize_builtin(x: float) -> Optional[ExactValue]:
+    rational = _rational(x, MAX_DENOMINATOR)
+    if rational is None:
+        rational = _decimal(x)
+    if rational is not None:
+        return _coefficient(rational, "", "")._replace(value=float(rational))
+
+    multiple = _rational(x / math.pi, MAX_PI_DENOMINATOR)
+    if multiple is not None:
+        return _format_pi(multiple)
+
+    for n in _RADICANDS:
+        coefficient = _rational(x / math.sqrt(n), MAX_SURD_DENOMINATOR)
+        if coefficient is not None:
+            return _format_surd(coefficient, n)
+
+    # a + (k/d)·√n: 유리수 부분의 분모는 MAX_MIXED_DENOMINATOR 이하이므로
+    # 공배수를 곱해 정수에 가까운지로 먼저 거른 뒤 Fraction 으로 확인한다
+    scale = _MIXED_SCALE
+    tolerance = RELATIVE_TOLERANCE * max(1.0, abs(x)) * scale
+    for n in _MIXED_RADICANDS:
+        root = math.sqrt(n)
+        for d in range(1, MAX_MIXED_DENOMINATOR + 1):
+            for k in range(-MAX_MIXED_COEFFICIENT, MAX_MIXED_COEFFICIENT + 1):
+                if k == 0 or math.gcd(k, d) != 1:
+                    continue
+                scaled = (x - k * root / d) * scale
+                if abs(scaled - round(scaled)) > tolerance:
+                    continue
+                rest = _rational(x - k * root / d, MAX_MIXED_DENOMINATOR)
+                if rest is not None and rest != 0:
+                    return _format_mixed(rest, Fraction(k, d), n)
+    return None
+
+
+def _recognize_sympy(x: float) -> Optional[ExactValue]:
+    if sympy is None:
+        return None
+    try:
+        expr = sympy.nsimplify(x, [sympy.pi], tolerance=RELATIVE_TOLERANCE * max(1.0, abs(x)))
+    except (ValueError, TypeError, sympy.SympifyError):
+        return None
+    # 너무 복잡한 식은 정확값으로 보지 않는다 (부동소수 잡음을 맞춘 것일 가능성)
+    if expr.is_Float or sympy.count_ops(expr) > 8 or not _close(float(expr), x):
+        return None
+    text = str(expr)
+    return ExactValue(text.replace("sqrt", "√").replace("pi", "π").replace("*", ""),
+                      text.replace("**", "^"), float(expr))
+
+
+@lru_cache(maxsize=4096)
+def _recognize_cached(key: float) -> Optional[ExactValue]:
+    return _recognize_builtin(key) or _recognize_sympy(key)
+
+
+def to_exact(x: Any) -> Optional[ExactValue]:
+    """
+    Recognize the closed form of a float
+
+    Returns:
+        ExactValue, or None when no simple closed form matches
+    """
+    if isinstance(x, bool) or not isinstance(x, (int, float)) or not math.isfinite(x):
+        return None
+    if abs(x) < 1e-12:
+        return ExactValue("0", "0", 0.0)
+    # 캐시 키: 부동소수 잡음을 흡수하도록 유효숫자 12자리로 반올림
+    key = float(f"{float(x):.12g}")
+    return _recognize_cached(key)
+
+
+def exact_values(values: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map a result section (lengths/angles/areas/coordinates) to exact forms
+
+    Scalars map to ExactValue dicts, points to a list of two ExactValue dicts.
+    Entries without a recognizable closed form are omitted.
+    """
+    result: Dict[str, Any] = {}
+    for name, value in (values or {}).items():
+        if isinstance(value, (list, tuple)):
+            forms: List[Optional[ExactValue]] = [to_exact(v) for v in value]
+            if forms and all(forms):
+                result[name] = [f.to_dict() for f in forms]
+        else:
+            form = to_exact(value)
+            if form is not None:
+                result[name] = form.to_dict()
+    return result
+
+
+def exact_result_sections(result: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Exact forms for every numeric section of a CalculationResult dict"""
+    sections = {}
+    for field in ("coordinates", "lengths", "angles", "areas"):
+        if isinstance(result.get(field), dict):
+            converted = exact_values(result[field])
+            if converted:
+                sections[field] = converted
+    return sections
@@ -1,5 +1,11 @@
 from typing import Any, Dict
 from models.state_models import GeometryState, CalculationTask
+from agents.calculation.tools.exact import exact_result_sections
+from config import EXACT_ARITHMETIC
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 
 def update_calculation_results(state: GeometryState, task: CalculationTask) -> None:
     """
@@ -12,7 +18,7 @@ def update_calculation_results(state: GeometryState, task: CalculationTask) -> N
     task_id = task.task_id
     
     if not task.result:
-        print(f"[WARNING] No result found for task {task_id}")
+        logger.warning("No result found for task %s", task_id)
         return
     
     # 기존 또는 새 결과 업데이트
@@ -25,9 +31,17 @@ def update_calculation_results(state: GeometryState, task: CalculationTask) -> N
         try:
             result_dict = task.result.to_dict()
         except:
-            print(f"[WARNING] Could not convert result to dict for task {task_id}")
+            logger.warning("Could not convert result to dict for task %s", task_id)
             return
     
+    # 정확값 모드: 실수 결과를 유리수/근호/π 표현으로 변환해 함께 저장
+    if EXACT_ARITHMETIC:
+        exact_sections = exact_result_sections(result_dict)
+        if exact_sections:
+            result_dict["exact_values"] = exact_sections
+            state.calculation_results.setdefault("exact_values", {})
+            deep_merge_dict(state.calculation_results["exact_values"], exact_sections)
+    
     # Update specific fields that come from the result
     for field in ["coordinates", "lengths", "angles", "areas"]:
         if field in result_dict and result_dict[field]:
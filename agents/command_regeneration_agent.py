@@ -1,13 +1,35 @@
-from typing import List
-from geo_prompts import COMMAND_REGENERATION_PROMPT, COMMAND_REGENERATION_JSON_TEMPLATE
+from typing import Dict, List
+from geo_prompts import (
+    COMMAND_REGENERATION_PROMPT,
+    COMMAND_REGENERATION_JSON_TEMPLATE,
+    COMMAND_REPAIR_PROMPT,
+    COMMAND_REPAIR_JSON_TEMPLATE,
+)
+from geo_prompts.assembly import assemble_prompt
 from utils.llm_manager import LLMManager
 from utils.json_parser import safe_parse_llm_json_output
-from models.validation_models import RegenerationResult
+from utils.structured_output import invoke_structured, FAILED
+from utils.command_repair import (
+    MAX_REPAIR_SHARE,
+    apply_patches,
+    defined_labels,
+    dependent_lines,
+    locate_errors,
+    repair_request,
+)
+from utils.geogebra_syntax import clean_command, is_comment
+from models.validation_models import RegenerationResult, RepairResult
 from agents.tools import get_common_tools
+from utils.prompt_context import build_prompt_context
+from utils.tracing import trace_tools
 from langchain.agents import AgentExecutor, create_openai_functions_agent
 import json
 import re
-from config import MAX_ATTEMPTS
+from config import MAX_ATTEMPTS, COMMAND_REPAIR_MODE
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 
 def command_regeneration_agent(state):
     """
@@ -24,7 +46,12 @@ def command_regeneration_agent(state):
     
     # 최대 시도 횟수 초과 시 중단
     if state.command_regeneration_attempts > MAX_ATTEMPTS:
-        print(f"[WARNING] 최대 명령어 재생성 시도 횟수({MAX_ATTEMPTS})를 초과했습니다.")
+        logger.warning("최대 명령어 재생성 시도 횟수(%s)를 초과했습니다.", MAX_ATTEMPTS)
+        return state
+    
+    # 부분 수리: 오류가 난 줄만 패치하고 재검증 범위를 남긴다 (실패하면 전체 재생성)
+    state.repair_scope = None
+    if COMMAND_REPAIR_MODE == "targeted" and _repair_commands(state):
         return state
     
     # LLM 초기화
@@ -37,17 +64,22 @@ def command_regeneration_agent(state):
     original_commands = state.geogebra_commands
     
     # 에이전트 생성
-    agent = create_openai_functions_agent(llm, tools, COMMAND_REGENERATION_PROMPT)
+    tools = trace_tools(tools)
+    prompt = assemble_prompt("command_regeneration", COMMAND_REGENERATION_PROMPT, llm.system_message,
+                             json_template=COMMAND_REGENERATION_JSON_TEMPLATE)
+    agent = create_openai_functions_agent(llm, tools, prompt)
     agent_executor = AgentExecutor(agent=agent, tools=tools)
     
     # 에이전트 실행
     try:
         result = agent_executor.invoke({
             "problem": state.input_problem,
-            "original_commands": str(original_commands),
-            "validation_result": str(state.validation),
+            **build_prompt_context(
+                "command_regeneration",
+                original_commands=original_commands,
+                validation_result=state.validation,
+            ),
             "attempt_count": state.command_regeneration_attempts,
-            "json_template": COMMAND_REGENERATION_JSON_TEMPLATE,
             "agent_scratchpad": ""
         })
         
@@ -60,7 +92,7 @@ def command_regeneration_agent(state):
             
             if not parsed_result:
                 # JSON 파싱 실패시 백업 파싱
-                print(f"[WARNING] safe_parse_llm_json_output 반환 값이 비어 있습니다")
+                logger.warning("safe_parse_llm_json_output 반환 값이 비어 있습니다")
                 regenerated_commands = _extract_commands_from_text(output)
                 analysis = "재생성 결과를 JSON 형식으로 파싱할 수 없어 텍스트에서 명령어를 추출했습니다."
                 fixed_issues = []
@@ -77,7 +109,7 @@ def command_regeneration_agent(state):
                     analysis = regeneration_result.analysis
                     fixed_issues = regeneration_result.fixed_issues
                 except Exception as e:
-                    print(f"[WARNING] 파싱된 결과를 RegenerationResult로 변환 실패: {str(e)}")
+                    logger.warning("파싱된 결과를 RegenerationResult로 변환 실패: %s", e)
                     # commands가 직접 리스트로 전달될 수 있음
                     if isinstance(parsed_result.get('commands'), list):
                         regenerated_commands = parsed_result.get('commands')
@@ -89,18 +121,18 @@ def command_regeneration_agent(state):
                         fixed_issues = []
         except Exception as e:
             # 파싱 실패 시 텍스트에서 명령어 추출
-            print(f"[WARNING] JSON 파싱 실패: {str(e)}")
+            logger.warning("JSON 파싱 실패: %s", e)
             regenerated_commands = _extract_commands_from_text(output)
             analysis = "재생성 결과를 JSON 형식으로 파싱할 수 없어 텍스트에서 명령어를 추출했습니다."
             fixed_issues = []
         
         # 명령어가 추출되지 않았다면 원본 명령어 유지
         if not regenerated_commands:
-            print("[WARNING] 재생성된 명령어가 없어 원본 명령어를 유지합니다.")
+            logger.warning("재생성된 명령어가 없어 원본 명령어를 유지합니다.")
             regenerated_commands = original_commands
             
     except Exception as e:
-        print(f"[ERROR] 명령어 재생성 에이전트 실행 오류: {str(e)}")
+        logger.error("명령어 재생성 에이전트 실행 오류: %s", e)
         regenerated_commands = original_commands
         analysis = f"에이전트 실행 오류: {str(e)}"
         fixed_issues = []
@@ -110,13 +142,81 @@ def command_regeneration_agent(state):
     state.geogebra_commands = regenerated_commands  # 검증을 위해 기존 명령어 교체
     
     # 디버그 정보
-    print(f"[DEBUG] Command regeneration attempt {state.command_regeneration_attempts}/{MAX_ATTEMPTS}")
-    print(f"[DEBUG] Analysis: {analysis}")
+    logger.debug("Command regeneration attempt %s/%s", state.command_regeneration_attempts, MAX_ATTEMPTS)
+    logger.debug("Analysis: %s", analysis)
     if fixed_issues:
-        print(f"[DEBUG] Fixed issues: {fixed_issues}")
+        logger.debug("Fixed issues: %s", fixed_issues)
     
     return state
 
+def _repair_commands(state) -> bool:
+    """
+    검증 오류가 난 줄만 LLM 에 패치로 요청해 끼워 넣음
+    
+    오류를 줄에 대응시킬 수 없거나(누락된 작도 등), 틀린 줄이 너무 많거나, 쓸 수 있는 패치를
+    받지 못하면 상태를 바꾸지 않고 False 를 반환한다 (전체 재생성으로 진행).
+    
+    Args:
+        state: 현재 상태 객체
+        
+    Returns:
+        패치를 적용했는지 여부 (적용하면 state.repair_scope 에 재검증할 줄 번호를 남긴다)
+    """
+    commands = list(state.geogebra_commands or [])
+    located = locate_errors(commands, state.validation)
+    if located is None:
+        logger.info("Validation errors could not be mapped to command lines, regenerating all commands")
+        return False
+    line_count = sum(1 for command in commands if not is_comment(clean_command(command)))
+    if len(located) > MAX_REPAIR_SHARE * line_count:
+        logger.info("%s of %s command lines failed validation, regenerating all commands", len(located), line_count)
+        return False
+    
+    lines_to_fix, context = repair_request(commands, located)
+    llm = LLMManager.get_geogebra_command_llm(temperature=0.2)
+    prompt = assemble_prompt("command_repair", COMMAND_REPAIR_PROMPT, llm.system_message,
+                             json_template=COMMAND_REPAIR_JSON_TEMPLATE)
+    try:
+        prompt_value = prompt.invoke({
+            "problem": state.input_problem,
+            **build_prompt_context("command_repair", lines_to_fix=lines_to_fix, context=context),
+            "attempt_count": state.command_regeneration_attempts,
+            "agent_scratchpad": "",
+        })
+        output = invoke_structured(llm, prompt_value, RepairResult, "command_repair")
+    except Exception as e:
+        logger.warning("명령어 부분 수리 실패, 전체 재생성으로 진행: %s", e)
+        return False
+    if output.status == FAILED:
+        logger.warning("명령어 부분 수리 결과를 파싱할 수 없어 전체 재생성으로 진행합니다.")
+        return False
+    
+    # 고칠 줄로 지정한 줄의 패치만 적용
+    repair_result = RepairResult(**output.data)
+    patches: Dict[int, List[str]] = {}
+    for patch in repair_result.patches:
+        index = patch.line - 1
+        if index in located:
+            patches[index] = [clean_command(command) for command in patch.commands if clean_command(command)]
+    if not patches:
+        logger.warning("적용할 패치가 없어 전체 재생성으로 진행합니다.")
+        return False
+    
+    repaired, index_map = apply_patches(commands, patches)
+    # 패치한 줄과 패치를 받지 못한 오류 줄, 그리고 그 줄들(패치 전 이름 포함)에 의존하는 줄을 재검증
+    seeds = [new_index for index in located for new_index in index_map[index]]
+    state.repair_scope = dependent_lines(repaired, seeds, defined_labels(commands, patches))
+    state.regenerated_commands = repaired
+    state.geogebra_commands = repaired
+    
+    logger.debug("Command repair attempt %s/%s patched lines %s, re-validating %s of %s lines",
+                 state.command_regeneration_attempts, MAX_ATTEMPTS, sorted(i + 1 for i in patches),
+                 len(state.repair_scope), len(repaired))
+    logger.debug("Analysis: %s", repair_result.analysis)
+    if repair_result.fixed_issues:
+        logger.debug("Fixed issues: %s", repair_result.fixed_issues)
+    return True
+
 def _extract_commands_from_text(text: str) -> List[str]:
     """
     텍스트에서 GeoGebra 명령어 추출
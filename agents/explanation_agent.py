@@ -1,6 +1,8 @@
 from geo_prompts import EXPLANATION_PROMPT
+from geo_prompts.assembly import assemble_prompt
 from utils.llm_manager import LLMManager
 from utils.json_parser import extract_markdown_from_text
+from utils.prompt_context import build_prompt_context
 
 def explanation_agent(state):
     """
@@ -16,21 +18,22 @@ def explanation_agent(state):
     llm = LLMManager.get_explanation_llm()
     
     # 프롬프트 생성 및 LLM 호출
-    prompt = EXPLANATION_PROMPT.format(
+    prompt = assemble_prompt("explanation", EXPLANATION_PROMPT, llm.system_message)
+    messages = prompt.format_messages(
         problem=state.input_problem,
-        parsed_elements=str(state.parsed_elements),
-        problem_analysis=str(state.problem_analysis),
         approach=state.approach,
-        calculations=str(state.calculations),
-        geogebra_commands=str(state.geogebra_commands),
-        validation=str(state.validation)
+        **build_prompt_context(
+            "explanation",
+            parsed_elements=state.parsed_elements,
+            problem_analysis=state.problem_analysis,
+            calculations=state.calculations,
+            geogebra_commands=state.geogebra_commands,
+            validation=state.validation,
+        )
     )
     
-    # LLM 직접 호출
-    response = llm.invoke(prompt)
-    
-    # 결과 처리
-    explanation = response.content
+    # LLM 스트리밍 호출 (토큰은 그래프의 messages 스트림으로 클라이언트에 전달됨)
+    explanation = "".join(chunk.content for chunk in llm.stream(messages) if chunk.content)
     
     # 마크다운 텍스트 추출 시도
     # markdown_text = extract_markdown_from_text(explanation)
@@ -4,15 +4,27 @@ GeoGebra Command Agent Module
 This module provides an agent for generating GeoGebra commands from structured data.
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import contextvars
 from langchain.tools import StructuredTool
 from langchain.agents import AgentExecutor, create_openai_functions_agent
 from geo_prompts import GEOGEBRA_COMMAND_PROMPT, COMMAND_GENERATION_TEMPLATE
+from geo_prompts.assembly import assemble_prompt
 from utils.llm_manager import LLMManager
 from agents.tools import get_common_tools
+from utils.prompt_context import build_prompt_context
+from utils.json_parser import safe_parse_llm_json_output
+from utils.tracing import trace_tools
+from utils.candidate_scoring import CandidateScore, best_candidate, score_candidate
+from config import COMMAND_CANDIDATES, COMMAND_CANDIDATE_STRATEGY, COMMAND_CANDIDATE_TEMPERATURE
 import re
 import json
 import numpy as np
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 
 
 def geogebra_command_agent(state):
@@ -51,62 +63,108 @@ def geogebra_command_agent(state):
     construction_plan = getattr(state, "construction_plan", {})
     
     # 에이전트 생성
-    agent = create_openai_functions_agent(llm, tools, GEOGEBRA_COMMAND_PROMPT)
+    tools = trace_tools(tools)
+    prompt = assemble_prompt("geogebra_command", GEOGEBRA_COMMAND_PROMPT, llm.system_message,
+                             json_template=COMMAND_GENERATION_TEMPLATE)
+    inputs = {
+        "problem": state.input_problem,
+        **build_prompt_context(
+            "geogebra_command",
+            problem_analysis=problem_analysis,
+            construction_plan=construction_plan,
+            calculations=calculations,
+            retrieved_commands=state.retrieved_commands,
+        ),
+        "agent_scratchpad": ""
+    }
+    
+    # 후보 여러 개를 만들어 로컬 검증 점수가 가장 높은 후보 사용
+    if COMMAND_CANDIDATES > 1:
+        state.geogebra_commands = _select_candidate(state, prompt, inputs, tools)
+        return state
+    
+    agent = create_openai_functions_agent(llm, tools, prompt)
     agent_executor = AgentExecutor(agent=agent, tools=tools)
     
     # 에이전트 실행
-    result = agent_executor.invoke({
-        "problem": state.input_problem,
-        "problem_analysis": str(problem_analysis),
-        "construction_plan": str(construction_plan),
-        "calculations": str(calculations),
-        "json_template": COMMAND_GENERATION_TEMPLATE,
-        "retrieved_commands": json.dumps(state.retrieved_commands),
-        "agent_scratchpad": ""
-    })
+    result = agent_executor.invoke(inputs)
     
-    # 결과에서 명령어 추출
-    try:
-        # JSON 형식인 경우 파싱
-        commands_data = json.loads(result["output"]) if isinstance(result["output"], str) else result["output"]
-        if isinstance(commands_data, dict) and "commands" in commands_data:
-            commands = commands_data["commands"]
-        elif isinstance(commands_data, list):
-            commands = commands_data
-        else:
-            # 텍스트에서 명령어 추출
-            commands = _extract_commands_from_text(result["output"])
-    except (json.JSONDecodeError, TypeError):
-        # 텍스트에서 명령어 추출
-        commands = _extract_commands_from_text(result["output"])
-    
-    # 상태 업데이트
-    state.geogebra_commands = commands
-    
-    # GeoGebra 직접 명령어 추가 (계산 없이 생성 가능한 명령어)
-    if hasattr(state, "calculation_results") and state.calculation_results:
-        direct_commands = _extract_direct_commands_from_calculations(state.calculation_results)
-        if direct_commands:
-            # 명령어 순서를 조정하여 기본 점/선 명령어가 먼저 오도록 함
-            reorganized_commands = []
-            
-            # 1. 점 정의 명령어 추가
-            point_commands = [cmd for cmd in commands if "=" in cmd and cmd.split("=")[0].strip() in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"]
-            reorganized_commands.extend(point_commands)
-            
-            # 2. 직접 명령어 추가 (중점, 교점 등)
-            reorganized_commands.extend(direct_commands)
-            
-            # 3. 나머지 명령어 추가
-            for cmd in commands:
-                if cmd not in reorganized_commands:
-                    reorganized_commands.append(cmd)
-            
-            state.geogebra_commands = reorganized_commands
-            print(f"[DEBUG] Added {len(direct_commands)} direct GeoGebra commands")
+    # 결과에서 명령어 추출 + 계산 결과의 직접 명령어 추가
+    state.geogebra_commands = _add_direct_commands(state, _parse_command_output(result["output"]))
     
     return state
 
+def _select_candidate(state, prompt, inputs: Dict[str, Any], tools) -> List[str]:
+    """
+    명령어 후보를 생성해 로컬에서 채점하고 가장 좋은 후보를 반환
+    
+    수치 검증을 통과한 후보가 나오면 나머지 후보를 기다리지 않는다 (concurrent 전략).
+    
+    Args:
+        state: 현재 상태 객체
+        prompt: 조립된 명령어 생성 프롬프트
+        inputs: 프롬프트 입력
+        tools: 명령어 검색 도구 (concurrent 전략에서 사용)
+        
+    Returns:
+        선택된 명령어 목록
+    """
+    candidates: List[List[str]] = []
+    scores: List[CandidateScore] = []
+    for output in _generate_candidates(prompt, inputs, tools):
+        commands = _add_direct_commands(state, _parse_command_output(output))
+        score = score_candidate(len(candidates), commands, state.parsed_elements)
+        candidates.append(commands)
+        scores.append(score)
+        logger.debug("Command %s", score.describe())
+        if score.confirmed:
+            break
+    
+    best = best_candidate(scores)
+    logger.info("Selected command candidate %s of %s (verified=%s, covered=%s)",
+                best.index + 1, len(scores), best.verified, best.covered)
+    return candidates[best.index]
+
+def _generate_candidates(prompt, inputs: Dict[str, Any], tools) -> Iterator[str]:
+    """
+    COMMAND_CANDIDATE_STRATEGY 에 따라 후보 응답 텍스트를 생성
+    
+    - n: 한 번의 호출에서 n 파라미터로 COMMAND_CANDIDATES 개 생성 (프롬프트 토큰은 한 번만 처리, 도구 없음,
+      스케줄러는 완성 토큰을 n 개분 예약)
+    - concurrent: 같은 에이전트를 동시에 실행해 끝나는 순서대로 반환. 소비자가 멈추면 아직 시작하지 않은
+      호출만 취소되고, 이미 시작된 호출은 스레드에서 끝까지 실행되어 토큰을 쓴 뒤 결과만 버려진다
+    """
+    if COMMAND_CANDIDATE_STRATEGY != "concurrent":
+        llm = LLMManager.get_geogebra_command_llm(temperature=COMMAND_CANDIDATE_TEMPERATURE, n=COMMAND_CANDIDATES)
+        result = llm.generate([prompt.invoke(inputs).to_messages()])
+        for generation in result.generations[0]:
+            yield generation.text
+        return
+    
+    llm = LLMManager.get_geogebra_command_llm(temperature=COMMAND_CANDIDATE_TEMPERATURE)
+    agent_executor = AgentExecutor(agent=create_openai_functions_agent(llm, tools, prompt), tools=tools)
+    pool = ThreadPoolExecutor(max_workers=COMMAND_CANDIDATES, thread_name_prefix="command-candidate")
+    # 추적/로그 문맥을 복사해 후보 호출이 요청 추적에 남도록 한다
+    futures = [pool.submit(contextvars.copy_context().run, agent_executor.invoke, inputs)
+               for _ in range(COMMAND_CANDIDATES)]
+    errors = []
+    produced = 0
+    try:
+        for future in as_completed(futures):
+            try:
+                output = future.result()["output"]
+            except Exception as e:
+                logger.warning("Command candidate generation failed: %s", e)
+                errors.append(e)
+                continue
+            produced += 1
+            yield output
+    finally:
+        # 실행 중인 동기 호출은 중단할 수 없으므로 기다리지 않고 시작 전 호출만 취소한다
+        pool.shutdown(wait=False, cancel_futures=True)
+    if not produced and errors:
+        raise errors[-1]
+
 def get_tools():
     """
     Get the list of tools for the GeoGebra Command Agent.
@@ -121,6 +179,65 @@ def get_tools():
         
 # === 헬퍼 함수 ===
 
+def _parse_command_output(output: Any) -> List[str]:
+    """
+    에이전트 응답에서 명령어 목록 추출 (JSON 의 commands 필드, JSON 리스트, 코드 블록 속 JSON, 텍스트 순)
+    
+    Args:
+        output: 에이전트 응답
+        
+    Returns:
+        명령어 목록
+    """
+    try:
+        # JSON 형식인 경우 파싱
+        commands_data = json.loads(output) if isinstance(output, str) else output
+        if isinstance(commands_data, dict) and "commands" in commands_data:
+            return commands_data["commands"]
+        if isinstance(commands_data, list):
+            return commands_data
+    except (json.JSONDecodeError, TypeError):
+        commands_data = safe_parse_llm_json_output(output, dict) if isinstance(output, str) else None
+        if isinstance(commands_data, dict) and isinstance(commands_data.get("commands"), list):
+            return commands_data["commands"]
+    # 텍스트에서 명령어 추출
+    return _extract_commands_from_text(output)
+
+def _add_direct_commands(state, commands: List[str]) -> List[str]:
+    """
+    계산 결과의 GeoGebra 직접 명령어 (계산 없이 생성 가능한 명령어) 추가
+    
+    Args:
+        state: 현재 상태 객체
+        commands: 생성된 명령어 목록
+        
+    Returns:
+        직접 명령어가 추가된 명령어 목록
+    """
+    if not (hasattr(state, "calculation_results") and state.calculation_results):
+        return commands
+    direct_commands = _extract_direct_commands_from_calculations(state.calculation_results)
+    if not direct_commands:
+        return commands
+    
+    # 명령어 순서를 조정하여 기본 점/선 명령어가 먼저 오도록 함
+    reorganized_commands = []
+    
+    # 1. 점 정의 명령어 추가
+    point_commands = [cmd for cmd in commands if "=" in cmd and cmd.split("=")[0].strip() in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"]
+    reorganized_commands.extend(point_commands)
+    
+    # 2. 직접 명령어 추가 (중점, 교점 등)
+    reorganized_commands.extend(direct_commands)
+    
+    # 3. 나머지 명령어 추가
+    for cmd in commands:
+        if cmd not in reorganized_commands:
+            reorganized_commands.append(cmd)
+    
+    logger.debug("Added %s direct GeoGebra commands", len(direct_commands))
+    return reorganized_commands
+
 def _extract_commands_from_text(text: str) -> List[str]:
     """
     텍스트에서 GeoGebra 명령어 추출
@@ -2,13 +2,182 @@
 GeoGebra 명령어 검색 에이전트 모듈
 
 이 모듈은 SentenceBERT와 pgvector를 사용하여 작도 계획에 적합한 GeoGebra 명령어를 검색합니다.
+
+계획/매니저/병합 에이전트가 응답을 스트리밍하는 동안 닫힌 단계·작업마다
+prefetch_step_commands / prefetch_command_lookup 으로 검색(임베딩 + DB)을 백그라운드에서 먼저 시작하고,
+검색 에이전트는 같은 검색이 미리 시작되어 있으면 그 결과를 기다려 사용합니다.
+
+계산 경로에서는 계획 에이전트가 start_command_preselection 으로 초안 작도 계획의 명령어
+검색·선택을 백그라운드 작업으로 시작해 계산 루프와 동시에 실행하고, 병합 후 검색 에이전트가
+그 작업을 기다려 결과를 받은 뒤 검색·선택 입력이 바뀐 단계만 다시 검색·선택합니다.
 """
 
-from typing import Dict, Any, List, Optional
+import contextvars
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from config import RETRIEVAL_PREFETCH_WORKERS, PARALLEL_COMMAND_RETRIEVAL
 from db.retrieval import CommandRetrieval
+from models.state_models import GeometryState
 from utils.llm_manager import LLMManager
 import json
 from geo_prompts import COMMAND_SELECTION_PROMPT, COMMAND_SELECTION_TEMPLATE
+from geo_prompts.assembly import assemble_prompt
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 미리 시작한 검색 (종류, 인자) -> Future. 사용하면 제거하고, 사용되지 않은 오래된 항목은 밀어낸다
+MAX_PREFETCHED = 256
+_prefetch_executor = ThreadPoolExecutor(max_workers=max(1, RETRIEVAL_PREFETCH_WORKERS),
+                                        thread_name_prefix="retrieval-prefetch")
+_prefetched: "OrderedDict[Tuple[str, str], Future]" = OrderedDict()
+_prefetch_lock = threading.Lock()
+_prefetch_stats = {"submitted": 0, "hits": 0, "misses": 0, "evicted": 0,
+                   "preselected_reused": 0, "preselected_changed": 0}
+
+# 초안 계획 서명 -> 미리 선택 작업. 검색 에이전트가 꺼내 기다리며, 재개 등으로 쓰이지 않은 작업은 밀어낸다
+# (미리 선택 작업이 검색 미리 시작 풀을 기다리므로 같은 풀을 쓰면 교착될 수 있어 별도 풀 사용)
+MAX_PRESELECTIONS = 64
+_preselection_executor = ThreadPoolExecutor(max_workers=max(1, RETRIEVAL_PREFETCH_WORKERS),
+                                            thread_name_prefix="command-preselection")
+_preselections: "OrderedDict[str, Future]" = OrderedDict()
+
+# 검색·선택 결과를 정하는 단계 필드 (모두 같으면 초안 계획에서 미리 선택한 명령어를 재사용)
+_SIGNATURE_FIELDS = ("description", "task_type", "operation_type", "command_type", "geogebra_command", "parameters")
+
+
+def _field(step: Any, name: str) -> Any:
+    return step.get(name) if isinstance(step, dict) else getattr(step, name, None)
+
+
+def _step_query(step: Any) -> str:
+    """단계 설명으로 만든 유사도 검색 쿼리"""
+    query = f"{_field(step, 'description') or ''} {_field(step, 'task_type') or ''}"
+    if _field(step, "command_type"):
+        query += f" {_field(step, 'command_type')}"
+    return query
+
+
+def _prefetch(kind: str, argument: str, search: Callable[[str], List[Dict[str, Any]]]) -> None:
+    key = (kind, argument)
+    with _prefetch_lock:
+        if key in _prefetched:
+            return
+        # 추적/로그 문맥을 복사해 검색 스팬이 요청 추적에 남도록 한다
+        _prefetched[key] = _prefetch_executor.submit(contextvars.copy_context().run, search, argument)
+        _prefetch_stats["submitted"] += 1
+        while len(_prefetched) > MAX_PREFETCHED:
+            _prefetched.popitem(last=False)
+            _prefetch_stats["evicted"] += 1
+
+
+def _search(kind: str, argument: str, search: Callable[[str], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """미리 시작된 같은 검색이 있으면 그 결과를, 없으면 바로 검색"""
+    with _prefetch_lock:
+        future = _prefetched.pop((kind, argument), None)
+        _prefetch_stats["hits" if future is not None else "misses"] += 1
+    if future is not None:
+        try:
+            return future.result()
+        except Exception as e:
+            logger.warning("Prefetched %s search failed, searching again: %s", kind, e)
+    return search(argument)
+
+
+def prefetch_command_lookup(command: Optional[str]) -> None:
+    """GeoGebra 명령어 이름 검색을 백그라운드에서 미리 시작 (계산 작업의 geogebra_command)"""
+    if command:
+        _prefetch("command", command, CommandRetrieval.search_commands_by_command)
+
+
+def prefetch_step_commands(step: Any) -> None:
+    """
+    작도 단계의 명령어 검색을 백그라운드에서 미리 시작
+
+    스트리밍 중 닫힌 단계(dict) 또는 ConstructionStep 을 받으며, 검색 에이전트와 같은
+    명령어 이름 검색과 설명 유사도 검색을 시작한다.
+    """
+    prefetch_command_lookup(_field(step, "geogebra_command"))
+    if _field(step, "description"):
+        _prefetch("cosine", _step_query(step), CommandRetrieval.cosine_search)
+
+
+def get_prefetch_stats() -> Dict[str, Any]:
+    """미리 검색 통계 (시작/사용/미사용 밀어냄 수, 검색 에이전트 요청 중 미리 시작된 비율, 미리 선택 재사용 수)"""
+    with _prefetch_lock:
+        stats = dict(_prefetch_stats, pending=len(_prefetched))
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    return stats
+
+
+def _step_signature(step: Any) -> str:
+    fields = {name: _field(step, name) for name in _SIGNATURE_FIELDS}
+    return hashlib.sha1(json.dumps(fields, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+
+def _reuse_preselected(step: Any, preselected: Optional[Dict[str, Dict[str, Any]]]) -> bool:
+    """입력이 같은 초안 단계에서 미리 선택한 명령어가 있으면 단계에 복사"""
+    selected = (preselected or {}).get(_step_signature(step))
+    if selected is None:
+        return False
+    step.selected_command = dict(selected)
+    return True
+
+
+def search_step_commands(retrieval: CommandRetrieval, step: Any) -> List[Dict[str, Any]]:
+    """
+    단계 하나의 후보 명령어 검색 (명령어 이름 검색 + 설명 유사도 검색 병합, 점수 내림차순)
+
+    Args:
+        retrieval: 검색 객체
+        step: ConstructionStep 또는 같은 필드를 가진 dict
+
+    Returns:
+        점수 순으로 정렬된 후보 명령어 목록
+    """
+    # 각 단계별 검색된 명령어 저장 리스트
+    retrieved_commands = []
+    
+    # geogebra_command가 있는 경우 DB에서 해당 명령어 검색
+    geogebra_command = _field(step, "geogebra_command")
+    if geogebra_command:
+        # DB에서 command 속성으로 대소문자 구분 없이 검색
+        command_search_results = _search("command", geogebra_command, retrieval.search_commands_by_command)
+        if command_search_results:
+            retrieved_commands.extend(command_search_results)
+    
+    # SentenceBERT로 검색 실행
+    search_results = _search("cosine", _step_query(step), retrieval.cosine_search)
+    
+    if search_results:
+        # 이미 command 속성으로 찾은 결과와 중복 체크하여 병합
+        existing_syntaxes = {cmd["syntax"].lower() for cmd in retrieved_commands}
+        
+        for result in search_results:
+            if result["syntax"].lower() in existing_syntaxes:
+                # 중복된 결과가 있으면 기존 결과의 점수 업데이트
+                for existing_cmd in retrieved_commands:
+                    if existing_cmd["syntax"].lower() == result["syntax"].lower():
+                        # score 값 병합 또는 업데이트
+                        if "score" in result:
+                            existing_cmd["sbert_score"] = result["score"]
+                            # DB 검색 결과에 높은 가중치 부여
+                            existing_cmd["score"] = result["score"] + 0.5
+            else:
+                # 중복되지 않은 결과 추가
+                retrieved_commands.append(result)
+    
+    # 검색 결과가 있으면 점수 기준으로 정렬
+    return sorted(
+        retrieved_commands,
+        key=lambda x: x.get("score", 0),
+        reverse=True
+    )
+
 
 def geogebra_command_retrieval_agent(state):
     """
@@ -20,7 +189,7 @@ def geogebra_command_retrieval_agent(state):
     Returns:
         명령어가 추가된 상태 객체
     """
-    print("[INFO] GeoGebra 명령어 검색 에이전트 실행 중...")
+    logger.info("GeoGebra 명령어 검색 에이전트 실행 중...")
     
     # 검색 객체 초기화
     retrieval = CommandRetrieval()
@@ -30,7 +199,7 @@ def geogebra_command_retrieval_agent(state):
     
     # construction_plan이 없는 경우 예외 처리
     if not hasattr(state, "construction_plan") or not state.construction_plan:
-        print("[WARN] 작도 계획이 없습니다. 검색을 진행할 수 없습니다.")
+        logger.warning("작도 계획이 없습니다. 검색을 진행할 수 없습니다.")
         return state
     
     # 작도 계획 가져오기
@@ -42,55 +211,21 @@ def geogebra_command_retrieval_agent(state):
         "final_result": plan.final_result
     }
     
-    for step in plan.steps:
-        # 각 단계별 검색된 명령어 저장 리스트
-        retrieved_commands = []
-        
-        # geogebra_command가 있는 경우 DB에서 해당 명령어 검색
-        if step.geogebra_command:
-            # DB에서 command 속성으로 대소문자 구분 없이 검색
-            command_search_results = retrieval.search_commands_by_command(step.geogebra_command)
-            if command_search_results:
-                retrieved_commands.extend(command_search_results)
-        
-        # 검색 쿼리 생성
-        query = f"{step.description} {step.task_type}"
-        if step.command_type:
-            query += f" {step.command_type}"
-        
-        # SentenceBERT로 검색 실행
-        search_results = retrieval.cosine_search(
-            query, top_k=5
-        )
-        
-        if search_results:
-            # 이미 command 속성으로 찾은 결과와 중복 체크하여 병합
-            existing_syntaxes = {cmd["syntax"].lower() for cmd in retrieved_commands}
-            
-            for result in search_results:
-                if result["syntax"].lower() in existing_syntaxes:
-                    # 중복된 결과가 있으면 기존 결과의 점수 업데이트
-                    for existing_cmd in retrieved_commands:
-                        if existing_cmd["syntax"].lower() == result["syntax"].lower():
-                            # score 값 병합 또는 업데이트
-                            if "score" in result:
-                                existing_cmd["sbert_score"] = result["score"]
-                                # DB 검색 결과에 높은 가중치 부여
-                                existing_cmd["score"] = result["score"] + 0.5
-                else:
-                    # 중복되지 않은 결과 추가
-                    retrieved_commands.append(result)
+    # 초안 계획에서 미리 선택한 명령어는 그대로 쓰고, 검색·선택 입력이 바뀐 단계만 다시 검색
+    if state.preselected_commands is None:
+        state.preselected_commands = _await_preselection(state.draft_construction_plan)
+    pending_steps = [step for step in plan.steps if not _reuse_preselected(step, state.preselected_commands)]
+    reused = len(plan.steps) - len(pending_steps)
+    
+    # 스트리밍 중 미리 시작되지 않은 단계도 모두 먼저 제출해 병렬로 검색
+    for step in pending_steps:
+        prefetch_step_commands(step)
+    
+    for step in pending_steps:
+        sorted_commands = search_step_commands(retrieval, step)
         
-        # 검색 결과가 있으면 점수 기준으로 정렬
-        if retrieved_commands:
-            sorted_commands = sorted(
-                retrieved_commands,
-                key=lambda x: x.get("score", 0),
-                reverse=True
-            )
-            
-            
-            # 단계에 검색된 명령어 저장
+        # 검색 결과가 있으면 단계에 검색된 명령어 저장
+        if sorted_commands:
             reranker_agent_input["steps"].append({
                 "step_id": step.step_id,
                 "description": step.description,
@@ -101,13 +236,73 @@ def geogebra_command_retrieval_agent(state):
             })
     
     
-    print(f"[INFO] {len(reranker_agent_input["steps"])}개 단계에 대한 명령어 검색 완료")
+    logger.info("%s개 단계에 대한 명령어 검색 완료", len(reranker_agent_input["steps"]))
+    
+    if state.preselected_commands is not None:
+        with _prefetch_lock:
+            _prefetch_stats["preselected_reused"] += reused
+            _prefetch_stats["preselected_changed"] += len(pending_steps)
+    if reused:
+        logger.info("초안 계획에서 미리 선택한 명령어 재사용: %s/%s개 단계", reused, len(plan.steps))
+        # 바뀐 단계만 선택하고, 명령어 목록은 단계 순서대로 다시 구성
+        if reranker_agent_input["steps"]:
+            state = command_selection_agent(state, reranker_agent_input)
+        state.retrieved_commands = [step.selected_command for step in plan.steps if step.selected_command]
+        return state
     
     # 명령어 선택 에이전트 호출
     state = command_selection_agent(state, reranker_agent_input)
     
     return state
 
+def _plan_signature(plan: Any) -> str:
+    return hashlib.sha1(plan.model_dump_json().encode("utf-8")).hexdigest()
+
+
+def _preselect_commands(plan: Any) -> Dict[str, Dict[str, Any]]:
+    """초안 계획 사본으로 검색·선택을 실행해 {단계 서명: 선택된 명령어} 반환"""
+    logger.info("초안 작도 계획으로 명령어 미리 선택 중... (%s개 단계)", len(plan.steps))
+    draft_state = geogebra_command_retrieval_agent(GeometryState(construction_plan=plan))
+    return {
+        _step_signature(step): step.selected_command
+        for step in draft_state.construction_plan.steps
+        if step.selected_command
+    }
+
+
+def start_command_preselection(plan: Any) -> None:
+    """
+    초안 작도 계획의 명령어 검색·선택을 백그라운드 작업으로 시작 (계산 루프와 동시에 실행)
+
+    그래프 단계를 차지하지 않으므로 계산 매니저/라우터는 이 작업을 기다리지 않고,
+    병합 후 검색 에이전트만 결과를 기다린다.
+    """
+    if not PARALLEL_COMMAND_RETRIEVAL or not plan or not plan.steps:
+        return
+    key = _plan_signature(plan)
+    with _prefetch_lock:
+        if key in _preselections:
+            return
+        _preselections[key] = _preselection_executor.submit(
+            contextvars.copy_context().run, _preselect_commands, plan.model_copy(deep=True))
+        while len(_preselections) > MAX_PRESELECTIONS:
+            _preselections.popitem(last=False)
+
+
+def _await_preselection(plan: Any) -> Optional[Dict[str, Dict[str, Any]]]:
+    """시작된 미리 선택 작업을 기다려 결과 반환 (작업이 없거나 실패하면 None)"""
+    if not plan:
+        return None
+    with _prefetch_lock:
+        future = _preselections.pop(_plan_signature(plan), None)
+    if future is None:
+        return None
+    try:
+        return future.result()
+    except Exception as e:
+        logger.warning("Command preselection failed, selecting all steps again: %s", e)
+        return None
+
 def command_selection_agent(state, reranker_agent_input):
     """
     검색된 명령어 중 최적의 명령어를 선택하는 에이전트
@@ -119,19 +314,20 @@ def command_selection_agent(state, reranker_agent_input):
     Returns:
         선택된 명령어가 추가된 상태 객체
     """
-    print("[INFO] 명령어 선택 에이전트 실행 중...")
+    logger.info("명령어 선택 에이전트 실행 중...")
     
     if not hasattr(state, "construction_plan") or not state.construction_plan:
-        print("[WARN] 작도 계획이 없습니다. 명령어 선택을 진행할 수 없습니다.")
+        logger.warning("작도 계획이 없습니다. 명령어 선택을 진행할 수 없습니다.")
         return state
     
     # LLM 인스턴스 생성
     llm = LLMManager.get_command_selection_llm()
     
     # LLM 호출하여 명령어 선택
-    chain = COMMAND_SELECTION_PROMPT | llm
+    prompt = assemble_prompt("command_selection", COMMAND_SELECTION_PROMPT, llm.system_message,
+                             json_template=COMMAND_SELECTION_TEMPLATE)
+    chain = prompt | llm
     result = chain.invoke({
-        "json_template": COMMAND_SELECTION_TEMPLATE,
         "reranker_agent_input": reranker_agent_input
     })
     
@@ -191,28 +387,28 @@ def command_selection_agent(state, reranker_agent_input):
                                 step.selected_command = step_retrieved_commands[0]
                                 retrieved_commands.append(step_retrieved_commands[0])
                     else:
-                        print(f"[WARN] step_id {step_id}에 해당하는 단계를 찾을 수 없습니다.")
+                        logger.warning("step_id %s에 해당하는 단계를 찾을 수 없습니다.", step_id)
             else:
-                print(f"[WARN] 응답에 selected_commands가 없습니다: {selection_result}")
+                logger.warning("응답에 selected_commands가 없습니다: %s", selection_result)
                 _select_default_commands(state, reranker_agent_input)
         else:
-            print(f"[WARN] JSON 응답을 찾을 수 없습니다: {response_text}")
+            logger.warning("JSON 응답을 찾을 수 없습니다: %s", response_text)
             # 모든 단계에 첫 번째 명령어를 기본값으로 선택
             _select_default_commands(state, reranker_agent_input)
             
         state.retrieved_commands = retrieved_commands
             
     except json.JSONDecodeError as e:
-        print(f"[ERROR] JSON 파싱 오류: {e}, 응답: {response_text}")
+        logger.error("JSON 파싱 오류: %s, 응답: %s", e, response_text)
         # 모든 단계에 첫 번째 명령어를 기본값으로 선택
         _select_default_commands(state, reranker_agent_input)
         
     except Exception as e:
-        print(f"[ERROR] 명령어 선택 오류: {e}")
+        logger.error("명령어 선택 오류: %s", e)
         # 모든 단계에 첫 번째 명령어를 기본값으로 선택
         _select_default_commands(state, reranker_agent_input)
     
-    print("[INFO] 모든 단계에 대한 명령어 선택 완료")
+    logger.info("모든 단계에 대한 명령어 선택 완료")
     
     return state
 
@@ -0,0 +1,70 @@
+"""
+파싱 + 계획 통합 에이전트 모듈
+
+FRONTEND_MODE=fused 일 때 parsing_agent → planner_agent 두 번의 LLM 호출 대신
+한 번의 구조화 출력 호출로 ParsedElements 와 PlannerResult 를 함께 받습니다.
+후처리(키워드 보강, 수동 파싱 대체, 계획 결과 반영)는 두 에이전트와 같은 함수를 사용하므로
+이후 노드가 받는 상태는 두 호출 방식과 같은 형태입니다.
+"""
+
+from langchain.output_parsers import PydanticOutputParser
+from pydantic import BaseModel, Field
+
+from models.state_models import PlannerResult
+from utils.llm_manager import LLMManager
+from geo_prompts import PARSE_PLAN_PROMPT, PLANNER_CALCULATION_JSON_TEMPLATE, PLANNER_NO_CALCULATION_JSON_TEMPLATE
+from geo_prompts.assembly import assemble_prompt
+from utils.structured_output import FAILED, StructuredOutput, repair_structured, stream_structured
+from agents.parsing_agent import ParsedElements, finalize_parsed_elements
+from agents.planner_agent import apply_planner_result
+from agents.geogebra_command_retrieval_agent import prefetch_step_commands
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ParsePlanResult(BaseModel):
+    parsed_elements: ParsedElements = Field(description="Parsed geometric elements, conditions, targets and problem analysis")
+    plan: PlannerResult = Field(description="Construction or calculation plan based on the parsed elements")
+
+
+def parse_plan_agent(state):
+    """
+    파싱과 계획을 한 번의 LLM 호출로 수행하는 에이전트
+    
+    Args:
+        state: 현재 상태(GeometryState 객체), input_problem 속성 포함
+        
+    Returns:
+        parsed_elements, 분석 정보, 작도 계획 또는 계산 큐가 추가된 상태
+    """
+    # 계획 단계가 응답의 대부분이므로 계획 프로필(모델, 시스템 메시지)을 사용
+    llm = LLMManager.get_planner_llm()
+    
+    prompt = assemble_prompt(
+        "parse_plan", PARSE_PLAN_PROMPT, llm.system_message,
+        format_instructions=PydanticOutputParser(pydantic_object=ParsePlanResult).get_format_instructions(),
+        json_template1=PLANNER_CALCULATION_JSON_TEMPLATE,
+        json_template2=PLANNER_NO_CALCULATION_JSON_TEMPLATE,
+    )
+    # 응답을 스트리밍으로 받으며 작도 단계가 닫힐 때마다 명령어 검색을 미리 시작
+    output = stream_structured(llm, prompt.invoke({"problem": state.input_problem}),
+                               ParsePlanResult, "parse_plan", on_items={
+                                   ("plan", "construction_plan", "steps"): prefetch_step_commands,
+                               })
+    
+    if output.status != FAILED:
+        parsed = StructuredOutput(output.data["parsed_elements"], output.status, output.text)
+        plan = output.data["plan"]
+    else:
+        # 전체 복구에 실패하면 두 부분을 따로 복구 (한쪽이 깨져도 다른 쪽은 사용)
+        logger.warning("통합 파싱+계획 응답 복구 실패, 부분별 복구 시도")
+        parsed = repair_structured(output.data.get("parsed_elements") or {}, ParsedElements)
+        if parsed.status == FAILED:
+            parsed = parsed._replace(text=output.text)
+        plan_output = repair_structured(output.data.get("plan") or {}, PlannerResult)
+        # 계획을 복구하지 못하면 기본값(계산 경로)으로 진행해 매니저가 작업을 새로 만든다
+        plan = plan_output.data if plan_output.status != FAILED else {}
+    
+    state.parsed_elements = finalize_parsed_elements(parsed, state.input_problem)
+    return apply_planner_result(state, plan)
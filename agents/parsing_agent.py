@@ -1,10 +1,15 @@
 from typing import Dict, Any, List, Optional
 from langchain.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
-import json
 import re
 from utils.llm_manager import LLMManager
 from geo_prompts import PARSING_PROMPT
+from geo_prompts.assembly import assemble_prompt
+from utils.structured_output import invoke_structured, FAILED, StructuredOutput
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 
 
 # 출력 구조 정의
@@ -85,40 +90,44 @@ def parsing_agent(state):
     Returns:
         Dictionary with parsed_elements added
     """
-    # 출력 파서 설정
-    parser = PydanticOutputParser(pydantic_object=ParsedElements)
-    
-    # 자동으로 형식 지침 생성
-    format_instructions = parser.get_format_instructions()
+    # 형식 지침은 기존 파서에서 생성 (구조화 출력을 지원하지 않는 모델을 위해 프롬프트에도 유지)
+    format_instructions = PydanticOutputParser(pydantic_object=ParsedElements).get_format_instructions()
     
     # LLM 설정
     llm = LLMManager.get_parsing_llm()
     
-    # 프롬프트 체인 생성 및 실행
-    chain = (PARSING_PROMPT.partial(format_instructions=format_instructions) | llm | parser)
+    # 프롬프트 생성
+    prompt = assemble_prompt("parsing", PARSING_PROMPT, llm.system_message,
+                             format_instructions=format_instructions)
+    
+    # ParsedElements 스키마로 구조화 출력 호출 (스키마에 맞지 않으면 다시 묻지 않고 로컬 복구)
+    output = invoke_structured(llm, prompt.invoke({"problem": state.input_problem}),
+                               ParsedElements, "parsing")
+    
+    # 항상 딕셔너리 형태로 반환
+    return {"parsed_elements": finalize_parsed_elements(output, state.input_problem)}
+
+def finalize_parsed_elements(output: StructuredOutput, problem: str) -> Dict[str, Any]:
+    """
+    구조화 출력 결과를 parsed_elements dict 로 정리 (통합 파싱+계획 에이전트와 공유)
     
-    try:
-        # 구조화된 형식으로 결과 가져오기
-        parsed_elements = chain.invoke({"problem": state.input_problem})
+    Args:
+        output: ParsedElements 스키마의 구조화 출력 결과
+        problem: 문제 텍스트 (키워드 보강과 수동 파싱에 사용)
         
-        # Pydantic 모델을 딕셔너리로 변환
-        parsed_elements_dict = parsed_elements.model_dump()
+    Returns:
+        키워드로 보강한 parsed_elements (복구 실패 시 수동 파싱 결과)
+    """
+    if output.status != FAILED:
+        parsed_elements_dict = output.data
         
         # 추가 처리가 필요한 경우 여기서 수행
-        _enhance_with_keywords(parsed_elements_dict, state.input_problem)
+        _enhance_with_keywords(parsed_elements_dict, problem)
 
-    except Exception as e:
-        # 파싱 실패 시 수동 파싱 시도
-        print(f"구조화된 파싱 실패, 수동 파싱 시도: {str(e)}")
-        result_text = llm.invoke(PARSING_PROMPT.format(problem=state.input_problem, format_instructions=format_instructions))
-        
-        try:
-            # JSON 형식 응답 추출 시도
-            json_content = _extract_json_from_response(result_text.content)
-            parsed_elements_dict = json.loads(json_content)
-        except:
-            # 수동 파싱으로 마지막 시도
-            parsed_elements_dict = _manual_parsing(result_text.content, state.input_problem)
+    else:
+        # 복구 실패 시 추출한 JSON 또는 같은 응답의 텍스트로 수동 파싱
+        logger.warning("구조화된 파싱 실패, 수동 파싱 시도")
+        parsed_elements_dict = output.data or _manual_parsing(output.text, problem)
         
         # 구조화되지 않은 경우 빈 구조 생성
         if not isinstance(parsed_elements_dict, dict) or not parsed_elements_dict:
@@ -127,34 +136,20 @@ def parsing_agent(state):
                 "relations": {},
                 "conditions": {},
                 "targets": {},
-                "error": f"파싱 오류: {str(e)}"
+                "error": "파싱 오류: 응답에서 구조를 추출하지 못했습니다"
             }
+        for key in ("geometric_objects", "relations", "conditions", "targets"):
+            if not isinstance(parsed_elements_dict.get(key), dict):
+                parsed_elements_dict[key] = {}
         
         # 수동 파싱한 결과에도 problem_type과 approach 추가
         if "problem_type" not in parsed_elements_dict:
             parsed_elements_dict["problem_type"] = {}
         
-        _enhance_with_keywords(parsed_elements_dict, state.input_problem)
+        _enhance_with_keywords(parsed_elements_dict, problem)
         parsed_elements_dict["approach"] = "GeoGebra作图"
     
-    # 항상 딕셔너리 형태로 반환
-    return {"parsed_elements": parsed_elements_dict}
-
-def _extract_json_from_response(response: str) -> str:
-    """응답에서 JSON 부분만 추출"""
-    # JSON 블록 추출 시도
-    json_match = re.search(r'```json\s*([\s\S]*?)\s*```', response)
-    if json_match:
-        return json_match.group(1)
-    
-    # JSON 객체 추출 시도
-    json_match = re.search(r'\{[\s\S]*\}', response)
-    if json_match:
-        return json_match.group(0)
-    
-    # JSON 추출 실패 시 전체 응답 반환
-    return response
-
+    return parsed_elements_dict
 
 def _manual_parsing(content: str, problem: str) -> Dict[str, Any]:
     """LLM 응답이 JSON이 아닌 경우의 수동 파싱"""
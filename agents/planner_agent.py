@@ -1,10 +1,16 @@
-from langchain_core.output_parsers import JsonOutputParser
 from models.state_models import CalculationQueue, CalculationTask, PlannerResult, ConstructionPlan, ConstructionStep
 from utils.llm_manager import LLMManager
 from geo_prompts import PLANNER_PROMPT, PLANNER_CALCULATION_JSON_TEMPLATE, PLANNER_NO_CALCULATION_JSON_TEMPLATE
+from geo_prompts.assembly import assemble_prompt
+from utils.structured_output import stream_structured
+from agents.geogebra_command_retrieval_agent import prefetch_step_commands, start_command_preselection
 from utils.construction_util import build_construction_plan
+from utils.logger import get_logger
+from pydantic import ValidationError
 import yaml
 
+logger = get_logger(__name__)
+
 def planner_agent(state):
     """
     기하학 문제 분석 에이전트
@@ -18,25 +24,20 @@ def planner_agent(state):
     # LLM 설정
     llm = LLMManager.get_planner_llm()
     
-    # 계산 결과 초기화
-    if state.calculation_results is None:
-        state.calculation_results = {}
-    
-    # JSON 출력 파서 생성
-    parser = JsonOutputParser(pydantic_object=PlannerResult)
-    
-    # 파싱 에이전트에서 이미 처리한 정보 활용
-    existing_problem_type = state.parsed_elements.get("problem_type", {})
-    existing_approach = state.parsed_elements.get("approach", "GeoGebra作图")
-    
     # 프롬프트 체인 생성 및 실행
-    chain = PLANNER_PROMPT | llm | parser
-    result = chain.invoke({
+    prompt = assemble_prompt(
+        "planner", PLANNER_PROMPT, llm.system_message,
+        json_template1=PLANNER_CALCULATION_JSON_TEMPLATE,
+        json_template2=PLANNER_NO_CALCULATION_JSON_TEMPLATE,
+    )
+    # PlannerResult 스키마로 구조화 출력 호출 (스키마에 맞지 않으면 로컬 복구)
+    # 응답을 스트리밍으로 받으며 작도 단계가 닫힐 때마다 명령어 검색을 미리 시작
+    result = stream_structured(llm, prompt.invoke({
         "problem": state.input_problem,
         "parsed_elements": yaml.dump(state.parsed_elements, allow_unicode=True, sort_keys=False),
-        "json_template1": PLANNER_CALCULATION_JSON_TEMPLATE,
-        "json_template2": PLANNER_NO_CALCULATION_JSON_TEMPLATE
-    })
+    }), PlannerResult, "planner", on_items={
+        ("construction_plan", "steps"): prefetch_step_commands,
+    }).data
     # state.input_problem = "△ABC为正三角形，D、E为BC上的点，且有∠CAD=∠DAE=∠EAB,取AD的中点F，连接BF交AE于G"
     # state.parsed_elements = {
     #   "geometric_objects": {
@@ -310,6 +311,28 @@ def planner_agent(state):
     # ]
     # }
     
+    return apply_planner_result(state, result)
+
+
+def apply_planner_result(state, result):
+    """
+    계획 결과를 상태에 반영 (통합 파싱+계획 에이전트와 공유)
+    
+    Args:
+        state: 현재 상태(GeometryState 객체), parsed_elements 포함
+        result: PlannerResult 형식의 dict
+        
+    Returns:
+        분석 정보, 작도 계획 또는 계산 큐가 추가된 상태
+    """
+    # 계산 결과 초기화
+    if state.calculation_results is None:
+        state.calculation_results = {}
+    
+    # 파싱 에이전트에서 이미 처리한 정보 활용
+    existing_problem_type = state.parsed_elements.get("problem_type", {})
+    existing_approach = state.parsed_elements.get("approach", "GeoGebra作图")
+    
     # 상태 업데이트 - 파싱 에이전트에서 이미 분석한 problem_type과 approach 사용
     state.problem_analysis = {
         "problem_type": existing_problem_type,
@@ -320,34 +343,26 @@ def planner_agent(state):
     }
     
     # 계산이 필요한지 여부 설정
-    state.requires_calculation = result["requires_calculation"]
+    state.requires_calculation = result.get("requires_calculation", True)
     
     # 계산이 필요 없는 경우 construction_plan 생성
-    if not result["requires_calculation"]:
+    if not state.requires_calculation:
         # 직접 생성된 construction_plan 사용 또는 유틸리티로 생성
-        if result.get("construction_plan"):
-            # 딕셔너리를 ConstructionPlan 모델로 변환
-            if isinstance(result["construction_plan"], dict):
-                # 각 step을 ConstructionStep 객체로 변환
-                steps = []
-                if "steps" in result["construction_plan"]:
-                    for step_dict in result["construction_plan"]["steps"]:
-                        steps.append(ConstructionStep(**step_dict))
-                
-                # 전체 construction_plan을 ConstructionPlan 객체로 변환
-                plan_dict = result["construction_plan"].copy()
-                if steps:
-                    plan_dict["steps"] = steps
-                
-                state.construction_plan = ConstructionPlan(**plan_dict)
-            else:
-                state.construction_plan = result["construction_plan"]
-        else:
-            # 유틸리티로 계획 생성
-            state.construction_plan = build_construction_plan(
+        state.construction_plan = _plan_from_result(result) or build_construction_plan(
+            state.input_problem,
+            state.parsed_elements
+        )
+    else:
+        # 계산 경로: 병합 에이전트가 최종 계획을 만들기 전에 명령어를 미리 선택할 초안 계획
+        try:
+            state.draft_construction_plan = _plan_from_result(result) or build_construction_plan(
                 state.input_problem,
-                state.parsed_elements
+                state.parsed_elements,
+                suggested_tasks=result.get("suggested_tasks") or None
             )
+            start_command_preselection(state.draft_construction_plan)
+        except (ValidationError, TypeError) as e:
+            logger.warning("초안 작도 계획을 만들 수 없어 명령어 미리 선택을 건너뜁니다: %s", e)
     
     # 계산 큐 초기화만 수행하고 Manager가 실제 작업을 생성하도록 함
     if state.requires_calculation:
@@ -357,4 +372,21 @@ def planner_agent(state):
             completed_task_ids=[]
         )
         
-    return state 
\ No newline at end of file
+    return state
+
+
+def _plan_from_result(result):
+    """계획 결과의 construction_plan 을 ConstructionPlan 모델로 변환 (없으면 None)"""
+    plan = result.get("construction_plan")
+    if not plan:
+        return None
+    if not isinstance(plan, dict):
+        return plan
+    # 각 step을 ConstructionStep 객체로 변환
+    steps = [ConstructionStep(**step_dict) for step_dict in plan.get("steps", [])]
+
+    # 전체 construction_plan을 ConstructionPlan 객체로 변환
+    plan_dict = plan.copy()
+    if steps:
+        plan_dict["steps"] = steps
+    return ConstructionPlan(**plan_dict)
@@ -1,11 +1,20 @@
 from typing import Dict, List, Any, Optional
 from geo_prompts import VALIDATION_PROMPT, VALIDATION_JSON_TEMPLATE
+from geo_prompts.assembly import assemble_prompt
+from utils.structured_output import invoke_structured, FAILED
 from utils.llm_manager import LLMManager
-from utils.json_parser import parse_llm_json_output, safe_parse_llm_json_output
-from models.validation_models import ValidationResult
-from agents.tools import get_common_tools
+from models.validation_models import ValidationResult, CommandAnalysis
+from utils.geogebra_syntax import validate_geogebra_commands
+from utils.geogebra_evaluator import verify_construction
+from utils.prompt_context import build_prompt_context
+from utils.command_repair import scoped_validation_input, merge_command_analysis
+from config import LOCAL_VALIDATION_ENABLED, LOCAL_NUMERIC_VALIDATION_ENABLED
 import json
 import re
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 
 def refine_validation_input(state):
     """
@@ -24,7 +33,7 @@ def refine_validation_input(state):
     }
     
     # GeoGebra 명령어 정제
-    refined_input["commands"] = str(state.geogebra_commands)
+    refined_input["commands"] = state.geogebra_commands
     
     # Construction Plan 정제
     if state.construction_plan:
@@ -61,59 +70,104 @@ def validation_agent(state):
     Returns:
         검증 결과가 추가된 상태 객체
     """
+    # 부분 수리 후라면 LLM 검증을 패치한 줄과 의존 줄로 한정 (로컬 검증은 항상 전체)
+    repair_scope = state.repair_scope
+    previous_validation = state.validation
+    state.repair_scope = None
+    
+    # 로컬 구문 검증: 구문 오류는 LLM 없이 즉시 반려
+    local_report = None
+    if LOCAL_VALIDATION_ENABLED:
+        local_report = validate_geogebra_commands(state.geogebra_commands or [])
+        if not local_report["is_valid"]:
+            validation_result = ValidationResult(
+                analysis=local_report["analysis"],
+                is_valid=False,
+                errors=local_report["errors"],
+                warnings=local_report["warnings"],
+                suggestions=local_report["suggestions"],
+                command_by_command_analysis=local_report["command_by_command_analysis"],
+            )
+            state.validation = validation_result.dict()
+            state.is_valid = False
+            logger.debug("Local validation failed: %s", local_report['errors'])
+            return state
+    
+    # 로컬 수치 검증: 작도를 실행해 문제 조건을 모두 만족하면 LLM 검증 생략
+    numeric_report = None
+    if local_report and LOCAL_NUMERIC_VALIDATION_ENABLED:
+        numeric_report = verify_construction(state.geogebra_commands or [], state.parsed_elements)
+        if numeric_report["verified"]:
+            passed = len(numeric_report["checks"])
+            validation_result = ValidationResult(
+                analysis=f"{local_report['analysis']} Numeric evaluation verified {passed} constraint(s) from the problem.",
+                is_valid=True,
+                errors=[],
+                warnings=local_report["warnings"],
+                suggestions=[],
+                command_by_command_analysis=local_report["command_by_command_analysis"],
+            )
+            state.validation = validation_result.dict()
+            state.is_valid = True
+            logger.debug("Local numeric validation passed (%s constraints), skipping LLM validation", passed)
+            return state
+    
     # LLM 초기화
     llm = LLMManager.get_validation_llm()
     
-    # 공통 도구 가져오기
-    tools = get_common_tools()
-    
     # 입력 데이터 정제
     refined_input = refine_validation_input(state)
+    scoped_input = None
+    if repair_scope:
+        scoped_input = scoped_validation_input(state.geogebra_commands or [], repair_scope, previous_validation)
+        if scoped_input is not None:
+            refined_input["commands"] = scoped_input
+            logger.debug("Validating %s patched/dependent lines only", len(scoped_input["lines_to_validate"]))
     
     # 입력 데이터 준비
-    chain = VALIDATION_PROMPT | llm
-    print(f"[DEBUG] Validation agent start")
-    result = chain.invoke({
+    prompt = assemble_prompt("validation", VALIDATION_PROMPT, llm.system_message,
+                             json_template=VALIDATION_JSON_TEMPLATE)
+    logger.debug("Validation agent start")
+    prompt_value = prompt.invoke({
         "problem": refined_input["problem"],
-        "commands": refined_input["commands"],
-        "construction_plan": refined_input.get("construction_plan", {}),
-        "json_template": VALIDATION_JSON_TEMPLATE,
+        **build_prompt_context(
+            "validation",
+            commands=refined_input["commands"],
+            construction_plan=refined_input.get("construction_plan", {}),
+        ),
         "agent_scratchpad": "",
-        "tools": tools
     })
-    print(f"[DEBUG] Validation agent end")
-    
-    # 결과 분석
-    output = result.content if hasattr(result, 'content') else result["output"]
-    
-    try:
-        # 결과 파싱 시도 (Pydantic 모델 사용)
-        parsed_result = safe_parse_llm_json_output(output, dict)
-        
-        if not parsed_result:
-            # JSON 파싱 실패시 백업 파싱
-            print(f"[WARNING] safe_parse_llm_json_output 반환 값이 비어 있습니다")
-            validation_dict = _parse_validation_result(output)
-        else:
-            # 성공적으로 파싱된 딕셔너리 사용
-            validation_dict = parsed_result
-        
-        # construction_plan 필드 내의 geogebra_command 리스트를 문자열로 변환
-        if 'construction_plan' in validation_dict and validation_dict['construction_plan']:
-            if 'steps' in validation_dict['construction_plan']:
-                for step in validation_dict['construction_plan']['steps']:
-                    if 'geogebra_command' in step and isinstance(step['geogebra_command'], list):
-                        # 리스트를 개행 문자로 구분된 문자열로 변환
-                        step['geogebra_command'] = '\n'.join(step['geogebra_command'])
-            
-        # ValidationResult 모델로 변환
-        validation_result = ValidationResult(**validation_dict)
-        
-    except Exception as e:
-        # 모든 파싱 실패시 백업 파서 사용
-        print(f"[WARNING] JSON 파싱 실패: {str(e)}")
-        validation_dict = _parse_validation_result(output)
-        validation_result = ValidationResult(**validation_dict)
+    # ValidationResult 스키마로 구조화 출력 호출 (스키마에 맞지 않으면 다시 묻지 않고 로컬 복구)
+    output = invoke_structured(llm, prompt_value, ValidationResult, "validation",
+                               normalize=_normalize_validation_dict)
+    logger.debug("Validation agent end")
+    
+    if output.status != FAILED:
+        validation_result = ValidationResult(**output.data)
+    else:
+        # 복구 실패시 같은 응답 텍스트로 백업 파싱
+        logger.warning("검증 결과 구조화 파싱 실패, 백업 파서 사용")
+        validation_result = ValidationResult(**_parse_validation_result(output.text))
+    
+    # 범위 검증이면 범위 밖 줄은 이전 줄별 분석을 유지
+    if scoped_input is not None:
+        validation_result.command_by_command_analysis = [CommandAnalysis(**entry) for entry in merge_command_analysis(
+            state.geogebra_commands or [], repair_scope, previous_validation,
+            validation_result.command_by_command_analysis,
+        )]
+    
+    # 로컬 검증 경고는 LLM 결과에 덧붙인다
+    if local_report and local_report["warnings"]:
+        validation_result.warnings = list(validation_result.warnings or []) + local_report["warnings"]
+    
+    # 수치 검증에서 어긋난 조건/실행 오류는 경고로 전달 (해석 차이가 있을 수 있으므로 판정은 LLM 에 맡김)
+    if numeric_report:
+        numeric_warnings = [f"Numeric check failed for {c['constraint']} ({c['kind']}): "
+                            f"{ {k: v for k, v in c.items() if k not in ('constraint', 'kind', 'status')} }"
+                            for c in numeric_report["failed"]]
+        numeric_warnings += numeric_report["errors"]
+        if numeric_warnings:
+            validation_result.warnings = list(validation_result.warnings or []) + numeric_warnings
     
     # 검증 성공 여부 결정
     is_valid = validation_result.is_valid
@@ -123,12 +177,20 @@ def validation_agent(state):
     state.is_valid = is_valid
     
     # 디버그 정보
-    print(f"[DEBUG] Validation result: {is_valid}")
+    logger.debug("Validation result: %s", is_valid)
     if not is_valid and validation_result.errors:
-        print(f"[DEBUG] Validation errors: {validation_result.errors}")
+        logger.debug("Validation errors: %s", validation_result.errors)
     
     return state
 
+def _normalize_validation_dict(validation_dict: Dict[str, Any]) -> None:
+    """construction_plan 필드 내의 geogebra_command 리스트를 개행 문자로 구분된 문자열로 변환"""
+    construction_plan = validation_dict.get('construction_plan')
+    if isinstance(construction_plan, dict):
+        for step in construction_plan.get('steps') or []:
+            if isinstance(step, dict) and isinstance(step.get('geogebra_command'), list):
+                step['geogebra_command'] = '\n'.join(step['geogebra_command'])
+
 def _parse_validation_result(output: str) -> Dict[str, Any]:
     """
     검증 결과 텍스트 파싱 (fallback 메서드)
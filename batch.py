@@ -0,0 +1,332 @@
+"""
+배치 문제 풀이 모듈
+
+JSONL 파일의 기하학 문제들을 한 번에 풀어 결과를 JSONL 로 저장합니다.
+
+- 동시 실행 수 설정 (--concurrency), 여러 프로세스/노드로 나누어 실행 (--shard K/N)
+- 동일한 문제는 한 번만 풀고 결과를 재사용
+- 출력 JSONL 이 체크포인트 역할: 중단된 실행을 다시 시작하면 완료된 문제는 건너뜀
+- 문제별 처리 시간, 토큰 사용량, 비용과 전체 처리량 보고
+
+사용법:
+    python batch.py problems.jsonl -o output/batch_results.jsonl --concurrency 4
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+from config import MODEL_PRICING
+from utils.llm_scheduler import priority_scope, usage_scope, PRIORITY_BULK
+from utils.tracing import trace_scope
+
+# 환경 변수 로드
+load_dotenv()
+
+# 입력 레코드에서 문제 텍스트/ID 를 찾을 필드 (앞에서부터 우선)
+PROBLEM_FIELDS = ("problem", "input_problem", "question", "text", "body")
+ID_FIELDS = ("id", "problem_id", "request_id")
+
+
+def normalize_problem(text: str) -> str:
+    """중복 판단용 문제 정규화 (유니코드 정규화 + 공백 정리)"""
+    text = unicodedata.normalize("NFKC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def problem_hash(text: str) -> str:
+    return hashlib.sha256(normalize_problem(text).encode("utf-8")).hexdigest()[:16]
+
+
+def read_problems(path: str) -> List[Dict[str, Any]]:
+    """
+    입력 JSONL 읽기
+
+    Returns:
+        {"id", "problem", "hash"} 딕셔너리 목록 (문제 텍스트가 없는 줄은 건너뜀)
+    """
+    problems = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"[WARNING] {path}:{line_no} JSON 파싱 실패: {e}")
+                continue
+            if isinstance(record, str):
+                record = {"problem": record}
+            text = next((record[k] for k in PROBLEM_FIELDS if isinstance(record.get(k), str) and record[k].strip()), None)
+            if text is None:
+                print(f"[WARNING] {path}:{line_no} 문제 텍스트 필드가 없습니다.")
+                continue
+            problem_id = next((str(record[k]) for k in ID_FIELDS if record.get(k) is not None), f"line-{line_no}")
+            problems.append({"id": problem_id, "problem": text, "hash": problem_hash(text)})
+    return problems
+
+
+def load_checkpoint(path: str, retry_failed: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    기존 출력 파일에서 이미 처리된 문제 해시를 읽어 옴
+
+    Args:
+        retry_failed: True 이면 실패한 문제는 다시 실행 대상으로 둔다
+    """
+    done: Dict[str, Dict[str, Any]] = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 강제 종료로 잘린 마지막 줄
+                continue
+            if record.get("status") == "ok" or not retry_failed:
+                done[record.get("hash")] = record
+    return done
+
+
+def load_written_ids(path: str) -> Set[str]:
+    """기존 출력 파일에 이미 기록된 문제 ID (중복 문제 기록 복구용)"""
+    written: Set[str] = set()
+    if not os.path.exists(path):
+        return written
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                written.add(str(json.loads(line).get("id")))
+            except (json.JSONDecodeError, AttributeError):
+                continue
+    return written
+
+
+def estimate_cost(usage: Dict[str, Any]) -> Optional[float]:
+    """모델별 토큰 사용량으로 비용(USD) 계산 (가격 정보가 없는 모델이 있으면 None)"""
+    total = 0.0
+    for model, entry in usage.get("by_model", {}).items():
+        pricing = MODEL_PRICING.get(model)
+        if pricing is None:
+            return None
+        cached = entry.get("cached_tokens", 0)
+        uncached = entry.get("prompt_tokens", 0) - cached
+        total += (
+            uncached * pricing["input"]
+            + cached * pricing.get("cached_input", pricing["input"])
+            + entry.get("completion_tokens", 0) * pricing["output"]
+        ) / 1_000_000
+    return round(total, 6)
+
+
+class JSONLWriter:
+    """한 줄씩 즉시 기록하는 JSONL 출력기 (체크포인트 겸용)"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = asyncio.Lock()
+
+    async def write(self, record: Dict[str, Any]):
+        await self.write_many([record])
+
+    async def write_many(self, records: List[Dict[str, Any]]):
+        """여러 레코드를 한 번에 기록 (대표 문제와 중복 문제 결과가 함께 남도록)"""
+        async with self._lock:
+            self._file.write("".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in records))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+async def solve_one(problem: Dict[str, Any]) -> Dict[str, Any]:
+    """문제 하나를 풀고 출력 레코드를 만든다"""
+    from main import solve_geometry_problem
+
+    started = time.perf_counter()
+    with usage_scope() as usage, trace_scope(str(problem["id"]), source="batch"):
+        try:
+            result = await solve_geometry_problem(problem["problem"])
+            record = {
+                "status": "ok",
+                "geogebra_commands": result.get("geogebra_commands", []),
+                "explanation": result.get("explanation", ""),
+                "is_valid": result.get("is_valid", False),
+                "error": result.get("error"),
+            }
+        except Exception as e:
+            record = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+    usage_data = usage.to_dict()
+    record.update({
+        "id": problem["id"],
+        "hash": problem["hash"],
+        "problem": problem["problem"],
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "usage": usage_data,
+        "cost_usd": estimate_cost(usage_data),
+    })
+    return record
+
+
+async def solve_batch(
+    problems: Iterable[Dict[str, Any]],
+    output_path: str,
+    concurrency: int = 4,
+    retry_failed: bool = False,
+) -> Dict[str, Any]:
+    """
+    여러 문제를 동시에 풀고 결과를 출력 JSONL 에 기록
+
+    Args:
+        problems: read_problems() 형식의 문제 목록
+        output_path: 결과 JSONL 경로 (이미 있으면 이어서 실행)
+        concurrency: 동시에 실행할 문제 수
+        retry_failed: 이전 실행에서 실패한 문제를 다시 실행할지 여부
+
+    Returns:
+        처리량/비용 요약 딕셔너리
+    """
+    problems = list(problems)
+    done = load_checkpoint(output_path, retry_failed)
+
+    # 문제 해시별로 묶어 중복 제거 (첫 번째 ID 가 대표)
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for problem in problems:
+        groups.setdefault(problem["hash"], []).append(problem)
+    pending = [members for key, members in groups.items() if key not in done]
+    # 대표 결과만 기록되고 중단된 경우: 빠진 중복 문제 기록을 체크포인트의 대표 결과로 채움
+    written = load_written_ids(output_path) if done else set()
+    recovered = [
+        _duplicate_record(done[key], duplicate)
+        for key, members in groups.items() if key in done
+        for duplicate in members if duplicate["id"] not in written
+    ]
+
+    print(
+        f"[INFO] 입력 {len(problems)}개, 고유 문제 {len(groups)}개, "
+        f"완료(체크포인트) {len(groups) - len(pending)}개, 실행 대상 {len(pending)}개"
+    )
+
+    writer = JSONLWriter(output_path)
+    if recovered:
+        print(f"[INFO] 체크포인트에서 중복 문제 기록 {len(recovered)}개 복구")
+        await writer.write_many(recovered)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    records: List[Dict[str, Any]] = []
+    started = time.perf_counter()
+
+    async def run(members: List[Dict[str, Any]]):
+        async with semaphore:
+            record = await solve_one(members[0])
+        # 중복 문제는 대표 결과를 복사해 함께 기록 (비용은 대표에만 계상)
+        await writer.write_many([record] + [_duplicate_record(record, duplicate) for duplicate in members[1:]])
+        records.append(record)
+        print(
+            f"[INFO] ({len(records)}/{len(pending)}) {record['id']} "
+            f"{record['status']} {record['elapsed_seconds']}s cost={record['cost_usd']}"
+        )
+
+    try:
+        with priority_scope(PRIORITY_BULK):
+            await asyncio.gather(*(run(members) for members in pending))
+    finally:
+        writer.close()
+
+    return summarize(records, time.perf_counter() - started)
+
+
+def _duplicate_record(record: Dict[str, Any], duplicate: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        **record,
+        "id": duplicate["id"],
+        "duplicate_of": record.get("duplicate_of") or record["id"],
+        "usage": None,
+        "cost_usd": 0.0,
+    }
+
+
+def summarize(records: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    """처리량과 문제당 비용 요약"""
+    succeeded = [r for r in records if r["status"] == "ok"]
+    costs = [r["cost_usd"] for r in records if r.get("cost_usd") is not None]
+    latencies = sorted(r["elapsed_seconds"] for r in records)
+    tokens = sum((r.get("usage") or {}).get("totals", {}).get("prompt_tokens", 0)
+                 + (r.get("usage") or {}).get("totals", {}).get("completion_tokens", 0) for r in records)
+    return {
+        "solved": len(records),
+        "succeeded": len(succeeded),
+        "failed": len(records) - len(succeeded),
+        "elapsed_seconds": round(elapsed, 2),
+        "throughput_per_minute": round(len(records) / elapsed * 60, 2) if elapsed > 0 else 0.0,
+        "latency_p50_seconds": latencies[len(latencies) // 2] if latencies else None,
+        "latency_max_seconds": latencies[-1] if latencies else None,
+        "total_tokens": tokens,
+        "total_cost_usd": round(sum(costs), 6) if costs else None,
+        "avg_cost_per_problem_usd": round(sum(costs) / len(costs), 6) if costs else None,
+    }
+
+
+def parse_shard(text: str) -> Tuple[int, int]:
+    """
+    --shard K/N 파싱 (0 <= K < N)
+
+    Raises:
+        ValueError: 형식이 틀렸거나 범위를 벗어난 경우
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", text or "")
+    if not match:
+        raise ValueError(f"K/N 형식이어야 합니다: {text!r}")
+    index, count = int(match.group(1)), int(match.group(2))
+    if count < 1 or index >= count:
+        raise ValueError(f"0 <= K < N 이어야 합니다: {text!r}")
+    return index, count
+
+
+def _select_shard(problems: List[Dict[str, Any]], shard: Optional[Tuple[int, int]]) -> List[Dict[str, Any]]:
+    """--shard K/N: 문제 해시 기준으로 N 개 중 K 번째 몫만 선택 (중복 문제는 같은 샤드로)"""
+    if not shard:
+        return problems
+    index, count = shard
+    return [p for p in problems if int(p["hash"], 16) % count == index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="기하학 문제 배치 풀이 (JSONL 입력/출력)")
+    parser.add_argument("input", help="입력 JSONL 파일 (problem/text/body 필드)")
+    parser.add_argument("-o", "--output", default="output/batch_results.jsonl", help="출력 JSONL 파일 (체크포인트 겸용)")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="동시에 풀 문제 수")
+    parser.add_argument("--shard", default=None, help="K/N 형식(0 <= K < N)으로 전체 중 일부만 실행 (여러 프로세스/노드 분산용)")
+    parser.add_argument("--retry-failed", action="store_true", help="이전 실행에서 실패한 문제 다시 실행")
+    parser.add_argument("--summary", default=None, help="요약을 저장할 JSON 파일")
+    args = parser.parse_args()
+    shard = None
+    if args.shard:
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(f"--shard: {e}")
+
+    problems = _select_shard(read_problems(args.input), shard)
+    summary = asyncio.run(solve_batch(problems, args.output, args.concurrency, args.retry_failed))
+
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
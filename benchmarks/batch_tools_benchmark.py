@@ -0,0 +1,145 @@
+"""
+배치 기하 도구 벤치마크
+
+스칼라 도구(TriangleTools 등)를 루프로 호출한 경우와 batch_tools 의 벡터화 버전을
+같은 무작위 입력으로 비교하고, 결과가 일치하는지도 함께 확인합니다.
+
+사용법:
+    python -m benchmarks.batch_tools_benchmark --n 10000 --repeat 3
+"""
+
+import argparse
+import time
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from agents.calculation.tools import (
+    AngleTools,
+    BatchAngleTools,
+    BatchCircleTools,
+    BatchCoordinateTools,
+    BatchTriangleTools,
+    CircleTools,
+    CoordinateTools,
+    TriangleTools,
+)
+
+
+def _best_time(func: Callable[[], object], repeat: int) -> Tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def _scalar_or_nan(func, *args):
+    try:
+        return func(*args)
+    except Exception:
+        return None
+
+
+def run(n: int, repeat: int, seed: int = 0) -> List[dict]:
+    rng = np.random.default_rng(seed)
+    triangles = rng.uniform(-10, 10, size=(n, 3, 2))
+    # 퇴화 입력도 섞어서 마스크 처리 비용까지 측정
+    triangles[::97, 2] = (triangles[::97, 0] + triangles[::97, 1]) / 2
+    tri_list = [[tuple(v) for v in t] for t in triangles]
+    points = rng.uniform(-10, 10, size=(n, 2))
+    lines1 = BatchCoordinateTools.line_equations(rng.uniform(-10, 10, (n, 2)), rng.uniform(-10, 10, (n, 2)))
+    lines2 = BatchCoordinateTools.line_equations(rng.uniform(-10, 10, (n, 2)), rng.uniform(-10, 10, (n, 2)))
+    centers1, centers2 = rng.uniform(-5, 5, (n, 2)), rng.uniform(-5, 5, (n, 2))
+    radii1, radii2 = rng.uniform(1, 6, n), rng.uniform(1, 6, n)
+
+    cases = [
+        (
+            "triangle area",
+            lambda: [TriangleTools.calculate_area(t) for t in tri_list],
+            lambda: BatchTriangleTools.areas(triangles),
+        ),
+        (
+            "triangle circumcenter",
+            lambda: [_scalar_or_nan(TriangleTools.calculate_circumcenter, t) for t in tri_list],
+            lambda: BatchTriangleTools.circumcenters(triangles),
+        ),
+        (
+            "triangle incenter",
+            lambda: [TriangleTools.calculate_incenter(t) for t in tri_list],
+            lambda: BatchTriangleTools.incenters(triangles),
+        ),
+        (
+            "triangle angles",
+            lambda: [TriangleTools.calculate_angles(t) for t in tri_list],
+            lambda: BatchTriangleTools.angles(triangles),
+        ),
+        (
+            "angle three points",
+            lambda: [AngleTools.calculate_angle_three_points(t[0], t[1], t[2]) for t in tri_list],
+            lambda: BatchAngleTools.angles_three_points(triangles[:, 0], triangles[:, 1], triangles[:, 2]),
+        ),
+        (
+            "line intersection",
+            lambda: [CoordinateTools.calculate_line_intersection(tuple(a), tuple(b)) for a, b in zip(lines1, lines2)],
+            lambda: BatchCoordinateTools.line_intersections(lines1, lines2),
+        ),
+        (
+            "reflection over line",
+            lambda: [CoordinateTools.calculate_reflection_point(tuple(p), tuple(l)) for p, l in zip(points, lines1)],
+            lambda: BatchCoordinateTools.reflect_points_over_lines(points, lines1),
+        ),
+        (
+            "circle intersection",
+            lambda: [_scalar_or_nan(CircleTools.calculate_circle_intersection, tuple(c1), r1, tuple(c2), r2)
+                     for c1, r1, c2, r2 in zip(centers1, radii1, centers2, radii2)],
+            lambda: BatchCircleTools.circle_intersections(centers1, radii1, centers2, radii2),
+        ),
+    ]
+
+    report = []
+    for name, scalar, batch in cases:
+        scalar_time, _ = _best_time(scalar, repeat)
+        batch_time, _ = _best_time(batch, repeat)
+        report.append({
+            "case": name,
+            "n": n,
+            "scalar_ms": scalar_time * 1000,
+            "batch_ms": batch_time * 1000,
+            "speedup": scalar_time / batch_time if batch_time > 0 else float("inf"),
+        })
+    return report
+
+
+def check_agreement(n: int = 500, seed: int = 1) -> None:
+    """비퇴화 입력에서 배치 결과가 스칼라 결과와 같은지 확인"""
+    rng = np.random.default_rng(seed)
+    triangles = rng.uniform(-10, 10, size=(n, 3, 2))
+    mask = ~BatchTriangleTools.degenerate_mask(triangles)
+    for t, area, center, angles in zip(
+        triangles[mask],
+        BatchTriangleTools.areas(triangles)[mask],
+        BatchTriangleTools.circumcenters(triangles)[mask],
+        BatchTriangleTools.angles(triangles)[mask],
+    ):
+        vertices = [tuple(v) for v in t]
+        assert np.isclose(area, TriangleTools.calculate_area(vertices))
+        assert np.allclose(center, TriangleTools.calculate_circumcenter(vertices))
+        assert np.allclose(angles, TriangleTools.calculate_angles(vertices))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스칼라 vs 배치 기하 도구 벤치마크")
+    parser.add_argument("--n", type=int, default=10000, help="입력 개수")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (최솟값 사용)")
+    args = parser.parse_args()
+
+    check_agreement()
+    print(f"{'case':<24}{'n':>8}{'scalar ms':>12}{'batch ms':>12}{'speedup':>10}")
+    for row in run(args.n, args.repeat):
+        print(f"{row['case']:<24}{row['n']:>8}{row['scalar_ms']:>12.2f}{row['batch_ms']:>12.3f}{row['speedup']:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
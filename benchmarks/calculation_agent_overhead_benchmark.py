@@ -0,0 +1,68 @@
+"""
+계산 에이전트 작업당 준비 비용 벤치마크
+
+LLM 호출 전에 작업마다 드는 준비 비용(도구/인자 스키마 생성, 파서 형식 지침,
+프롬프트 조립, 에이전트·실행기 생성)을 비교합니다.
+
+- per-task build: 예전처럼 작업마다 새로 빌드 (build_calculation_runtime)
+- shared runtime: 팩토리가 한 번 빌드한 런타임 조회 (get_calculation_runtime)
+
+실제 요청은 보내지 않으며, OPENAI_API_KEY 가 없으면 임의 값으로 LLM 객체만 만듭니다.
+
+사용법:
+    python -m benchmarks.calculation_agent_overhead_benchmark --tasks 50
+"""
+
+import argparse
+import os
+import time
+from typing import Callable, List
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+import agents.calculation  # noqa: F401  계산 에이전트 등록
+from agents.calculation.agent_factory import (
+    _specs,
+    build_calculation_runtime,
+    get_calculation_runtime,
+)
+
+
+def _per_task_ms(func: Callable[[], object], tasks: int) -> float:
+    started = time.perf_counter()
+    for _ in range(tasks):
+        func()
+    return (time.perf_counter() - started) * 1000 / tasks
+
+
+def run(tasks: int) -> List[dict]:
+    report = []
+    for task_type, spec in _specs.items():
+        toolsets = [()] + ([spec.tool_groups] if spec.tool_groups else [])
+        for toolset in toolsets:
+            get_calculation_runtime(task_type, toolset)  # 첫 빌드는 지연 생성 비용이므로 제외
+            before = _per_task_ms(lambda: build_calculation_runtime(spec, toolset), tasks)
+            after = _per_task_ms(lambda: get_calculation_runtime(task_type, toolset), tasks)
+            report.append({
+                "agent": task_type + (f" [{'+'.join(toolset)}]" if toolset else ""),
+                "tools": len(get_calculation_runtime(task_type, toolset).tools),
+                "before_ms": before,
+                "after_ms": after,
+                "speedup": before / after if after > 0 else float("inf"),
+            })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="계산 에이전트 작업당 준비 비용 벤치마크")
+    parser.add_argument("--tasks", type=int, default=50, help="유형별 작업 수")
+    args = parser.parse_args()
+
+    print(f"{'agent':<44}{'tools':>6}{'per-task ms':>13}{'shared ms':>12}{'speedup':>11}")
+    for row in run(args.tasks):
+        print(f"{row['agent']:<44}{row['tools']:>6}{row['before_ms']:>13.2f}"
+              f"{row['after_ms']:>12.4f}{row['speedup']:>10.0f}x")
+
+
+if __name__ == "__main__":
+    main()
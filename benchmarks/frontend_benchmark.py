@@ -0,0 +1,158 @@
+"""
+앞단(파싱 + 계획) 모드 비교 벤치마크
+
+같은 문제 세트에서 두 호출 방식(parsing_agent → planner_agent)과 통합 방식(parse_plan_agent)을
+실행하고 지연 시간, LLM 호출/토큰 수, 구조화 출력 실패율, 결과 품질을 비교합니다.
+품질은 두 호출 방식의 결과를 기준으로 한 일치도입니다.
+
+- requires_calculation 일치율
+- 기하 객체 이름 집합의 Jaccard 유사도, 문제 유형 플래그 일치율
+- 계획 크기 (계산 경로는 suggested_tasks 수, 작도 경로는 작도 단계 수) 차이
+
+실제 LLM 을 호출하므로 OPENAI_API_KEY 가 필요합니다. 문제 세트는 batch.py 와 같은 JSONL 형식입니다.
+
+사용법:
+    python -m benchmarks.frontend_benchmark --repeat 2
+    python -m benchmarks.frontend_benchmark --problems problems.jsonl --limit 20
+"""
+
+import argparse
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from agents.parse_plan_agent import parse_plan_agent
+from agents.parsing_agent import parsing_agent
+from agents.planner_agent import planner_agent
+from batch import read_problems
+from models.state_models import GeometryState
+from utils.llm_scheduler import usage_scope
+from utils.structured_output import get_structured_output_stats
+
+SAMPLE_PROBLEMS = [
+    "△ABC为正三角形，D、E为BC上的点，且有∠CAD=∠DAE=∠EAB,取AD的中点F，连接BF交AE于G",
+    "请画出直角三角形ABC，∠C=90°，AC=3，BC=4，并作斜边AB上的高CD",
+    "已知⊙O的半径为5，弦AB=8，求圆心O到弦AB的距离",
+    "在平行四边形ABCD中，E为BC的中点，连接AE并延长交DC的延长线于F",
+    "等腰三角形ABC中，AB=AC，∠BAC=40°，作∠ABC的平分线交AC于D",
+]
+
+TWO_CALL = "two_call"
+FUSED = "fused"
+
+
+def _run_two_call(problem: str) -> GeometryState:
+    state = GeometryState(input_problem=problem)
+    state.parsed_elements = parsing_agent(state)["parsed_elements"]
+    return planner_agent(state)
+
+
+def _run_fused(problem: str) -> GeometryState:
+    return parse_plan_agent(GeometryState(input_problem=problem))
+
+
+RUNNERS: Dict[str, Callable[[str], GeometryState]] = {TWO_CALL: _run_two_call, FUSED: _run_fused}
+
+
+def _summary(state: GeometryState) -> Dict[str, Any]:
+    parsed = state.parsed_elements or {}
+    if state.requires_calculation:
+        plan_size = len(state.problem_analysis.get("suggested_tasks_blueprint") or [])
+    else:
+        plan_size = len(state.construction_plan.steps) if state.construction_plan else 0
+    return {
+        "requires_calculation": state.requires_calculation,
+        "objects": set((parsed.get("geometric_objects") or {}).keys()),
+        "problem_type": {k: bool(v) for k, v in (parsed.get("problem_type") or {}).items()},
+        "plan_size": plan_size,
+    }
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def _agreement(reference: Dict[str, Any], candidate: Dict[str, Any]) -> Dict[str, float]:
+    flags = set(reference["problem_type"]) | set(candidate["problem_type"])
+    same_flags = sum(reference["problem_type"].get(k, False) == candidate["problem_type"].get(k, False) for k in flags)
+    return {
+        "requires_calculation": float(reference["requires_calculation"] == candidate["requires_calculation"]),
+        "objects_jaccard": _jaccard(reference["objects"], candidate["objects"]),
+        "problem_type": same_flags / len(flags) if flags else 1.0,
+        "plan_size_diff": abs(reference["plan_size"] - candidate["plan_size"]),
+    }
+
+
+def run(problems: List[str], repeat: int) -> Dict[str, Any]:
+    rows: Dict[str, List[Dict[str, Any]]] = {TWO_CALL: [], FUSED: []}
+    agreements: List[Dict[str, float]] = []
+    for index, problem in enumerate(problems):
+        for _ in range(repeat):
+            summaries = {}
+            # 순서에 따른 캐시 효과를 줄이기 위해 반복마다 실행 순서를 바꾼다
+            modes = [TWO_CALL, FUSED] if len(rows[TWO_CALL]) % 2 == 0 else [FUSED, TWO_CALL]
+            for mode in modes:
+                with usage_scope() as usage:
+                    started = time.perf_counter()
+                    try:
+                        state = RUNNERS[mode](problem)
+                        error = None
+                    except Exception as e:  # noqa: BLE001  실패도 결과로 기록
+                        state, error = None, repr(e)
+                    elapsed = time.perf_counter() - started
+                rows[mode].append({"problem": index, "seconds": elapsed, "error": error, **usage.totals()})
+                if state is not None:
+                    summaries[mode] = _summary(state)
+            if len(summaries) == 2:
+                agreements.append(_agreement(summaries[TWO_CALL], summaries[FUSED]))
+            print(f"[{index + 1}/{len(problems)}] " + "  ".join(
+                f"{mode}={rows[mode][-1]['seconds']:.1f}s" for mode in (TWO_CALL, FUSED)))
+    return {"rows": rows, "agreements": agreements}
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))] if ordered else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="앞단(파싱 + 계획) 모드 비교 벤치마크")
+    parser.add_argument("--problems", default="", help="문제 JSONL (batch.py 입력 형식), 없으면 내장 샘플")
+    parser.add_argument("--limit", type=int, default=0, help="사용할 문제 수 (0 이면 전체)")
+    parser.add_argument("--repeat", type=int, default=1, help="문제별 반복 횟수")
+    args = parser.parse_args()
+
+    problems = [record["problem"] for record in read_problems(args.problems)] if args.problems else SAMPLE_PROBLEMS
+    if args.limit:
+        problems = problems[:args.limit]
+    report = run(problems, args.repeat)
+
+    print(f"\n{'mode':<10}{'runs':>6}{'errors':>8}{'mean s':>9}{'p50 s':>8}{'p95 s':>8}"
+          f"{'calls':>7}{'prompt tok':>12}{'output tok':>12}")
+    for mode, rows in report["rows"].items():
+        seconds = [row["seconds"] for row in rows if row["error"] is None]
+        runs = len(rows)
+        print(f"{mode:<10}{runs:>6}{sum(row['error'] is not None for row in rows):>8}"
+              f"{statistics.mean(seconds) if seconds else 0:>9.2f}{_percentile(seconds, 0.5):>8.2f}"
+              f"{_percentile(seconds, 0.95):>8.2f}{sum(row['calls'] for row in rows) / max(runs, 1):>7.1f}"
+              f"{sum(row['prompt_tokens'] for row in rows) / max(runs, 1):>12.0f}"
+              f"{sum(row['completion_tokens'] for row in rows) / max(runs, 1):>12.0f}")
+
+    agreements = report["agreements"]
+    if agreements:
+        print("\nfused vs two_call agreement (mean over runs)")
+        for key in agreements[0]:
+            print(f"  {key:<22}{statistics.mean(a[key] for a in agreements):.3f}")
+
+    print("\nstructured output parse failure rate by stage")
+    for stage, counters in get_structured_output_stats()["stages"].items():
+        print(f"  {stage:<12}calls={counters['calls']:<4}failure={counters['parse_failure_rate']:.3f}"
+              f"  unrecovered={counters['unrecovered_rate']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+LLM 출력 JSON 파싱 퍼즈/성능 벤치마크
+
+에이전트 응답 형태(코드 블록, 앞뒤 설명문, 중첩 객체, 문자열 안의 괄호)의 샘플과
+--corpus 로 지정한 녹화 응답(*.txt, *.json, *.md)을 대상으로 다음을 확인합니다.
+
+- 퍼즈: 임의 위치에서 자른 응답, 괄호가 섞인 설명문 삽입, 후행 쉼표/Python 리터럴 삽입,
+  임의 청크로 나눈 스트리밍 입력에 대해 예외 없이 기대 타입을 돌려주는지,
+  손상되지 않은 값은 원본과 같은지 (위반이 있으면 종료 코드 1)
+- 성능: 응답 크기별로 예전 정규식/문자 루프 방식과 선형 스캐너의 파싱 시간 비교
+
+사용법:
+    python -m benchmarks.json_parser_benchmark --cases 500 --sizes 1 10 100
+    python -m benchmarks.json_parser_benchmark --corpus recorded_outputs/
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, List, Tuple
+
+from utils.json_parser import IncrementalJSONParser, safe_parse_llm_json_output
+
+SAMPLE_OUTPUTS = [
+    # 파싱 에이전트: 코드 블록 + 설명문
+    'Here is the parsed problem:\n```json\n{"geometric_objects": {"ABC": {"type": "triangle", '
+    '"points": ["A", "B", "C"]}, "O": {"type": "circle", "center": "O", "radius": 5}}, '
+    '"relationships": ["AB = AC", "O is the circumcenter of {ABC}"], "constraints": '
+    '{"angle_BAC": 40}, "problem_type": {"circle": true, "triangle": true}}\n```\n'
+    'Let me know if you need anything else.',
+    # 계산 에이전트: 설명문 사이의 JSON, 문자열 안의 괄호와 이스케이프
+    'I computed the result using the law of cosines.\n{"task_id": "t1", "success": true, '
+    '"coordinates": {"A": [0.0, 0.0], "B": [4.0, 0.0], "C": [2.0, 3.4641]}, '
+    '"lengths": {"AB": 4.0, "BC": 4.0}, "angles": {"ABC": 60.0}, '
+    '"explanation": "Angle \\"ABC\\" = arccos((a^2 + c^2 - b^2) / (2ac)) [degrees] {exact}"}\n'
+    'The triangle is equilateral.',
+    # 계획 에이전트: 불리언/정수/중첩 배열
+    '{"requires_calculation": true, "calculation_types": {"triangle": true, "circle": false}, '
+    '"steps": [{"id": 1, "action": "find [coordinates]", "depends_on": []}, '
+    '{"id": 2, "action": "measure angle", "depends_on": [1]}], "confidence": 0.92}',
+    # 명령 재생성 에이전트: 명령 문자열 안의 괄호
+    '```\n{"commands": ["A = (0, 0)", "B = (4, 0)", "c = Circle(A, B)", "l = Line(A, {B})"], '
+    '"explanation": "Regenerated with Circle(<Point>, <Point>)", "success": true}\n```',
+    # 병합 에이전트: 중국어 설명문과 유니코드
+    '结果如下：{"final_results": {"AB": 5, "∠ABC": "60°"}, "notes": "使用余弦定理 [1]"} 完成。',
+]
+
+LEGACY_MARKDOWN = re.compile(r'```(?:json)?\s*([\s\S]*?)\s*```')
+
+
+def _legacy_parse(text: str) -> Any:
+    """예전 추출 순서 (마크다운 정규식 → 탐욕적 {.*} → 문자 루프 → 전체 → 정리 → 비탐욕적 전체 검색)"""
+    def loads(candidate):
+        try:
+            value = json.loads(candidate)
+            return value if isinstance(value, dict) else None
+        except ValueError:
+            return None
+
+    match = LEGACY_MARKDOWN.search(text)
+    if match and loads(match.group(1).strip()) is not None:
+        return loads(match.group(1).strip())
+    match = re.search(r'(\{[\s\S]*\})', text)
+    if match and loads(match.group(1)) is not None:
+        return loads(match.group(1))
+    start = next((i for i, char in enumerate(text) if char in "{["), -1)
+    if start >= 0:
+        stack = []
+        for i in range(start, len(text)):
+            if text[i] in "{[":
+                stack.append(text[i])
+            elif text[i] in "}]" and stack and stack[-1] == ("{" if text[i] == "}" else "["):
+                stack.pop()
+                if not stack:
+                    if loads(text[start:i + 1]) is not None:
+                        return loads(text[start:i + 1])
+                    break
+    for candidate in (text, re.sub(r'\s+', ' ', text).replace('\\"', '"')):
+        if loads(candidate) is not None:
+            return loads(candidate)
+    for match in re.finditer(r'(\{[\s\S]*?\})', text):
+        if loads(match.group(1)) is not None:
+            return loads(match.group(1))
+    return {}
+
+
+# ----------------------------------------------------------------------
+# 코퍼스
+# ----------------------------------------------------------------------
+def _expected(text: str) -> Any:
+    """샘플의 기준값: 코드 블록 또는 첫 '{' 부터 마지막 '}' 까지를 그대로 파싱"""
+    return json.loads(text[text.index("{"):text.rindex("}") + 1])
+
+
+def load_corpus(directory: str = "") -> List[Tuple[str, Any]]:
+    """(응답 텍스트, 기준값) 목록. 녹화 응답은 현재 파서 결과를 기준값으로 사용"""
+    corpus = [(text, _expected(text)) for text in SAMPLE_OUTPUTS]
+    if directory:
+        for path in sorted(Path(directory).iterdir()):
+            if path.suffix in (".txt", ".json", ".md"):
+                text = path.read_text(encoding="utf-8")
+                corpus.append((text, safe_parse_llm_json_output(text, dict)))
+    return corpus
+
+
+def _scale(text: str, factor: int) -> str:
+    """크기 확장: 설명문을 늘리고 JSON 배열 값을 반복"""
+    prose = "Reasoning about the figure [see step {n}] with brackets { and ]. " * factor
+    expected = _expected(text)
+    expected["history"] = [{"step": i, "note": f"value [{i}] {{ok}}"} for i in range(factor * 20)]
+    return f"{prose}\n```json\n{json.dumps(expected, ensure_ascii=False)}\n```\n{prose}"
+
+
+# ----------------------------------------------------------------------
+# 퍼즈
+# ----------------------------------------------------------------------
+def _check(label: str, failures: List[str], condition: bool, detail: str) -> None:
+    if not condition:
+        failures.append(f"{label}: {detail}")
+
+
+def _dump_damaged(value: Any) -> str:
+    """후행 쉼표와 Python 리터럴(True/False/None)이 섞인 JSON 직렬화"""
+    if isinstance(value, dict):
+        items = "".join(f"{json.dumps(key, ensure_ascii=False)}: {_dump_damaged(item)}, "
+                        for key, item in value.items())
+        return "{" + items + "}"
+    if isinstance(value, list):
+        return "[" + "".join(f"{_dump_damaged(item)}," for item in value) + "]"
+    if isinstance(value, bool) or value is None:
+        return repr(value)
+    return json.dumps(value, ensure_ascii=False)
+
+
+def fuzz(corpus: List[Tuple[str, Any]], cases: int, seed: int) -> Tuple[int, List[str]]:
+    rng = random.Random(seed)
+    failures: List[str] = []
+    checks = 0
+    for _ in range(cases):
+        text, expected = rng.choice(corpus)
+        checks += 4
+
+        # 1. 임의 위치에서 자른 응답: 예외 없이 dict, 복구된 키는 원본 키의 부분집합
+        cut = rng.randrange(len(text) + 1)
+        try:
+            result = safe_parse_llm_json_output(text[:cut], dict)
+            _check("truncate", failures, isinstance(result, dict) and set(result) <= set(expected),
+                   f"cut={cut} result={str(result)[:60]}")
+        except Exception as e:  # noqa: BLE001  퍼즈는 모든 예외를 위반으로 기록
+            failures.append(f"truncate: cut={cut} raised {e!r}")
+
+        # 2. 괄호가 섞인 설명문을 앞뒤에 삽입: 원본과 동일
+        noise = rng.choice(["Note: use [brackets] and }", "Step (1) ] done", "Set {A, B} ok", "  "])
+        noisy = f"{noise}\n{text}\n{noise}"
+        _check("noise", failures, safe_parse_llm_json_output(noisy, dict) == expected, repr(noise))
+
+        # 3. 후행 쉼표와 Python 리터럴: 원본과 동일
+        damaged = f"Result:\n{_dump_damaged(expected)}\nDone."
+        _check("repair", failures, safe_parse_llm_json_output(damaged, dict) == expected, damaged[:60])
+
+        # 4. 임의 청크로 나눈 스트리밍 입력: 완성된 값이 원본과 동일
+        parser = IncrementalJSONParser(dict)
+        position = 0
+        while position < len(text):
+            size = rng.randint(1, 16)
+            parser.feed(text[position:position + size])
+            parser.partial()
+            position += size
+        _check("stream", failures, parser.complete and parser.value == expected, text[:60])
+    return checks, failures
+
+
+# ----------------------------------------------------------------------
+# 성능
+# ----------------------------------------------------------------------
+def _per_call_ms(func: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def benchmark(sizes: List[int], repeat: int) -> List[dict]:
+    report = []
+    for factor in sizes:
+        texts = [_scale(text, factor) for text in SAMPLE_OUTPUTS]
+        # 코드 블록이 잘린 응답 (스트리밍 중단): 예전 방식은 여러 번 전체 스캔한 뒤 실패한다
+        texts += [text[:int(len(text) * 0.8)] for text in texts]
+        chars = sum(len(text) for text in texts) // len(texts)
+        legacy = _per_call_ms(lambda: [_legacy_parse(text) for text in texts], repeat) / len(texts)
+        scanner = _per_call_ms(lambda: [safe_parse_llm_json_output(text, dict) for text in texts], repeat) / len(texts)
+        truncated = texts[len(texts) // 2:]
+        recovered = sum(bool(safe_parse_llm_json_output(text, dict)) for text in truncated)
+        report.append({
+            "chars": chars,
+            "legacy_ms": legacy,
+            "scanner_ms": scanner,
+            "speedup": legacy / scanner if scanner > 0 else float("inf"),
+            "truncated_recovered": f"{recovered}/{len(truncated)}",
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM 출력 JSON 파싱 퍼즈/성능 벤치마크")
+    parser.add_argument("--cases", type=int, default=500, help="퍼즈 케이스 수")
+    parser.add_argument("--seed", type=int, default=0, help="퍼즈 난수 시드")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100], help="응답 크기 배수")
+    parser.add_argument("--repeat", type=int, default=3, help="성능 측정 반복 횟수 (최솟값 사용)")
+    parser.add_argument("--corpus", default="", help="녹화된 LLM 응답 디렉터리 (*.txt, *.json, *.md)")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    checks, failures = fuzz(corpus, args.cases, args.seed)
+    print(f"fuzz: {len(corpus)} outputs, {checks} checks, {len(failures)} violations")
+    for failure in failures[:20]:
+        print(f"  {failure}")
+
+    print(f"{'avg chars':>10}{'legacy ms':>12}{'scanner ms':>12}{'speedup':>10}{'truncated ok':>14}")
+    for row in benchmark(args.sizes, args.repeat):
+        print(f"{row['chars']:>10}{row['legacy_ms']:>12.3f}{row['scanner_ms']:>12.3f}"
+              f"{row['speedup']:>9.1f}x{row['truncated_recovered']:>14}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+계산 작업 스케줄링 벤치마크
+
+무작위 DAG 형태의 계산 큐에서 모든 작업을 순서대로 실행할 때의 스케줄링 오버헤드를 비교합니다.
+
+- legacy: 예전 라우터 방식 (실행 순서를 훑으며 의존성을 완료 목록에서 선형 검색)
+- rebuild: 단계마다 TaskGraph 를 O(V+E) 로 새로 만들고 pop (큐 캐시가 무효화될 때의 비용)
+- incremental: 현재 라우터 방식 (큐에 캐시된 TaskGraph 하나를 유지하며 complete() 로 준비 집합 갱신)
+
+함께 보고하는 makespan 은 작업 비용(결정적 작업 0.05, LLM 작업 1.0)과 --workers 개의 실행 슬롯을
+가정했을 때 임계 경로 우선 순서와 원래 목록 순서의 예상 완료 시간입니다.
+
+사용법:
+    python -m benchmarks.task_graph_benchmark --sizes 10 50 200 --workers 4
+"""
+
+import argparse
+import heapq
+import random
+import time
+from typing import Callable, List
+
+from models.state_models import CalculationTask, TaskGraph
+
+DETERMINISTIC_OPERATIONS = ("distance", "midpoint", "triangle_area")
+COSTS = {"deterministic": 0.05, "llm": 1.0}
+
+
+def make_tasks(size: int, rng: random.Random) -> List[CalculationTask]:
+    """앞쪽 작업에만 의존하는 무작위 DAG (일부는 존재하지 않는 점 이름을 의존성으로 가짐)"""
+    tasks = []
+    for index in range(size):
+        deps = [f"t{dep}" for dep in rng.sample(range(index), min(index, rng.randint(0, 3)))]
+        if rng.random() < 0.1:
+            deps.append("P")
+        deterministic = rng.random() < 0.6
+        tasks.append(CalculationTask(
+            task_id=f"t{index}",
+            task_type="length" if deterministic else "triangle",
+            operation_type=rng.choice(DETERMINISTIC_OPERATIONS) if deterministic else None,
+            parameters={},
+            dependencies=deps,
+            description="",
+        ))
+    rng.shuffle(tasks)
+    return tasks
+
+
+def cost_of(task: CalculationTask) -> float:
+    return COSTS["deterministic" if task.operation_type else "llm"]
+
+
+def legacy_schedule(tasks: List[CalculationTask]) -> List[str]:
+    """예전 라우터: 완료 목록(list)에서 의존성을 찾으며 처음 실행 가능한 작업을 고른다"""
+    known = {task.task_id for task in tasks}
+    completed: List[str] = []
+    order = []
+    while True:
+        for task in tasks:
+            if task.task_id in completed:
+                continue
+            if all(dep in completed for dep in task.dependencies if dep in known):
+                completed.append(task.task_id)
+                order.append(task.task_id)
+                break
+        else:
+            return order
+
+
+def rebuild_schedule(tasks: List[CalculationTask]) -> List[str]:
+    completed: List[str] = []
+    while True:
+        task = TaskGraph(tasks, completed, cost_of).pop()
+        if task is None:
+            return completed
+        completed.append(task.task_id)
+
+
+def incremental_schedule(tasks: List[CalculationTask]) -> List[str]:
+    graph = TaskGraph(tasks, cost=cost_of)
+    order = []
+    while True:
+        task = graph.pop()
+        if task is None:
+            return order
+        order.append(task.task_id)
+        graph.complete(task.task_id)
+
+
+def makespan(tasks: List[CalculationTask], priority_cost: Callable[[CalculationTask], float],
+             workers: int) -> float:
+    """priority_cost 로 만든 우선순위가 높은 준비 작업부터 빈 슬롯에 배정하는 목록 스케줄링 시뮬레이션"""
+    graph = TaskGraph(tasks, cost=priority_cost)
+    now, running = 0.0, []
+    while True:
+        while len(running) < workers:
+            task = graph.pop()
+            if task is None:
+                break
+            heapq.heappush(running, (now + cost_of(task), task.task_id))
+        if not running:
+            return now
+        now, task_id = heapq.heappop(running)
+        graph.complete(task_id)
+
+
+def _best_ms(func: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="계산 작업 스케줄링 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200], help="작업 수")
+    parser.add_argument("--workers", type=int, default=4, help="makespan 시뮬레이션 실행 슬롯 수")
+    parser.add_argument("--repeat", type=int, default=3, help="측정 반복 횟수 (최솟값 사용)")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'tasks':>6}{'legacy ms':>12}{'rebuild ms':>12}{'incr ms':>10}"
+          f"{'list makespan':>15}{'cp makespan':>13}")
+    for size in args.sizes:
+        tasks = make_tasks(size, rng)
+        legacy = _best_ms(lambda: legacy_schedule(tasks), args.repeat)
+        rebuild = _best_ms(lambda: rebuild_schedule(tasks), args.repeat)
+        incremental = _best_ms(lambda: incremental_schedule(tasks), args.repeat)
+        # 모든 비용을 0 으로 주면 우선순위가 같아 원래 목록 순서로 배정된다
+        in_list_order = makespan(tasks, lambda task: 0.0, args.workers)
+        critical_first = makespan(tasks, cost_of, args.workers)
+        print(f"{size:>6}{legacy:>12.2f}{rebuild:>12.2f}{incremental:>10.2f}"
+              f"{in_list_order:>15.2f}{critical_first:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
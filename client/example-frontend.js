@@ -15,8 +15,11 @@ class GeometryProblemSolver {
       onStateUpdate: null,
       onStateFullUpdate: null,
       onNodeUpdate: null,
-      onLlmUpdate: null
+      onLlmUpdate: null,
+      onLlmToken: null
     };
+    // 노드별로 스트리밍된 LLM 텍스트
+    this.streamedText = {};
   }
 
   // Socket.IO 연결 초기화
@@ -144,6 +147,21 @@ class GeometryProblemSolver {
       }
     });
 
+    // LLM 토큰 스트리밍 이벤트 처리
+    this.socket.on('llm_token', (data) => {
+      if (this.taskId && data.task_id === this.taskId) {
+        this.streamedText[data.node] = (this.streamedText[data.node] || '') + data.token;
+        if (this.callbacks.onLlmToken) {
+          this.callbacks.onLlmToken(data, this.streamedText[data.node]);
+        }
+        
+        // 해설은 토큰이 도착하는 대로 표시
+        if (data.node === 'explanation_agent' && window.resultVisualizer) {
+          window.resultVisualizer.updateExplanation(this.streamedText[data.node]);
+        }
+      }
+    });
+
     // 에러 업데이트 이벤트 처리
     this.socket.on('error_update', (data) => {
       if (this.taskId && data.task_id === this.taskId) {
@@ -247,6 +265,7 @@ class GeometryProblemSolver {
       'state_full_update': 'onStateFullUpdate',
       'agent_progress': 'onAgentProgress',
       'llm_update': 'onLlmUpdate',
+      'llm_token': 'onLlmToken',
       'error_update': 'onError',
       'task_update': 'onUpdate',
       'task_completed': 'onCompleted',
@@ -1,3 +1,5 @@
+import os
+
 
 # # LLM 설정
 # DEFAULT_MODEL = "deepseek-chat"
@@ -20,4 +22,145 @@ ADVANCED_TEMPERATURE = 0.1
 
 # 시스템 설정
 MAX_ATTEMPTS = 3
-DEFAULT_LANGUAGE = "chinese"
\ No newline at end of file
+DEFAULT_LANGUAGE = "chinese"
+
+# 작업 실행 설정
+# inline: FastAPI BackgroundTasks 에서 직접 실행 / queue: 작업 큐에 넣고 별도 워커 프로세스가 실행
+EXECUTION_MODE = os.environ.get("EXECUTION_MODE", "inline")
+JOB_QUEUE_PATH = os.environ.get(
+    "JOB_QUEUE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "job_queue.sqlite3")
+)
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+JOB_LEASE_SECONDS = int(os.environ.get("JOB_LEASE_SECONDS", "600"))
+JOB_RETRY_BACKOFF_SECONDS = float(os.environ.get("JOB_RETRY_BACKOFF_SECONDS", "5"))
+TENANT_MAX_CONCURRENT_JOBS = int(os.environ.get("TENANT_MAX_CONCURRENT_JOBS", "2"))
+
+# 동시성 제한 설정 (0 이하이면 제한 없음)
+MAX_CONCURRENT_SOLVES = int(os.environ.get("MAX_CONCURRENT_SOLVES", "4"))
+MAX_QUEUED_SOLVES = int(os.environ.get("MAX_QUEUED_SOLVES", "16"))
+LLM_GLOBAL_CONCURRENCY = int(os.environ.get("LLM_GLOBAL_CONCURRENCY", "8"))
+# 프로필별 LLM 동시 호출 수, 예: LLM_PROFILE_CONCURRENCY="planner=2,validation=2"
+LLM_PROFILE_CONCURRENCY = {
+    name.strip(): int(limit)
+    for name, limit in (
+        item.split("=", 1)
+        for item in os.environ.get("LLM_PROFILE_CONCURRENCY", "").split(",")
+        if "=" in item
+    )
+}
+EMBEDDING_CONCURRENCY = int(os.environ.get("EMBEDDING_CONCURRENCY", "2"))
+RETRIEVAL_CONCURRENCY = int(os.environ.get("RETRIEVAL_CONCURRENCY", "8"))
+
+# LLM 속도 제한 설정 (모델별 분당 요청 수 rpm / 분당 토큰 수 tpm, "default" 는 미등록 모델용)
+MODEL_RATE_LIMITS = {
+    "default": {"rpm": 500, "tpm": 200000},
+    "gpt-4.1-nano": {"rpm": 500, "tpm": 200000},
+    "deepseek-chat": {"rpm": 300, "tpm": 300000},
+}
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "5"))
+LLM_BACKOFF_BASE_SECONDS = float(os.environ.get("LLM_BACKOFF_BASE_SECONDS", "1.0"))
+LLM_BACKOFF_MAX_SECONDS = float(os.environ.get("LLM_BACKOFF_MAX_SECONDS", "30"))
+# max_tokens 가 지정되지 않은 호출의 예상 응답 토큰 수 (예산 선점용)
+LLM_EXPECTED_COMPLETION_TOKENS = int(os.environ.get("LLM_EXPECTED_COMPLETION_TOKENS", "512"))
+
+# LLM 토큰 스트리밍 대상 노드 (쉼표 구분, 예: "explanation_agent,command_generation_agent")
+STREAMING_NODES = [
+    node.strip()
+    for node in os.environ.get("STREAMING_NODES", "explanation_agent").split(",")
+    if node.strip()
+]
+
+# 모델별 가격 (USD / 1M 토큰), 배치 실행 비용 보고에 사용
+MODEL_PRICING = {
+    "gpt-4.1-nano": {"input": 0.10, "cached_input": 0.025, "output": 0.40},
+    "deepseek-chat": {"input": 0.27, "cached_input": 0.07, "output": 1.10},
+}
+
+# 로컬 GeoGebra 구문 검증 (LLM 검증 전에 실행, 구문 오류가 있으면 LLM 호출 생략)
+LOCAL_VALIDATION_ENABLED = os.environ.get("LOCAL_VALIDATION_ENABLED", "true").lower() == "true"
+
+# 로컬 수치 검증: 명령어를 실행해 parsed_elements 조건을 확인하고, 모두 만족하면 LLM 검증 생략
+LOCAL_NUMERIC_VALIDATION_ENABLED = os.environ.get("LOCAL_NUMERIC_VALIDATION_ENABLED", "true").lower() == "true"
+EVALUATOR_LENGTH_TOLERANCE = float(os.environ.get("EVALUATOR_LENGTH_TOLERANCE", "1e-3"))  # 상대 오차
+EVALUATOR_ANGLE_TOLERANCE_DEGREES = float(os.environ.get("EVALUATOR_ANGLE_TOLERANCE_DEGREES", "0.1"))
+
+# 결정적 계산 엔진: operation_type/parameters 로 도구가 정해지는 계산 작업은 LLM 없이 실행
+DETERMINISTIC_CALCULATION_ENABLED = os.environ.get("DETERMINISTIC_CALCULATION_ENABLED", "true").lower() == "true"
+
+# 정확값 모드: 계산 결과에 유리수/근호/π 정확값(exact_values)을 함께 기록 (SymPy 가 있으면 보조로 사용)
+EXACT_ARITHMETIC = os.environ.get("EXACT_ARITHMETIC", "false").lower() == "true"
+
+# 조건 풀이기: parsed_elements 의 길이/각도/관계 조건을 수치적으로 풀어 기본 좌표를 한 번에 계산
+CONSTRAINT_SOLVER_ENABLED = os.environ.get("CONSTRAINT_SOLVER_ENABLED", "true").lower() == "true"
+
+# 프롬프트 컨텍스트 압축: 상태 값을 str() 대신 에이전트별 투영 + 간결한 JSON 으로 전달
+PROMPT_CONTEXT_COMPACTION = os.environ.get("PROMPT_CONTEXT_COMPACTION", "true").lower() == "true"
+PROMPT_FLOAT_PRECISION = int(os.environ.get("PROMPT_FLOAT_PRECISION", "4"))
+# 에이전트별 컨텍스트 토큰 예산 (프롬프트 변수 합계, 0 이면 제한 없음)
+PROMPT_CONTEXT_BUDGETS = {
+    "calculation": 2000,
+    "calculation_manager": 3000,
+    "merger": 4000,
+    "geogebra_command": 4000,
+    "command_regeneration": 3000,
+    "command_repair": 1500,
+    "validation": 2000,
+    "explanation": 3000,
+}
+
+# 요청 단위 추적: 노드/LLM/도구/검색 호출의 시간, 대기열 대기, 토큰, 캐시 적중, 재시도 기록
+TRACING_ENABLED = os.environ.get("TRACING_ENABLED", "true").lower() == "true"
+TRACE_EXPORTER = os.environ.get("TRACE_EXPORTER", "jsonl").lower()  # jsonl | otel | none
+TRACE_JSONL_PATH = os.environ.get("TRACE_JSONL_PATH", os.path.join("data", "traces.jsonl"))
+TRACE_RETENTION = int(os.environ.get("TRACE_RETENTION", "200"))  # 메모리에 보관하는 최근 추적 수
+# JSONL 싱크 크기 제한: 이 크기를 넘으면 traces.jsonl -> traces.jsonl.1 ... 로 회전하고 오래된 파일은 삭제
+TRACE_JSONL_MAX_BYTES = int(os.environ.get("TRACE_JSONL_MAX_BYTES", str(50 * 1024 * 1024)))
+TRACE_JSONL_BACKUPS = int(os.environ.get("TRACE_JSONL_BACKUPS", "3"))
+
+# 구조화 로깅 (utils/logger.py): 레벨, 형식(text|json), DEBUG 레코드 샘플링 비율, 비차단 큐 크기
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text").lower()
+LOG_DEBUG_SAMPLE_RATE = float(os.environ.get("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+
+# 프롬프트 앞부분 캐시: 정적 지침/템플릿을 시스템 메시지 앞부분으로, 요청별 변수를 뒤로 재조립
+PROMPT_PREFIX_CACHING = os.environ.get("PROMPT_PREFIX_CACHING", "true").lower() == "true"
+PROMPT_CACHE_MIN_TOKENS = int(os.environ.get("PROMPT_CACHE_MIN_TOKENS", "1024"))  # 제공자 캐시 최소 길이
+
+# 계산 에이전트 도구/프롬프트/실행기를 서버·워커 시작 시 미리 빌드 (false 면 첫 작업에서 지연 빌드)
+CALCULATION_AGENT_PREBUILD = os.environ.get("CALCULATION_AGENT_PREBUILD", "true").lower() == "true"
+
+# 파싱/계획/검증 단계의 구조화 출력 방식: function_calling | json_schema | json_mode | none (텍스트 + 로컬 복구)
+STRUCTURED_OUTPUT_METHOD = os.environ.get("STRUCTURED_OUTPUT_METHOD", "function_calling")
+
+# 계획/매니저/병합 응답을 스트리밍으로 받아 닫힌 작도 단계·계산 작업부터 명령어 검색을 미리 시작
+STREAMING_PIPELINE = os.environ.get("STREAMING_PIPELINE", "true").lower() == "true"
+RETRIEVAL_PREFETCH_WORKERS = int(os.environ.get("RETRIEVAL_PREFETCH_WORKERS", "4"))  # 미리 검색 스레드 수
+
+# 계산 경로에서 초안 작도 계획의 명령어 검색/선택을 백그라운드 작업으로 계산 루프와 동시에 실행
+PARALLEL_COMMAND_RETRIEVAL = os.environ.get("PARALLEL_COMMAND_RETRIEVAL", "true").lower() == "true"
+
+# 앞단 모드: two_call (파싱 → 계획, LLM 두 번) | fused (파싱+계획 한 번의 구조화 출력 호출)
+FRONTEND_MODE = os.environ.get("FRONTEND_MODE", "two_call").lower()
+
+# 그래프 체크포인트: 노드마다 상태를 저장해 스트림 중단/재연결/재시도/재시작 시 마지막으로 끝난 노드부터 재개
+CHECKPOINT_BACKEND = os.environ.get("CHECKPOINT_BACKEND", "sqlite").lower()  # sqlite | postgres | memory | none
+CHECKPOINT_SQLITE_PATH = os.environ.get(
+    "CHECKPOINT_SQLITE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "checkpoints.sqlite3")
+)
+CHECKPOINT_POSTGRES_URL = os.environ.get("CHECKPOINT_POSTGRES_URL", "")
+CHECKPOINT_RETENTION_SECONDS = int(os.environ.get("CHECKPOINT_RETENTION_SECONDS", "86400"))  # 0 이면 삭제하지 않음
+CHECKPOINT_SWEEP_INTERVAL_SECONDS = int(os.environ.get("CHECKPOINT_SWEEP_INTERVAL_SECONDS", "600"))
+# 끝난 풀이는 최종 체크포인트 하나만 남김 (같은 task_id 재시도는 LLM 호출 없이 결과 반환)
+CHECKPOINT_COMPACT_ON_COMPLETE = os.environ.get("CHECKPOINT_COMPACT_ON_COMPLETE", "true").lower() == "true"
+
+# 검증 실패 후 명령어 수정 방식: targeted (오류가 난 줄만 패치 + 패치한 줄과 의존 줄만 재검증) | full (전체 재생성)
+COMMAND_REPAIR_MODE = os.environ.get("COMMAND_REPAIR_MODE", "targeted").lower()
+
+# 명령어 생성 후보 수: 1 이면 한 번 생성, N>1 이면 후보 N개를 로컬 검증(구문/참조/수치)으로 채점해 가장 좋은 후보 사용
+COMMAND_CANDIDATES = int(os.environ.get("COMMAND_CANDIDATES", "1"))
+# n: 한 번의 호출로 n 개 생성 (도구 없이) | concurrent: 동시 호출 (도구 사용, 수치 검증을 통과한 첫 후보를 채택; 이미 시작된 나머지 호출은 끝까지 실행됨)
+COMMAND_CANDIDATE_STRATEGY = os.environ.get("COMMAND_CANDIDATE_STRATEGY", "n").lower()
+COMMAND_CANDIDATE_TEMPERATURE = float(os.environ.get("COMMAND_CANDIDATE_TEMPERATURE", "0.7"))  # 후보 다양성
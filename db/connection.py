@@ -11,6 +11,10 @@ from sqlalchemy_utils import database_exists, create_database
 from db.models import Base
 
 from dotenv import load_dotenv
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 
 load_dotenv()
 
@@ -54,16 +58,16 @@ class DatabaseManager:
         # 데이터베이스가 없으면 생성
         if not database_exists(self.engine.url):
             create_database(self.engine.url)
-            print(f"데이터베이스 '{self.db_name}'을 생성했습니다.")
+            logger.info("데이터베이스 '%s'을 생성했습니다.", self.db_name)
         
         # 테이블 생성
         if create_tables:
             Base.metadata.create_all(self.engine)
-            print("테이블이 생성되었습니다.")
+            logger.info("테이블이 생성되었습니다.")
         
         # 세션 팩토리 생성
         self.session_factory = scoped_session(sessionmaker(bind=self.engine))
-        print(f"데이터베이스 '{self.db_name}'에 연결되었습니다.")
+        logger.info("데이터베이스 '%s'에 연결되었습니다.", self.db_name)
         
         return self.engine
     
@@ -77,7 +81,7 @@ class DatabaseManager:
         """연결 종료"""
         if self.session_factory:
             self.session_factory.remove()
-            print("세션이 종료되었습니다.")
+            logger.info("세션이 종료되었습니다.")
         
     def test_connection(self):
         """연결 테스트"""
@@ -86,5 +90,5 @@ class DatabaseManager:
             session.close()
             return True
         except Exception as e:
-            print(f"데이터베이스 연결 오류: {e}")
+            logger.error("데이터베이스 연결 오류: %s", e)
             return False 
\ No newline at end of file
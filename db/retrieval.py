@@ -13,6 +13,12 @@ from pgvector.sqlalchemy import Vector
 
 from db.connection import DatabaseManager
 from db.models import GeogebraCommand
+from utils.concurrency import stage_limiter
+from utils.tracing import KIND_RETRIEVAL, traced
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 
 class CommandRetrieval:
     """GeoGebra 명령어 검색 클래스"""
@@ -47,6 +53,7 @@ class CommandRetrieval:
         return cls._db_manager
     
     @classmethod
+    @traced("retrieval generate_embedding", KIND_RETRIEVAL)
     def generate_embedding(cls, text: str) -> np.ndarray:
         """
         텍스트 임베딩 생성
@@ -58,9 +65,11 @@ class CommandRetrieval:
             임베딩 벡터
         """
         model = cls._get_embedding_model()
-        return model.encode(text)
+        with stage_limiter.limit("embedding"):
+            return model.encode(text)
     
     @classmethod
+    @traced("retrieval search_commands_by_command", KIND_RETRIEVAL)
     def search_commands_by_command(cls, command: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """
         특정 명령어로 검색하고 description 유사도로 정렬
@@ -102,7 +111,8 @@ class CommandRetrieval:
                 .limit(top_k)
             )
             
-            result = session.execute(query)
+            with stage_limiter.limit("retrieval"):
+                result = session.execute(query).fetchall()
             
             commands = []
             for row in result:
@@ -122,12 +132,13 @@ class CommandRetrieval:
             return commands
         
         except Exception as e:
-            print(f"명령어 검색 오류: {e}")
+            logger.error("명령어 검색 오류: %s", e)
             return []
         finally:
             session.close()
         
     @classmethod
+    @traced("retrieval cosine_search", KIND_RETRIEVAL)
     def cosine_search(cls, 
                      query: str, 
                      top_k: int = 5) -> List[Dict[str, Any]]:
@@ -177,7 +188,8 @@ class CommandRetrieval:
             query = query.order_by(similarity_score.desc()).limit(top_k)
             
             # 쿼리 실행
-            result = session.execute(query)
+            with stage_limiter.limit("retrieval"):
+                result = session.execute(query).fetchall()
             
             # 결과 포맷팅
             commands = []
@@ -199,7 +211,7 @@ class CommandRetrieval:
         
             
         except Exception as e:
-            print(f"하이브리드 검색 오류: {e}")
+            logger.error("하이브리드 검색 오류: %s", e)
             return []
         finally:
             session.close()
@@ -15,9 +15,11 @@ if language == "en":
     from .i18n.en.prompt_text import (
         PARSING_PROMPT,
         PLANNER_PROMPT,
+        PARSE_PLAN_PROMPT,
         GEOGEBRA_COMMAND_PROMPT,
         VALIDATION_PROMPT,
         COMMAND_REGENERATION_PROMPT,
+        COMMAND_REPAIR_PROMPT,
         EXPLANATION_PROMPT,
         COMMAND_SELECTION_PROMPT,
         # Calculation Prompts ------------------------------------------------------------
@@ -40,9 +42,11 @@ else:  # 기본값은 중국어
     from .i18n.zh.prompt_text import (
         PARSING_PROMPT,
         PLANNER_PROMPT,
+        PARSE_PLAN_PROMPT,
         GEOGEBRA_COMMAND_PROMPT,
         VALIDATION_PROMPT,
         COMMAND_REGENERATION_PROMPT,
+        COMMAND_REPAIR_PROMPT,
         EXPLANATION_PROMPT,
         COMMAND_SELECTION_PROMPT,
         # Calculation Prompts ------------------------------------------------------------
@@ -73,6 +77,7 @@ from geo_prompts.templates.json_templates import (
     COMMAND_SELECTION_TEMPLATE,
     COMMAND_GENERATION_TEMPLATE,
     COMMAND_REGENERATION_JSON_TEMPLATE,
+    COMMAND_REPAIR_JSON_TEMPLATE,
     MANAGER_JSON_TEMPLATE,  # calculation_manager_agent에서 사용하는 JSON 템플릿
     TRIANGLE_JSON_TEMPLATE,
     ANGLE_JSON_TEMPLATE,
@@ -92,9 +97,11 @@ __all__ = [
     # 기본 프롬프트
     "PARSING_PROMPT",
     "PLANNER_PROMPT",
+    "PARSE_PLAN_PROMPT",
     "GEOGEBRA_COMMAND_PROMPT",
     "VALIDATION_PROMPT",
     "COMMAND_REGENERATION_PROMPT",
+    "COMMAND_REPAIR_PROMPT",
     "EXPLANATION_PROMPT",
     "COMMAND_SELECTION_PROMPT",
     
@@ -115,6 +122,7 @@ __all__ = [
     "COMMAND_GENERATION_TEMPLATE",
     "VALIDATION_JSON_TEMPLATE",
     "COMMAND_REGENERATION_JSON_TEMPLATE",
+    "COMMAND_REPAIR_JSON_TEMPLATE",
     "MANAGER_JSON_TEMPLATE",
     "TRIANGLE_JSON_TEMPLATE",
     "ANGLE_JSON_TEMPLATE",
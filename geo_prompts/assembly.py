@@ -0,0 +1,242 @@
+"""
+프롬프트 조립 모듈
+
+제공자 측 프롬프트 캐시(OpenAI 등)는 요청 간에 바이트 단위로 같은 앞부분(prefix)에만 적용됩니다.
+i18n 프롬프트는 정적 지침과 요청별 변수({problem} 등)가 섞여 있어 앞부분이 매번 달라지므로,
+에이전트별로 다음 순서로 다시 조립합니다.
+
+    [system]  시스템 메시지 + 정적 지침 + JSON 템플릿/형식 지침 (에이전트별로 항상 동일)
+    [human]   요청별 변수 줄 (원래 순서 유지) + agent_scratchpad
+
+- assemble_prompt(name, template, system_message, **static_values): 조립된 프롬프트 (조립 결과는 캐시)
+- 조립 시 서로 다른 두 입력으로 렌더링해 정적 앞부분이 같은지 검증
+- identify_prefix / record_prompt_usage: 호출 시 첫 메시지로 프롬프트를 식별하고 cached_tokens 비율 집계
+- prompt_cache_report(): 프롬프트별 앞부분 토큰 수, 안정성, 캐시 적중 비율
+"""
+
+import hashlib
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder, PromptTemplate
+
+from config import PROMPT_PREFIX_CACHING, PROMPT_CACHE_MIN_TOKENS
+from utils.llm_scheduler import estimate_tokens
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCRATCHPAD = "agent_scratchpad"
+MAX_TRACKED_VARIANTS = 1000
+# f-string 변수 ({{...}} 로 이스케이프된 중괄호는 제외)
+_VARIABLE = re.compile(r"(?<!\{)\{([A-Za-z_][A-Za-z0-9_]*)\}(?!\})")
+_SENTINEL = "\u2063"  # 렌더링 검증용 보이지 않는 구분 문자
+
+
+class PromptPrefix:
+    """조립된 프롬프트의 정적 앞부분과 호출 통계"""
+
+    __slots__ = ("name", "digest", "tokens", "stable", "variants", "calls", "prompt_tokens", "cached_tokens")
+
+    def __init__(self, name: str, text: str, stable: bool = True):
+        self.name = name
+        self.digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+        self.tokens = estimate_tokens(text)
+        self.stable = stable
+        self.variants = {self.digest}
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "prefix_digest": self.digest,
+            "prefix_tokens": self.tokens,
+            "cacheable": self.tokens >= PROMPT_CACHE_MIN_TOKENS,
+            "stable": self.stable and len(self.variants) == 1,
+            "prefix_variants": len(self.variants),
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cached_share": round(self.cached_tokens / self.prompt_tokens, 4) if self.prompt_tokens else 0.0,
+        }
+
+
+_lock = threading.Lock()
+_assembled: Dict[Tuple, ChatPromptTemplate] = {}
+_prefix_by_text: Dict[str, PromptPrefix] = {}
+_prefix_by_name: Dict[str, PromptPrefix] = {}
+
+
+# ----------------------------------------------------------------------
+# 조립
+# ----------------------------------------------------------------------
+def _escape(value: str) -> str:
+    return str(value).replace("{", "{{").replace("}", "}}")
+
+
+def _split_lines(text: str, static_values: Dict[str, Any]) -> Tuple[List[str], List[List[str]]]:
+    """
+    템플릿 줄을 정적 줄과 변수 줄 묶음으로 나눈다
+
+    변수만 있는 줄 바로 앞의 'Problem:' 같은 라벨 줄은 변수 줄과 함께 옮긴다.
+    """
+    static_lines: List[str] = []
+    dynamic_groups: List[List[str]] = []
+    for line in text.split("\n"):
+        names = _VARIABLE.findall(line)
+        dynamic = [name for name in names if name not in static_values]
+        if not dynamic:
+            for name in names:
+                line = line.replace("{" + name + "}", _escape(static_values[name]))
+            static_lines.append(line)
+            continue
+        if dynamic == [SCRATCHPAD]:
+            continue  # 맨 끝에 다시 붙인다
+        group = [line]
+        if line.strip() == "{" + dynamic[0] + "}" and static_lines and static_lines[-1].rstrip().endswith((":", "：")):
+            group.insert(0, static_lines.pop())
+        dynamic_groups.append(group)
+    return static_lines, dynamic_groups
+
+
+def _collapse_blank_lines(lines: List[str]) -> str:
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def _verify_prefix(prompt: ChatPromptTemplate) -> Tuple[str, bool]:
+    """서로 다른 두 입력으로 렌더링해 첫 메시지가 같고 입력이 섞여 들어가지 않았는지 확인"""
+    variables = prompt.input_variables
+    first = prompt.format_messages(**{name: f"{_SENTINEL}{name}1" for name in variables})[0].content
+    second = prompt.format_messages(**{name: f"{_SENTINEL}{name}2" for name in variables})[0].content
+    return first, first == second and _SENTINEL not in first
+
+
+def _register(name: str, prefix_text: str, stable: bool) -> PromptPrefix:
+    prefix = PromptPrefix(name, prefix_text, stable)
+    with _lock:
+        _prefix_by_text[prefix_text] = prefix
+        previous = _prefix_by_name.get(name)
+        if previous is not None:
+            # 같은 이름으로 다른 앞부분이 조립되면 (언어/시스템 메시지 변경 등) 변형 수로 드러난다
+            prefix.variants |= previous.variants
+            prefix.calls, prefix.prompt_tokens, prefix.cached_tokens = (
+                previous.calls, previous.prompt_tokens, previous.cached_tokens)
+        _prefix_by_name[name] = prefix
+    if not stable:
+        logger.warning("Prompt %s: static prefix differs between inputs and will not be cached", name)
+    elif prefix.tokens < PROMPT_CACHE_MIN_TOKENS:
+        logger.debug("Prompt %s: static prefix is %s tokens, below the %s-token cache minimum",
+                     name, prefix.tokens, PROMPT_CACHE_MIN_TOKENS)
+    return prefix
+
+
+def _build(name: str, template: ChatPromptTemplate, system_message: Optional[str],
+           static_values: Dict[str, Any]) -> ChatPromptTemplate:
+    static_parts: List[str] = [system_message] if system_message else []
+    dynamic_groups: List[List[str]] = []
+    placeholders: List[MessagesPlaceholder] = []
+    has_scratchpad = False
+    for message in template.messages:
+        if isinstance(message, MessagesPlaceholder):
+            placeholders.append(message)
+            continue
+        inner = getattr(message, "prompt", None)
+        if not isinstance(inner, PromptTemplate) or inner.template_format != "f-string":
+            logger.warning("Prompt %s: unsupported message template, prefix caching disabled", name)
+            return template.partial(**static_values)
+        text = inner.template
+        has_scratchpad = has_scratchpad or "{" + SCRATCHPAD + "}" in text
+        static_lines, groups = _split_lines(text, static_values)
+        static_parts.append(_collapse_blank_lines(static_lines))
+        dynamic_groups.extend(groups)
+
+    human_text = "\n\n".join("\n".join(group) for group in dynamic_groups)
+    if has_scratchpad:
+        human_text += "\n\n{" + SCRATCHPAD + "}"
+    messages: List[Any] = [("system", "\n\n".join(part for part in static_parts if part))]
+    if human_text.strip():
+        messages.append(("human", human_text.strip()))
+    messages.extend(placeholders)
+    prompt = ChatPromptTemplate.from_messages(messages)
+
+    prefix_text, stable = _verify_prefix(prompt)
+    _register(name, prefix_text, stable)
+    return prompt
+
+
+def assemble_prompt(name: str, template: ChatPromptTemplate, system_message: Optional[str] = None,
+                    **static_values: Any) -> ChatPromptTemplate:
+    """
+    정적 앞부분이 먼저 오도록 프롬프트를 재조립
+
+    Args:
+        name: 프롬프트 이름 (통계 키, 예: "triangle_calculation")
+        template: i18n 프롬프트 템플릿
+        system_message: 앞부분 맨 앞에 둘 시스템 메시지 (보통 llm.system_message)
+        **static_values: 요청과 무관한 변수 값 (json_template, format_instructions 등)
+
+    Returns:
+        [system: 정적 앞부분, human: 요청별 변수] 프롬프트.
+        PROMPT_PREFIX_CACHING 이 꺼져 있으면 static_values 만 채운 원본 템플릿.
+    """
+    if not PROMPT_PREFIX_CACHING:
+        return template.partial(**static_values)
+    key = (name, id(template), system_message, tuple(sorted((k, str(v)) for k, v in static_values.items())))
+    prompt = _assembled.get(key)
+    if prompt is None:
+        prompt = _build(name, template, system_message, static_values)
+        with _lock:
+            _assembled[key] = prompt
+    return prompt
+
+
+# ----------------------------------------------------------------------
+# 호출 통계
+# ----------------------------------------------------------------------
+def identify_prefix(messages: List[Any], profile: str = "default") -> PromptPrefix:
+    """
+    첫 (시스템) 메시지로 조립된 프롬프트를 찾는다
+
+    조립되지 않은 프롬프트는 '<profile>:unassembled' 로 묶고, 서로 다른 앞부분 수를 변형 수로 센다.
+    """
+    first = messages[0] if messages else None
+    text = getattr(first, "content", None) if getattr(first, "type", None) == "system" else None
+    if isinstance(text, str):
+        prefix = _prefix_by_text.get(text)
+        if prefix is not None:
+            return prefix
+    name = f"{profile}:unassembled"
+    digest = hashlib.sha1(str(text).encode("utf-8")).hexdigest()[:12]
+    with _lock:
+        prefix = _prefix_by_name.get(name)
+        if prefix is None:
+            prefix = _prefix_by_name[name] = PromptPrefix(name, str(text or ""), stable=False)
+        if len(prefix.variants) < MAX_TRACKED_VARIANTS:
+            prefix.variants.add(digest)
+    return prefix
+
+
+def record_prompt_usage(prefix: PromptPrefix, usage: Dict[str, int]) -> None:
+    """제공자 usage 메타데이터(prompt/cached tokens)를 프롬프트 통계에 합산"""
+    with _lock:
+        prefix.calls += 1
+        prefix.prompt_tokens += usage.get("prompt_tokens", 0)
+        prefix.cached_tokens += usage.get("cached_tokens", 0)
+
+
+def prompt_cache_report() -> Dict[str, Any]:
+    """프롬프트별 앞부분 안정성과 캐시 적중 비율"""
+    with _lock:
+        prompts = {name: prefix.to_dict() for name, prefix in sorted(_prefix_by_name.items())}
+    prompt_tokens = sum(item["prompt_tokens"] for item in prompts.values())
+    cached_tokens = sum(item["cached_tokens"] for item in prompts.values())
+    return {
+        "enabled": PROMPT_PREFIX_CACHING,
+        "min_cacheable_tokens": PROMPT_CACHE_MIN_TOKENS,
+        "prompt_tokens": prompt_tokens,
+        "cached_tokens": cached_tokens,
+        "cached_share": round(cached_tokens / prompt_tokens, 4) if prompt_tokens else 0.0,
+        "prompts": prompts,
+    }
@@ -127,6 +127,119 @@ Return only the JSON format response, do not add other explanations or comments.
 """)
 
 
+# Fused parsing + planning prompt (FRONTEND_MODE=fused)
+PARSE_PLAN_PROMPT = ChatPromptTemplate.from_template("""
+You are a geometry problem analysis and construction planning expert.
+
+Your task has two parts, answered together in a single JSON object:
+1. `parsed_elements`: analyze the problem and extract all geometric elements, relationships, conditions, and objectives, and analyze the problem type and condition characteristics.
+2. `plan`: based on the problem and the `parsed_elements` you extracted, determine the best construction or calculation plan to solve it. Use your own `problem_type` and `approach` analysis.
+---
+Problem:
+{problem}
+---
+## Part 1: parsed_elements
+
+Please complete the following analysis tasks:
+1. Extract geometric objects: points, lines, triangles, circles, etc.
+2. Extract geometric relationships: segment lengths, angle sizes, parallel, perpendicular, etc.
+3. Extract known conditions: length, angle constraints, etc.
+4. Extract the objectives that need to be solved
+5. Analyze problem type: whether it involves triangles, circles, angles, coordinates, etc., is it a proof problem, construction problem, or calculation problem
+6. Analyze problem conditions: whether it includes equal sides, equal angles, perpendicular, parallel, congruent, similar, tangent, etc. characteristics
+7. Determine the appropriate construction method for the problem: ruler-compass construction, GeoGebra construction, coordinate geometry construction, analytic geometry construction, etc.
+
+## Part 2: plan
+
+### 1. Determine the construction type
+Choose one of:
+- Basic construction (using points, segments, angles, circles, etc.)
+- Special construction (under specific geometric constraints)
+- Complex construction (with chained dependencies or logical inferences)
+
+### 2. Establish optimal coordinate system
+- For problems with line segments of known length, consider setting endpoints at origin (0,0) and along axes
+- For right triangles, align one leg with x-axis when possible
+- For circles, position center at origin or other strategic coordinates
+- Consider symmetry and simplicity when establishing coordinates
+
+### 3. Strategic geometric constraints utilization
+- For problems involving circles:
+  - Remember that points on a circle centered at (a,b) satisfy (x-a)²+(y-b)²=r²
+  - Points on a circle with diameter AB are precisely the points that form right angles with A and B
+  - To create a circle with diameter AB in GeoGebra, use Circle(Midpoint(A,B),Distance(A,B)/2)
+  - Note that Circle(A,B) creates a circle with center A passing through B, NOT a circle with diameter AB
+- For problems with distance constraints:
+  - Use circles of specified radius to locate points satisfying distance requirements
+  - Intersections of two circles can determine points with specific distance requirements
+- For angle constraints:
+  - Right angles can be established using perpendicular lines or circle properties
+  - Use angle bisectors or trisectors when needed
+- For points with multiple possible positions:
+  - Use the Point(Object) command to represent points constrained to geometric objects
+  - Example: For all points on circle c, use P = Point(c)
+  - Example: For all points on segment AB, use P = Point(Segment(A,B))
+  - This approach is especially useful when:
+    - Multiple valid configurations exist for a problem
+    - The exact position is not uniquely determined
+    - Interactive exploration of valid positions is beneficial
+  - When combining constraints, use circle intersections:
+    - For a point P on segment AB that is distance d from point C, find the intersection of:
+      - Circle centered at C with radius d
+      - Segment AB
+
+### 4. Analyze whether the problem requires calculation tools:
+
+- If **yes** → set `"requires_calculation": true`, and provide a list of `suggested_tasks`.
+  Do **not** include a `construction_plan`.
+  Use one of the following agent types based on required calculations:
+  - triangle_calculation_agent
+  - angle_calculation_agent
+  - length_calculation_agent
+  - coordinate_calculation_agent
+  - circle_calculation_agent
+  - area_calculation_agent
+
+- If **no** → set `"requires_calculation": false`, and provide a complete `construction_plan`.
+  You do **not** need to include `suggested_tasks`.
+
+---
+
+### 5. Task creation guidelines (for either plan):
+
+For every task or step:
+- Set `task_type` to: triangle, circle, angle, length, area, or coordinate
+- Set `operation_type` to: midpoint, intersect, angleBisector, perpendicular, etc.
+- If directly usable in GeoGebra, set:
+  - `"geogebra_alternatives": true`
+  - `"geogebra_command": "..."` (e.g., "Midpoint[A, D]")
+
+Use the following GeoGebra-compatible operations when possible:
+- Midpoint between two points: `Midpoint[A, D]`
+- Intersection of two lines: `Intersect[BF, AE]`
+- Angle bisector: `AngleBisector[E, A, B]` (DOESN'T WORK FOR ANGLE TRISSECTION!!!)
+- Perpendicular / parallel lines
+- Circle (inscribed or circumscribed)
+
+---
+                                                  
+### 6. Output format
+
+Your output must be a single JSON object with the keys `parsed_elements` and `plan`, conforming to the following schema:
+{format_instructions}
+
+The `plan` object must conform to one of the following JSON formats:
+
+#### If `requires_calculation = true`:
+{json_template1}
+
+#### If `requires_calculation = false`:
+{json_template2}
+
+Return only the JSON format response, do not add other explanations or comments.
+""")
+
+
 # GeoGebra command generation agent prompt
 GEOGEBRA_COMMAND_PROMPT = ChatPromptTemplate.from_messages([
     ("system", """You are a professional GeoGebra command generation assistant. You can use the provided tools to generate and verify GeoGebra commands.
@@ -155,6 +268,7 @@ Please generate GeoGebra commands based on the following information:
 
 Analyze the input data, noting the following points:
 1. If specific coordinates and measurement values are provided, use these precise values
+   - If calculation results contain `exact_values`, write those values with their `geogebra` form (e.g. sqrt(3)/2, pi/3) instead of decimals
 2. If there is only problem analysis but no calculation results, reasonable values need to be inferred through geometric relationships
 3. If there are calculation results but no problem analysis, infer the problem type from the calculation results
 4. Ensure the generated commands are complete and can accurately express the geometric relationships of the problem
@@ -359,6 +473,37 @@ Please output in the following JSON format:
 {agent_scratchpad}
 """)
 
+# GeoGebra command repair agent prompt (patches only the lines that failed validation)
+COMMAND_REPAIR_PROMPT = ChatPromptTemplate.from_template("""
+You are a professional GeoGebra command repair expert. Validation has located the commands that failed. Your task is to fix only these lines and return a patch for each of them; every other command is already validated and stays unchanged.
+
+Problem: {problem}
+Lines to fix (line number, command, validation errors): {lines_to_fix}
+Unchanged context (commands defining objects the lines to fix refer to, and all names defined by other lines): {context}
+Current repair attempt count: {attempt_count}
+
+Please strictly follow these steps:
+1. Analyze the validation errors of each listed line
+2. Fix each listed line with the smallest change that resolves its errors, keeping its object name (label) so that later commands still refer to the same object
+3. If a line needs helper objects, put their commands before the fixed command in the same patch; if a line is redundant, return an empty command list for it
+4. Only use objects that are defined by the unchanged context, by earlier lines, or by commands in the same patch
+
+Command writing rules:
+1. Use standard GeoGebra command syntax, ensuring command names and parameter formats are correct
+2. The correct usage for instructions is <Object Name> : <CommandName> (<Parameter1>, <Parameter2>, ...) or <Object Name> = <CommandName> [<Parameter1>, <Parameter2>, ...]
+3. All angles MUST be expressed using the degree symbol (°) or as radians using π
+4. The Rotate command performs counter-clockwise rotation by default; use negative angles for clockwise rotation
+5. For a circle with diameter AB, use Circle(Midpoint(A,B),Distance(A,B)/2), not Circle(A,B)
+
+Return patches only for the listed line numbers, never the complete command list.
+
+Please output in the following JSON format:
+{json_template}
+
+{agent_scratchpad}
+""")
+
+
 # Explanation generation agent prompt
 EXPLANATION_PROMPT = ChatPromptTemplate.from_template("""
 You are a geometry education expert who needs to generate detailed solution explanations. Please use the following information to create a structured teaching instruction:
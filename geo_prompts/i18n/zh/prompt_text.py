@@ -105,6 +105,102 @@ PLANNER_PROMPT = ChatPromptTemplate.from_template("""
 """)
 
 
+# 파싱 + 계획 통합 프롬프트 (FRONTEND_MODE=fused)
+PARSE_PLAN_PROMPT = ChatPromptTemplate.from_template("""
+你是一个几何问题分析与作图规划专家。你的任务分为两部分，在同一个JSON对象中一起回答:
+1. parsed_elements: 分析几何问题，提取所有几何元素、关系、条件和目标，并分析问题类型和条件特征。
+2. plan: 根据问题和你提取的 parsed_elements，确定解决问题的最佳作图方法。请直接使用你自己分析出的 problem_type 和 approach。
+
+请分析以下几何问题:
+{problem}
+
+## 第一部分: parsed_elements
+请完成以下分析任务:
+1. 提取几何对象：点、线、三角形、圆等
+2. 提取几何关系：线段长度、角度大小、平行、垂直等
+3. 提取已知条件：长度、角度等约束条件
+4. 提取需要求解的目标
+5. 分析问题类型：是否涉及三角形、圆、角度、坐标等，是证明题、作图题还是计算题
+6. 分析问题条件：是否包含等边、等角、垂直、平行、全等、相似、切线等特征
+7. 确定问题适合的作图方法：尺规作图、GeoGebra作图、坐标几何作图、解析几何作图等
+
+## 第二部分: plan
+请完成以下分析任务:
+1. 判断问题的作图类型：
+   - 基本作图：基本的点、线、圆等几何元素的作图
+   - 特殊作图：特定条件下的几何图形作图
+   - 构造作图：根据给定条件构造复杂几何图形
+2. 提出作图任务建议，包括：
+   - 任务类型（triangle/circle/angle/length/area/coordinate 等）
+   - 所需参数
+   - 作图步骤之间的依赖关系
+3. 判断哪些操作可以直接使用GeoGebra命令完成而无需计算:
+   - 两点中点的计算 (可用 Midpoint 命令)
+   - 线的交点计算 (可用 Intersect 命令)
+   - 角平分线 (可用 AngleBisector 命令)
+   - 垂直线/平行线 (可用 Perpendicular/Parallel 命令)
+   - 圆的内切/外接 (可用相应的 Circle 命令)
+   - 将可以直接用GeoGebra命令替代的任务添加geogebra_alternatives=true标记和geogebra_command属性
+4. 判断是否需要使用计算工具并在 reasoning 中详细说明:
+   - 如果问题需要以下计算工具处理，则 requires_calculation 为 True，需要提供suggested_tasks，不提供 construction_plan:
+     * triangle_calculation_agent: 复杂三角形关系计算
+     * circle_calculation_agent: 复杂圆相关计算
+     * angle_calculation_agent: 复杂角度关系计算
+     * length_calculation_agent: 复杂长度和距离计算
+     * area_calculation_agent: 复杂面积计算
+     * coordinate_calculation_agent: 复杂坐标转换和计算
+   - 如果问题需要计算工具处理，则确定需要的计算类型 task_type：
+     * triangle: 三角形相关计算
+     * circle: 圆相关计算
+     * angle: 角度相关计算
+     * length: 长度相关计算
+     * area: 面积相关计算
+     * coordinate: 坐标几何计算 
+   - 如果所有操作都可以通过GeoGebra命令直接完成，则 requires_calculation 为 False， 需要提供 construction_plan，不需要提供 suggested_tasks
+
+                                                   
+注意: 对于每个suggested_task，请根据具体操作特性设置合适的operation_type，确保如下:
+- task_type表示计算步骤的大类别(三角形/圆/角度/长度/面积/坐标)
+- operation_type表示具体执行的操作类型(例如midpoint, intersect)
+- 当任务可以通过GeoGebra命令直接实现时，应当设置geogebra_alternatives=true并提供geogebra_command
+- 同一个task_type可以有不同的operation_type，取决于具体操作
+
+常见operation_type参考(但不限于):
+- midpoint: 中点计算
+- intersect: 交点计算
+- perpendicular: 垂线
+- parallel: 平行线
+- circle: 圆的构造
+- polygon: 多边形构造
+- segment: 线段
+- angle: 角度
+- distance: 距离测量
+- reflection: 镜像反射
+- rotation: 旋转
+- translation: 平移
+- angleTrisection: 三等分角
+                                                  
+注意: 请提供作图计划的详细推理解释，包括:
+- 作图步骤的具体顺序和理由
+- 每个步骤如何依赖于前面的步骤
+- 为什么这种作图方法是最合适的
+- 如何保证构造的正确性
+
+你的输出必须是一个包含 parsed_elements 和 plan 两个键的JSON对象，符合以下格式:
+{format_instructions}
+
+plan 对象必须符合以下JSON格式之一:
+
+如果 requires_calculation 为 True:
+{json_template1}
+
+如果 requires_calculation 为 False:
+{json_template2}
+
+仅返回JSON格式的响应，不要添加其他说明或注释。
+""")
+
+
 # GeoGebra 명령어 생성 에이전트 프롬프트
 GEOGEBRA_COMMAND_PROMPT = ChatPromptTemplate.from_messages([
     ("system", """你是一个专业的GeoGebra命令生成助手。你可以使用提供的工具来生成和验证GeoGebra命令。
@@ -124,6 +220,7 @@ GEOGEBRA_COMMAND_PROMPT = ChatPromptTemplate.from_messages([
 
 分析输入数据，注意以下几点：
 1. 如果提供了具体的坐标和度量值，请使用这些精确值
+   - 如果计算结果中包含 `exact_values`，请使用其中的 `geogebra` 写法（例如 sqrt(3)/2、pi/3），不要使用小数近似值
 2. 如果只有问题分析但没有计算结果，需要通过几何关系推断合理的值
 3. 如果有计算结果但没有问题分析，请从计算结果中推断问题类型
 4. 确保生成的命令是完整的，能够准确表达问题的几何关系
@@ -243,6 +340,37 @@ COMMAND_REGENERATION_PROMPT = ChatPromptTemplate.from_template("""
 {agent_scratchpad}
 """)
 
+# GeoGebra 명령어 부분 수리 에이전트 프롬프트 (검증에 실패한 줄만 패치)
+COMMAND_REPAIR_PROMPT = ChatPromptTemplate.from_template("""
+你是一个专业的GeoGebra命令修复专家。验证已经定位了出错的命令。你的任务是只修复这些行，并为每一行返回一个补丁；其他命令都已通过验证，保持不变。
+
+问题: {problem}
+需要修复的行（行号、命令、验证错误）: {lines_to_fix}
+不变的上下文（需要修复的行所引用对象的定义命令，以及其他行定义的全部名称）: {context}
+当前修复尝试次数: {attempt_count}
+
+请严格按照以下步骤进行：
+1. 分析每一条列出的行的验证错误
+2. 用最小的修改修复每一条列出的行，保留其对象名（标签），使后续命令仍引用同一个对象
+3. 如果某行需要辅助对象，把辅助对象的命令放在同一补丁中修复后的命令之前；如果某行是多余的，为它返回空的命令列表
+4. 只能使用不变的上下文、前面的行或同一补丁中定义的对象
+
+命令编写规则：
+1. 使用标准的GeoGebra命令语法，确保命令名称和参数格式正确
+2. 指令的正确用法为 <Object Name> : <CommandName> (<Parameter1>, <Parameter2>, ...) 或者 <Object Name> = <CommandName> [<Parameter1>, <Parameter2>, ...]
+3. 所有角度必须使用度数符号（°）或用π表示的弧度
+4. Rotate 命令默认逆时针旋转；顺时针旋转请使用负角度
+5. 以AB为直径的圆请使用 Circle(Midpoint(A,B),Distance(A,B)/2)，而不是 Circle(A,B)
+
+只返回列出行号的补丁，不要返回完整的命令列表。
+
+请以以下JSON格式输出：
+{json_template}
+
+{agent_scratchpad}
+""")
+
+
 
 # 해설 생성 에이전트 프롬프트
 EXPLANATION_PROMPT = ChatPromptTemplate.from_template("""
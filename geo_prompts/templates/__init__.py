@@ -11,6 +11,7 @@ from .json_templates import (
     COMMAND_GENERATION_TEMPLATE,
     VALIDATION_JSON_TEMPLATE,
     COMMAND_REGENERATION_JSON_TEMPLATE,
+    COMMAND_REPAIR_JSON_TEMPLATE,
     MANAGER_JSON_TEMPLATE,
     TRIANGLE_JSON_TEMPLATE,
     ANGLE_JSON_TEMPLATE,
@@ -28,6 +29,7 @@ __all__ = [
     "COMMAND_GENERATION_TEMPLATE",
     "VALIDATION_JSON_TEMPLATE",
     "COMMAND_REGENERATION_JSON_TEMPLATE",
+    "COMMAND_REPAIR_JSON_TEMPLATE",
     # Calculation JSON Template ------------------------------------------------------------
     "MANAGER_JSON_TEMPLATE",
     "TRIANGLE_JSON_TEMPLATE",
@@ -84,6 +84,7 @@ VALIDATION_JSON_TEMPLATE = '''
     {
       "command": "GeoGebra command",
       "analysis": "Analysis of the command",
+      "is_correct": boolean,  // false only when this command itself has an error
     }
   ],
   "construction_plan": { // Re-planned construction plan
@@ -115,6 +116,19 @@ COMMAND_REGENERATION_JSON_TEMPLATE = '''
 }
 '''
 
+# Command Repair JSON Template ------------------------------------------------------------
+COMMAND_REPAIR_JSON_TEMPLATE = '''
+{
+  "analysis": "Brief analysis of why each listed line failed validation",
+  "fixed_issues": ["Fixed issue 1", "Fixed issue 2", ...],
+  "patches": [
+    {"line": 3, "commands": ["Replacement command for line 3"]},
+    {"line": 7, "commands": ["Helper command", "Replacement command for line 7"]},
+    ...
+  ]
+}
+'''
+
 # Calculation JSON Template ------------------------------------------------------------
 
 # Construction Manager Prompt
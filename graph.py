@@ -2,26 +2,42 @@
 그래프 모듈
 
 이 모듈은 기하학 문제 해결 그래프를 정의합니다.
+
+PARALLEL_COMMAND_RETRIEVAL 이 켜져 있으면 계산 경로에서 계획 에이전트가 초안 작도 계획의
+명령어 검색·선택을 그래프 밖 백그라운드 작업으로 시작하고, 계산 루프가 끝난 뒤 명령어 검색
+에이전트가 그 결과를 기다려 사용합니다 (계산 노드는 미리 선택을 기다리지 않음).
+
+FRONTEND_MODE=fused 이면 parsing_agent → planner_agent 대신 parse_plan_agent 한 노드가
+한 번의 LLM 호출로 파싱과 계획을 수행하고, 이후 라우팅은 같습니다.
 """
 
 from typing import List, Dict, Any, Optional
 from langgraph.graph import StateGraph, END
-from config import MAX_ATTEMPTS
+from config import MAX_ATTEMPTS, FRONTEND_MODE
+from utils.tracing import traced_node
 
 # 상태 모델 임포트
 from models.state_models import GeometryState
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 
 # 기하학 솔버 그래프 생성 함수
-def create_geometry_solver_graph():
+def create_geometry_solver_graph(checkpointer: Optional[Any] = None):
     """
     기하학 문제 해결기 그래프 생성
     
+    Args:
+        checkpointer: LangGraph 체크포인터 (utils.checkpointing.get_checkpointer), 있으면 노드마다 상태 저장
+    
     Returns:
         그래프 인스턴스
     """
     from agents import (
         parsing_agent,
         planner_agent,
+        parse_plan_agent,
         explanation_agent,
         geogebra_command_agent,
         geogebra_command_retrieval_agent,
@@ -44,32 +60,44 @@ def create_geometry_solver_graph():
     # 그래프 초기화
     workflow = StateGraph(GeometryState)
 
-    # 모든 노드 추가
-    workflow.add_node("parsing_agent", parsing_agent)
-    workflow.add_node("planner_agent", planner_agent)
+    def add_node(name: str, node):
+        # 노드별 실행 시간/LLM 호출을 요청 추적에 기록
+        workflow.add_node(name, traced_node(name, node))
 
-    workflow.add_node("calculation_manager_agent", calculation_manager_agent)
-    workflow.add_node("calculation_router_agent", calculation_router_agent)
-    workflow.add_node("calculation_result_merger_agent", calculation_result_merger_agent)
+    # 모든 노드 추가 (fused 모드는 파싱+계획 노드 하나)
+    fused_frontend = FRONTEND_MODE == "fused"
+    if fused_frontend:
+        add_node("parse_plan_agent", parse_plan_agent)
+    else:
+        add_node("parsing_agent", parsing_agent)
+        add_node("planner_agent", planner_agent)
+    plan_node = "parse_plan_agent" if fused_frontend else "planner_agent"
+
+    add_node("calculation_manager_agent", calculation_manager_agent)
+    add_node("calculation_router_agent", calculation_router_agent)
+    add_node("calculation_result_merger_agent", calculation_result_merger_agent)
     
     # 계산 노드 추가
-    workflow.add_node("triangle_calculation_agent", triangle_calculation_agent)
-    workflow.add_node("circle_calculation_agent", circle_calculation_agent)
-    workflow.add_node("angle_calculation_agent", angle_calculation_agent)
-    workflow.add_node("length_calculation_agent", length_calculation_agent)
-    workflow.add_node("area_calculation_agent", area_calculation_agent)
-    workflow.add_node("coordinate_calculation_agent", coordinate_calculation_agent)
+    add_node("triangle_calculation_agent", triangle_calculation_agent)
+    add_node("circle_calculation_agent", circle_calculation_agent)
+    add_node("angle_calculation_agent", angle_calculation_agent)
+    add_node("length_calculation_agent", length_calculation_agent)
+    add_node("area_calculation_agent", area_calculation_agent)
+    add_node("coordinate_calculation_agent", coordinate_calculation_agent)
 
     # GeoGebra 관련 노드 추가
-    workflow.add_node("command_retrieval_agent", geogebra_command_retrieval_agent)
-    workflow.add_node("command_generation_agent", geogebra_command_agent)
-    workflow.add_node("validation_agent", validation_agent)
-    workflow.add_node("command_regeneration_agent", command_regeneration_agent)
-    workflow.add_node("explanation_agent", explanation_agent)
+    add_node("command_retrieval_agent", geogebra_command_retrieval_agent)
+    add_node("command_generation_agent", geogebra_command_agent)
+    add_node("validation_agent", validation_agent)
+    add_node("command_regeneration_agent", command_regeneration_agent)
+    add_node("explanation_agent", explanation_agent)
     
     # 기본 흐름 설정
-    workflow.set_entry_point("parsing_agent")
-    workflow.add_edge("parsing_agent", "planner_agent")
+    if fused_frontend:
+        workflow.set_entry_point("parse_plan_agent")
+    else:
+        workflow.set_entry_point("parsing_agent")
+        workflow.add_edge("parsing_agent", "planner_agent")
     
     # 분석 결과에 따른 라우팅 설정
     def route_after_planner(state: GeometryState):
@@ -81,14 +109,11 @@ def create_geometry_solver_graph():
             # 계산 불필요 시 바로 GeoGebra 명령어 검색으로
             return "command_retrieval_agent"
     
-    workflow.add_conditional_edges(
-        "planner_agent",
-        route_after_planner,
-        {
-            "calculation_manager_agent": "calculation_manager_agent",
-            "command_retrieval_agent": "command_retrieval_agent"
-        }
-    )
+    planner_routes = {
+        "calculation_manager_agent": "calculation_manager_agent",
+        "command_retrieval_agent": "command_retrieval_agent"
+    }
+    workflow.add_conditional_edges(plan_node, route_after_planner, planner_routes)
     
     # 매니저 에이전트에서 라우터로 항상 라우팅
     workflow.add_edge("calculation_manager_agent", "calculation_router_agent")
@@ -128,7 +153,7 @@ def create_geometry_solver_graph():
     for agent in calculation_agents:
         workflow.add_edge(agent, "calculation_router_agent")
     
-    # 결과 병합 후 명령어 검색
+    # 결과 병합 후 명령어 검색 (백그라운드 미리 선택 결과는 검색 에이전트가 기다려 사용)
     workflow.add_edge("calculation_result_merger_agent", "command_retrieval_agent")
     
     # GeoGebra 명령어 생성 관련 흐름
@@ -159,7 +184,7 @@ def create_geometry_solver_graph():
     workflow.set_finish_point("explanation_agent")
     
     # 그래프 컴파일
-    compiled_graph = workflow.compile()
+    compiled_graph = workflow.compile(checkpointer=checkpointer)
     
     return compiled_graph
 
@@ -170,7 +195,7 @@ def route_after_validation(state: GeometryState) -> str:
     
     # 최대 재생성 시도 횟수 초과 시 그냥 설명으로 넘어감
     if state.command_regeneration_attempts >= MAX_ATTEMPTS:
-        print(f"[WARNING] 최대 명령어 재생성 시도 횟수({MAX_ATTEMPTS})를 초과했습니다. 설명으로 넘어갑니다.")
+        logger.warning("최대 명령어 재생성 시도 횟수(%s)를 초과했습니다. 설명으로 넘어갑니다.", MAX_ATTEMPTS)
         state.is_valid = True  # 강제로 유효하다고 설정
         return "success"
     
@@ -180,7 +205,7 @@ def route_after_regeneration(state: GeometryState) -> str:
     """재생성 후 라우팅 결정"""
     # 최대 재생성 시도 횟수 초과 시 바로 설명으로 넘어감
     if state.command_regeneration_attempts >= MAX_ATTEMPTS:
-        print(f"[WARNING] 최대 명령어 재생성 시도 횟수({MAX_ATTEMPTS})를 초과했습니다. 검증을 건너뛰고 설명으로 넘어갑니다.")
+        logger.warning("최대 명령어 재생성 시도 횟수(%s)를 초과했습니다. 검증을 건너뛰고 설명으로 넘어갑니다.", MAX_ATTEMPTS)
         state.is_valid = True  # 강제로 유효하다고 설정
         return "explanation_agent"
     
@@ -4,45 +4,92 @@ from typing import Dict, Any, Optional, Callable, Awaitable
 from dotenv import load_dotenv
 import sys
 import asyncio
+import uuid
 from datetime import datetime
 from graph import create_geometry_solver_graph
 from models import GeometryState
+from config import STREAMING_NODES
+from utils.checkpointing import get_checkpointer, close_checkpointer, solve_config, resume_point, finish_thread
+from utils.logger import get_logger
 
+logger = get_logger(__name__)
 
 # 환경 변수 로드
 load_dotenv()
 
+# 체크포인터별로 컴파일한 그래프 (프로세스 안에서 재사용)
+_solver_graphs: Dict[int, Any] = {}
+
+
+def get_solver_graph(checkpointer: Optional[Any] = None) -> Any:
+    """체크포인터에 묶인 컴파일된 그래프 (처음 한 번만 컴파일)"""
+    key = id(checkpointer)
+    graph = _solver_graphs.get(key)
+    if graph is None or graph.checkpointer is not checkpointer:
+        graph = create_geometry_solver_graph(checkpointer)
+        _solver_graphs.clear()  # 체크포인터가 바뀌면 이전 그래프는 버린다
+        _solver_graphs[key] = graph
+    return graph
+
 async def solve_geometry_problem(
     problem_text: str, 
     progress_callback: Optional[Callable[[str, str, Optional[Dict[str, Any]]], Awaitable[None]]] = None,
-    output_file: Optional[str] = None
+    output_file: Optional[str] = None,
+    task_id: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     기하학 문제를 해결하고 GeoGebra 명령어와 해설을 제공하는 메인 함수
     
+    그래프 상태는 노드마다 task_id 를 스레드 ID 로 체크포인트에 저장됩니다. 같은 task_id 로 다시
+    호출하면 (재연결, 작업 재시도, 서버 재시작) 마지막으로 끝난 노드 다음부터 이어서 실행합니다.
+    
     Args:
         problem_text: 중국어 기하학 문제 텍스트
         progress_callback: 진행 상황을 받을 콜백 함수
         output_file: 결과를 저장할 파일 경로 (선택 사항)
+        task_id: 체크포인트 스레드 ID (없으면 이번 호출에서만 쓰는 임의 ID)
         
     Returns:
         해결 결과 딕셔너리 (GeoGebra 명령어, 해설 등 포함)
     """
-    # 그래프 생성
-    solver_graph = create_geometry_solver_graph()
-    
+    thread_id = task_id or f"adhoc-{uuid.uuid4()}"
+    config = solve_config(thread_id)
+    # 프로세스에서 공유하는 체크포인터와 그래프 (체크포인터가 있으면 노드마다 상태 저장)
+    solver_graph = get_solver_graph(await get_checkpointer())
+    result = await _run_solver_graph(solver_graph, config, problem_text, progress_callback)
+    await finish_thread(solver_graph, config, keep=task_id is not None)
+    return result
+
+
+async def _run_solver_graph(
+    solver_graph: Any,
+    config: Dict[str, Any],
+    problem_text: str,
+    progress_callback: Optional[Callable[[str, str, Optional[Dict[str, Any]]], Awaitable[None]]] = None
+) -> Dict[str, Any]:
+    """그래프 실행 (체크포인트가 있으면 이어서 실행) 후 결과 딕셔너리 생성"""
     # 초기 상태 설정
     initial_state = GeometryState(input_problem=problem_text)
     
+    # 체크포인트 기준 시작점: 새 실행 / 중단된 노드부터 이어서 / 이미 끝난 실행
+    start = await resume_point(solver_graph, config, initial_state)
+    
     # 스트리밍 결과 기록 변수
     streaming_results = []
     
     # 최종 상태를 추적할 변수
-    final_state = None
+    final_state = start.finished_state
     
+    if final_state is not None:
+        # 같은 task_id 로 이미 끝난 실행: 저장된 최종 상태를 그대로 사용
+        if progress_callback:
+            await progress_callback("system", "체크포인트에 저장된 결과를 사용합니다.", {"status": "completed"})
     # 디버그 모드로 그래프 실행 (스트리밍)
-    if progress_callback:
-        await progress_callback("system", "그래프 실행 시작", {"status": "starting"})
+    elif progress_callback:
+        if start.next_nodes:
+            await progress_callback("system", "체크포인트에서 이어서 실행", {"status": "resumed", "next": list(start.next_nodes)})
+        else:
+            await progress_callback("system", "그래프 실행 시작", {"status": "starting"})
         
         try:
             # 마지막 상태 업데이트를 추적하기 위한 변수들
@@ -50,13 +97,25 @@ async def solve_geometry_problem(
             node_results = {}
             
             async for chunk in solver_graph.astream(
-                initial_state,
-                stream_mode=["debug", "updates", "values"],
-                config={
-                    "recursion_limit": 30
-                }
+                start.input,
+                stream_mode=["debug", "updates", "values", "messages"],
+                config=config
             ):
                 stream_mode, data = chunk
+                
+                if stream_mode == "messages":
+                    # LLM 토큰 스트리밍: 지정된 노드의 토큰만 클라이언트에 전달
+                    message_chunk, metadata = data
+                    node_name = metadata.get("langgraph_node")
+                    token = getattr(message_chunk, "content", None)
+                    if node_name in STREAMING_NODES and isinstance(token, str) and token:
+                        await progress_callback(
+                            "llm_token",
+                            f"{node_name} 토큰",
+                            {"node": node_name, "token": token}
+                        )
+                    continue
+                
                 streaming_results.append(data)
                 
                 if stream_mode == "debug":
@@ -120,7 +179,7 @@ async def solve_geometry_problem(
                                         # 직접 변환을 시도합니다
                                         final_state.construction_plan = final_state.construction_plan.to_dict()
                                 except Exception as cp_error:
-                                    print(f"ConstructionPlan 변환 실패: {str(cp_error)}")
+                                    logger.warning("ConstructionPlan 변환 실패: %s", cp_error)
                                     # 실패하면 None으로 설정
                                     final_state.construction_plan = None
                             
@@ -130,31 +189,28 @@ async def solve_geometry_problem(
                                 {"node": last_node, "data": final_state}
                             )
                         except Exception as e:
-                            print(f"상태 업데이트 중 오류 발생: {str(e)}")
+                            logger.warning("상태 업데이트 중 오류 발생: %s", e)
                             # 오류가 발생해도 계속 진행
             
             # 마지막 상태가 없는 경우를 대비해 기본 실행 결과 사용
             if not final_state:
-                print("스트리밍에서 최종 상태를 얻지 못했습니다. 기본 실행 결과를 사용합니다.")
+                logger.warning("스트리밍에서 최종 상태를 얻지 못했습니다. 기본 실행 결과를 사용합니다.")
                 result = await solver_graph.ainvoke(
-                    initial_state,
-                    config={
-                        "recursion_limit": 30
-                    }
+                    (await resume_point(solver_graph, config, initial_state)).input,
+                    config=config
                 )
                 final_state = dict(result)
         
         except GeneratorExit:
-            print("GeneratorExit: 스트림이 비정상적으로 종료되었습니다. 이는 클라이언트 연결 문제 또는 소켓 타임아웃 때문일 수 있습니다.")
+            logger.warning("GeneratorExit: 스트림이 비정상적으로 종료되었습니다. 이는 클라이언트 연결 문제 또는 소켓 타임아웃 때문일 수 있습니다.")
             if not final_state:
-                print("스트림이 종료되어 결과를 가져오는 다른 방법을 시도합니다.")
+                logger.info("스트림이 종료되어 결과를 가져오는 다른 방법을 시도합니다.")
                 try:
                     # 스트림이 중단되었으므로 대체 방법으로 결과 가져오기
+                    # (체크포인트가 있으면 처음부터가 아니라 마지막으로 끝난 노드 다음부터 이어서 실행)
                     result = await solver_graph.ainvoke(
-                        initial_state,
-                        config={
-                            "recursion_limit": 30
-                        }
+                        (await resume_point(solver_graph, config, initial_state)).input,
+                        config=config
                     )
                     final_state = dict(result)
                     
@@ -162,7 +218,7 @@ async def solve_geometry_problem(
                     await progress_callback("system", "스트림이 종료되어 대체 방법으로 결과를 가져왔습니다.", {"status": "recovered"})
                     
                 except Exception as recovery_error:
-                    print(f"결과 복구 실패: {str(recovery_error)}")
+                    logger.error("결과 복구 실패: %s", recovery_error)
                     await progress_callback("system_error", f"결과 복구 실패: {str(recovery_error)}", {"error": str(recovery_error)})
                     raise recovery_error
             else:
@@ -176,12 +232,7 @@ async def solve_geometry_problem(
         await progress_callback("system", "그래프 실행 완료", {"status": "completed"})
     else:
         # 기존 로직: 스트리밍 없이 최종 결과만 반환
-        result = await solver_graph.ainvoke(
-            initial_state,
-            config={
-                "recursion_limit": 30
-            }
-        )
+        result = await solver_graph.ainvoke(start.input, config=config)
         final_state = dict(result)
     
     # GeometryState 객체를 직접 반환하면 JSON 직렬화 오류가 발생할 수 있으므로
@@ -216,10 +267,11 @@ async def solve_geometry_problem(
         }
     
     # 디버그 정보 출력
-    if final_state.geogebra_commands:
-        print(f"\n디버그: geogebra_commands 타입: {type(final_state.geogebra_commands)}")
-        print(f"디버그: geogebra_commands 길이: {len(final_state.geogebra_commands) if final_state.geogebra_commands else 0}")
-        print(f"디버그: geogebra_commands 내용: {final_state.geogebra_commands[:3] if final_state.geogebra_commands else '없음'}")
+    # (그래프 출력과 체크포인트 최종 상태는 dict 이므로 result_dict 기준으로 출력)
+    if result_dict["geogebra_commands"]:
+        logger.debug("geogebra_commands 타입: %s", type(result_dict["geogebra_commands"]))
+        logger.debug("geogebra_commands 길이: %s", len(result_dict["geogebra_commands"]))
+        logger.debug("geogebra_commands 내용: %s", result_dict["geogebra_commands"][:3])
     
     return result_dict
 
@@ -331,7 +383,10 @@ async def main_async():
     
     # 문제 해결
     print("\nSolving problem...")
-    result = await solve_geometry_problem(problem_text)
+    try:
+        result = await solve_geometry_problem(problem_text)
+    finally:
+        await close_checkpointer()
     
     # 결과 출력
     display_result(result)
@@ -15,6 +15,7 @@ class CalculationResult(BaseModel):
     geometric_elements: Optional[Dict[str, Any]] = Field(None, description="Various geometric elements")
     derived_data: Optional[Dict[str, Any]] = Field(None, description="Derived data from calculations")
     explanation: Optional[str] = Field(None, description="Calculation explanation")
+    exact_values: Optional[Dict[str, Any]] = Field(None, description="Exact closed forms (rational, radical, π) of numeric results")
     
     # 임의 확장을 위한 필드
     extras: Optional[Dict[str, Any]] = Field(None, description="Problem-specific extension data")
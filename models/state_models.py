@@ -5,8 +5,9 @@ This module defines state model classes used in the geometry problem solver.
 It also includes calculation-related models to avoid circular import problems.
 """
 
-from typing import Dict, List, Any, Optional, Literal, Union
-from pydantic import BaseModel, Field
+import heapq
+from typing import Callable, Dict, Iterable, List, Any, Optional, Literal, Set, Union
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class DependencyNode(BaseModel):
@@ -62,6 +63,156 @@ class CalculationTask(BaseModel):
             available_tools=self.available_tools.copy()
         )
 
+# Estimated relative cost of running a task (used for critical-path priorities)
+TaskCost = Callable[[CalculationTask], float]
+
+
+class TaskGraph:
+    """
+    Id-indexed scheduling view over calculation tasks
+
+    Built once in O(V + E): tasks are indexed by id, every unfinished task keeps a counter
+    of unfinished dependencies, and tasks whose counter is zero sit in a ready heap.
+    Completing a task only touches its dependents, so choosing the next task never
+    rescans the task list.
+
+    Problems are detected up front instead of silently stalling the queue:
+    - dependencies naming no known task (e.g. point names copied from the planner
+      blueprint) are ignored for readiness and reported in ``dangling``
+    - tasks on a dependency cycle, or downstream of one, can never become ready; they
+      are reported in ``blocked`` and ``cycles`` holds one example cycle per component
+
+    Ready tasks are ordered critical-path first: the priority of a task is its own
+    estimated cost plus the most expensive chain of tasks waiting on it, so long chains
+    of LLM calls start before cheap leaves. Ties keep the original task order.
+    ``ready()`` lists every runnable task (for a parallel executor); ``pop()`` and
+    ``complete()`` drive a sequential one.
+    """
+
+    def __init__(self, tasks: Iterable[CalculationTask], completed_task_ids: Iterable[str] = (),
+                 cost: Optional[TaskCost] = None):
+        self.tasks: Dict[str, CalculationTask] = {}
+        for task in tasks:
+            self.tasks.setdefault(task.task_id, task)  # first task wins on duplicate ids
+        rank = {task_id: index for index, task_id in enumerate(self.tasks)}
+        self.completed: Set[str] = set(completed_task_ids)
+        self.completed.update(task_id for task_id, task in self.tasks.items() if task.status == "completed")
+
+        unfinished = [task_id for task_id in self.tasks if task_id not in self.completed]
+        self.dependents: Dict[str, List[str]] = {task_id: [] for task_id in unfinished}
+        self.dangling: Dict[str, List[str]] = {}
+        self._remaining: Dict[str, int] = {}
+        for task_id in unfinished:
+            count = 0
+            for dep in dict.fromkeys(self.tasks[task_id].dependencies or []):
+                if dep in self.completed:
+                    continue
+                if dep not in self.dependents:
+                    self.dangling.setdefault(task_id, []).append(dep)
+                    continue
+                self.dependents[dep].append(task_id)
+                count += 1
+            self._remaining[task_id] = count
+
+        # Kahn's algorithm: whatever is never reached waits on a cycle
+        remaining = dict(self._remaining)
+        order = [task_id for task_id in unfinished if remaining[task_id] == 0]
+        for task_id in order:
+            for dependent in self.dependents[task_id]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    order.append(dependent)
+        reached = set(order)
+        self.blocked: List[str] = [task_id for task_id in unfinished if task_id not in reached]
+        self.cycles: List[List[str]] = self._find_cycles()
+
+        # Critical-path priority, computed from the sinks back
+        self.cost = cost
+        estimate = cost or (lambda task: 1.0)
+        self.priority: Dict[str, float] = {}
+        for task_id in reversed(order):
+            downstream = (self.priority[d] for d in self.dependents[task_id] if d in self.priority)
+            self.priority[task_id] = estimate(self.tasks[task_id]) + max(downstream, default=0.0)
+        self._key = {task_id: (-self.priority[task_id], rank[task_id]) for task_id in order}
+
+        self._ready = [(*self._key[task_id], task_id) for task_id in order
+                       if self._remaining[task_id] == 0 and self.tasks[task_id].status == "pending"]
+        heapq.heapify(self._ready)
+
+    def _find_cycles(self) -> List[List[str]]:
+        """One cycle per blocked component (every blocked task waits on another blocked task)"""
+        blocked = set(self.blocked)
+        cycles, seen = [], set()
+        for start in self.blocked:
+            path, index = [], {}
+            node = start
+            while node not in index and node not in seen:
+                index[node] = len(path)
+                path.append(node)
+                node = next(dep for dep in self.tasks[node].dependencies if dep in blocked)
+            if node in index:
+                cycles.append(path[index[node]:])
+            seen.update(path)
+        return cycles
+
+    def covers(self, tasks: Iterable[CalculationTask]) -> bool:
+        """Whether the graph was built from exactly these task objects (none added or replaced)"""
+        return all(self.tasks.get(task.task_id) is task for task in tasks)
+
+    def ready(self) -> List[CalculationTask]:
+        """All pending tasks whose dependencies are finished, highest priority first"""
+        return [self.tasks[task_id] for *_, task_id in sorted(self._ready)
+                if task_id not in self.completed and self.tasks[task_id].status == "pending"]
+
+    def pop(self) -> Optional[CalculationTask]:
+        """Remove and return the highest-priority ready task (None when nothing can run)"""
+        while self._ready:
+            *_, task_id = heapq.heappop(self._ready)
+            if task_id not in self.completed and self.tasks[task_id].status == "pending":
+                return self.tasks[task_id]
+        return None
+
+    def complete(self, task_id: str) -> List[str]:
+        """Mark a task finished and return the ids of tasks that became ready"""
+        if task_id in self.completed:
+            return []
+        self.completed.add(task_id)
+        newly_ready = []
+        for dependent in self.dependents.get(task_id, ()):
+            self._remaining[dependent] -= 1
+            if self._remaining[dependent] == 0 and dependent in self._key:
+                heapq.heappush(self._ready, (*self._key[dependent], dependent))
+                newly_ready.append(dependent)
+        return newly_ready
+
+    def execution_order(self) -> List[str]:
+        """Sequential critical-path-first schedule of all unfinished, unblocked tasks"""
+        remaining = dict(self._remaining)
+        heap = [(*key, task_id) for task_id, key in self._key.items() if remaining[task_id] == 0]
+        heapq.heapify(heap)
+        order = []
+        while heap:
+            *_, task_id = heapq.heappop(heap)
+            order.append(task_id)
+            for dependent in self.dependents[task_id]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    heapq.heappush(heap, (*self._key[dependent], dependent))
+        return order
+
+    def critical_path(self) -> List[str]:
+        """The most expensive chain of unfinished tasks"""
+        roots = [task_id for task_id in self._key if self._remaining[task_id] == 0]
+        if not roots:
+            return []
+        path = [min(roots, key=self._key.__getitem__)]
+        while True:
+            downstream = [d for d in self.dependents[path[-1]] if d in self._key]
+            if not downstream:
+                return path
+            path.append(min(downstream, key=self._key.__getitem__))
+
+
 # Calculation queue class definition
 class CalculationQueue(BaseModel):
     tasks: List[CalculationTask] = Field(description="List of all calculation tasks", default_factory=list)
@@ -69,12 +220,30 @@ class CalculationQueue(BaseModel):
     completed_task_ids: List[str] = Field(description="List of completed task IDs", default_factory=list)
     dependency_graph: Optional[DependencyGraph] = Field(description="Dependency graph for calculation tasks", default=None)
     
-    def get_next_task(self) -> Optional[CalculationTask]:
-        """Get the next executable task"""
+    _task_graph: Optional[TaskGraph] = PrivateAttr(default=None)
+
+    def task_graph(self, cost: Optional[TaskCost] = None) -> TaskGraph:
+        """
+        Index the queue for dependency scheduling
+
+        The graph is cached on the queue and kept current incrementally (newly completed
+        tasks go through TaskGraph.complete); it is rebuilt when tasks were added or replaced.
+        """
+        graph = self._task_graph
+        if graph is None or graph.cost is not cost or not graph.covers(self.tasks):
+            graph = self._task_graph = TaskGraph(self.tasks, self.completed_task_ids, cost)
+            return graph
+        for task_id in self.completed_task_ids:
+            graph.complete(task_id)
         for task in self.tasks:
-            if task.status == "pending" and all(dep in self.completed_task_ids for dep in task.dependencies):
-                return task
-        return None
+            if task.status == "completed":
+                graph.complete(task.task_id)
+        return graph
+
+    def get_next_task(self, cost: Optional[TaskCost] = None) -> Optional[CalculationTask]:
+        """Get the next executable task (critical path first) without claiming it"""
+        ready = self.task_graph(cost).ready()
+        return ready[0] if ready else None
 
 # Calculation task creation model
 class CalculationTaskCreation(BaseModel):
@@ -196,10 +365,14 @@ class GeometryState(BaseModel):
 
     # Add construction plan field
     construction_plan: Optional[ConstructionPlan] = Field(default=None, description="Geometric construction plan")
+    # Draft plan from the planner on the calculation path, used to select commands while calculations run
+    draft_construction_plan: Optional[ConstructionPlan] = Field(default=None, description="Draft construction plan before merging")
+    preselected_commands: Optional[Dict[str, Dict[str, Any]]] = Field(default=None, description="Commands selected for draft steps, keyed by step signature")
     
     # Add command regeneration-related fields
     regenerated_commands: Optional[List[str]] = Field(default=None, description="Regenerated GeoGebra commands")
     command_regeneration_attempts: int = Field(default=0, description="Number of attempts to regenerate GeoGebra commands")
+    repair_scope: Optional[List[int]] = Field(default=None, description="Indices of patched commands and their dependents to re-validate (None validates all commands)")
 
     # Add geometric constraints
     geometric_constraints: Optional[Dict[str, Any]] = Field(description="Geometric constraints", default=None)
@@ -11,6 +11,7 @@ from models.state_models import ConstructionPlan
 class CommandAnalysis(BaseModel):
     command: str = Field(description="GeoGebra command")
     analysis: str = Field(description="Analysis of the command")
+    is_correct: Optional[bool] = Field(default=None, description="Verdict for this command (false only when the command itself has an error)")
 
 class ValidationResult(BaseModel):
     """검증 결과 모델"""
@@ -26,4 +27,15 @@ class RegenerationResult(BaseModel):
     """명령어 재생성 결과 모델"""
     analysis: str = Field(description="Analysis of the reasons for validation failure (in Markdown format, detailed analysis)")
     fixed_issues: List[str] = Field(default_factory=list, description="Fixed issues extracted from the validation results")
-    commands: List[str] = Field(default_factory=list, description="GeoGebra commands extracted from the validation results") 
\ No newline at end of file
+    commands: List[str] = Field(default_factory=list, description="GeoGebra commands extracted from the validation results") 
+
+class CommandPatch(BaseModel):
+    """명령어 한 줄 패치"""
+    line: int = Field(description="Line number (as given) of the command to replace")
+    commands: List[str] = Field(default_factory=list, description="Replacement GeoGebra commands for this line, in order (an empty list deletes the line)")
+
+class RepairResult(BaseModel):
+    """명령어 부분 수리 결과 모델"""
+    analysis: str = Field(description="Brief analysis of why each listed line failed validation")
+    fixed_issues: List[str] = Field(default_factory=list, description="Issues fixed by the patches")
+    patches: List[CommandPatch] = Field(default_factory=list, description="One patch per listed line that needs changes")
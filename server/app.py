@@ -8,10 +8,24 @@ import os
 from dotenv import load_dotenv
 import socketio
 from schemas import *
+from serialization import make_json_serializable
 # from config import MODEL_PATH
 import asyncio
 import uuid
 from main import solve_geometry_problem
+from config import EXECUTION_MODE, MAX_QUEUED_SOLVES, CALCULATION_AGENT_PREBUILD
+from utils.concurrency import SolveAdmission, AdmissionRejected, get_stage_stats
+from utils.llm_scheduler import get_scheduler_stats, priority_scope, PRIORITY_INTERACTIVE
+from geo_prompts.assembly import prompt_cache_report
+from utils.structured_output import get_structured_output_stats
+from agents.calculation.agent_factory import prebuild_calculation_agents
+from agents.geogebra_command_retrieval_agent import get_prefetch_stats
+from utils.tracing import trace_scope, get_trace, summarize_trace
+from utils.checkpointing import close_checkpointer
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 
 # .env 파일에서 환경 변수 로드
 load_dotenv()
@@ -32,9 +46,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 작업 상태 저장소
+# 작업 상태 저장소 (inline 모드)
 tasks = {}
 
+# 문제 풀이 입장 제어 (inline 모드)
+solve_admission = SolveAdmission()
+
+# 작업 큐 (queue 모드) - 실제 실행은 worker.py 프로세스가 담당
+job_queue = None
+if EXECUTION_MODE == "queue":
+    from job_queue import JobQueue
+    job_queue = JobQueue()
+
+# 큐 이벤트 relay 폴링 간격 (초)
+RELAY_POLL_INTERVAL = 0.2
+
 # Socket.IO 설정 - 수정된 버전
 sio = socketio.AsyncServer(
     async_mode='asgi', 
@@ -54,51 +80,148 @@ app.mount('/socket.io', socket_app)  # /socket.io 경로에 마운트
 # 연결 이벤트 핸들러
 @sio.event
 async def connect(sid, environ):
-    print(f"Client connected: {sid}")
+    logger.info("Client connected: %s", sid)
 
 @sio.event
 async def disconnect(sid):
-    print(f"Client disconnected: {sid}")
+    logger.info("Client disconnected: %s", sid)
 
 # 서버 상태 확인 엔드포인트
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "model": 'MODEL_PATH'}
 
-# JSON 직렬화 가능한 객체로 변환하는 함수
-def make_json_serializable(obj):
-    """객체를 JSON 직렬화 가능한 형태로 변환"""
-    if obj is None:
-        return None
-    # ConstructionPlan 클래스 직접 처리
-    elif obj.__class__.__name__ == 'ConstructionPlan':
-        if hasattr(obj, 'to_dict') and callable(getattr(obj, 'to_dict')):
-            return obj.to_dict()
-    # 일반적인 객체 변환 방법 적용    
-    elif hasattr(obj, 'to_dict') and callable(getattr(obj, 'to_dict')):
-        return obj.to_dict()
-    elif hasattr(obj, 'model_dump') and callable(getattr(obj, 'model_dump')):
-        return obj.model_dump()
-    elif isinstance(obj, dict):
-        return {k: make_json_serializable(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [make_json_serializable(item) for item in obj]
-    # 기본 타입이 아닌 경우 변환 시도
-    elif not isinstance(obj, (str, int, float, bool)) and hasattr(obj, '__dict__'):
-        return make_json_serializable(obj.__dict__)
-    # 기본 타입으로 변환 시도
+# 동시성/대기 시간 지표 엔드포인트 (이 프로세스 기준)
+@app.get("/metrics")
+async def metrics():
+    data = {
+        "execution_mode": EXECUTION_MODE,
+        "stages": get_stage_stats(),
+        "llm_scheduler": get_scheduler_stats(),
+        "prompt_cache": prompt_cache_report(),
+        "structured_output": get_structured_output_stats(),
+        "retrieval_prefetch": get_prefetch_stats(),
+    }
+    if job_queue is not None:
+        data["job_queue_depth"] = await asyncio.to_thread(job_queue.queue_depth)
     else:
+        data["solve"] = solve_admission.snapshot()
+    return data
+
+# 진행 이벤트를 Socket.IO 로 전달하는 함수 (인라인 실행과 큐 relay 에서 공용)
+async def emit_progress(task_id: str, step: str, message: str, data: dict = None, delay: float = 0.2):
+    # LLM 토큰 이벤트: 지연 없이 전용 이벤트로만 전송
+    if step == "llm_token":
+        await sio.emit('llm_token', {
+            "task_id": task_id,
+            "type": "llm_token",
+            "node": data.get("node") if data else None,
+            "token": data.get("token") if data else ""
+        })
+        return
+    
+    # 에이전트 진행 상황 이벤트 발생
+    await sio.emit('agent_progress', {
+        "task_id": task_id,
+        "step": step,
+        "message": message,
+        "data": data
+    })
+    
+    # 특정 단계의 데이터 업데이트 (예: 파싱된 요소, GeoGebra 명령어, 설명 등)
+    if step == "state_update" and data:
+        await sio.emit('state_update', {
+            "task_id": task_id,
+            "type": "state_update",
+            "data": data
+        })
+    
+    # 전체 상태 업데이트 이벤트 처리
+    if step == "state_full_update" and data:
+        await sio.emit('state_full_update', {
+            "task_id": task_id,
+            "type": "state_full_update",
+            "node": data.get("node"),
+            "data": data.get("data")
+        })
+    
+    # 노드 완료/시작 이벤트
+    if step in ["node_start", "node_complete"]:
+        await sio.emit('node_update', {
+            "task_id": task_id,
+            "type": step,
+            "node": data.get("node") if data else None,
+            "message": message
+        })
+    
+    # 에러 이벤트
+    if step == "node_error":
+        await sio.emit('error_update', {
+            "task_id": task_id,
+            "type": "error",
+            "message": message,
+            "error": data.get("error") if data else None
+        })
+        
+    # LLM 호출 이벤트
+    if step in ["llm_start", "llm_complete"]:
+        await sio.emit('llm_update', {
+            "task_id": task_id,
+            "type": step,
+            "message": message
+        })
+        
+    # 약간의 지연을 두어 메시지가 순서대로 전송되도록 함
+    if delay:
+        await asyncio.sleep(delay)  # 0.1에서 0.2로 지연 시간 증가
+
+# 큐 모드: 워커가 기록한 진행 이벤트를 Socket.IO 로 전달
+async def relay_job_events():
+    last_event_id = await asyncio.to_thread(job_queue.last_event_id)
+    polls = 0
+    while True:
         try:
-            # JSON으로 직렬화 가능한지 테스트
-            import json
-            json.dumps(obj)
-            return obj
-        except (TypeError, OverflowError):
-            # 직렬화 불가능한 경우 문자열로 변환
-            return str(obj)
+            events = await asyncio.to_thread(job_queue.fetch_events, last_event_id)
+            for event in events:
+                last_event_id = event["id"]
+                data = event["data"]
+                if event["event"] == "progress":
+                    await emit_progress(event["job_id"], data["step"], data["message"], data.get("data"), delay=0)
+                else:
+                    await sio.emit(event["event"], {"task_id": event["job_id"], **data})
+            polls += 1
+            # 주기적으로 오래된 이벤트 정리
+            if polls % 3000 == 0:
+                await asyncio.to_thread(job_queue.prune_events)
+        except Exception as e:
+            logger.error("이벤트 relay 오류: %s", e)
+        await asyncio.sleep(RELAY_POLL_INTERVAL)
+
+@app.on_event("startup")
+async def start_job_event_relay():
+    if job_queue is not None:
+        asyncio.create_task(relay_job_events())
+
+@app.on_event("startup")
+async def prebuild_agents():
+    # 인라인 실행 모드에서는 첫 요청이 계산 에이전트 빌드 비용을 내지 않도록 미리 빌드
+    if job_queue is None and CALCULATION_AGENT_PREBUILD:
+        built = await asyncio.to_thread(prebuild_calculation_agents)
+        logger.info("계산 에이전트 미리 빌드 완료 (ms): %s", built)
+
+@app.on_event("shutdown")
+async def close_checkpoint_connection():
+    # 프로세스에서 공유하던 체크포인트 DB 연결 닫기
+    await close_checkpointer()
 
-# 비동기 작업 처리 함수
+# 비동기 작업 처리 함수 (입장 제어 슬롯을 얻은 뒤 실행)
 async def process_geometry_problem(task_id: str, user_query: str):
+    async with solve_admission.slot():
+        # API 요청은 대화형 우선순위로 LLM 스케줄러 대기열에 들어간다
+        with priority_scope(PRIORITY_INTERACTIVE):
+            await run_geometry_problem(task_id, user_query)
+
+async def run_geometry_problem(task_id: str, user_query: str):
     try:
         # 작업 상태 업데이트
         tasks[task_id]["status"] = "processing"
@@ -109,63 +232,11 @@ async def process_geometry_problem(task_id: str, user_query: str):
             # 데이터가 있으면 JSON 직렬화 가능하게 변환
             if data:
                 data = make_json_serializable(data)
-                
-            # 에이전트 진행 상황 이벤트 발생
-            await sio.emit('agent_progress', {
-                "task_id": task_id,
-                "step": step,
-                "message": message,
-                "data": data
-            })
-            
-            # 특정 단계의 데이터 업데이트 (예: 파싱된 요소, GeoGebra 명령어, 설명 등)
-            if step == "state_update" and data:
-                await sio.emit('state_update', {
-                    "task_id": task_id,
-                    "type": "state_update",
-                    "data": data
-                })
-            
-            # 전체 상태 업데이트 이벤트 처리
-            if step == "state_full_update" and data:
-                await sio.emit('state_full_update', {
-                    "task_id": task_id,
-                    "type": "state_full_update",
-                    "node": data.get("node"),
-                    "data": data.get("data")
-                })
-            
-            # 노드 완료/시작 이벤트
-            if step in ["node_start", "node_complete"]:
-                await sio.emit('node_update', {
-                    "task_id": task_id,
-                    "type": step,
-                    "node": data.get("node") if data else None,
-                    "message": message
-                })
-            
-            # 에러 이벤트
-            if step == "node_error":
-                await sio.emit('error_update', {
-                    "task_id": task_id,
-                    "type": "error",
-                    "message": message,
-                    "error": data.get("error") if data else None
-                })
-                
-            # LLM 호출 이벤트
-            if step in ["llm_start", "llm_complete"]:
-                await sio.emit('llm_update', {
-                    "task_id": task_id,
-                    "type": step,
-                    "message": message
-                })
-                
-            # 약간의 지연을 두어 메시지가 순서대로 전송되도록 함
-            await asyncio.sleep(0.2)  # 0.1에서 0.2로 지연 시간 증가
+            await emit_progress(task_id, step, message, data)
         
-        # 기하학 문제 해결 (콜백 함수 전달)
-        result = await solve_geometry_problem(user_query, progress_callback)
+        # 기하학 문제 해결 (콜백 함수 전달, 노드/LLM 호출을 task_id 로 추적)
+        with trace_scope(task_id, query=user_query):
+            result = await solve_geometry_problem(user_query, progress_callback, task_id=task_id)
         
         # 결과를 JSON 직렬화 가능한 형태로 변환
         serializable_result = make_json_serializable(result)
@@ -181,11 +252,11 @@ async def process_geometry_problem(task_id: str, user_query: str):
             "result": serializable_result
         })
         
-        print(f"작업 완료: {task_id}")
+        logger.info("작업 완료: %s", task_id)
         
     except GeneratorExit as ge:
         # GeneratorExit 예외 처리
-        print(f"GeneratorExit 예외 발생: {task_id}")
+        logger.warning("GeneratorExit 예외 발생: %s", task_id)
         # 작업 상태를 실패로 변경
         tasks[task_id]["status"] = "failed"
         tasks[task_id]["error"] = "비동기 스트림이 종료되었습니다. 연결 문제가 발생했을 수 있습니다."
@@ -198,7 +269,7 @@ async def process_geometry_problem(task_id: str, user_query: str):
                 "error": "비동기 스트림이 종료되었습니다. 연결 문제가 발생했을 수 있습니다."
             })
         except Exception:
-            print(f"사용자에게 에러 메시지를 보내는데 실패했습니다: {task_id}")
+            logger.error("사용자에게 에러 메시지를 보내는데 실패했습니다: %s", task_id)
             
     except Exception as e:
         # 오류 처리
@@ -213,7 +284,7 @@ async def process_geometry_problem(task_id: str, user_query: str):
             "error": error_message
         })
         
-        print(f"작업 실패: {task_id}, 오류: {error_message}")
+        logger.error("작업 실패: %s, 오류: %s", task_id, error_message)
 
 # 명령어 생성 API 엔드포인트 - 작업 ID 반환 및 비동기 처리
 @app.post("/generate-commands", response_model=TaskResponse)
@@ -225,6 +296,31 @@ async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
             if msg.role == "user":
                 user_query = msg.content
         
+        # 큐 모드: 작업을 큐에 넣고 워커 프로세스가 처리
+        if job_queue is not None:
+            # 0 이하이면 대기열 제한 없음
+            if MAX_QUEUED_SOLVES > 0:
+                queue_depth = await asyncio.to_thread(job_queue.queue_depth)
+                if queue_depth >= MAX_QUEUED_SOLVES:
+                    raise HTTPException(
+                        status_code=429,
+                        detail=f"Too many queued jobs ({queue_depth}/{MAX_QUEUED_SOLVES})",
+                        headers={"Retry-After": "5"},
+                    )
+            job = await asyncio.to_thread(
+                job_queue.enqueue,
+                {"query": user_query},
+                request.tenant_id or "default",
+                request.idempotency_key,
+            )
+            return {"task_id": job["id"], "status": job["status"]}
+        
+        # 입장 제어: 대기열이 가득 차면 즉시 429 반환
+        try:
+            solve_admission.reserve()
+        except AdmissionRejected as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+        
         # 작업 ID 생성
         task_id = str(uuid.uuid4())
         
@@ -242,13 +338,42 @@ async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
         # 작업 ID 반환
         return {"task_id": task_id, "status": "pending"}
             
+    except HTTPException:
+        raise
     except Exception as e:
-        print(e)
+        logger.error("명령어 생성 요청 처리 오류: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+# 요청별 추적 API: 노드별 시간, LLM 대기열 대기, 토큰, 캐시 적중, 재시도
+# (큐 모드에서는 워커가 JSONL 싱크에 기록한 추적을 읽는다)
+@app.get("/task/{task_id}/trace")
+async def get_task_trace(task_id: str, spans: bool = True):
+    trace = await asyncio.to_thread(get_trace, task_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    response = {
+        "task_id": task_id,
+        "duration_ms": trace.get("duration_ms"),
+        "summary": summarize_trace(trace),
+    }
+    if spans:
+        response["spans"] = trace["spans"]
+    return response
+
 # 작업 상태 확인 API
 @app.get("/task/{task_id}", response_model=TaskStatusResponse)
 async def get_task_status(task_id: str):
+    if job_queue is not None:
+        job = await asyncio.to_thread(job_queue.get, task_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        response = {"task_id": task_id, "status": job["status"]}
+        if job["status"] == "completed" and job["result"]:
+            response["result"] = job["result"]
+        if job["error"] and job["status"] in ("failed", "pending"):
+            response["error"] = job["error"]
+        return response
+    
     if task_id not in tasks:
         raise HTTPException(status_code=404, detail="Task not found")
     
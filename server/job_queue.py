@@ -0,0 +1,344 @@
+"""
+SQLite 기반 작업 큐
+
+웹 프로세스는 작업을 큐에 넣기만 하고, 별도의 워커 프로세스(worker.py)가
+작업을 가져가 solve_geometry_problem 을 실행한다. 진행 이벤트는 job_events
+테이블에 기록되며, 웹 프로세스의 relay 가 이를 Socket.IO 로 전달한다.
+
+- 여러 워커 프로세스가 같은 DB 파일을 공유 (WAL 모드, BEGIN IMMEDIATE 로 원자적 claim)
+- 테넌트별 동시 실행 수 제한
+- 임대(lease) 만료 시 재시도, 지수 백오프
+- idempotency key 로 중복 제출 방지
+"""
+
+import json
+import os
+import sqlite3
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from config import (
+    JOB_QUEUE_PATH,
+    JOB_MAX_ATTEMPTS,
+    JOB_LEASE_SECONDS,
+    JOB_RETRY_BACKOFF_SECONDS,
+    TENANT_MAX_CONCURRENT_JOBS,
+)
+
+# 작업 상태 (TaskStatusResponse.status 와 동일한 값 사용)
+STATUS_PENDING = "pending"
+STATUS_PROCESSING = "processing"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    tenant_id TEXT NOT NULL,
+    idempotency_key TEXT,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_until REAL,
+    locked_by TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (tenant_id, idempotency_key)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_available ON jobs (status, available_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_tenant_status ON jobs (tenant_id, status);
+CREATE TABLE IF NOT EXISTS job_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    event TEXT NOT NULL,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events (job_id);
+"""
+
+
+class JobQueue:
+    """SQLite 파일 하나를 공유하는 다중 프로세스 작업 큐"""
+
+    def __init__(
+        self,
+        path: str = JOB_QUEUE_PATH,
+        tenant_limit: int = TENANT_MAX_CONCURRENT_JOBS,
+        lease_seconds: int = JOB_LEASE_SECONDS,
+        retry_backoff: float = JOB_RETRY_BACKOFF_SECONDS,
+    ):
+        self.path = path
+        self.tenant_limit = tenant_limit
+        self.lease_seconds = lease_seconds
+        self.retry_backoff = retry_backoff
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # 호출마다 새 연결을 사용하므로 스레드/프로세스 간 공유 문제가 없다
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # ------------------------------------------------------------------
+    # 생산자 (웹 프로세스)
+    # ------------------------------------------------------------------
+    def enqueue(
+        self,
+        payload: Dict[str, Any],
+        tenant_id: str = "default",
+        idempotency_key: Optional[str] = None,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+    ) -> Dict[str, Any]:
+        """
+        작업을 큐에 추가
+
+        같은 테넌트에서 같은 idempotency_key 로 이미 제출된 작업이 있으면
+        새 작업을 만들지 않고 기존 작업을 반환한다.
+        """
+        now = time.time()
+        job_id = str(uuid.uuid4())
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if idempotency_key:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE tenant_id = ? AND idempotency_key = ?",
+                    (tenant_id, idempotency_key),
+                ).fetchone()
+                if row is not None:
+                    conn.execute("COMMIT")
+                    job = self._row_to_job(row)
+                    job["duplicate"] = True
+                    return job
+            conn.execute(
+                "INSERT INTO jobs (id, tenant_id, idempotency_key, payload, status, attempts, "
+                "max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?, ?)",
+                (job_id, tenant_id, idempotency_key, json.dumps(payload, ensure_ascii=False),
+                 STATUS_PENDING, max_attempts, now, now, now),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        job = self.get(job_id)
+        job["duplicate"] = False
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """작업 조회"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return self._row_to_job(row) if row is not None else None
+
+    def queue_depth(self, tenant_id: Optional[str] = None) -> int:
+        """대기 중인 작업 수"""
+        query = "SELECT COUNT(*) FROM jobs WHERE status = ?"
+        params: List[Any] = [STATUS_PENDING]
+        if tenant_id is not None:
+            query += " AND tenant_id = ?"
+            params.append(tenant_id)
+        conn = self._connect()
+        try:
+            return conn.execute(query, params).fetchone()[0]
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # 소비자 (워커 프로세스)
+    # ------------------------------------------------------------------
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        실행할 작업 하나를 가져와 processing 상태로 잠근다
+
+        - 임대가 만료된 processing 작업은 먼저 재시도 대기열로 돌린다
+        - 테넌트별 실행 중 작업 수가 tenant_limit 이상이면 해당 테넌트 작업은 건너뛴다
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._requeue_expired(conn, now)
+            row = conn.execute(
+                "SELECT j.* FROM jobs j "
+                "WHERE j.status = ? AND j.available_at <= ? "
+                "AND (SELECT COUNT(*) FROM jobs r WHERE r.tenant_id = j.tenant_id AND r.status = ?) < ? "
+                "ORDER BY j.available_at, j.created_at LIMIT 1",
+                (STATUS_PENDING, now, STATUS_PROCESSING, self.tenant_limit),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, locked_by = ?, "
+                "lease_until = ?, updated_at = ? WHERE id = ?",
+                (STATUS_PROCESSING, worker_id, now + self.lease_seconds, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return self.get(row["id"])
+
+    def heartbeat(self, job_id: str, worker_id: str) -> None:
+        """실행 중인 작업의 임대 연장"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? "
+                "WHERE id = ? AND locked_by = ? AND status = ?",
+                (now + self.lease_seconds, now, job_id, worker_id, STATUS_PROCESSING),
+            )
+        finally:
+            conn.close()
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """
+        작업 완료 처리 (임대를 가진 워커만)
+
+        Returns:
+            기록했으면 True, 임대가 만료되어 다른 워커가 가져갔거나 이미 끝난 작업이면 False
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = NULL, lease_until = NULL, "
+                "updated_at = ? WHERE id = ? AND locked_by = ? AND status = ?",
+                (STATUS_COMPLETED, json.dumps(result, ensure_ascii=False), now, job_id, worker_id,
+                 STATUS_PROCESSING),
+            )
+            return cursor.rowcount > 0
+        finally:
+            conn.close()
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> Optional[bool]:
+        """
+        작업 실패 처리 (임대를 가진 워커만)
+
+        Returns:
+            재시도가 예약되었으면 True, 최대 시도 횟수를 넘겨 최종 실패하면 False,
+            임대를 잃어 기록하지 않았으면 None
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND locked_by = ? AND status = ?",
+                (job_id, worker_id, STATUS_PROCESSING),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            retry = row["attempts"] < row["max_attempts"]
+            if retry:
+                delay = self.retry_backoff * (2 ** (row["attempts"] - 1))
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, available_at = ?, locked_by = NULL, "
+                    "lease_until = NULL, updated_at = ? WHERE id = ?",
+                    (STATUS_PENDING, error, now + delay, now, job_id),
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, lease_until = NULL, updated_at = ? WHERE id = ?",
+                    (STATUS_FAILED, error, now, job_id),
+                )
+            conn.execute("COMMIT")
+            return retry
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _requeue_expired(self, conn: sqlite3.Connection, now: float) -> None:
+        """임대가 만료된(워커가 죽은) 작업을 재시도 대기열 또는 실패로 전환"""
+        conn.execute(
+            "UPDATE jobs SET status = ?, locked_by = NULL, lease_until = NULL, updated_at = ?, "
+            "error = '워커 임대 만료' WHERE status = ? AND lease_until < ? AND attempts < max_attempts",
+            (STATUS_PENDING, now, STATUS_PROCESSING, now),
+        )
+        conn.execute(
+            "UPDATE jobs SET status = ?, lease_until = NULL, updated_at = ?, "
+            "error = '워커 임대 만료 (최대 시도 횟수 초과)' WHERE status = ? AND lease_until < ?",
+            (STATUS_FAILED, now, STATUS_PROCESSING, now),
+        )
+
+    # ------------------------------------------------------------------
+    # 진행 이벤트
+    # ------------------------------------------------------------------
+    def publish_event(self, job_id: str, event: str, data: Dict[str, Any]) -> None:
+        """워커에서 진행 이벤트 기록"""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT INTO job_events (job_id, event, data, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, event, json.dumps(data, ensure_ascii=False, default=str), time.time()),
+            )
+        finally:
+            conn.close()
+
+    def fetch_events(self, after_id: int = 0, limit: int = 500) -> List[Dict[str, Any]]:
+        """after_id 이후의 진행 이벤트 조회 (relay 용)"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT * FROM job_events WHERE id > ? ORDER BY id LIMIT ?",
+                (after_id, limit),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [
+            {"id": row["id"], "job_id": row["job_id"], "event": row["event"], "data": json.loads(row["data"])}
+            for row in rows
+        ]
+
+    def last_event_id(self) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COALESCE(MAX(id), 0) FROM job_events").fetchone()[0]
+        finally:
+            conn.close()
+
+    def prune_events(self, older_than_seconds: float = 3600) -> int:
+        """전달이 끝난 오래된 진행 이벤트 삭제"""
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "DELETE FROM job_events WHERE created_at < ?",
+                (time.time() - older_than_seconds,),
+            )
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"]) if job.get("payload") else {}
+        job["result"] = json.loads(job["result"]) if job.get("result") else None
+        return job
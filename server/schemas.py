@@ -22,6 +22,9 @@ class ChatRequest(BaseModel):
     temperature: Optional[float] = 0.7
     top_p: Optional[float] = 0.9
     max_tokens: Optional[int] = 2048
+    # 큐 모드 전용: 테넌트별 동시 실행 제한과 중복 제출 방지에 사용
+    tenant_id: Optional[str] = None
+    idempotency_key: Optional[str] = None
 
 # 응답 모델 정의
 class SearchResult(BaseModel):
@@ -119,6 +122,13 @@ class SystemErrorEvent(BaseModel):
     message: str
     error: Optional[str] = None
 
+class LLMTokenEvent(BaseModel):
+    """LLM 토큰 스트리밍 이벤트"""
+    task_id: str
+    type: str = "llm_token"
+    node: str
+    token: str
+
 # 모든 이벤트 타입을 포함하는 유니온 타입
 StreamEvent = Union[
     NodeStartEvent, 
@@ -127,5 +137,6 @@ StreamEvent = Union[
     StateUpdateEvent, 
     StateFullUpdateEvent,
     SystemEvent,
-    SystemErrorEvent
+    SystemErrorEvent,
+    LLMTokenEvent
 ]
\ No newline at end of file
@@ -0,0 +1,33 @@
+import json
+
+
+# JSON 직렬화 가능한 객체로 변환하는 함수
+def make_json_serializable(obj):
+    """객체를 JSON 직렬화 가능한 형태로 변환"""
+    if obj is None:
+        return None
+    # ConstructionPlan 클래스 직접 처리
+    elif obj.__class__.__name__ == 'ConstructionPlan':
+        if hasattr(obj, 'to_dict') and callable(getattr(obj, 'to_dict')):
+            return obj.to_dict()
+    # 일반적인 객체 변환 방법 적용    
+    elif hasattr(obj, 'to_dict') and callable(getattr(obj, 'to_dict')):
+        return obj.to_dict()
+    elif hasattr(obj, 'model_dump') and callable(getattr(obj, 'model_dump')):
+        return obj.model_dump()
+    elif isinstance(obj, dict):
+        return {k: make_json_serializable(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [make_json_serializable(item) for item in obj]
+    # 기본 타입이 아닌 경우 변환 시도
+    elif not isinstance(obj, (str, int, float, bool)) and hasattr(obj, '__dict__'):
+        return make_json_serializable(obj.__dict__)
+    # 기본 타입으로 변환 시도
+    else:
+        try:
+            # JSON으로 직렬화 가능한지 테스트
+            json.dumps(obj)
+            return obj
+        except (TypeError, OverflowError):
+            # 직렬화 불가능한 경우 문자열로 변환
+            return str(obj)
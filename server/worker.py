@@ -0,0 +1,195 @@
+"""
+작업 큐 워커
+
+EXECUTION_MODE=queue 일 때 웹 서버(app.py)는 작업을 큐에 넣기만 하고,
+이 워커 프로세스들이 작업을 가져가 solve_geometry_problem 을 실행한다.
+진행 상황은 큐의 job_events 테이블에 기록되고 웹 서버가 Socket.IO 로 전달한다.
+
+사용법:
+    python worker.py --workers 4
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import asyncio
+import multiprocessing
+import signal
+import socket
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+from job_queue import JobQueue
+from serialization import make_json_serializable
+from utils.llm_scheduler import priority_scope, PRIORITY_DEFAULT
+from utils.tracing import trace_scope
+from config import CALCULATION_AGENT_PREBUILD
+from agents.calculation.agent_factory import prebuild_calculation_agents
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# .env 파일에서 환경 변수 로드
+load_dotenv()
+
+# 작업이 없을 때 큐 폴링 간격 (초)
+POLL_INTERVAL = 1.0
+# LLM 토큰 이벤트는 모아서 기록 (이 간격 또는 글자 수를 넘으면, 다른 이벤트가 오면 바로)
+TOKEN_FLUSH_SECONDS = 0.25
+TOKEN_FLUSH_CHARS = 200
+
+_stop = False
+
+
+def _handle_stop(signum, frame):
+    global _stop
+    _stop = True
+
+
+async def run_job(queue: JobQueue, job: Dict[str, Any], worker_id: str) -> None:
+    """큐에서 가져온 작업 하나를 실행"""
+    # main 모듈은 무거운 의존성(LangGraph, 임베딩 모델 등)을 불러오므로 워커 안에서만 임포트
+    from main import solve_geometry_problem
+
+    job_id = job["id"]
+    user_query = job["payload"].get("query", "")
+
+    queue.publish_event(job_id, "task_update", {"status": "processing", "attempt": job["attempts"]})
+
+    # 토큰 이벤트마다 SQLite 에 쓰지 않도록 같은 노드의 토큰을 모아 한 이벤트로 기록
+    pending_tokens: Dict[str, Any] = {"node": None, "parts": [], "size": 0, "since": 0.0}
+
+    def flush_tokens():
+        if not pending_tokens["parts"]:
+            return
+        node = pending_tokens["node"]
+        queue.publish_event(job_id, "progress", {
+            "step": "llm_token",
+            "message": f"{node} 토큰",
+            "data": {"node": node, "token": "".join(pending_tokens["parts"])},
+        })
+        pending_tokens.update(parts=[], size=0)
+
+    async def progress_callback(step: str, message: str, data: Optional[dict] = None):
+        if step == "llm_token" and data:
+            now = time.monotonic()
+            if pending_tokens["node"] != data.get("node"):
+                flush_tokens()
+                pending_tokens["node"] = data.get("node")
+            if not pending_tokens["parts"]:
+                pending_tokens["since"] = now
+            token = str(data.get("token") or "")
+            pending_tokens["parts"].append(token)
+            pending_tokens["size"] += len(token)
+            if pending_tokens["size"] >= TOKEN_FLUSH_CHARS or now - pending_tokens["since"] >= TOKEN_FLUSH_SECONDS:
+                flush_tokens()
+            return
+        flush_tokens()
+        if data:
+            data = make_json_serializable(data)
+        queue.publish_event(job_id, "progress", {"step": step, "message": message, "data": data})
+
+    # 진행 이벤트가 없는 긴 LLM 호출/노드 중에도 임대가 만료되지 않도록 작업 내내 주기적으로 연장
+    async def keep_alive():
+        interval = max(queue.lease_seconds / 3, 1.0)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(queue.heartbeat, job_id, worker_id)
+            except Exception as e:
+                logger.warning("[%s] 임대 연장 실패: %s, 오류: %s", worker_id, job_id, e)
+
+    heartbeat_task = asyncio.create_task(keep_alive())
+    try:
+        with trace_scope(job_id, query=user_query, worker_id=worker_id, attempt=job["attempts"]):
+            # job_id 를 체크포인트 스레드로 사용: 재시도/임대 만료 후 재실행은 마지막으로 끝난 노드부터 이어서 실행
+            result = await solve_geometry_problem(user_query, progress_callback, task_id=job_id)
+        flush_tokens()
+        serializable_result = make_json_serializable(result)
+        if not queue.complete(job_id, worker_id, serializable_result):
+            logger.warning("[%s] 임대를 잃어 결과를 기록하지 않음: %s", worker_id, job_id)
+            return
+        queue.publish_event(job_id, "task_completed", {"status": "completed", "result": serializable_result})
+        logger.info("[%s] 작업 완료: %s", worker_id, job_id)
+    except Exception as e:
+        error_message = str(e)
+        will_retry = queue.fail(job_id, worker_id, error_message)
+        if will_retry is None:
+            logger.warning("[%s] 임대를 잃어 실패를 기록하지 않음: %s, 오류: %s", worker_id, job_id, error_message)
+        elif will_retry:
+            queue.publish_event(job_id, "task_update", {"status": "pending", "error": error_message, "retry": True})
+            logger.warning("[%s] 작업 실패, 재시도 예정: %s, 오류: %s", worker_id, job_id, error_message)
+        else:
+            queue.publish_event(job_id, "task_error", {"status": "failed", "error": error_message})
+            logger.error("[%s] 작업 실패: %s, 오류: %s", worker_id, job_id, error_message)
+    finally:
+        heartbeat_task.cancel()
+        try:
+            await heartbeat_task
+        except asyncio.CancelledError:
+            pass
+
+
+def worker_loop(worker_index: int = 0) -> None:
+    """작업을 하나씩 가져와 실행하는 워커 루프 (프로세스당 하나)"""
+    signal.signal(signal.SIGTERM, _handle_stop)
+    signal.signal(signal.SIGINT, _handle_stop)
+
+    worker_id = f"{socket.gethostname()}-{os.getpid()}-{worker_index}-{uuid.uuid4().hex[:6]}"
+    queue = JobQueue()
+    logger.info("[%s] 워커 시작 (queue: %s)", worker_id, queue.path)
+    if CALCULATION_AGENT_PREBUILD:
+        logger.info("[%s] 계산 에이전트 미리 빌드 완료 (ms): %s", worker_id, prebuild_calculation_agents())
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        while not _stop:
+            job = queue.claim(worker_id)
+            if job is None:
+                loop.run_until_complete(asyncio.sleep(POLL_INTERVAL))
+                continue
+            logger.info("[%s] 작업 시작: %s (tenant: %s, attempt: %s)",
+                        worker_id, job['id'], job['tenant_id'], job['attempts'])
+            # 큐 작업은 응답을 기다리는 interactive 요청보다 뒤에 (payload 로 bulk 지정 가능)
+            with priority_scope(max(int(job["payload"].get("priority", PRIORITY_DEFAULT)), PRIORITY_DEFAULT)):
+                loop.run_until_complete(run_job(queue, job, worker_id))
+    finally:
+        # 작업들이 함께 쓰던 체크포인트 DB 연결 닫기
+        from utils.checkpointing import close_checkpointer
+        loop.run_until_complete(close_checkpointer())
+        loop.close()
+        logger.info("[%s] 워커 종료", worker_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GeoGebra 명령어 생성 작업 큐 워커")
+    parser.add_argument("--workers", type=int, default=1, help="실행할 워커 프로세스 수")
+    args = parser.parse_args()
+
+    if args.workers <= 1:
+        worker_loop(0)
+        return
+
+    processes = [
+        multiprocessing.Process(target=worker_loop, args=(i,), daemon=False)
+        for i in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,8 @@ setup(
         "numpy",
         "python-dotenv",
         "sqlalchemy-utils",
+        "aiosqlite",
+        "langgraph-checkpoint-sqlite",
     ],
     python_requires='>=3.6',
 ) 
\ No newline at end of file
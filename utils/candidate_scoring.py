@@ -0,0 +1,95 @@
+"""
+명령어 후보 채점 모듈
+
+명령어 생성 에이전트가 후보를 여러 개 만들 때(COMMAND_CANDIDATES > 1) LLM 검증 없이 로컬에서
+각 후보를 채점해 가장 좋은 후보를 고릅니다.
+
+- 구문: 로컬 구문 검증(geogebra_syntax)의 오류 수 (알 수 없는 명령어, 인자 개수, 괄호 불균형 등)
+- 참조: 정의되지 않은 객체, 정의 전 사용, 순환 정의 오류 수
+- 수치: 작도를 실행해(geogebra_evaluator) 실행 오류 수와 문제 조건 통과/실패/판정 불가 수
+
+순위는 (명령어 있음, 확정 통과, 구문 오류, 참조 오류, 실행 오류, 실패 조건, 판정 불가 조건, 통과 조건,
+지원하지 않는 명령어, 경고) 순의 사전식 비교이며, 같으면 먼저 나온 후보를 고릅니다.
+확정 통과는 수치 검증을 통과하고 문제의 모든 조건과 객체를 검사한(covered) 경우로, 이런 후보는
+검증 에이전트에서도 LLM 없이 통과하므로 더 생성하지 않습니다. 조건 일부만 검사한 통과는 순위에 쓰지 않습니다.
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from utils.geogebra_evaluator import verify_construction
+from utils.geogebra_syntax import validate_geogebra_commands
+
+REFERENCE_CODES = {"undefined_reference", "use_before_definition", "circular_definition"}
+
+
+class CandidateScore(NamedTuple):
+    """명령어 후보 하나의 로컬 검증 결과"""
+    index: int
+    command_count: int
+    syntax_errors: int
+    reference_errors: int
+    evaluation_errors: int
+    failed_checks: int
+    passed_checks: int
+    unresolved_checks: int
+    unsupported: int
+    warnings: int
+    verified: bool
+    covered: bool
+
+    @property
+    def confirmed(self) -> bool:
+        """모든 조건과 객체를 검사한 수치 검증 통과"""
+        return self.verified and self.covered
+
+    @property
+    def rank(self) -> tuple:
+        """클수록 좋은 정렬 키"""
+        return (self.command_count > 0, self.confirmed, -self.syntax_errors, -self.reference_errors,
+                -self.evaluation_errors, -self.failed_checks, -self.unresolved_checks, self.passed_checks,
+                -self.unsupported, -self.warnings)
+
+    def describe(self) -> str:
+        return (f"candidate {self.index + 1}: {self.command_count} commands, verified={self.verified}, "
+                f"covered={self.covered}, syntax={self.syntax_errors}, references={self.reference_errors}, "
+                f"evaluation={self.evaluation_errors}, checks passed/failed/unresolved="
+                f"{self.passed_checks}/{self.failed_checks}/{self.unresolved_checks}")
+
+
+def score_candidate(index: int, commands: List[Any], parsed_elements: Optional[Dict[str, Any]]) -> CandidateScore:
+    """
+    후보 하나를 로컬에서 채점
+
+    Args:
+        index: 후보 번호 (0부터, 동점일 때 앞선 후보 우선)
+        commands: 후보 명령어 목록
+        parsed_elements: 수치 조건을 뽑을 파싱 결과
+
+    Returns:
+        CandidateScore
+    """
+    if not commands:
+        return CandidateScore(index, 0, 0, 0, 0, 0, 0, 0, 0, 0, False, False)
+    report = validate_geogebra_commands(commands)
+    errors = [issue for issue in report["issues"] if issue["severity"] == "error"]
+    reference_errors = sum(1 for issue in errors if issue["code"] in REFERENCE_CODES)
+    numeric = verify_construction(commands, parsed_elements)
+    return CandidateScore(
+        index=index,
+        command_count=len(report["command_by_command_analysis"]),
+        syntax_errors=len(errors) - reference_errors,
+        reference_errors=reference_errors,
+        evaluation_errors=len(numeric["errors"]),
+        failed_checks=len(numeric["failed"]),
+        passed_checks=len(numeric["checks"]) - len(numeric["failed"]) - len(numeric["unresolved"]),
+        unresolved_checks=len(numeric["unresolved"]),
+        unsupported=len(numeric["unsupported"]),
+        warnings=len(report["warnings"]),
+        verified=report["is_valid"] and numeric["verified"],
+        covered=numeric["covered"],
+    )
+
+
+def best_candidate(scores: List[CandidateScore]) -> CandidateScore:
+    """순위가 가장 높은 후보 (동점이면 앞선 후보)"""
+    return max(scores, key=lambda score: (score.rank, -score.index))
@@ -0,0 +1,235 @@
+"""
+그래프 체크포인트 모듈
+
+LangGraph 체크포인터로 노드(슈퍼스텝)가 끝날 때마다 상태를 저장합니다. 스레드 ID 는 요청의
+task_id(큐 모드에서는 job_id)이므로 스트림 중단, 재연결, 워커 재시도, 서버 재시작 뒤에 같은 ID 로
+다시 실행하면 처음부터가 아니라 마지막으로 끝난 노드 다음부터 이어서 실행하고,
+이미 끝난 풀이는 LLM 호출 없이 저장된 최종 상태를 돌려줍니다.
+
+- get_checkpointer(): 설정된 백엔드의 체크포인터 (프로세스당 하나를 열어 재사용, 꺼져 있으면 None)
+- close_checkpointer(): 공유 체크포인터 연결 닫기 (서버/워커 종료 시)
+- solve_config(thread_id): 그래프 실행 config (recursion_limit + thread_id)
+- resume_point(graph, config, initial_state): 새 실행 / 이어서 실행 / 이미 끝난 실행 판단
+- finish_thread(graph, config, keep): 끝난 스레드를 최종 체크포인트 하나로 압축(또는 삭제)하고
+  주기적으로 보관 기간이 지난 스레드 정리
+
+CHECKPOINT_BACKEND: sqlite(기본, langgraph-checkpoint-sqlite) | postgres(langgraph-checkpoint-postgres)
+| memory(프로세스 안에서만 유지) | none. 선택 패키지가 없으면 경고 후 memory 로 동작합니다.
+저장소는 이 서비스만 쓰는 내부 DB 이므로 msgpack 으로 표현할 수 없는 상태 값은 pickle 로 저장합니다.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from config import (
+    CHECKPOINT_BACKEND,
+    CHECKPOINT_SQLITE_PATH,
+    CHECKPOINT_POSTGRES_URL,
+    CHECKPOINT_RETENTION_SECONDS,
+    CHECKPOINT_SWEEP_INTERVAL_SECONDS,
+    CHECKPOINT_COMPACT_ON_COMPLETE,
+)
+from utils.logger import get_logger
+
+try:
+    import aiosqlite
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+except ImportError:  # langgraph-checkpoint-sqlite 는 선택 의존성
+    AsyncSqliteSaver = None
+
+try:
+    from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+except ImportError:  # langgraph-checkpoint-postgres 는 선택 의존성
+    AsyncPostgresSaver = None
+
+logger = get_logger(__name__)
+
+RECURSION_LIMIT = 30
+
+_memory_saver: Optional[InMemorySaver] = None
+_shared_saver: Optional[BaseCheckpointSaver] = None
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+_shared_stack: Optional[AsyncExitStack] = None
+_open_lock: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Lock]] = None
+_last_sweep = 0.0
+
+
+class ResumePoint(NamedTuple):
+    """그래프를 어디서부터 실행할지"""
+    input: Any                                  # 그래프 입력 (이어서 실행하면 None)
+    next_nodes: Tuple[str, ...]                 # 이어서 실행할 노드 (새 실행이면 빈 튜플)
+    finished_state: Optional[Dict[str, Any]]    # 이미 끝난 실행의 최종 상태 (아니면 None)
+
+
+def _serde() -> JsonPlusSerializer:
+    return JsonPlusSerializer(pickle_fallback=True)
+
+
+def _memory() -> InMemorySaver:
+    global _memory_saver
+    if _memory_saver is None:
+        _memory_saver = InMemorySaver(serde=_serde())
+    return _memory_saver
+
+
+async def get_checkpointer() -> Optional[BaseCheckpointSaver]:
+    """
+    설정된 백엔드의 체크포인터 (프로세스당 하나)
+
+    SQLite/Postgres 연결은 처음 호출할 때 한 번 열고 이후 풀이들이 함께 쓴다 (세이버가 연결 단위
+    잠금으로 동시 호출을 직렬화). 연결은 연 이벤트 루프에 묶이므로 루프가 바뀌면 다시 연다.
+    memory 체크포인터는 프로세스 안에서 공유한다.
+    """
+    global _open_lock
+    if CHECKPOINT_BACKEND == "none":
+        return None
+    loop = asyncio.get_running_loop()
+    if _shared_saver is not None and _shared_loop is loop:
+        return _shared_saver
+    if _open_lock is None or _open_lock[0] is not loop:
+        _open_lock = (loop, asyncio.Lock())
+    async with _open_lock[1]:
+        if _shared_saver is None or _shared_loop is not loop:
+            await _open_shared(loop)
+    return _shared_saver
+
+
+async def _open_shared(loop: asyncio.AbstractEventLoop) -> None:
+    global _shared_saver, _shared_loop, _shared_stack
+    # 이전 루프의 연결은 그 루프와 함께 버려진다
+    _shared_saver, _shared_loop, _shared_stack = None, loop, AsyncExitStack()
+    backend = CHECKPOINT_BACKEND
+
+    if backend == "sqlite" and AsyncSqliteSaver is not None:
+        directory = os.path.dirname(CHECKPOINT_SQLITE_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = await _shared_stack.enter_async_context(aiosqlite.connect(CHECKPOINT_SQLITE_PATH, timeout=30))
+        saver = AsyncSqliteSaver(conn, serde=_serde())
+        await saver.setup()  # 테이블 생성 + WAL 모드 (여러 워커 프로세스가 같은 파일 공유)
+        _shared_saver = saver
+        return
+
+    if backend == "postgres" and AsyncPostgresSaver is not None and CHECKPOINT_POSTGRES_URL:
+        saver = await _shared_stack.enter_async_context(
+            AsyncPostgresSaver.from_conn_string(CHECKPOINT_POSTGRES_URL, serde=_serde()))
+        await saver.setup()  # 마이그레이션은 프로세스당 한 번
+        _shared_saver = saver
+        return
+
+    if backend != "memory":
+        logger.warning("Checkpoint backend '%s' is unavailable (missing package or URL); "
+                       "checkpoints are kept in memory only", backend)
+    _shared_saver = _memory()
+
+
+async def close_checkpointer() -> None:
+    """공유 체크포인터 연결을 닫는다 (다음 get_checkpointer 호출은 새로 연다)"""
+    global _shared_saver, _shared_loop, _shared_stack
+    stack = _shared_stack
+    _shared_saver, _shared_loop, _shared_stack = None, None, None
+    if stack is not None:
+        await stack.aclose()
+
+
+def solve_config(thread_id: str) -> Dict[str, Any]:
+    """그래프 실행 config (체크포인터가 없으면 thread_id 는 무시된다)"""
+    return {"recursion_limit": RECURSION_LIMIT, "configurable": {"thread_id": thread_id}}
+
+
+async def resume_point(graph: Any, config: Dict[str, Any], initial_state: Any) -> ResumePoint:
+    """
+    스레드의 마지막 체크포인트를 보고 실행 시작점을 정한다
+
+    - 체크포인트가 없으면 초기 상태로 새로 실행
+    - 남은 노드가 있으면 None 입력으로 마지막으로 끝난 노드 다음부터 이어서 실행
+    - 남은 노드가 없으면 이미 끝난 실행이므로 저장된 최종 상태를 그대로 사용
+    """
+    if graph.checkpointer is None:
+        return ResumePoint(initial_state, (), None)
+    snapshot = await graph.aget_state(config)
+    if not snapshot.values:
+        return ResumePoint(initial_state, (), None)
+    if snapshot.next:
+        logger.info("Resuming thread %s at %s", config["configurable"]["thread_id"], snapshot.next)
+        return ResumePoint(None, tuple(snapshot.next), None)
+    return ResumePoint(None, (), dict(snapshot.values))
+
+
+async def finish_thread(graph: Any, config: Dict[str, Any], keep: bool = True) -> None:
+    """
+    실행이 끝난 스레드 정리
+
+    keep 이면 중간 체크포인트와 보류 쓰기를 지우고 최종 체크포인트 하나만 남겨 (같은 ID 의 재시도가
+    LLM 호출 없이 결과를 받도록) 저장 공간을 줄이고, 아니면 (이어서 실행할 수 없는 임의 ID) 스레드를
+    삭제한다. 아직 남은 노드가 있으면 (스트림이 중간에 끊긴 경우) 재개할 수 있도록 그대로 둔다.
+    """
+    saver = graph.checkpointer
+    if saver is None:
+        return
+    thread_id = config["configurable"]["thread_id"]
+    try:
+        snapshot = await graph.aget_state(config)
+        if not snapshot.next:
+            if not keep:
+                await saver.adelete_thread(thread_id)
+            elif CHECKPOINT_COMPACT_ON_COMPLETE:
+                await _compact_thread(saver, thread_id)
+        await sweep_expired_threads(saver)
+    except Exception as e:  # 정리 실패가 풀이 결과를 막지 않도록
+        logger.warning("Checkpoint cleanup for thread %s failed: %s", thread_id, e)
+
+
+async def _compact_thread(saver: BaseCheckpointSaver, thread_id: str) -> None:
+    """스레드를 최신 체크포인트 하나로 압축 (백엔드와 무관하게 공개 API 만 사용)"""
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    latest = await saver.aget_tuple(config)
+    if latest is None or latest.parent_config is None:
+        return
+    await saver.adelete_thread(thread_id)
+    await saver.aput(config, latest.checkpoint, latest.metadata, dict(latest.checkpoint["channel_versions"]))
+
+
+def _timestamp(value: Any) -> float:
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+async def sweep_expired_threads(saver: BaseCheckpointSaver, force: bool = False) -> int:
+    """
+    CHECKPOINT_RETENTION_SECONDS 보다 오래 갱신되지 않은 스레드 삭제
+
+    CHECKPOINT_SWEEP_INTERVAL_SECONDS 에 한 번만 실제로 훑는다 (force 면 바로).
+
+    Returns:
+        삭제한 스레드 수
+    """
+    global _last_sweep
+    now = time.time()
+    if CHECKPOINT_RETENTION_SECONDS <= 0:
+        return 0
+    if not force and now - _last_sweep < CHECKPOINT_SWEEP_INTERVAL_SECONDS:
+        return 0
+    _last_sweep = now
+
+    latest: Dict[str, float] = {}
+    async for item in saver.alist(None):
+        thread_id = item.config["configurable"]["thread_id"]
+        latest[thread_id] = max(latest.get(thread_id, 0.0), _timestamp(item.checkpoint.get("ts")))
+    expired = [thread_id for thread_id, updated in latest.items()
+               if now - updated > CHECKPOINT_RETENTION_SECONDS]
+    for thread_id in expired:
+        await saver.adelete_thread(thread_id)
+    if expired:
+        logger.info("Deleted %s expired checkpoint threads", len(expired))
+    return len(expired)
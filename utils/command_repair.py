@@ -0,0 +1,277 @@
+"""
+명령어 부분 수리 모듈
+
+검증에 실패한 명령어 목록 전체를 LLM 으로 다시 생성하는 대신, 검증 결과의 오류(errors,
+command_by_command_analysis)를 명령어 줄에 대응시키고 그 줄만 패치로 받아 끼워 넣습니다.
+줄별 분석은 명시적인 판정(is_correct=false)이나 로컬 구문 검증의 [error] 표시만 오류로 봅니다
+(분석 문장의 단어로 추측하면 "no missing points" 같은 정상 설명도 오류로 잡힌다).
+재검증은 패치한 줄과 그 줄이 정의한 객체를 직간접으로 참조하는 줄로 한정합니다.
+
+- locate_errors(commands, validation): 줄 번호(0부터) -> 오류 메시지 (위치를 알 수 없는 오류가 있으면 None)
+- repair_request(commands, located): 수리 프롬프트에 넣을 고칠 줄과 참조 컨텍스트
+- apply_patches(commands, patches): 패치를 끼워 넣은 명령어 목록과 원래 줄 -> 새 줄 번호 대응
+- defined_labels(commands, indices): 줄들이 정의하는 이름 (패치 전 이름을 재검증 범위 계산에 사용)
+- dependent_lines(commands, indices, labels): 재검증 범위 (indices 와 그 줄들에 의존하는 줄)
+- scoped_validation_input(commands, scope, previous): 범위 재검증 입력 (이전 검증으로 대신할 수 없으면 None)
+- merge_command_analysis(commands, scope, previous, entries): 범위 밖 줄은 이전 줄별 분석 유지
+
+줄 번호는 프롬프트와 검증 메시지(Command N `...`)에서 1부터, 함수 인자/반환값에서는 0부터 셉니다.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.geogebra_syntax import (
+    GeoGebraSyntaxError,
+    Statement,
+    clean_command,
+    is_comment,
+    parse_command,
+    referenced_names,
+    tokenize,
+)
+
+# 이 비율보다 많은 줄이 틀렸으면 패치보다 전체 재생성이 낫다
+MAX_REPAIR_SHARE = 0.5
+
+# 검증 메시지의 줄 참조: "Command 3 `...`", "line 3", "第3行"
+_LINE_REF = re.compile(r"\b(?:command|line)\s*#?\s*(\d+)|第\s*(\d+)\s*[行条]", re.IGNORECASE)
+_QUOTED = re.compile(r"`([^`]+)`")
+# 로컬 구문 검증이 만든 줄별 분석 (LLM 검증을 거치지 않은 줄)
+_LOCAL_ANALYSIS = re.compile(r"^(?:OK \(local syntax check\)|\[(?:error|warning)\])")
+_IDENTIFIER = re.compile(r"[^\W\d]\w*'*")
+
+
+def _key(command: Any) -> str:
+    """공백 차이를 무시한 비교 키"""
+    return re.sub(r"\s+", "", clean_command(command))
+
+
+def _command_lines(cleaned: List[str]) -> List[int]:
+    return [index for index, source in enumerate(cleaned) if not is_comment(source)]
+
+
+def _parse_all(cleaned: List[str]) -> Dict[int, Statement]:
+    statements = {}
+    for index in _command_lines(cleaned):
+        try:
+            statements[index] = parse_command(cleaned[index], index)
+        except GeoGebraSyntaxError:
+            continue
+    return statements
+
+
+def _names_used(source: str, statement: Optional[Statement]) -> Set[str]:
+    if statement is not None:
+        return referenced_names(statement)
+    try:
+        return {token.value for token in tokenize(source) if token.kind == "NAME"}
+    except GeoGebraSyntaxError:
+        return set(_IDENTIFIER.findall(source))
+
+
+def _entry_fields(entry: Any) -> Tuple[str, str, Optional[bool]]:
+    """(명령어, 분석, 판정) — 판정이 없으면 None"""
+    if isinstance(entry, dict):
+        return str(entry.get("command", "")), str(entry.get("analysis", "")), entry.get("is_correct")
+    return (str(getattr(entry, "command", "")), str(getattr(entry, "analysis", "")),
+            getattr(entry, "is_correct", None))
+
+
+def _match_entries(entries: Iterable[Any], cleaned: List[str], lines: List[int],
+                   positional: bool = True) -> List[Tuple[int, str, str, Optional[bool]]]:
+    """
+    줄별 분석 항목을 줄 번호에 대응 (명령어 텍스트 우선, 개수가 같으면 위치로)
+
+    다른 명령어 목록(패치 전)의 분석을 대응시킬 때는 positional=False 로 텍스트가 같은 줄만 잇는다.
+    """
+    entries = list(entries or [])
+    by_key: Dict[str, List[int]] = {}
+    for index in lines:
+        by_key.setdefault(_key(cleaned[index]), []).append(index)
+    positional = positional and len(entries) == len(lines)
+    matched = []
+    for position, entry in enumerate(entries):
+        command, analysis, verdict = _entry_fields(entry)
+        candidates = by_key.get(_key(command))
+        if candidates:
+            matched.append((candidates.pop(0), command, analysis, verdict))
+        elif positional:
+            matched.append((lines[position], command, analysis, verdict))
+    return matched
+
+
+def _flags_error(analysis: str, verdict: Optional[bool]) -> bool:
+    """명시적 판정이 false 이거나 로컬 구문 검증이 [error] 를 표시한 줄만 오류로 본다"""
+    if verdict is not None:
+        return not verdict
+    return bool(_LOCAL_ANALYSIS.match(analysis)) and "[error]" in analysis
+
+
+def _error_lines(error: str, cleaned: List[str], lines: List[int]) -> Set[int]:
+    """오류 메시지가 가리키는 줄 (인용한 명령어 → 줄 번호 → 메시지에 그대로 포함된 명령어 순)"""
+    keys = {index: _key(cleaned[index]) for index in lines}
+    found = {index for quote in _QUOTED.findall(error) for index, key in keys.items() if key == _key(quote)}
+    if found:
+        return found
+    for match in _LINE_REF.finditer(error):
+        index = int(match.group(1) or match.group(2)) - 1
+        if index in keys:
+            found.add(index)
+    if found:
+        return found
+    compact = re.sub(r"\s+", "", error)
+    return {index for index, key in keys.items() if len(key) >= 5 and key in compact}
+
+
+def locate_errors(commands: List[Any], validation: Optional[Dict[str, Any]]) -> Optional[Dict[int, List[str]]]:
+    """
+    검증 오류를 명령어 줄에 대응
+
+    Args:
+        commands: 검증한 명령어 목록
+        validation: ValidationResult 딕셔너리 (errors, command_by_command_analysis)
+
+    Returns:
+        {줄 번호(0부터): 오류 메시지 목록}. 어떤 줄에도 대응시킬 수 없는 오류(누락된 작도 등)가 있거나
+        대응된 줄이 없으면 None (전체 재생성 대상)
+    """
+    validation = validation or {}
+    cleaned = [clean_command(c) for c in commands]
+    lines = _command_lines(cleaned)
+    located: Dict[int, List[str]] = {}
+    for error in validation.get("errors") or []:
+        indices = _error_lines(str(error), cleaned, lines)
+        if not indices:
+            return None
+        for index in indices:
+            located.setdefault(index, []).append(str(error))
+    for index, _, analysis, verdict in _match_entries(validation.get("command_by_command_analysis"), cleaned, lines):
+        if _flags_error(analysis, verdict) and analysis not in located.get(index, []):
+            located.setdefault(index, []).append(analysis)
+    return located or None
+
+
+def _context(cleaned: List[str], statements: Dict[int, Statement], indices: Set[int]) -> Dict[str, Any]:
+    """indices 줄이 참조하는 범위 밖 정의 줄과 그 밖의 줄이 정의한 이름"""
+    definitions: Dict[str, int] = {}
+    for index, statement in statements.items():
+        for label in statement.labels:
+            definitions.setdefault(label, index)
+    used = set()
+    for index in indices:
+        used |= _names_used(cleaned[index], statements.get(index))
+    referenced = sorted({definitions[name] for name in used if name in definitions} - indices)
+    shown = set(referenced) | indices
+    other_names = sorted({label for index, statement in statements.items() if index not in shown
+                          for label in statement.labels})
+    return {
+        "referenced_lines": [{"line": index + 1, "command": cleaned[index]} for index in referenced],
+        "names_defined_by_other_lines": other_names,
+    }
+
+
+def repair_request(commands: List[Any], located: Dict[int, List[str]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    수리 프롬프트 입력
+
+    Returns:
+        (고칠 줄 [{line, command, errors}], 참조 컨텍스트 {referenced_lines, names_defined_by_other_lines})
+    """
+    cleaned = [clean_command(c) for c in commands]
+    lines_to_fix = [{"line": index + 1, "command": cleaned[index], "errors": messages}
+                    for index, messages in sorted(located.items())]
+    return lines_to_fix, _context(cleaned, _parse_all(cleaned), set(located))
+
+
+def apply_patches(commands: List[Any], patches: Dict[int, List[str]]) -> Tuple[List[Any], Dict[int, List[int]]]:
+    """
+    패치를 끼워 넣음 (한 줄을 0개 이상의 줄로 교체)
+
+    Returns:
+        (새 명령어 목록, {원래 줄 번호: 새 줄 번호 목록})
+    """
+    repaired: List[Any] = []
+    index_map: Dict[int, List[int]] = {}
+    for index, command in enumerate(commands):
+        replacement = patches.get(index, [command])
+        index_map[index] = list(range(len(repaired), len(repaired) + len(replacement)))
+        repaired.extend(replacement)
+    return repaired, index_map
+
+
+def defined_labels(commands: List[Any], indices: Iterable[int]) -> Set[str]:
+    """indices 줄이 정의하는 이름"""
+    labels: Set[str] = set()
+    for index in indices:
+        try:
+            labels.update(parse_command(clean_command(commands[index]), index).labels)
+        except GeoGebraSyntaxError:
+            continue
+    return labels
+
+
+def dependent_lines(commands: List[Any], indices: Iterable[int], labels: Iterable[str] = ()) -> List[int]:
+    """
+    재검증 범위: indices 줄과, 그 줄들(및 labels)이 정의한 객체를 직간접으로 참조하는 줄
+
+    labels 에는 패치 전 줄이 정의했던 이름을 넘겨 이름이 바뀌거나 지워진 객체를 쓰던 줄도 포함한다.
+    """
+    cleaned = [clean_command(c) for c in commands]
+    statements = _parse_all(cleaned)
+    scope = set(indices)
+    dirty = set(labels)
+    for index in scope:
+        if index in statements:
+            dirty.update(statements[index].labels)
+    for index in sorted(statements):
+        if index not in scope and referenced_names(statements[index]) & dirty:
+            scope.add(index)
+            dirty.update(statements[index].labels)
+    return sorted(scope)
+
+
+def scoped_validation_input(commands: List[Any], scope: List[int],
+                            previous: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    범위 재검증 입력 (검증 프롬프트의 commands 자리에 넣는 딕셔너리)
+
+    범위 밖 줄이 모두 이전 LLM 검증의 줄별 분석을 가지고 있을 때만 범위를 좁힐 수 있다.
+    로컬 구문 검증에서 바로 반려된 줄처럼 LLM 검증을 거치지 않은 줄이 있으면 None (전체 검증).
+    """
+    cleaned = [clean_command(c) for c in commands]
+    lines = _command_lines(cleaned)
+    in_scope = set(scope) & set(lines)
+    if not in_scope:
+        return None
+    analyzed = {index for index, _, analysis, _ in _match_entries(
+        (previous or {}).get("command_by_command_analysis"), cleaned, lines, positional=False)
+        if not _LOCAL_ANALYSIS.match(analysis)}
+    if any(index not in analyzed for index in lines if index not in in_scope):
+        return None
+    context = _context(cleaned, _parse_all(cleaned), in_scope)
+    return {
+        "lines_to_validate": [{"line": index + 1, "command": cleaned[index]} for index in sorted(in_scope)],
+        "already_validated_lines": context["referenced_lines"],
+        "names_defined_by_other_validated_lines": context["names_defined_by_other_lines"],
+    }
+
+
+def merge_command_analysis(commands: List[Any], scope: List[int], previous: Optional[Dict[str, Any]],
+                           entries: List[Any]) -> List[Dict[str, Any]]:
+    """범위 안 줄은 새 분석, 범위 밖 줄은 이전 분석을 써서 전체 줄별 분석을 만든다 (판정 포함)"""
+    cleaned = [clean_command(c) for c in commands]
+    lines = _command_lines(cleaned)
+    in_scope = set(scope)
+    scoped_lines = [index for index in lines if index in in_scope]
+    fresh = {index: (analysis, verdict) for index, _, analysis, verdict in _match_entries(entries, cleaned, scoped_lines)}
+    earlier = {index: (analysis, verdict) for index, _, analysis, verdict in _match_entries(
+        (previous or {}).get("command_by_command_analysis"), cleaned, lines, positional=False)}
+    merged = []
+    for index in lines:
+        if index in in_scope:
+            analysis, verdict = fresh.get(index, ("Re-validated with the patched lines", None))
+        else:
+            analysis, verdict = earlier.get(index, ("OK (validated in an earlier round)", None))
+        merged.append({"command": cleaned[index], "analysis": analysis, "is_correct": verdict})
+    return merged
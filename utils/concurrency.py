@@ -0,0 +1,256 @@
+"""
+동시성 제한 모듈
+
+이 모듈은 문제 풀이 요청의 입장 제어(admission control)와
+단계별(LLM 프로필, 임베딩, DB 검색) 세마포어를 제공합니다.
+
+- 그래프 노드는 LangGraph 가 스레드 풀에서 실행하므로 단계별 제한은 threading 세마포어를 사용
+- 문제 풀이 입장 제어는 서버 이벤트 루프에서 동작하므로 asyncio 기반
+- 단계별 대기 시간 통계는 get_stage_stats() 로 조회
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, Optional
+
+from config import (
+    LLM_GLOBAL_CONCURRENCY,
+    LLM_PROFILE_CONCURRENCY,
+    EMBEDDING_CONCURRENCY,
+    RETRIEVAL_CONCURRENCY,
+    MAX_CONCURRENT_SOLVES,
+    MAX_QUEUED_SOLVES,
+)
+
+
+class AdmissionRejected(Exception):
+    """대기열이 가득 차서 요청을 받을 수 없을 때 발생하는 예외"""
+    pass
+
+
+class StageStats:
+    """단계별 대기/실행 통계"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.in_flight = 0
+        self.waiting = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+
+    def start_wait(self):
+        with self._lock:
+            self.waiting += 1
+
+    def end_wait(self, wait: float):
+        with self._lock:
+            self.waiting -= 1
+            self.in_flight += 1
+            self.acquired += 1
+            self.total_wait += wait
+            self.last_wait = wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def cancel_wait(self):
+        """획득 전에 대기가 취소된 경우"""
+        with self._lock:
+            self.waiting -= 1
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def snapshot(self, limit: Optional[int]) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": limit,
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "acquired": self.acquired,
+                "avg_wait_seconds": round(self.total_wait / self.acquired, 4) if self.acquired else 0.0,
+                "max_wait_seconds": round(self.max_wait, 4),
+                "last_wait_seconds": round(self.last_wait, 4),
+            }
+
+
+class StageLimiter:
+    """
+    이름이 붙은 단계별 세마포어 모음
+
+    limit 이 None 또는 0 이하이면 해당 단계는 제한하지 않고 통계만 기록한다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, Optional[threading.BoundedSemaphore]] = {}
+        self._limits: Dict[str, Optional[int]] = {}
+        self._stats: Dict[str, StageStats] = {}
+
+    def configure(self, stage: str, limit: Optional[int]) -> None:
+        """단계 제한 설정 (이미 사용 중인 단계는 이후 획득부터 적용)"""
+        with self._lock:
+            self._limits[stage] = limit if limit and limit > 0 else None
+            self._semaphores[stage] = (
+                threading.BoundedSemaphore(limit) if limit and limit > 0 else None
+            )
+            self._stats.setdefault(stage, StageStats())
+
+    def _get(self, stage: str):
+        with self._lock:
+            if stage not in self._stats:
+                self._limits[stage] = None
+                self._semaphores[stage] = None
+                self._stats[stage] = StageStats()
+            return self._semaphores[stage], self._stats[stage]
+
+    @contextmanager
+    def limit(self, stage: str):
+        """단계 세마포어를 획득한 상태로 블록을 실행"""
+        semaphore, stats = self._get(stage)
+        stats.start_wait()
+        started = time.perf_counter()
+        if semaphore is not None:
+            semaphore.acquire()
+        stats.end_wait(time.perf_counter() - started)
+        try:
+            yield
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+            stats.release()
+
+    @asynccontextmanager
+    async def alimit(self, stage: str):
+        """
+        비동기 코드용 limit
+
+        세마포어는 논블로킹 획득을 재시도하며 기다린다. 스레드에서 블로킹 획득하면 대기 중 취소될 때
+        스레드가 나중에 얻은 허가를 돌려줄 곳이 없어 새기 때문이다.
+        """
+        semaphore, stats = self._get(stage)
+        stats.start_wait()
+        started = time.perf_counter()
+        if semaphore is not None:
+            delay = 0.001
+            try:
+                while not semaphore.acquire(blocking=False):
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 0.05)
+            except BaseException:
+                stats.cancel_wait()
+                raise
+        stats.end_wait(time.perf_counter() - started)
+        try:
+            yield
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+            stats.release()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            items = list(self._stats.items())
+            limits = dict(self._limits)
+        return {stage: stats.snapshot(limits.get(stage)) for stage, stats in items}
+
+
+class SolveAdmission:
+    """
+    문제 풀이 요청 입장 제어
+
+    동시에 실행 중인 풀이는 max_concurrent 개로 제한하고,
+    대기 중인 요청이 max_queued 를 넘으면 AdmissionRejected 를 발생시킨다.
+    각 값이 0 이하이면 해당 제한을 두지 않는다.
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_SOLVES, max_queued: int = MAX_QUEUED_SOLVES):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._running = 0
+        self._queued = 0
+        self.stats = StageStats()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    def reserve(self) -> None:
+        """
+        대기열 자리 예약 (요청 핸들러에서 즉시 호출)
+
+        Raises:
+            AdmissionRejected: 대기열이 가득 찬 경우
+        """
+        if (self.max_concurrent > 0 and self.max_queued > 0
+                and self._running + self._queued >= self.max_concurrent + self.max_queued):
+            raise AdmissionRejected(
+                f"Too many queued solves ({self._queued}/{self.max_queued})"
+            )
+        self._queued += 1
+        self.stats.start_wait()
+
+    @asynccontextmanager
+    async def slot(self):
+        """reserve() 로 예약한 요청이 실행 슬롯을 얻을 때까지 대기"""
+        if self._semaphore is None and self.max_concurrent > 0:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        semaphore = self._semaphore
+        started = time.perf_counter()
+        try:
+            if semaphore is not None:
+                await semaphore.acquire()
+        except BaseException:
+            self.stats.cancel_wait()
+            raise
+        finally:
+            self._queued -= 1
+        self._running += 1
+        self.stats.end_wait(time.perf_counter() - started)
+        try:
+            yield
+        finally:
+            self._running -= 1
+            self.stats.release()
+            if semaphore is not None:
+                semaphore.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = self.stats.snapshot(self.max_concurrent if self.max_concurrent > 0 else None)
+        data.update({"running": self._running, "queued": self._queued, "max_queued": self.max_queued})
+        return data
+
+
+# 프로세스 전역 단계 제한기
+stage_limiter = StageLimiter()
+stage_limiter.configure("llm", LLM_GLOBAL_CONCURRENCY)
+for _profile, _limit in LLM_PROFILE_CONCURRENCY.items():
+    stage_limiter.configure(f"llm:{_profile}", _limit)
+stage_limiter.configure("embedding", EMBEDDING_CONCURRENCY)
+stage_limiter.configure("retrieval", RETRIEVAL_CONCURRENCY)
+
+
+@contextmanager
+def llm_slot(profile: str = "default"):
+    """프로필별 세마포어와 전역 LLM 세마포어를 순서대로 획득"""
+    # 프로필 대기 중에 전역 슬롯을 점유하지 않도록 프로필 세마포어를 먼저 획득
+    with stage_limiter.limit(f"llm:{profile}"):
+        with stage_limiter.limit("llm"):
+            yield
+
+
+@asynccontextmanager
+async def allm_slot(profile: str = "default"):
+    """llm_slot 의 비동기 버전"""
+    async with stage_limiter.alimit(f"llm:{profile}"):
+        async with stage_limiter.alimit("llm"):
+            yield
+
+
+def get_stage_stats() -> Dict[str, Dict[str, Any]]:
+    """단계별 대기 시간/동시 실행 통계"""
+    return stage_limiter.stats()
@@ -0,0 +1,1095 @@
+"""
+GeoGebra 작도 수치 평가 모듈
+
+생성된 GeoGebra 명령어를 프로세스 안에서 수치적으로 실행하고,
+parsed_elements 의 조건(길이, 각도, 평행/수직, 중점, 점-도형 결합)을
+허용 오차 안에서 만족하는지 확인합니다.
+
+지원 명령어: Point, Segment, Line, Ray, Vector, Circle, Midpoint, Intersect,
+Perpendicular/PerpendicularLine, PerpendicularBisector, AngleBisector, Polygon,
+Rotate, Reflect, Translate, Dilate, Distance, Angle, Area, Length, Radius,
+Center, Centroid, TriangleCenter, Incircle 및 수학 함수
+"""
+
+import math
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from config import EVALUATOR_LENGTH_TOLERANCE, EVALUATOR_ANGLE_TOLERANCE_DEGREES
+from utils.geogebra_syntax import (
+    ACTION_COMMANDS,
+    BinOp,
+    Call,
+    ListExpr,
+    Name,
+    Num,
+    Postfix,
+    Statement,
+    Str,
+    TupleExpr,
+    Unary,
+    clean_command,
+    is_comment,
+    parse_command,
+    resolve_command,
+    GeoGebraSyntaxError,
+)
+
+EPS = 1e-9
+
+
+class EvaluationError(Exception):
+    """수치 평가 중 오류 (정의되지 않은 객체, 퇴화된 작도 등)"""
+    pass
+
+
+class UnsupportedCommand(EvaluationError):
+    """평가기가 지원하지 않는 명령어"""
+    pass
+
+
+# ----------------------------------------------------------------------
+# 수치 객체
+# ----------------------------------------------------------------------
+class Pt(NamedTuple):
+    x: float
+    y: float
+
+
+class Vec(NamedTuple):
+    x: float
+    y: float
+
+
+class LineObj(NamedTuple):
+    """직선/선분/반직선 (p 에서 시작하는 방향 d, 선분/반직선이면 end 사용)"""
+    p: Pt
+    d: Vec
+    kind: str = "line"  # line / segment / ray
+    end: Optional[Pt] = None
+
+
+class CircleObj(NamedTuple):
+    center: Pt
+    r: float
+
+
+class PolygonObj(NamedTuple):
+    vertices: tuple
+
+
+def _sub(a, b) -> Vec:
+    return Vec(a.x - b.x, a.y - b.y)
+
+
+def _norm(v) -> float:
+    return math.hypot(v.x, v.y)
+
+
+def _cross(a, b) -> float:
+    return a.x * b.y - a.y * b.x
+
+
+def _dot(a, b) -> float:
+    return a.x * b.x + a.y * b.y
+
+
+def _line_through(a: Pt, b: Pt, kind: str = "line") -> LineObj:
+    d = _sub(b, a)
+    if _norm(d) < EPS:
+        raise EvaluationError("degenerate line: the two points coincide")
+    return LineObj(a, d, kind, b if kind != "line" else None)
+
+
+def _as_point(value) -> Pt:
+    if isinstance(value, Pt):
+        return value
+    if isinstance(value, Vec):
+        return Pt(value.x, value.y)
+    if isinstance(value, (list, tuple)) and len(value) == 2 and all(isinstance(v, (int, float)) for v in value):
+        return Pt(float(value[0]), float(value[1]))
+    raise EvaluationError(f"expected a point, got {type(value).__name__}")
+
+
+def _as_line(value) -> LineObj:
+    if isinstance(value, LineObj):
+        return value
+    if isinstance(value, Vec):
+        return LineObj(Pt(0.0, 0.0), value)
+    raise EvaluationError(f"expected a line, got {type(value).__name__}")
+
+
+def _as_number(value) -> float:
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, LineObj) and value.kind == "segment":
+        return _norm(value.d)
+    raise EvaluationError(f"expected a number, got {type(value).__name__}")
+
+
+# ----------------------------------------------------------------------
+# 기하 연산
+# ----------------------------------------------------------------------
+def _intersect_lines(l1: LineObj, l2: LineObj) -> List[Pt]:
+    denom = _cross(l1.d, l2.d)
+    if abs(denom) < EPS:
+        return []
+    t = _cross(_sub(l2.p, l1.p), l2.d) / denom
+    return [Pt(l1.p.x + t * l1.d.x, l1.p.y + t * l1.d.y)]
+
+
+def _intersect_line_circle(line: LineObj, circle: CircleObj) -> List[Pt]:
+    f = _sub(line.p, circle.center)
+    a = _dot(line.d, line.d)
+    b = 2 * _dot(f, line.d)
+    c = _dot(f, f) - circle.r ** 2
+    disc = b * b - 4 * a * c
+    if disc < -EPS * max(1.0, abs(b * b)):
+        return []
+    disc = math.sqrt(max(disc, 0.0))
+    ts = sorted({(-b - disc) / (2 * a), (-b + disc) / (2 * a)})
+    return [Pt(line.p.x + t * line.d.x, line.p.y + t * line.d.y) for t in ts]
+
+
+def _intersect_circles(c1: CircleObj, c2: CircleObj) -> List[Pt]:
+    d = _norm(_sub(c2.center, c1.center))
+    if d < EPS or d > c1.r + c2.r + EPS or d < abs(c1.r - c2.r) - EPS:
+        return []
+    a = (c1.r ** 2 - c2.r ** 2 + d ** 2) / (2 * d)
+    h = math.sqrt(max(c1.r ** 2 - a ** 2, 0.0))
+    ex = Vec((c2.center.x - c1.center.x) / d, (c2.center.y - c1.center.y) / d)
+    base = Pt(c1.center.x + a * ex.x, c1.center.y + a * ex.y)
+    points = [Pt(base.x + h * ex.y, base.y - h * ex.x), Pt(base.x - h * ex.y, base.y + h * ex.x)]
+    return points[:1] if h < EPS else points
+
+
+def _polygon_edges(polygon: PolygonObj) -> List[LineObj]:
+    vertices = polygon.vertices
+    return [_line_through(vertices[i], vertices[(i + 1) % len(vertices)], "segment") for i in range(len(vertices))]
+
+
+def _on_bounded(line: LineObj, point: Pt) -> bool:
+    """선분/반직선 범위 안의 점인지 (직선이면 항상 True)"""
+    if line.kind == "line":
+        return True
+    t = _dot(_sub(point, line.p), line.d) / _dot(line.d, line.d)
+    if line.kind == "ray":
+        return t >= -1e-9
+    return -1e-9 <= t <= 1 + 1e-9
+
+
+def intersect(a, b) -> List[Pt]:
+    if isinstance(a, PolygonObj) or isinstance(b, PolygonObj):
+        polygon, other = (a, b) if isinstance(a, PolygonObj) else (b, a)
+        points: List[Pt] = []
+        for edge in _polygon_edges(polygon):
+            points.extend(p for p in intersect(edge, other) if p not in points)
+        return points
+    if isinstance(a, LineObj) and isinstance(b, LineObj):
+        points = _intersect_lines(a, b)
+        return [p for p in points if _on_bounded(a, p) and _on_bounded(b, p)]
+    if isinstance(a, LineObj) and isinstance(b, CircleObj):
+        return [p for p in _intersect_line_circle(a, b) if _on_bounded(a, p)]
+    if isinstance(a, CircleObj) and isinstance(b, LineObj):
+        return intersect(b, a)
+    if isinstance(a, CircleObj) and isinstance(b, CircleObj):
+        return _intersect_circles(a, b)
+    raise UnsupportedCommand(f"Intersect of {type(a).__name__} and {type(b).__name__}")
+
+
+def distance_point_line(point: Pt, line: LineObj) -> float:
+    return abs(_cross(line.d, _sub(point, line.p))) / _norm(line.d)
+
+
+def directed_angle(a: Pt, vertex: Pt, b: Pt) -> float:
+    """GeoGebra Angle(A, B, C): BA 에서 BC 로 반시계 방향 각 (0 ~ 2π)"""
+    v1, v2 = _sub(a, vertex), _sub(b, vertex)
+    if _norm(v1) < EPS or _norm(v2) < EPS:
+        raise EvaluationError("degenerate angle: a point coincides with the vertex")
+    angle = math.atan2(_cross(v1, v2), _dot(v1, v2))
+    return angle if angle >= 0 else angle + 2 * math.pi
+
+
+def undirected_angle(a: Pt, vertex: Pt, b: Pt) -> float:
+    angle = directed_angle(a, vertex, b)
+    return min(angle, 2 * math.pi - angle)
+
+
+def polygon_area(vertices) -> float:
+    total = 0.0
+    for i in range(len(vertices)):
+        p, q = vertices[i], vertices[(i + 1) % len(vertices)]
+        total += p.x * q.y - q.x * p.y
+    return abs(total) / 2
+
+
+def _circle_through(a: Pt, b: Pt, c: Pt) -> CircleObj:
+    d = 2 * (a.x * (b.y - c.y) + b.x * (c.y - a.y) + c.x * (a.y - b.y))
+    if abs(d) < EPS:
+        raise EvaluationError("degenerate circle: the three points are collinear")
+    ux = ((a.x ** 2 + a.y ** 2) * (b.y - c.y) + (b.x ** 2 + b.y ** 2) * (c.y - a.y) + (c.x ** 2 + c.y ** 2) * (a.y - b.y)) / d
+    uy = ((a.x ** 2 + a.y ** 2) * (c.x - b.x) + (b.x ** 2 + b.y ** 2) * (a.x - c.x) + (c.x ** 2 + c.y ** 2) * (b.x - a.x)) / d
+    center = Pt(ux, uy)
+    return CircleObj(center, _norm(_sub(a, center)))
+
+
+def _incenter(a: Pt, b: Pt, c: Pt) -> Tuple[Pt, float]:
+    la, lb, lc = _norm(_sub(b, c)), _norm(_sub(a, c)), _norm(_sub(a, b))
+    perimeter = la + lb + lc
+    if perimeter < EPS:
+        raise EvaluationError("degenerate triangle")
+    center = Pt((la * a.x + lb * b.x + lc * c.x) / perimeter, (la * a.y + lb * b.y + lc * c.y) / perimeter)
+    return center, 2 * polygon_area((a, b, c)) / perimeter
+
+
+def _map_points(obj, f):
+    """점 변환 f 를 모든 객체에 적용 (직선 방향과 원 반지름도 함께 변환)"""
+    if isinstance(obj, Pt):
+        return f(obj)
+    if isinstance(obj, LineObj):
+        p = f(obj.p)
+        q = f(Pt(obj.p.x + obj.d.x, obj.p.y + obj.d.y))
+        return LineObj(p, _sub(q, p), obj.kind, f(obj.end) if obj.end is not None else None)
+    if isinstance(obj, CircleObj):
+        c = f(obj.center)
+        edge = f(Pt(obj.center.x + obj.r, obj.center.y))
+        return CircleObj(c, _norm(_sub(edge, c)))
+    if isinstance(obj, PolygonObj):
+        return PolygonObj(tuple(f(v) for v in obj.vertices))
+    if isinstance(obj, Vec):
+        origin = f(Pt(0.0, 0.0))
+        moved = f(Pt(obj.x, obj.y))
+        return Vec(moved.x - origin.x, moved.y - origin.y)
+    if isinstance(obj, list):
+        return [_map_points(o, f) for o in obj]
+    raise UnsupportedCommand(f"transform of {type(obj).__name__}")
+
+
+def _rotation(angle: float, center: Pt):
+    cos_a, sin_a = math.cos(angle), math.sin(angle)
+
+    def f(p: Pt) -> Pt:
+        dx, dy = p.x - center.x, p.y - center.y
+        return Pt(center.x + dx * cos_a - dy * sin_a, center.y + dx * sin_a + dy * cos_a)
+    return f
+
+
+def _reflection(mirror):
+    if isinstance(mirror, Pt):
+        return lambda p: Pt(2 * mirror.x - p.x, 2 * mirror.y - p.y)
+    line = _as_line(mirror)
+
+    def f(p: Pt) -> Pt:
+        t = _dot(_sub(p, line.p), line.d) / _dot(line.d, line.d)
+        foot = Pt(line.p.x + t * line.d.x, line.p.y + t * line.d.y)
+        return Pt(2 * foot.x - p.x, 2 * foot.y - p.y)
+    return f
+
+
+# ----------------------------------------------------------------------
+# 평가기
+# ----------------------------------------------------------------------
+_MATH = {
+    "sqrt": math.sqrt, "cbrt": lambda v: math.copysign(abs(v) ** (1 / 3), v), "abs": abs,
+    "exp": math.exp, "ln": math.log, "lg": math.log10, "ld": math.log2,
+    "log": lambda a, b=None: math.log(a) if b is None else math.log(b, a),
+    "sin": math.sin, "cos": math.cos, "tan": math.tan,
+    "asin": math.asin, "acos": math.acos, "atan": math.atan,
+    "arcsin": math.asin, "arccos": math.acos, "arctan": math.atan, "atan2": math.atan2,
+    "sind": lambda v: math.sin(math.radians(v)), "cosd": lambda v: math.cos(math.radians(v)),
+    "tand": lambda v: math.tan(math.radians(v)),
+    "floor": math.floor, "ceil": math.ceil, "round": lambda v, n=0: round(v, int(n)),
+    "nroot": lambda v, n: math.copysign(abs(v) ** (1 / n), v),
+}
+
+_CONSTANTS = {"pi": math.pi, "π": math.pi, "e": math.e, "ℯ": math.e, "deg": math.pi / 180}
+# 평면 기본 객체 (geogebra_syntax.BUILTIN_OBJECTS 중 2D 로 평가할 수 있는 것)
+_BUILTIN_OBJECTS = {
+    "xaxis": LineObj(Pt(0.0, 0.0), Vec(1.0, 0.0)),
+    "yaxis": LineObj(Pt(0.0, 0.0), Vec(0.0, 1.0)),
+}
+
+
+class ConstructionEvaluator:
+    """명령어 목록을 순서대로 실행해 이름 -> 수치 객체 환경을 만든다"""
+
+    def __init__(self):
+        self.env: Dict[str, Any] = {}
+
+    # 식 평가 ----------------------------------------------------------
+    def eval(self, node):
+        if isinstance(node, Num):
+            return node.value
+        if isinstance(node, Str):
+            return node.value
+        if isinstance(node, Name):
+            if node.id in self.env:
+                return self.env[node.id]
+            if node.id.lower() in _CONSTANTS:
+                return _CONSTANTS[node.id.lower()]
+            if node.id.lower() in _BUILTIN_OBJECTS:
+                return _BUILTIN_OBJECTS[node.id.lower()]
+            raise EvaluationError(f"'{node.id}' is not defined")
+        if isinstance(node, TupleExpr):
+            values = [_as_number(self.eval(item)) for item in node.items]
+            if len(values) != 2:
+                raise UnsupportedCommand("only 2D points are supported")
+            if node.polar:
+                return Pt(values[0] * math.cos(values[1]), values[0] * math.sin(values[1]))
+            return Pt(values[0], values[1])
+        if isinstance(node, ListExpr):
+            return [self.eval(item) for item in node.items]
+        if isinstance(node, Postfix):
+            value = _as_number(self.eval(node.operand))
+            return math.radians(value) if node.op == "°" else float(math.factorial(int(value)))
+        if isinstance(node, Unary):
+            value = self.eval(node.operand)
+            if node.op == "+":
+                return value
+            if isinstance(value, (Pt, Vec)):
+                return type(value)(-value.x, -value.y)
+            return -_as_number(value)
+        if isinstance(node, BinOp):
+            return self._binop(node)
+        if isinstance(node, Call):
+            return self.call(node)
+        raise UnsupportedCommand(f"expression {type(node).__name__}")
+
+    def _binop(self, node: BinOp):
+        if node.op not in ("+", "-", "*", "/", "^"):
+            raise UnsupportedCommand(f"operator '{node.op}'")
+        left, right = self.eval(node.left), self.eval(node.right)
+        vector_types = (Pt, Vec)
+        if node.op in ("+", "-") and isinstance(left, vector_types) and isinstance(right, vector_types):
+            sign = 1 if node.op == "+" else -1
+            result_type = Pt if isinstance(left, Pt) or isinstance(right, Pt) else Vec
+            if node.op == "-" and isinstance(left, Pt) and isinstance(right, Pt):
+                result_type = Vec
+            return result_type(left.x + sign * right.x, left.y + sign * right.y)
+        if node.op == "*" and isinstance(left, vector_types) and isinstance(right, vector_types):
+            return _dot(left, right)
+        if node.op in ("*", "/") and isinstance(left, vector_types):
+            k = _as_number(right)
+            return type(left)(left.x * k, left.y * k) if node.op == "*" else type(left)(left.x / k, left.y / k)
+        if node.op == "*" and isinstance(right, vector_types):
+            k = _as_number(left)
+            return type(right)(right.x * k, right.y * k)
+        a, b = _as_number(left), _as_number(right)
+        if node.op == "+":
+            return a + b
+        if node.op == "-":
+            return a - b
+        if node.op == "*":
+            return a * b
+        if node.op == "/":
+            if abs(b) < EPS:
+                raise EvaluationError("division by zero")
+            return a / b
+        return a ** b
+
+    # 명령어 ------------------------------------------------------------
+    def call(self, node: Call):
+        lowered = node.name.lower()
+        if node.name in self.env:
+            raise UnsupportedCommand(f"evaluating object '{node.name}' as a function")
+        if lowered in _MATH:
+            return float(_MATH[lowered](*[_as_number(self.eval(a)) for a in node.args]))
+        if lowered in ("x", "y"):
+            point = _as_point(self.eval(node.args[0]))
+            return point.x if lowered == "x" else point.y
+        signature = resolve_command(node.name)
+        name = signature.name if signature else node.name
+        handler = getattr(self, f"_cmd_{name.lower()}", None)
+        if handler is None:
+            raise UnsupportedCommand(f"command '{name}'")
+        args = [self.eval(a) for a in node.args]
+        return handler(*args)
+
+    def _cmd_point(self, *args):
+        if len(args) == 1 and isinstance(args[0], list):
+            return _as_point(args[0])
+        target = args[0]
+        # 도형 위의 자유점: 결정적인 대표 위치를 사용
+        if isinstance(target, LineObj):
+            if target.kind == "segment":
+                return Pt(target.p.x + target.d.x / 2, target.p.y + target.d.y / 2)
+            return Pt(target.p.x + target.d.x, target.p.y + target.d.y)
+        if isinstance(target, CircleObj):
+            return Pt(target.center.x + target.r, target.center.y)
+        if isinstance(target, Pt):
+            return target
+        raise UnsupportedCommand("Point on this object")
+
+    def _cmd_segment(self, a, b):
+        a = _as_point(a)
+        if isinstance(b, (int, float)):
+            return _line_through(a, Pt(a.x + b, a.y), "segment")
+        return _line_through(a, _as_point(b), "segment")
+
+    def _cmd_line(self, a, b):
+        a = _as_point(a)
+        if isinstance(b, Pt):
+            return _line_through(a, b)
+        if isinstance(b, LineObj):
+            return LineObj(a, b.d)
+        if isinstance(b, Vec):
+            return LineObj(a, b)
+        raise UnsupportedCommand("Line with this argument")
+
+    def _cmd_ray(self, a, b):
+        a = _as_point(a)
+        if isinstance(b, Vec):
+            return LineObj(a, b, "ray", Pt(a.x + b.x, a.y + b.y))
+        return _line_through(a, _as_point(b), "ray")
+
+    def _cmd_vector(self, a, b=None):
+        if b is None:
+            return Vec(*_as_point(a))
+        return _sub(_as_point(b), _as_point(a))
+
+    def _cmd_circle(self, *args):
+        if len(args) == 3:
+            return _circle_through(*(_as_point(a) for a in args))
+        center, second = args
+        if isinstance(center, LineObj):
+            raise UnsupportedCommand("Circle(<Line>, <Point>)")
+        center = _as_point(center)
+        if isinstance(second, Pt):
+            return CircleObj(center, _norm(_sub(second, center)))
+        return CircleObj(center, abs(_as_number(second)))
+
+    def _cmd_incircle(self, a, b, c):
+        center, r = _incenter(_as_point(a), _as_point(b), _as_point(c))
+        return CircleObj(center, r)
+
+    def _cmd_midpoint(self, a, b=None):
+        if b is not None:
+            a, b = _as_point(a), _as_point(b)
+            return Pt((a.x + b.x) / 2, (a.y + b.y) / 2)
+        if isinstance(a, LineObj) and a.kind == "segment":
+            return Pt(a.p.x + a.d.x / 2, a.p.y + a.d.y / 2)
+        if isinstance(a, CircleObj):
+            return a.center
+        raise UnsupportedCommand("Midpoint of this object")
+
+    def _cmd_center(self, circle):
+        if isinstance(circle, CircleObj):
+            return circle.center
+        raise UnsupportedCommand("Center of this object")
+
+    def _cmd_radius(self, circle):
+        if isinstance(circle, CircleObj):
+            return circle.r
+        raise UnsupportedCommand("Radius of this object")
+
+    def _cmd_centroid(self, polygon):
+        vertices = polygon.vertices if isinstance(polygon, PolygonObj) else [_as_point(p) for p in polygon]
+        return Pt(sum(v.x for v in vertices) / len(vertices), sum(v.y for v in vertices) / len(vertices))
+
+    def _cmd_trianglecenter(self, a, b, c, index):
+        a, b, c = _as_point(a), _as_point(b), _as_point(c)
+        index = int(_as_number(index))
+        if index == 1:
+            return _incenter(a, b, c)[0]
+        if index == 2:
+            return Pt((a.x + b.x + c.x) / 3, (a.y + b.y + c.y) / 3)
+        if index == 3:
+            return _circle_through(a, b, c).center
+        if index == 4:
+            circumcenter = _circle_through(a, b, c).center
+            return Pt(a.x + b.x + c.x - 2 * circumcenter.x, a.y + b.y + c.y - 2 * circumcenter.y)
+        raise UnsupportedCommand(f"TriangleCenter index {index}")
+
+    def _cmd_intersect(self, a, b, selector=None):
+        points = intersect(a, b)
+        if not points:
+            raise EvaluationError("objects do not intersect")
+        if selector is None:
+            return points
+        if isinstance(selector, Pt):
+            return min(points, key=lambda p: _norm(_sub(p, selector)))
+        index = int(_as_number(selector))
+        if index < 1 or index > len(points):
+            raise EvaluationError(f"intersection index {index} out of range ({len(points)} point(s))")
+        return points[index - 1]
+
+    def _cmd_perpendicularline(self, a, b, *rest):
+        if rest:
+            raise UnsupportedCommand("3D PerpendicularLine")
+        if isinstance(a, LineObj) and isinstance(b, Pt):
+            a, b = b, a
+        point = _as_point(a)
+        direction = b if isinstance(b, Vec) else _as_line(b).d
+        return LineObj(point, Vec(-direction.y, direction.x))
+
+    _cmd_perpendicular = _cmd_perpendicularline
+    _cmd_orthogonalline = _cmd_perpendicularline
+
+    def _cmd_perpendicularbisector(self, a, b=None):
+        if b is None:
+            line = _as_line(a)
+            a, b = line.p, Pt(line.p.x + line.d.x, line.p.y + line.d.y)
+        a, b = _as_point(a), _as_point(b)
+        mid = Pt((a.x + b.x) / 2, (a.y + b.y) / 2)
+        d = _sub(b, a)
+        return LineObj(mid, Vec(-d.y, d.x))
+
+    _cmd_linebisector = _cmd_perpendicularbisector
+
+    def _cmd_anglebisector(self, a, b, c=None):
+        if c is None:
+            l1, l2 = _as_line(a), _as_line(b)
+            vertex = _intersect_lines(l1, l2)
+            if not vertex:
+                raise EvaluationError("angle bisector of parallel lines")
+            u1 = Vec(l1.d.x / _norm(l1.d), l1.d.y / _norm(l1.d))
+            u2 = Vec(l2.d.x / _norm(l2.d), l2.d.y / _norm(l2.d))
+            return LineObj(vertex[0], Vec(u1.x + u2.x, u1.y + u2.y))
+        a, vertex, c = _as_point(a), _as_point(b), _as_point(c)
+        u1, u2 = _sub(a, vertex), _sub(c, vertex)
+        if _norm(u1) < EPS or _norm(u2) < EPS:
+            raise EvaluationError("degenerate angle bisector")
+        d = Vec(u1.x / _norm(u1) + u2.x / _norm(u2), u1.y / _norm(u1) + u2.y / _norm(u2))
+        if _norm(d) < EPS:
+            d = Vec(-u1.y, u1.x)
+        return LineObj(vertex, d)
+
+    def _cmd_polygon(self, *args):
+        if len(args) == 1 and isinstance(args[0], list):
+            args = tuple(args[0])
+        if len(args) == 3 and isinstance(args[2], (int, float)) and not isinstance(args[2], bool):
+            # 정다각형: Polygon(A, B, n) - A, B 에서 반시계 방향
+            a, b, n = _as_point(args[0]), _as_point(args[1]), int(args[2])
+            vertices = [a, b]
+            for _ in range(n - 2):
+                rotate = _rotation(math.pi - 2 * math.pi / n, vertices[-1])
+                vertices.append(rotate(vertices[-2]))
+            return PolygonObj(tuple(vertices))
+        vertices = tuple(_as_point(v) for v in args)
+        if len(vertices) < 3:
+            raise EvaluationError("polygon needs at least 3 vertices")
+        return PolygonObj(vertices)
+
+    def _cmd_rotate(self, obj, angle, center=None):
+        center = _as_point(center) if center is not None else Pt(0.0, 0.0)
+        return _map_points(obj, _rotation(_as_number(angle), center))
+
+    def _cmd_reflect(self, obj, mirror):
+        if isinstance(mirror, CircleObj):
+            raise UnsupportedCommand("circle inversion")
+        return _map_points(obj, _reflection(mirror))
+
+    _cmd_mirror = _cmd_reflect
+
+    def _cmd_translate(self, obj, vector):
+        if isinstance(obj, Vec) and not isinstance(vector, Vec):
+            obj, vector = vector, obj
+        v = vector if isinstance(vector, Vec) else Vec(*_as_point(vector))
+        return _map_points(obj, lambda p: Pt(p.x + v.x, p.y + v.y))
+
+    def _cmd_dilate(self, obj, factor, center=None):
+        center = _as_point(center) if center is not None else Pt(0.0, 0.0)
+        k = _as_number(factor)
+        return _map_points(obj, lambda p: Pt(center.x + k * (p.x - center.x), center.y + k * (p.y - center.y)))
+
+    def _cmd_distance(self, a, b):
+        if isinstance(a, Pt) and isinstance(b, Pt):
+            return _norm(_sub(a, b))
+        if isinstance(a, LineObj) and isinstance(b, Pt):
+            a, b = b, a
+        if isinstance(a, Pt) and isinstance(b, LineObj):
+            return distance_point_line(a, b)
+        if isinstance(a, Pt) and isinstance(b, CircleObj):
+            return abs(_norm(_sub(a, b.center)) - b.r)
+        if isinstance(a, LineObj) and isinstance(b, LineObj):
+            if abs(_cross(a.d, b.d)) > EPS:
+                return 0.0
+            return distance_point_line(a.p, b)
+        raise UnsupportedCommand("Distance between these objects")
+
+    def _cmd_angle(self, *args):
+        if len(args) == 3:
+            a, vertex, c = args
+            if isinstance(c, (int, float)):
+                # Angle(<Point>, <Apex>, <Angle>) 는 각도 값 자체
+                return float(c)
+            return directed_angle(_as_point(a), _as_point(vertex), _as_point(c))
+        if len(args) == 2:
+            a, b = args
+            d1 = a if isinstance(a, Vec) else _as_line(a).d
+            d2 = b if isinstance(b, Vec) else _as_line(b).d
+            angle = math.atan2(_cross(d1, d2), _dot(d1, d2))
+            return angle if angle >= 0 else angle + 2 * math.pi
+        if len(args) == 1 and isinstance(args[0], (int, float)):
+            return float(args[0])
+        raise UnsupportedCommand("Angle with these arguments")
+
+    def _cmd_area(self, *args):
+        if len(args) == 1:
+            obj = args[0]
+            if isinstance(obj, PolygonObj):
+                return polygon_area(obj.vertices)
+            if isinstance(obj, CircleObj):
+                return math.pi * obj.r ** 2
+            raise UnsupportedCommand("Area of this object")
+        return polygon_area([_as_point(p) for p in args])
+
+    def _cmd_length(self, obj):
+        if isinstance(obj, LineObj) and obj.kind == "segment":
+            return _norm(obj.d)
+        if isinstance(obj, Vec):
+            return _norm(obj)
+        if isinstance(obj, Pt):
+            return _norm(obj)
+        raise UnsupportedCommand("Length of this object")
+
+    def _cmd_perimeter(self, obj):
+        if isinstance(obj, PolygonObj):
+            return sum(_norm(e.d) for e in _polygon_edges(obj))
+        if isinstance(obj, CircleObj):
+            return 2 * math.pi * obj.r
+        raise UnsupportedCommand("Perimeter of this object")
+
+    _cmd_circumference = _cmd_perimeter
+
+    def _cmd_slope(self, line):
+        line = _as_line(line)
+        if abs(line.d.x) < EPS:
+            raise EvaluationError("slope of a vertical line")
+        return line.d.y / line.d.x
+
+    # 실행 --------------------------------------------------------------
+    def execute(self, statement: Statement) -> None:
+        expr = statement.expr
+        if isinstance(expr, Call):
+            signature = resolve_command(expr.name)
+            if signature and signature.name in ACTION_COMMANDS or expr.name in ("Text",):
+                return
+        if statement.kind == "define" or statement.params:
+            # 방정식/함수 정의는 수치 객체로 실행하지 않는다
+            raise UnsupportedCommand("equation or function definition")
+        value = self.eval(expr)
+        if not statement.labels:
+            return
+        if len(statement.labels) == 1:
+            if isinstance(value, list) and value and all(isinstance(v, Pt) for v in value):
+                value = value[0]
+            self.env[statement.labels[0]] = value
+            return
+        values = value if isinstance(value, list) else [value]
+        for label, item in zip(statement.labels, values):
+            self.env[label] = item
+
+
+def evaluate_commands(commands: List[Any]) -> Dict[str, Any]:
+    """
+    명령어 목록을 실행
+
+    Returns:
+        env(이름 -> 수치 객체), errors, unsupported, complete(모두 실행되었는지)
+    """
+    evaluator = ConstructionEvaluator()
+    errors: List[str] = []
+    unsupported: List[str] = []
+    for index, raw in enumerate(commands):
+        source = clean_command(raw)
+        if is_comment(source):
+            continue
+        try:
+            evaluator.execute(parse_command(source, index))
+        except UnsupportedCommand as e:
+            unsupported.append(f"Command {index + 1} `{source}`: {e}")
+        except (EvaluationError, GeoGebraSyntaxError, ValueError, ZeroDivisionError, TypeError, IndexError) as e:
+            errors.append(f"Command {index + 1} `{source}`: {e}")
+    return {
+        "env": evaluator.env,
+        "errors": errors,
+        "unsupported": unsupported,
+        "complete": not errors and not unsupported,
+    }
+
+
+# ----------------------------------------------------------------------
+# parsed_elements 조건 검증
+# ----------------------------------------------------------------------
+_STRIP_PREFIXES = ("∠", "angle", "segment", "line", "线段", "直线", "射线", "△", "triangle", "⊙", "circle")
+
+
+def _point_labels(env: Dict[str, Any]) -> List[str]:
+    return sorted((k for k, v in env.items() if isinstance(v, Pt)), key=len, reverse=True)
+
+
+def split_points(token: Any, env: Dict[str, Any]) -> Optional[List[Pt]]:
+    """'AB', '∠ABC', ['A','B'] 같은 표기를 점 목록으로 변환 (실패하면 None)"""
+    if isinstance(token, (list, tuple)):
+        points: List[Pt] = []
+        for item in token:
+            resolved = split_points(item, env)
+            if resolved is None:
+                return None
+            points.extend(resolved)
+        return points
+    text = str(token).strip()
+    if text in env and isinstance(env[text], Pt):
+        return [env[text]]
+    for prefix in _STRIP_PREFIXES:
+        if text.lower().startswith(prefix):
+            text = text[len(prefix):].strip()
+    text = text.replace(" ", "").replace("-", "")
+    labels = _point_labels(env)
+    points = []
+    position = 0
+    while position < len(text):
+        for label in labels:
+            if text.startswith(label, position):
+                points.append(env[label])
+                position += len(label)
+                break
+        else:
+            return None
+    return points or None
+
+
+def _resolve_line(token: Any, env: Dict[str, Any]) -> Optional[LineObj]:
+    if isinstance(token, str) and isinstance(env.get(token), LineObj):
+        return env[token]
+    points = split_points(token, env)
+    if points and len(points) == 2:
+        try:
+            return _line_through(points[0], points[1])
+        except EvaluationError:
+            return None
+    return None
+
+
+# 조건 종류 키워드: 영문은 단어 단위(복수형 포함), 한자/기호는 부분 문자열로 비교
+_CONDITION_KEYWORDS = (
+    ("perpendicular", "perpendicular"), ("垂直", "perpendicular"), ("⊥", "perpendicular"),
+    ("parallel", "parallel"), ("平行", "parallel"), ("∥", "parallel"),
+    ("midpoint", "midpoint"), ("中点", "midpoint"),
+    ("intersection", "intersection"), ("intersect", "intersection"), ("交点", "intersection"),
+    ("collinear", "collinear"), ("共线", "collinear"),
+    ("equal", "equal"), ("相等", "equal"),
+    ("angle", "angle"), ("角", "angle"),
+    ("on", "incidence"), ("lies", "incidence"), ("incidence", "incidence"), ("在", "incidence"),
+    ("length", "length"), ("segment", "length"), ("distance", "length"), ("长", "length"),
+)
+
+# 삼각형 종류 -> 검사 종류
+_TRIANGLE_TYPES = (
+    (("equilateral", "regular"), ("等边", "正三角"), "equal_sides"),
+    (("isosceles",), ("等腰",), "isosceles"),
+    (("right",), ("直角",), "right_triangle"),
+)
+
+
+def _words(text: str) -> List[str]:
+    return [word for word in re.split(r"[^a-z0-9]+", text.lower()) if word]
+
+
+def _keyword_in(keyword: str, text: str, words: List[str]) -> bool:
+    if keyword.isascii() and keyword.isalpha():
+        return keyword in words or keyword + "s" in words
+    return keyword in text
+
+
+def _classify(item: Dict[str, Any]) -> str:
+    kind = str(item.get("type", "")).lower()
+    words = _words(kind)
+    # 'triangle_type' 의 'angle', '三角形' 의 '角' 이 각 조건으로 잡히지 않도록 삼각형 종류를 먼저 본다
+    if "triangle" in words or "三角形" in kind:
+        return "triangle_type"
+    for keyword, label in _CONDITION_KEYWORDS:
+        if _keyword_in(keyword, kind, words):
+            return label
+    return ""
+
+
+def triangle_type_checks(text: Any) -> List[str]:
+    """'equilateral', '等腰直角三角形', 'right isosceles triangle' -> 검사 종류 목록"""
+    text = str(text or "").lower()
+    words = _words(text)
+    return [check for english, chinese, check in _TRIANGLE_TYPES
+            if any(_keyword_in(k, text, words) for k in english) or any(k in text for k in chinese)]
+
+
+def _single_triangle(parsed_elements: Dict[str, Any]) -> Optional[List[Any]]:
+    """꼭짓점이 셋인 도형이 하나뿐이면 그 꼭짓점"""
+    objects = parsed_elements.get("geometric_objects") or {}
+    triangles = [obj.get("vertices") for obj in (objects.values() if isinstance(objects, dict) else [])
+                 if isinstance(obj, dict) and isinstance(obj.get("vertices"), (list, tuple, str))
+                 and len(obj["vertices"]) == 3]
+    return list(triangles[0]) if len(triangles) == 1 else None
+
+
+class ConstraintSet(NamedTuple):
+    """parsed_elements 에서 뽑은 검증 조건"""
+    constraints: List[Dict[str, Any]]   # 수치로 검사할 수 있는 조건
+    unsupported: List[Dict[str, Any]]   # 해석하지 못한 조건 (접함, 닮음, 합동 등): {source, kind, reason}
+    required: List[Dict[str, Any]]      # 작도에 있어야 하는 점 표기: {source, elements}
+
+
+def collect_constraints(parsed_elements: Dict[str, Any]) -> ConstraintSet:
+    """
+    parsed_elements 의 relations/conditions/geometric_objects 를 검증 조건으로 분류
+
+    풀이 목표(target)가 아닌 조건 중 종류를 알 수 없거나 요소가 없는 조건은 버리지 않고 unsupported 로,
+    값이 없는 길이/각 관계(예: 선분 AB)와 기하 객체의 꼭짓점/점/중심은 required 로 돌려준다.
+    """
+    constraints: List[Dict[str, Any]] = []
+    unsupported: List[Dict[str, Any]] = []
+    required: List[Dict[str, Any]] = []
+    if not isinstance(parsed_elements, dict):
+        return ConstraintSet(constraints, unsupported, required)
+
+    for section in ("relations", "conditions"):
+        items = parsed_elements.get(section) or {}
+        if isinstance(items, list):
+            items = {str(i): item for i, item in enumerate(items)}
+        for key, item in items.items():
+            source = f"{section}.{key}"
+            if not isinstance(item, dict):
+                if item:
+                    unsupported.append({"source": source, "kind": "", "reason": f"unparsed condition {item!r}"})
+                continue
+            if item.get("target"):
+                continue
+            kind = _classify(item)
+            elements = item.get("elements") or []
+            value = item.get("length") if item.get("length") is not None else item.get("measure")
+            if kind == "triangle_type":
+                # 예: parsing_agent 가 넣는 {"type": "triangle_type", "value": "equilateral"} (요소 없음)
+                checks = triangle_type_checks(item.get("value") or value or item.get("type"))
+                vertices = elements or _single_triangle(parsed_elements)
+                if not checks or not vertices:
+                    unsupported.append({"source": source, "kind": "triangle_type",
+                                        "reason": "unknown triangle type" if not checks
+                                        else "cannot tell which triangle the type refers to"})
+                    continue
+                constraints.extend({"source": source, "kind": check, "elements": vertices, "value": None, "unit": ""}
+                                   for check in checks)
+                continue
+            if not kind or not elements:
+                unsupported.append({"source": source, "kind": str(item.get("type", "")),
+                                    "reason": "condition type is not supported by the numeric checker"
+                                    if not kind else "condition has no elements"})
+                continue
+            if kind in ("length", "angle") and value is None:
+                # 값이 없는 선분/각은 조건이 아니라 작도해야 하는 대상
+                required.append({"source": source, "elements": elements})
+                continue
+            constraints.append({
+                "source": source,
+                "kind": kind,
+                "elements": elements,
+                "value": value,
+                "unit": str(item.get("unit") or "degree").lower(),
+            })
+
+    objects = parsed_elements.get("geometric_objects") or {}
+    if isinstance(objects, dict):
+        for key, obj in objects.items():
+            if not isinstance(obj, dict):
+                continue
+            source = f"geometric_objects.{key}"
+            kind = str(obj.get("type", "")).lower()
+            vertices = obj.get("vertices") or obj.get("points")
+            labels = list(vertices or []) + ([obj["center"]] if obj.get("center") else [])
+            if not labels and kind in ("point", "点"):
+                labels = [key]
+            if labels:
+                required.append({"source": source, "elements": labels})
+            if obj.get("center") and obj.get("radius") is not None:
+                constraints.append({"source": source, "kind": "circle",
+                                    "elements": [obj["center"]], "value": obj["radius"], "unit": ""})
+            if vertices and any(k in kind for k in ("equilateral", "等边", "正三角", "square", "正方形", "regular")):
+                constraints.append({"source": source, "kind": "equal_sides",
+                                    "elements": vertices, "value": None, "unit": ""})
+            if vertices and len(vertices) == 3:
+                constraints.extend({"source": source, "kind": check, "elements": vertices, "value": None, "unit": ""}
+                                   for check in triangle_type_checks(kind) if check != "equal_sides")
+            if vertices and len(vertices) == 4 and any(k in kind for k in ("square", "正方形", "rectangle", "矩形", "长方形")):
+                constraints.append({"source": source, "kind": "right_angles",
+                                    "elements": vertices, "value": None, "unit": ""})
+    return ConstraintSet(constraints, unsupported, required)
+
+
+def extract_constraints(parsed_elements: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """parsed_elements 에서 수치로 검사할 수 있는 조건만 (collect_constraints 참고)"""
+    return collect_constraints(parsed_elements).constraints
+
+
+def _close(actual: float, expected: float, tolerance: float) -> bool:
+    return abs(actual - expected) <= tolerance * max(1.0, abs(expected))
+
+
+def check_constraint(constraint: Dict[str, Any], env: Dict[str, Any]) -> Dict[str, Any]:
+    """조건 하나를 검사 (status: pass / fail / unresolved)"""
+    kind, elements, value = constraint["kind"], constraint["elements"], constraint["value"]
+    length_tol = EVALUATOR_LENGTH_TOLERANCE
+    angle_tol = math.radians(EVALUATOR_ANGLE_TOLERANCE_DEGREES)
+    result = {"constraint": constraint["source"], "kind": kind, "status": "unresolved"}
+
+    def done(ok: bool, **details):
+        result.update(details)
+        result["status"] = "pass" if ok else "fail"
+        return result
+
+    try:
+        if kind == "length":
+            points = split_points(elements, env)
+            if points and len(points) == 2:
+                actual = _norm(_sub(points[0], points[1]))
+                return done(_close(actual, float(value), length_tol), expected=float(value), actual=actual)
+        elif kind == "angle":
+            points = split_points(elements, env)
+            expected = float(value) if "rad" in constraint["unit"] else math.radians(float(value))
+            if points and len(points) == 3:
+                actual = undirected_angle(points[0], points[1], points[2])
+                if expected > math.pi:
+                    # 우각(reflex angle) 조건
+                    actual = 2 * math.pi - actual
+                return done(abs(actual - expected) <= angle_tol, expected=math.degrees(expected), actual=math.degrees(actual))
+            if len(elements) == 2:
+                l1, l2 = _resolve_line(elements[0], env), _resolve_line(elements[1], env)
+                if l1 and l2:
+                    actual = abs(math.atan2(_cross(l1.d, l2.d), _dot(l1.d, l2.d)))
+                    ok = abs(actual - expected) <= angle_tol or abs((math.pi - actual) - expected) <= angle_tol
+                    return done(ok, expected=math.degrees(expected), actual=math.degrees(actual))
+        elif kind in ("parallel", "perpendicular"):
+            lines = [_resolve_line(e, env) for e in elements] if len(elements) == 2 else []
+            if len(elements) == 4:
+                points = split_points(elements, env)
+                if points and len(points) == 4:
+                    lines = [_line_through(points[0], points[1]), _line_through(points[2], points[3])]
+            if len(lines) == 2 and all(lines):
+                u, v = lines
+                sine = _cross(u.d, v.d) / (_norm(u.d) * _norm(v.d))
+                cosine = _dot(u.d, v.d) / (_norm(u.d) * _norm(v.d))
+                measure = abs(sine) if kind == "parallel" else abs(cosine)
+                return done(measure <= math.sin(angle_tol), deviation=measure)
+        elif kind == "midpoint":
+            points = split_points(elements, env)
+            if points and len(points) == 3:
+                m, a, b = points
+                expected = Pt((a.x + b.x) / 2, (a.y + b.y) / 2)
+                error = _norm(_sub(m, expected))
+                return done(error <= length_tol * max(1.0, _norm(_sub(a, b))), deviation=error)
+        elif kind in ("incidence", "intersection"):
+            point = split_points(elements[0], env)
+            if point and len(point) == 1:
+                deviations = []
+                for other in elements[1:]:
+                    target = env.get(other) if isinstance(other, str) else None
+                    if isinstance(target, CircleObj):
+                        deviations.append(abs(_norm(_sub(point[0], target.center)) - target.r))
+                        continue
+                    line = _resolve_line(other, env)
+                    if line is None:
+                        return result
+                    deviations.append(distance_point_line(point[0], line))
+                if deviations:
+                    return done(max(deviations) <= length_tol, deviation=max(deviations))
+        elif kind == "collinear":
+            points = split_points(elements, env)
+            if points and len(points) >= 3:
+                line = _line_through(points[0], points[1])
+                deviation = max(distance_point_line(p, line) for p in points[2:])
+                return done(deviation <= length_tol, deviation=deviation)
+        elif kind == "equal":
+            if len(elements) == 2:
+                groups = [split_points(e, env) for e in elements]
+                if all(groups) and all(len(g) == 2 for g in groups):
+                    l1, l2 = (_norm(_sub(g[0], g[1])) for g in groups)
+                    return done(_close(l1, l2, length_tol), actual=[l1, l2])
+                if all(groups) and all(len(g) == 3 for g in groups):
+                    a1, a2 = (undirected_angle(*g) for g in groups)
+                    return done(abs(a1 - a2) <= angle_tol, actual=[math.degrees(a1), math.degrees(a2)])
+        elif kind == "circle":
+            center = split_points(elements[0], env)
+            circles = [v for v in env.values() if isinstance(v, CircleObj)]
+            if center and len(center) == 1 and circles:
+                ok = any(_norm(_sub(c.center, center[0])) <= length_tol and _close(c.r, float(value), length_tol)
+                         for c in circles)
+                return done(ok, expected=float(value))
+        elif kind == "equal_sides":
+            points = split_points(elements, env)
+            if points and len(points) >= 3:
+                sides = [_norm(_sub(points[i], points[(i + 1) % len(points)])) for i in range(len(points))]
+                return done(all(_close(s, sides[0], length_tol) for s in sides), actual=sides)
+        elif kind in ("isosceles", "right_triangle"):
+            points = split_points(elements, env)
+            if points and len(points) == 3:
+                if kind == "isosceles":
+                    sides = [_norm(_sub(points[i], points[(i + 1) % 3])) for i in range(3)]
+                    ok = any(_close(sides[i], sides[(i + 1) % 3], length_tol) for i in range(3))
+                    return done(ok, actual=sides)
+                angles = [undirected_angle(points[i - 1], points[i], points[(i + 1) % 3]) for i in range(3)]
+                return done(any(abs(a - math.pi / 2) <= angle_tol for a in angles),
+                            actual=[math.degrees(a) for a in angles])
+        elif kind == "right_angles":
+            points = split_points(elements, env)
+            if points and len(points) == 4:
+                angles = [undirected_angle(points[i - 1], points[i], points[(i + 1) % 4]) for i in range(4)]
+                return done(all(abs(a - math.pi / 2) <= angle_tol for a in angles),
+                            actual=[math.degrees(a) for a in angles])
+    except (EvaluationError, ValueError, TypeError, ZeroDivisionError) as e:
+        result["reason"] = str(e)
+    return result
+
+
+def verify_construction(commands: List[Any], parsed_elements: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    명령어를 실행하고 parsed_elements 조건을 검증
+
+    해석하지 못한 조건과 명령어가 정의하지 않은 객체의 점은 unresolved 항목(checks 에도 포함)으로 남긴다.
+
+    Returns:
+        verified: 모든 명령어가 실행되고, 조건이 하나 이상 있으며, 전부 통과했고, 모든 조건이 검사되었으며
+            (covered) 모든 객체의 점이 정의되었는지
+        covered: 해석하지 못한 조건이 없고 모든 객체의 점이 정의되었는지
+        checks / failed / unresolved / errors / unsupported (지원하지 않는 명령어)
+    """
+    evaluation = evaluate_commands(commands)
+    env = evaluation["env"]
+    constraint_set = collect_constraints(parsed_elements or {})
+    checks = [check_constraint(c, env) for c in constraint_set.constraints]
+    gaps = [{"constraint": item["source"], "kind": item["kind"] or "unknown", "status": "unresolved",
+             "reason": item["reason"]} for item in constraint_set.unsupported]
+    for item in constraint_set.required:
+        missing = [str(element) for element in item["elements"] if split_points(element, env) is None]
+        if missing:
+            gaps.append({"constraint": item["source"], "kind": "object", "status": "unresolved",
+                         "reason": f"not defined by the commands: {', '.join(missing)}"})
+    checks += gaps
+    failed = [c for c in checks if c["status"] == "fail"]
+    unresolved = [c for c in checks if c["status"] == "unresolved"]
+    covered = not gaps
+    verified = evaluation["complete"] and covered and bool(checks) and not failed and not unresolved
+    return {
+        "verified": verified,
+        "covered": covered,
+        "complete": evaluation["complete"],
+        "errors": evaluation["errors"],
+        "unsupported": evaluation["unsupported"],
+        "checks": checks,
+        "failed": failed,
+        "unresolved": unresolved,
+        "objects": {name: _describe(value) for name, value in env.items()},
+    }
+
+
+def _describe(value: Any) -> Any:
+    if isinstance(value, (Pt, Vec)):
+        return [round(value.x, 6), round(value.y, 6)]
+    if isinstance(value, CircleObj):
+        return {"center": _describe(value.center), "radius": round(value.r, 6)}
+    if isinstance(value, LineObj):
+        return {"kind": value.kind, "point": _describe(value.p), "direction": _describe(value.d)}
+    if isinstance(value, PolygonObj):
+        return [_describe(v) for v in value.vertices]
+    if isinstance(value, float):
+        return round(value, 6)
+    return value if isinstance(value, (int, str, bool)) else str(value)
@@ -0,0 +1,826 @@
+"""
+GeoGebra 명령어 구문 분석/검증 모듈
+
+LLM 검증 전에 생성된 GeoGebra 명령어를 로컬에서 결정적으로 검사합니다.
+
+- 토큰화 및 재귀 하강 파싱 (라벨 정의, 명령어 호출, 좌표, 리스트, 수식, 방정식)
+- data/geogebra_*_commands.json 의 syntax 로부터 명령어별 인자 개수(arity) 추출
+- 알 수 없는 명령어, 인자 개수 오류, 괄호 불균형
+- 정의 순서 추적: 정의되지 않은 객체 참조, 정의 전 사용, 순환 정의
+
+파싱 결과(Statement)는 수치 평가기(geogebra_evaluator)에서도 재사용합니다.
+"""
+
+import difflib
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+COMMAND_CORPUS_FILES = ("geogebra_object_commands.json", "geogebra_value_commands.json")
+
+
+class GeoGebraSyntaxError(Exception):
+    """GeoGebra 명령어 구문 오류"""
+
+    def __init__(self, message: str, position: int = -1):
+        super().__init__(message)
+        self.position = position
+
+
+# ----------------------------------------------------------------------
+# 명령어 시그니처
+# ----------------------------------------------------------------------
+class Signature(NamedTuple):
+    """
+    명령어 이름과 허용 인자 개수 (variadic_min 이 있으면 그 이상 모두 허용)
+
+    선택 인자가 있는 형식은 최소~최대 사이의 모든 개수가 arities 에 들어간다.
+    """
+    name: str
+    arities: frozenset
+    variadic_min: Optional[int] = None
+
+    def accepts(self, count: int) -> bool:
+        if count in self.arities:
+            return True
+        return self.variadic_min is not None and count >= self.variadic_min
+
+    def describe(self) -> str:
+        parts: List[str] = []
+        runs: List[List[int]] = []
+        for n in sorted(self.arities):  # 연속된 개수는 범위로 표시 (예: 2-9)
+            if runs and runs[-1][-1] == n - 1:
+                runs[-1].append(n)
+            else:
+                runs.append([n])
+        for run in runs:
+            parts.append(f"{run[0]}-{run[-1]}" if len(run) > 2 else ", ".join(map(str, run)))
+        if self.variadic_min is not None:
+            parts.append(f"{self.variadic_min}+")
+        return ", ".join(parts)
+
+
+# 코퍼스에 없지만 생성 결과에 자주 등장하는 명령어 (이름: (허용 인자 개수, 가변 최소 개수))
+SUPPLEMENTAL_SIGNATURES: Dict[str, Tuple[Tuple[int, ...], Optional[int]]] = {
+    "Rotate": ((1, 2, 3), None),
+    "Reflect": ((2,), None),
+    "Mirror": ((2,), None),
+    "Translate": ((2,), None),
+    "Dilate": ((2, 3), None),
+    "Stretch": ((2, 3), None),
+    "Shear": ((2, 3), None),
+    "Perpendicular": ((2, 3), None),
+    "OrthogonalLine": ((2, 3), None),
+    "LineBisector": ((1, 2), None),
+    "UnitPerpendicularVector": ((1,), None),
+    "Polar": ((2,), None),
+    "Diameter": ((2,), None),
+    "Asymptote": ((1,), None),
+    "Vertex": ((1, 2), None),
+    "Corner": ((1, 2), None),
+    "Text": ((1, 2, 3, 4), None),
+    "Sequence": ((1, 2, 4, 5), None),
+    "Zip": ((), 3),
+    "Element": ((), 2),
+    "If": ((), 2),
+    "Function": ((3,), None),
+    "Sum": ((1, 2, 4), None),
+    "Min": ((), 1),
+    "Max": ((), 1),
+    "ShowLabel": ((2,), None),
+    "ShowAxes": ((0, 1, 2), None),
+    "ShowGrid": ((0, 1, 2), None),
+    "SetLabelMode": ((2,), None),
+    "SetVisibleInView": ((3,), None),
+    "SetFixed": ((2, 3), None),
+    "SetFilling": ((2,), None),
+    "SetLineThickness": ((2,), None),
+    "SetDecoration": ((2, 3), None),
+    "SetBackgroundColor": ((2, 4), None),
+    "SetLayer": ((2,), None),
+    "SetTrace": ((2,), None),
+    "Delete": ((1,), None),
+    "Rename": ((2,), None),
+    "CopyFreeObject": ((1,), None),
+    "ZoomIn": ((0, 1, 2, 3, 4), None),
+    "RegularPolygon": ((3, 4), None),
+    "Conic": ((5, 6), None),
+    "Relation": ((1, 2), None),
+    "Checkbox": ((0, 1, 2), None),
+    "InputBox": ((0, 1), None),
+    "Button": ((0, 1), None),
+    "Prove": ((1,), None),
+    "ProveDetails": ((1,), None),
+}
+
+# 코퍼스 syntax 에 전체 형식만 있고 뒤쪽 인자를 생략할 수 있는 명령어 (이름: 필수 인자 개수)
+# 예: Slider( <Min>, <Max>, <Increment>, ... ) 는 Slider(0, 10) 도 된다
+OPTIONAL_ARGUMENTS: Dict[str, int] = {
+    "Slider": 2,
+}
+
+# 라벨 없이 호출해도 새 객체를 만들지 않는 동작 명령어
+ACTION_COMMANDS = {
+    "SetColor", "SetConditionToShowObject", "SetValue", "SetCoords", "SetPointSize",
+    "SetLineStyle", "SetCaption", "ShowLabel", "ShowAxes", "ShowGrid", "SetLabelMode",
+    "SetVisibleInView", "SetFixed", "SetFilling", "SetLineThickness", "SetDecoration",
+    "SetBackgroundColor", "SetLayer", "SetTrace", "Delete", "Rename", "ZoomIn",
+}
+
+# 변수를 바인딩하는 명령어: 이름 -> 변수 인자 위치를 돌려주는 함수
+BINDER_COMMANDS = {
+    "Sequence": lambda n: [1] if n >= 4 else [],
+    "Sum": lambda n: [1] if n == 4 else [],
+    "Zip": lambda n: list(range(1, n, 2)),
+    "Curve": lambda n: [n - 3] if n >= 5 else [],
+}
+
+# 출력 객체에 이름을 자동으로 붙이는 명령어 (최상위 호출일 때)
+# Polygon(A, B, C) 는 변 a, b, c (이름이 겹치면 f, g ...), 정다각형이면 나머지 꼭짓점도 만들고,
+# Intersect 는 교점이 여럿이면 P_1, P_2 처럼 라벨에 번호를 붙이거나 빈 대문자 이름을 쓴다
+_INDEX_SUFFIX = r"(?:_?\d+|_\{\d+\})?"
+AUTO_NAMING_COMMANDS = {
+    "Polygon": [rf"[a-z]{_INDEX_SUFFIX}", rf"[A-Z]{_INDEX_SUFFIX}"],
+    "Intersect": [rf"[A-Z]{_INDEX_SUFFIX}"],
+}
+
+# 수학 함수 (명령어가 아니므로 인자 개수만 느슨하게 확인)
+MATH_FUNCTIONS = {
+    "sqrt": (1,), "cbrt": (1,), "abs": (1,), "sgn": (1,), "sign": (1,), "exp": (1,),
+    "ln": (1,), "log": (1, 2), "lg": (1,), "ld": (1,),
+    "sin": (1,), "cos": (1,), "tan": (1,), "cot": (1,), "sec": (1,), "csc": (1,),
+    "asin": (1,), "acos": (1,), "atan": (1,), "arcsin": (1,), "arccos": (1,), "arctan": (1,),
+    "atan2": (2,), "sinh": (1,), "cosh": (1,), "tanh": (1,), "asinh": (1,), "acosh": (1,), "atanh": (1,),
+    "sind": (1,), "cosd": (1,), "tand": (1,), "asind": (1,), "acosd": (1,), "atand": (1,),
+    "floor": (1,), "ceil": (1,), "round": (1, 2), "random": (0,), "nroot": (2,),
+    "gamma": (1,), "real": (1,), "imaginary": (1,), "arg": (1,), "conjugate": (1,),
+    "fractionalpart": (1,), "x": (1,), "y": (1,), "z": (1,),
+}
+
+# 상수와 방정식 자유 변수
+CONSTANTS = {"pi", "π", "e", "ℯ", "i", "ί", "infinity", "∞", "deg", "true", "false"}
+FREE_VARIABLES = {"x", "y", "z"}
+# GeoGebra 가 미리 만들어 두는 객체 (소문자로 비교)
+BUILTIN_OBJECTS = {"xaxis", "yaxis", "zaxis", "xoyplane", "space"}
+
+
+def _split_syntax_args(syntax: str) -> Optional[List[str]]:
+    """'Circle( <Point>, <Radius> )' -> ['<Point>', '<Radius>']"""
+    start, end = syntax.find("("), syntax.rfind(")")
+    if start < 0 or end < start:
+        return None
+    inner = syntax[start + 1:end].strip()
+    if not inner:
+        return []
+    args, depth, current = [], 0, []
+    for ch in inner:
+        if ch in "<([{":
+            depth += 1
+        elif ch in ">)]}":
+            depth -= 1
+        if ch == "," and depth == 0:
+            args.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    args.append("".join(current).strip())
+    return args
+
+
+def _is_ellipsis(arg: str) -> bool:
+    return arg.replace("​", "").strip() in ("…", "...")
+
+
+@lru_cache(maxsize=1)
+def load_command_signatures() -> Dict[str, Signature]:
+    """
+    명령어 코퍼스에서 시그니처를 만든다 (소문자 이름 -> Signature)
+
+    코퍼스의 syntax 문자열에서 인자 개수를 세고, '…' 가 있으면 가변 인자로 본다.
+    '[<...>]' 로 감싼 인자와 OPTIONAL_ARGUMENTS 의 뒤쪽 인자는 생략 가능한 것으로 보고 최소~최대 범위를 허용한다.
+    """
+    collected: Dict[str, Dict[str, Any]] = {}
+
+    def add(name: str, arities, variadic_min):
+        entry = collected.setdefault(name.lower(), {"name": name, "arities": set(), "variadic_min": None})
+        entry["arities"].update(arities)
+        if variadic_min is not None:
+            current = entry["variadic_min"]
+            entry["variadic_min"] = variadic_min if current is None else min(current, variadic_min)
+
+    for filename in COMMAND_CORPUS_FILES:
+        path = os.path.join(_DATA_DIR, filename)
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            corpus = json.load(f)
+        for item in corpus:
+            name = item.get("command")
+            if not name:
+                continue
+            for usage in item.get("usage", []):
+                args = _split_syntax_args(usage.get("syntax", ""))
+                if args is None:
+                    continue
+                if any(_is_ellipsis(a) for a in args):
+                    add(name, (), len([a for a in args if not _is_ellipsis(a)]))
+                else:
+                    required = len([a for a in args if not a.startswith("[")])
+                    required = min(required, OPTIONAL_ARGUMENTS.get(name, required))
+                    add(name, range(required, len(args) + 1), None)
+
+    for name, (arities, variadic_min) in SUPPLEMENTAL_SIGNATURES.items():
+        add(name, arities, variadic_min)
+
+    return {
+        key: Signature(entry["name"], frozenset(entry["arities"]), entry["variadic_min"])
+        for key, entry in collected.items()
+    }
+
+
+# ----------------------------------------------------------------------
+# 토큰화
+# ----------------------------------------------------------------------
+class Token(NamedTuple):
+    kind: str   # NUMBER, NAME, STRING, OP, END
+    value: str
+    position: int
+
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<WS>\s+)
+  | (?P<STRING>"(?:[^"\\]|\\.)*")
+  | (?P<NUMBER>\d+(?:\.\d*)?|\.\d+)
+  | (?P<NAME>[^\W\d](?:[^\W_]|_(?!\{))*(?:_\{[^{}]*\})?'*)
+  | (?P<OP>==|!=|<=|>=|≟|≠|≤|≥|[-+*/^=:,;()\[\]{}<>°!∈∧∨⊥∥&|√·×])
+    """,
+    re.VERBOSE,
+)
+
+_OPEN_BRACKETS = {"(": ")", "[": "]", "{": "}"}
+_CLOSE_BRACKETS = {v: k for k, v in _OPEN_BRACKETS.items()}
+
+
+def tokenize(source: str) -> List[Token]:
+    tokens = []
+    position = 0
+    while position < len(source):
+        match = _TOKEN_RE.match(source, position)
+        if match is None:
+            raise GeoGebraSyntaxError(f"unexpected character '{source[position]}'", position)
+        kind = match.lastgroup
+        if kind != "WS":
+            tokens.append(Token(kind, match.group(kind), position))
+        position = match.end()
+    tokens.append(Token("END", "", len(source)))
+    return tokens
+
+
+def check_brackets(source: str) -> Optional[GeoGebraSyntaxError]:
+    """문자열 리터럴을 건너뛰며 괄호 짝을 확인 (오류가 없으면 None)"""
+    stack: List[Tuple[str, int]] = []
+    in_string = False
+    escaped = False
+    for position, ch in enumerate(source):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in _OPEN_BRACKETS:
+            stack.append((ch, position))
+        elif ch in _CLOSE_BRACKETS:
+            if not stack:
+                return GeoGebraSyntaxError(f"unmatched closing '{ch}'", position)
+            opened, opened_at = stack.pop()
+            if _OPEN_BRACKETS[opened] != ch:
+                return GeoGebraSyntaxError(
+                    f"'{opened}' at {opened_at} closed by '{ch}'", position
+                )
+    if in_string:
+        return GeoGebraSyntaxError("unterminated string literal", len(source))
+    if stack:
+        opened, opened_at = stack[-1]
+        return GeoGebraSyntaxError(f"unclosed '{opened}'", opened_at)
+    return None
+
+
+# ----------------------------------------------------------------------
+# 구문 트리
+# ----------------------------------------------------------------------
+class Num(NamedTuple):
+    value: float
+
+
+class Str(NamedTuple):
+    value: str
+
+
+class Name(NamedTuple):
+    id: str
+    position: int
+
+
+class Call(NamedTuple):
+    name: str
+    args: tuple
+    position: int
+
+
+class TupleExpr(NamedTuple):
+    items: tuple
+    polar: bool = False
+
+
+class ListExpr(NamedTuple):
+    items: tuple
+
+
+class BinOp(NamedTuple):
+    op: str
+    left: Any
+    right: Any
+
+
+class Unary(NamedTuple):
+    op: str
+    operand: Any
+
+
+class Postfix(NamedTuple):
+    op: str
+    operand: Any
+
+
+class Statement(NamedTuple):
+    """
+    명령어 한 줄의 파싱 결과
+
+    labels: 이 줄이 정의하는 이름들 (없으면 빈 튜플)
+    params: 함수 정의 f(x) = ... 의 매개변수
+    kind: assign(=) / define(:) / expr(라벨 없음)
+    """
+    index: int
+    source: str
+    labels: tuple
+    params: tuple
+    kind: str
+    expr: Any
+
+
+_COMPARISON_OPS = {"=", "==", "!=", "≠", "<", ">", "<=", ">=", "≤", "≥", "≟", "∈", "⊥", "∥"}
+
+
+class _Parser:
+    def __init__(self, source: str):
+        self.source = source
+        self.tokens = tokenize(source)
+        self.pos = 0
+
+    @property
+    def current(self) -> Token:
+        return self.tokens[self.pos]
+
+    def peek(self, offset: int = 1) -> Token:
+        return self.tokens[min(self.pos + offset, len(self.tokens) - 1)]
+
+    def advance(self) -> Token:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def accept(self, value: str) -> bool:
+        if self.current.kind == "OP" and self.current.value == value:
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, value: str) -> Token:
+        if not (self.current.kind == "OP" and self.current.value == value):
+            found = self.current.value or "end of command"
+            raise GeoGebraSyntaxError(f"expected '{value}' but found '{found}'", self.current.position)
+        return self.advance()
+
+    # 라벨 -------------------------------------------------------------
+    def parse_labels(self) -> Tuple[tuple, tuple, str]:
+        """'A =', 'c:', 'f(x) =', 'A, B =' 형태의 라벨 부분을 인식"""
+        start = self.pos
+        if self.current.kind != "NAME":
+            return (), (), "expr"
+
+        # A, B = ...
+        labels = [self.advance().value]
+        while self.current.kind == "OP" and self.current.value == "," and self.peek().kind == "NAME":
+            self.advance()
+            labels.append(self.advance().value)
+
+        params: List[str] = []
+        if len(labels) == 1 and self.current.kind == "OP" and self.current.value == "(":
+            # f(x) = ... : 괄호 안이 모두 이름이고 뒤에 '=' 가 오면 함수 정의
+            save = self.pos
+            self.advance()
+            names = []
+            while self.current.kind == "NAME":
+                names.append(self.advance().value)
+                if not self.accept(","):
+                    break
+            if names and self.accept(")") and self.current.kind == "OP" and self.current.value == "=":
+                params = names
+            else:
+                self.pos = save
+
+        if self.current.kind == "OP" and self.current.value in ("=", ":"):
+            if len(labels) > 1 and self.current.value != "=":
+                self.pos = start
+                return (), (), "expr"
+            kind = "assign" if self.current.value == "=" else "define"
+            self.advance()
+            return tuple(labels), tuple(params), kind
+
+        self.pos = start
+        return (), (), "expr"
+
+    # 식 ---------------------------------------------------------------
+    def parse_statement(self, index: int) -> Statement:
+        labels, params, kind = self.parse_labels()
+        if self.current.kind == "END":
+            raise GeoGebraSyntaxError("missing expression", self.current.position)
+        expr = self.parse_expression()
+        if self.current.kind != "END":
+            raise GeoGebraSyntaxError(f"unexpected '{self.current.value}'", self.current.position)
+        return Statement(index, self.source, labels, params, kind, expr)
+
+    def parse_expression(self):
+        return self.parse_logical()
+
+    def parse_logical(self):
+        left = self.parse_comparison()
+        while self.current.kind == "OP" and self.current.value in ("∧", "∨", "&", "|"):
+            op = self.advance().value
+            left = BinOp(op, left, self.parse_comparison())
+        return left
+
+    def parse_comparison(self):
+        left = self.parse_additive()
+        if self.current.kind == "OP" and self.current.value in _COMPARISON_OPS:
+            op = self.advance().value
+            left = BinOp(op, left, self.parse_additive())
+        return left
+
+    def parse_additive(self):
+        left = self.parse_term()
+        while self.current.kind == "OP" and self.current.value in ("+", "-"):
+            op = self.advance().value
+            left = BinOp(op, left, self.parse_term())
+        return left
+
+    def _starts_primary(self) -> bool:
+        token = self.current
+        return token.kind in ("NUMBER", "NAME") or (token.kind == "OP" and token.value in ("(", "√"))
+
+    def parse_term(self):
+        left = self.parse_unary()
+        while True:
+            if self.current.kind == "OP" and self.current.value in ("*", "/", "·", "×"):
+                op = self.advance().value
+                left = BinOp("/" if op == "/" else "*", left, self.parse_unary())
+            elif self._starts_primary():
+                # 암시적 곱셈: 2x, 2 sqrt(3), 3π
+                left = BinOp("*", left, self.parse_power())
+            else:
+                return left
+
+    def parse_unary(self):
+        if self.current.kind == "OP" and self.current.value in ("-", "+"):
+            op = self.advance().value
+            return Unary(op, self.parse_unary())
+        return self.parse_power()
+
+    def parse_power(self):
+        base = self.parse_postfix()
+        if self.accept("^"):
+            return BinOp("^", base, self.parse_unary())
+        return base
+
+    def parse_postfix(self):
+        node = self.parse_primary()
+        while self.current.kind == "OP" and self.current.value in ("°", "!"):
+            node = Postfix(self.advance().value, node)
+        return node
+
+    def parse_arguments(self, closing: str) -> tuple:
+        args = []
+        if self.accept(closing):
+            return ()
+        while True:
+            args.append(self.parse_expression())
+            if self.accept(closing):
+                return tuple(args)
+            self.expect(",")
+
+    def parse_primary(self):
+        token = self.current
+        if token.kind == "NUMBER":
+            self.advance()
+            return Num(float(token.value))
+        if token.kind == "STRING":
+            self.advance()
+            return Str(token.value[1:-1])
+        if token.kind == "NAME":
+            self.advance()
+            if self.current.kind == "OP" and self.current.value in ("(", "["):
+                closing = ")" if self.advance().value == "(" else "]"
+                return Call(token.value, self.parse_arguments(closing), token.position)
+            return Name(token.value, token.position)
+        if token.kind == "OP" and token.value == "√":
+            self.advance()
+            return Call("sqrt", (self.parse_postfix(),), token.position)
+        if token.kind == "OP" and token.value == "(":
+            self.advance()
+            first = self.parse_expression()
+            if self.accept(")"):
+                return first
+            separator = self.current.value if self.current.kind == "OP" else ""
+            if separator not in (",", ";"):
+                raise GeoGebraSyntaxError(f"expected ')' but found '{self.current.value}'", self.current.position)
+            items = [first]
+            while self.accept(separator):
+                items.append(self.parse_expression())
+            self.expect(")")
+            return TupleExpr(tuple(items), polar=(separator == ";"))
+        if token.kind == "OP" and token.value == "{":
+            self.advance()
+            return ListExpr(self.parse_arguments("}"))
+        found = token.value or "end of command"
+        raise GeoGebraSyntaxError(f"unexpected '{found}'", token.position)
+
+
+# ----------------------------------------------------------------------
+# 공개 API
+# ----------------------------------------------------------------------
+def clean_command(command: Any) -> str:
+    """LLM 출력에 섞인 따옴표, 끝 쉼표/세미콜론 등을 정리"""
+    text = str(command).strip()
+    text = text.rstrip(",;").strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in ("'", '"', "`"):
+        text = text[1:-1].strip()
+    return text
+
+
+def is_comment(command: str) -> bool:
+    return not command or command.startswith("#") or command.startswith("//")
+
+
+def parse_command(source: str, index: int = 0) -> Statement:
+    """
+    명령어 한 줄을 파싱
+
+    Raises:
+        GeoGebraSyntaxError: 괄호 불균형 또는 구문 오류
+    """
+    bracket_error = check_brackets(source)
+    if bracket_error is not None:
+        raise bracket_error
+    return _Parser(source).parse_statement(index)
+
+
+def iter_nodes(node):
+    """구문 트리를 전위 순회"""
+    yield node
+    if isinstance(node, Call):
+        for arg in node.args:
+            yield from iter_nodes(arg)
+    elif isinstance(node, (TupleExpr, ListExpr)):
+        for item in node.items:
+            yield from iter_nodes(item)
+    elif isinstance(node, BinOp):
+        yield from iter_nodes(node.left)
+        yield from iter_nodes(node.right)
+    elif isinstance(node, (Unary, Postfix)):
+        yield from iter_nodes(node.operand)
+
+
+def resolve_command(name: str) -> Optional[Signature]:
+    """명령어 이름(대소문자 무시)으로 시그니처 조회"""
+    return load_command_signatures().get(name.lower())
+
+
+def _bound_names(node) -> Set[str]:
+    """Sequence/Zip/Curve 등이 바인딩하는 지역 변수 이름"""
+    bound: Set[str] = set()
+    for sub in iter_nodes(node):
+        if isinstance(sub, Call):
+            signature = resolve_command(sub.name)
+            binder = BINDER_COMMANDS.get(signature.name) if signature else None
+            if binder:
+                for i in binder(len(sub.args)):
+                    if i < len(sub.args) and isinstance(sub.args[i], Name):
+                        bound.add(sub.args[i].id)
+    return bound
+
+
+def referenced_names(statement: Statement) -> Set[str]:
+    """명령어가 참조하는 이름 (객체/함수 이름 후보, 매개변수와 지역 변수 제외)"""
+    local_names = set(statement.params) | _bound_names(statement.expr)
+    names = set()
+    for node in iter_nodes(statement.expr):
+        if isinstance(node, Name):
+            names.add(node.id)
+        elif isinstance(node, Call):
+            names.add(node.name)
+    return names - local_names
+
+
+def auto_named_pattern(statement: Statement) -> Optional["re.Pattern"]:
+    """명령어가 자동으로 만들 수 있는 이름의 패턴 (Polygon/Intersect 최상위 호출이 아니면 None)"""
+    top = statement.expr
+    signature = resolve_command(top.name) if isinstance(top, Call) else None
+    if signature is None or signature.name not in AUTO_NAMING_COMMANDS:
+        return None
+    patterns = list(AUTO_NAMING_COMMANDS[signature.name])
+    patterns += [rf"{re.escape(label)}_(?:\d+|\{{\d+\}})" for label in statement.labels]
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
+class CommandIssue(NamedTuple):
+    """명령어별 검사 결과 항목 (index 는 원래 명령어 목록 기준 0부터)"""
+    index: int
+    command: str
+    code: str
+    severity: str  # error / warning
+    message: str
+
+    def describe(self) -> str:
+        return f"Command {self.index + 1} `{self.command}`: {self.message}"
+
+
+def validate_geogebra_commands(commands: List[Any]) -> Dict[str, Any]:
+    """
+    GeoGebra 명령어 목록을 로컬에서 검증
+
+    Args:
+        commands: 생성된 GeoGebra 명령어 목록
+
+    Returns:
+        ValidationResult 와 호환되는 딕셔너리
+        (is_valid, errors, warnings, suggestions, command_by_command_analysis, analysis)
+        와 추가 정보 issues, statements, definitions
+    """
+    issues: List[CommandIssue] = []
+    statements: List[Statement] = []
+
+    # 1단계: 파싱
+    cleaned = [clean_command(c) for c in commands]
+    for index, source in enumerate(cleaned):
+        if is_comment(source):
+            continue
+        try:
+            statements.append(parse_command(source, index))
+        except GeoGebraSyntaxError as e:
+            code = "unbalanced_brackets" if any(
+                k in str(e) for k in ("unclosed", "unmatched", "closed by", "unterminated")
+            ) else "syntax_error"
+            issues.append(CommandIssue(index, source, code, "error", f"{str(e)} (at column {e.position + 1})"))
+
+    # 2단계: 정의 위치 수집 (처음 정의된 위치)
+    definitions: Dict[str, int] = {}
+    for statement in statements:
+        for label in statement.labels:
+            definitions.setdefault(label, statement.index)
+
+    # 3단계: 명령어/참조 검사
+    suggestions: List[str] = []
+    unlabeled_seen = False
+    auto_named: List["re.Pattern"] = []
+    for statement in statements:
+        source = statement.source
+        local_names = set(statement.params) | _bound_names(statement.expr)
+        for node in iter_nodes(statement.expr):
+            if isinstance(node, Call):
+                if node.name in definitions and node.name not in MATH_FUNCTIONS:
+                    # 사용자 정의 함수/객체 호출 (예: f(2))
+                    _check_reference(node.name, statement, definitions, unlabeled_seen, issues, auto_named)
+                    continue
+                if node.name.lower() in MATH_FUNCTIONS:
+                    allowed = MATH_FUNCTIONS[node.name.lower()]
+                    if len(node.args) not in allowed:
+                        issues.append(CommandIssue(
+                            statement.index, source, "wrong_arity", "error",
+                            f"function '{node.name}' takes {', '.join(map(str, allowed))} argument(s), got {len(node.args)}",
+                        ))
+                    continue
+                signature = resolve_command(node.name)
+                if signature is None:
+                    close = difflib.get_close_matches(
+                        node.name, [s.name for s in load_command_signatures().values()], n=3, cutoff=0.7
+                    )
+                    # 코퍼스는 GeoGebra 명령어 일부만 담고 있으므로 비슷한 이름이 있을 때(오타)만 오류로 본다
+                    hint = f" (did you mean {', '.join(close)}?)" if close else " (not in the local command list)"
+                    issues.append(CommandIssue(
+                        statement.index, source, "unknown_command", "error" if close else "warning",
+                        f"unknown command '{node.name}'{hint}",
+                    ))
+                    if close:
+                        suggestions.append(f"Replace '{node.name}' with '{close[0]}' in command {statement.index + 1}")
+                elif not signature.accepts(len(node.args)):
+                    issues.append(CommandIssue(
+                        statement.index, source, "wrong_arity", "error",
+                        f"'{signature.name}' accepts {signature.describe()} argument(s), got {len(node.args)}",
+                    ))
+            elif isinstance(node, Name):
+                name = node.id
+                if (name in local_names or name.lower() in CONSTANTS or name.lower() in BUILTIN_OBJECTS
+                        or name in FREE_VARIABLES):
+                    continue
+                if name in statement.labels and statement.kind == "define":
+                    continue
+                _check_reference(name, statement, definitions, unlabeled_seen, issues, auto_named)
+
+        pattern = auto_named_pattern(statement)
+        if pattern is not None:
+            auto_named.append(pattern)
+        if not statement.labels:
+            top = statement.expr
+            if not (isinstance(top, Call) and (resolve_command(top.name) or Signature("", frozenset())).name in ACTION_COMMANDS):
+                unlabeled_seen = True
+
+    return _build_report(commands, cleaned, issues, suggestions, statements, definitions)
+
+
+def _check_reference(name: str, statement: Statement, definitions: Dict[str, int],
+                     unlabeled_seen: bool, issues: List[CommandIssue],
+                     auto_named: Optional[List["re.Pattern"]] = None) -> None:
+    defined_at = definitions.get(name)
+    if defined_at is None:
+        # 라벨 없는 명령어나 앞선 Polygon/Intersect 가 자동 이름(A, f, c, P_1 ...)을 만들었을 수 있으면 경고로 낮춘다
+        auto_created = any(pattern.fullmatch(name) for pattern in auto_named or [])
+        severity = "warning" if unlabeled_seen or auto_created else "error"
+        hint = " (it may be auto-created by an earlier Polygon/Intersect command)" if auto_created else ""
+        issues.append(CommandIssue(
+            statement.index, statement.source, "undefined_reference", severity,
+            f"'{name}' is not defined by any command{hint}",
+        ))
+    elif defined_at == statement.index:
+        if statement.kind == "assign" and name in statement.labels:
+            issues.append(CommandIssue(
+                statement.index, statement.source, "circular_definition", "error",
+                f"'{name}' is defined in terms of itself",
+            ))
+    elif defined_at > statement.index:
+        issues.append(CommandIssue(
+            statement.index, statement.source, "use_before_definition", "error",
+            f"'{name}' is used before its definition in command {defined_at + 1}",
+        ))
+
+
+def _build_report(commands, cleaned, issues, suggestions, statements, definitions) -> Dict[str, Any]:
+    # 같은 명령어에서 같은 메시지가 반복되지 않도록 정리
+    unique: List[CommandIssue] = []
+    seen = set()
+    for issue in issues:
+        key = (issue.index, issue.code, issue.message)
+        if key not in seen:
+            seen.add(key)
+            unique.append(issue)
+    unique.sort(key=lambda i: i.index)
+
+    errors = [i.describe() for i in unique if i.severity == "error"]
+    warnings = [i.describe() for i in unique if i.severity == "warning"]
+
+    by_index: Dict[int, List[CommandIssue]] = {}
+    for issue in unique:
+        by_index.setdefault(issue.index, []).append(issue)
+    command_analysis = []
+    for index, source in enumerate(cleaned):
+        if is_comment(source):
+            continue
+        found = by_index.get(index)
+        analysis = "; ".join(f"[{i.severity}] {i.message}" for i in found) if found else "OK (local syntax check)"
+        command_analysis.append({"command": source, "analysis": analysis,
+                                 "is_correct": not any(i.severity == "error" for i in found or ())})
+
+    is_valid = not errors
+    analysis = (
+        f"Local syntax validation: {len(statements)} command(s) parsed, "
+        f"{len(errors)} error(s), {len(warnings)} warning(s)."
+    )
+    return {
+        "analysis": analysis,
+        "is_valid": is_valid,
+        "errors": errors,
+        "warnings": warnings,
+        "suggestions": suggestions,
+        "command_by_command_analysis": command_analysis,
+        "issues": [i._asdict() for i in unique],
+        "statements": statements,
+        "definitions": definitions,
+    }
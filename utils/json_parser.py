@@ -4,12 +4,25 @@
 이 모듈은 LLM 출력에서 JSON을 추출하고 파싱하는 다양한 유틸리티 함수를 제공합니다.
 여러 형식(마크다운 코드 블록, 일반 JSON 문자열 등)을 처리하고
 강력한 오류 처리와 복구 메커니즘을 포함합니다.
+
+추출은 JSONScanner 의 한 번의 선형 스캔으로 합니다. 문자열과 이스케이프를 인식하는
+괄호 스택으로 최상위 JSON 값의 구간을 찾으며, 구조 문자 사이는 정규식 검색으로 건너뛰므로
+긴 응답에서도 전체 텍스트를 반복해서 훑거나 역추적하지 않습니다.
+
+- JSONScanner: 청크 단위로 이어서 스캔할 수 있는 괄호 스캐너 (최상위 값 구간 반환)
+- repair_json(fragment): 잘리거나 손상된 JSON 조각 복구 (열린 문자열/괄호 닫기, 후행 쉼표 제거)
+- IncrementalJSONParser: 스트리밍 응답을 청크마다 이어서 파싱 (완성된 값 또는 복구한 부분 값)
 """
 
 import json
+import logging
 import re
-from typing import Any, Type, TypeVar, Optional, Union, Dict, List, Callable
+from typing import Any, Type, TypeVar, Optional, Union, Dict, List, Callable, Tuple
 from pydantic import BaseModel, ValidationError
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 
 T = TypeVar('T', bound=BaseModel)
 
@@ -30,6 +43,374 @@ class ModelConversionError(ParseError):
     pass
 
 
+# ----------------------------------------------------------------------
+# 선형 스캐너
+# ----------------------------------------------------------------------
+_CLOSERS = {"{": "}", "[": "]"}
+# 문자열 본문을 정규식 한 번으로 건너뛴다: 끝 따옴표(그룹 1) 또는 텍스트 끝(잘린 문자열, 짝 없는
+# 이스케이프 문자는 그룹 2)까지. 이스케이프 쌍을 통째로 소비하므로 역추적이 생기지 않는다.
+_STRING_BODY = r'[^"\\]*(?:\\[\s\S][^"\\]*)*(?:(")|(\\)?\Z)'
+_STRING_REST = re.compile(_STRING_BODY)                  # 문자열 안에서 이어서 스캔
+# 값 안: 괄호가 아닌 글자와 완결된 문자열을 한꺼번에 건너뛴다 (다음 괄호 또는 잘린 문자열에서 멈춤)
+_SKIP_VALUE = re.compile(r'(?:[^"{}\[\]]+|"[^"\\]*(?:\\[\s\S][^"\\]*)*")*')
+_REPAIR_TOKEN = re.compile('"' + _STRING_BODY + r'|[{}\[\],:]')   # 복구 시 쉼표/콜론도 추적
+_OPENER_PATTERNS = {
+    "{[": re.compile(r"[{\[]"),
+    "{": re.compile(r"\{"),
+    "[": re.compile(r"\["),
+}
+_PY_LITERALS = re.compile(r"\b(True|False|None)\b")
+_PY_TO_JSON = {"True": "true", "False": "false", "None": "null"}
+# 잘린 문자열 끝의 미완성 이스케이프 (\ 또는 \u12)
+_DANGLING_ESCAPE = re.compile(r"(?<!\\)((?:\\\\)*)\\(?:u[0-9a-fA-F]{0,3})?\Z")
+_TRAILING_SCALAR = re.compile(r"[\w.+-]+\Z")
+_JSON_LITERALS = ("true", "false", "null")
+_DECODER = json.JSONDecoder(strict=False)   # 문자열 안의 줄바꿈 등 제어 문자 허용
+
+
+class JSONScanner:
+    """
+    문자열 인식 괄호 스캐너
+
+    텍스트를 한 번만 훑으며 최상위 JSON 값의 (시작, 끝) 구간을 찾는다. 상태(괄호 스택,
+    문자열/이스케이프 여부)를 유지하므로 스트리밍 청크를 순서대로 feed 할 수 있고,
+    구간 위치는 지금까지 들어온 전체 텍스트 기준이다.
+
+    값 밖의 텍스트(설명문, 코드 블록 표시)에서는 openers 에 있는 여는 괄호만 찾으며,
+    짝이 맞지 않는 닫는 괄호는 무시한다 (repair_json 에서 바로잡는다).
+    """
+
+    __slots__ = ("openers", "_outside", "offset", "stack", "start", "in_string", "string_start", "escape",
+                 "closes")
+
+    def __init__(self, openers: str = "{["):
+        self.openers = openers
+        self._outside = _OPENER_PATTERNS[openers]
+        self.offset = 0          # 지금까지 스캔한 글자 수
+        self.stack: List[str] = []
+        self.start = -1          # 열려 있는 최상위 값의 시작 위치
+        self.in_string = False
+        self.string_start = -1   # 닫히지 않은 문자열의 시작 따옴표 위치
+        self.escape = False      # 이전 청크가 이스케이프 문자로 끝남
+        self.closes = 0          # 지금까지 닫힌 괄호 수 (깊이 무관)
+
+    @property
+    def open(self) -> bool:
+        """최상위 값이 아직 닫히지 않았는지"""
+        return bool(self.stack)
+
+    def feed(self, chunk: str) -> List[Tuple[int, int]]:
+        """청크를 이어서 스캔하고 이번에 닫힌 최상위 값의 구간 목록 반환"""
+        spans: List[Tuple[int, int]] = []
+        base = self.offset
+        n = len(chunk)
+        pos = 0
+        if self.escape and n:
+            pos, self.escape = 1, False
+        stack = self.stack
+        while pos < n:
+            if self.in_string:
+                m = _STRING_REST.match(chunk, pos)
+                pos = m.end()
+                if m.group(1) is None:          # 청크 끝까지 문자열
+                    self.escape = m.group(2) is not None
+                    break
+                self.in_string = False
+                continue
+            if not stack:
+                m = self._outside.search(chunk, pos)
+                if m is None:
+                    break
+                self.start = base + m.start()
+                stack.append(m.group())
+                pos = m.end()
+                continue
+            pos = _SKIP_VALUE.match(chunk, pos).end()
+            if pos >= n:
+                break
+            char = chunk[pos]
+            if char == '"':                     # 청크 끝까지 닫히지 않은 문자열
+                self.in_string = True
+                self.string_start = base + pos
+                self.escape = _STRING_REST.match(chunk, pos + 1).group(2) is not None
+                break
+            pos += 1
+            if char in _CLOSERS:
+                stack.append(char)
+            elif char == _CLOSERS[stack[-1]]:
+                stack.pop()
+                self.closes += 1
+                if not stack:
+                    spans.append((self.start, base + pos))
+                    self.start = -1
+        self.offset += n
+        return spans
+
+    def close(self, text: str) -> str:
+        """
+        지금까지 스캔한 전체 텍스트에서 열려 있는 최상위 값을 현재 상태만으로 닫은 문자열
+
+        잘린 꼬리(문자열, 값 없는 키/콜론, 후행 쉼표, 미완성 리터럴/숫자)만 보정하므로 값 길이와
+        무관하게 비용이 작다. 값 중간의 손상은 repair_json 이 맡는다.
+        """
+        if not self.stack:
+            return ""
+        if self.in_string:
+            before = text[self.start:self.string_start].rstrip()
+            if self.stack[-1] == "{" and before[-1:] in ("{", ","):
+                value = before                    # 값 없는 키 제거
+            else:
+                value = text[self.start:self.string_start] + \
+                    _DANGLING_ESCAPE.sub(r"\1", text[self.string_start:], count=1) + '"'
+        else:
+            value = text[self.start:].rstrip()
+            if value.endswith(":"):
+                value += " null"
+            else:
+                scalar = _TRAILING_SCALAR.search(value)
+                if scalar is not None:
+                    value = value[:scalar.start()] + _complete_scalar(scalar.group())
+        if value.endswith(","):
+            value = value[:-1]
+        return value + "".join(_CLOSERS[opener] for opener in reversed(self.stack))
+
+    @classmethod
+    def scan(cls, text: str, openers: str = "{[") -> Tuple[List[Tuple[int, int]], int]:
+        """전체 텍스트를 스캔해 (닫힌 최상위 값 구간 목록, 닫히지 않은 값의 시작 위치 또는 -1) 반환"""
+        scanner = cls(openers)
+        spans = scanner.feed(text)
+        return spans, scanner.start if scanner.open else -1
+
+
+def _strip_trailing_comma(out: List[str]) -> None:
+    i = len(out) - 1
+    while i >= 0 and not out[i].strip():
+        i -= 1
+    if i >= 0 and out[i] == ",":
+        del out[i]
+
+
+def _complete_scalar(word: str) -> str:
+    """잘린 리터럴/숫자 보정 (tr → true, 12. → 12, - → null)"""
+    for literal in _JSON_LITERALS:
+        if literal.startswith(word):
+            return literal
+    trimmed = word.rstrip(".eE+-")
+    return trimmed if trimmed else "null"
+
+
+def _close_dangling_value(out: List[str]) -> None:
+    """잘린 위치의 값 정리: 값 없는 콜론에 null, 미완성 리터럴/숫자 보정"""
+    while out and not out[-1].strip():
+        out.pop()
+    if not out:
+        return
+    last = out[-1]
+    if last == ":":
+        out.append(" null")
+        return
+    if len(last) == 1 and last in '{}[],"':
+        return
+    word = last.strip()
+    if word.endswith('"'):
+        return
+    out[-1] = _complete_scalar(word)
+
+
+def repair_json(fragment: str) -> str:
+    """
+    잘리거나 손상된 JSON 조각을 한 번의 스캔으로 복구
+
+    - 문자열 밖의 후행 쉼표 제거, 짝이 맞지 않는 닫는 괄호를 열린 괄호에 맞게 교정
+    - Python 리터럴(True/False/None)을 JSON 리터럴로 변환
+    - 잘린 경우: 열린 문자열을 닫고, 값 없는 키와 미완성 리터럴/숫자를 정리한 뒤 열린 괄호를 닫음
+
+    첫 여는 괄호 앞의 텍스트와 최상위 값이 닫힌 뒤의 텍스트는 버린다.
+    복구 결과가 유효한 JSON 이라는 보장은 없으므로 호출 측에서 json.loads 로 확인한다.
+    """
+    first = _OPENER_PATTERNS["{["].search(fragment)
+    if first is None:
+        return fragment
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = False
+    expect_key = False
+    key_start = -1           # 콜론이 아직 없는 객체 키가 시작된 out 위치
+    pos = first.start()
+    n = len(fragment)
+    while pos < n:
+        m = _REPAIR_TOKEN.search(fragment, pos)
+        end = m.start() if m else n
+        if end > pos:
+            out.append(_PY_LITERALS.sub(lambda literal: _PY_TO_JSON[literal.group()], fragment[pos:end]))
+        if m is None:
+            break
+        token = m.group()
+        pos = m.end()
+        if token[0] == '"':
+            if expect_key:
+                key_start, expect_key = len(out), False
+            out.append(token)
+            if m.group(1) is None:
+                in_string = True         # 텍스트 끝까지 이어진 문자열
+                break
+        elif token == ":":
+            key_start = -1
+            out.append(token)
+        elif token == ",":
+            expect_key = stack[-1] == "{"
+            out.append(token)
+        elif token in _CLOSERS:
+            stack.append(token)
+            expect_key = token == "{"
+            out.append(token)
+        else:
+            if key_start >= 0:
+                del out[key_start:]      # {"a": 1, "b"} → 값 없는 키 제거
+            _strip_trailing_comma(out)
+            out.append(_CLOSERS[stack.pop()])
+            expect_key, key_start = False, -1
+            if not stack:
+                return "".join(out)
+
+    # 잘린 입력
+    if key_start >= 0:
+        del out[key_start:]
+    elif in_string:
+        out[-1] = _DANGLING_ESCAPE.sub(r"\1", out[-1], count=1) + '"'
+    _close_dangling_value(out)
+    while stack:
+        _strip_trailing_comma(out)
+        out.append(_CLOSERS[stack.pop()])
+    return "".join(out)
+
+
+def _loads(fragment: str) -> Any:
+    """닫힌 JSON 조각 파싱 (실패하면 repair_json 후 한 번 더), 둘 다 실패하면 None"""
+    try:
+        return _DECODER.decode(fragment)
+    except ValueError:
+        pass
+    try:
+        return _DECODER.decode(repair_json(fragment))
+    except ValueError:
+        return None
+
+
+def _load_open(fragment: str, closed: str) -> Any:
+    """닫히지 않은 값 파싱: 스캐너가 꼬리만 닫은 closed 를 먼저, 실패하면 repair_json 으로 전체 복구"""
+    try:
+        return _DECODER.decode(closed)
+    except ValueError:
+        pass
+    try:
+        return _DECODER.decode(repair_json(fragment))
+    except ValueError:
+        return None
+
+
+def _opener_for(expected_type: Type) -> str:
+    if expected_type is dict:
+        return "{"
+    if expected_type is list:
+        return "["
+    return "{["
+
+
+class IncrementalJSONParser:
+    """
+    스트리밍 응답용 증분 JSON 파서
+
+    feed 할 때마다 새로 들어온 청크만 스캔한다. 기대 타입의 최상위 값이 닫히면 complete 가 되고
+    value 에 완성된 값이 저장된다. 닫히기 전에는 partial() 이 지금까지의 부분을 repair_json 으로
+    닫아 파싱한 값을 돌려준다 (앞쪽 필드부터 먼저 쓰려는 후속 단계용).
+    completed_items(path) 는 path 위치 배열에서 새로 닫힌 항목만 돌려준다 (작도 단계, 계산 작업 등).
+    """
+
+    def __init__(self, expected_type: Type = dict):
+        self.expected_type = expected_type
+        self._scanner = JSONScanner(_opener_for(expected_type))
+        self._text = ""
+        self._pending: List[str] = []
+        self.value: Any = None
+        self.complete = False
+        self._emitted: Dict[Tuple[str, ...], int] = {}
+        self._checked: Dict[Tuple[str, ...], int] = {}
+
+    @property
+    def text(self) -> str:
+        """지금까지 들어온 전체 텍스트"""
+        if self._pending:
+            self._text += "".join(self._pending)
+            self._pending.clear()
+        return self._text
+
+    def feed(self, chunk: str) -> Any:
+        """청크를 추가하고, 이번 청크로 값이 완성되면 그 값을, 아니면 None 반환"""
+        if not chunk:
+            return None
+        self._pending.append(chunk)
+        if self.complete:
+            return None
+        for start, end in self._scanner.feed(chunk):
+            value = _loads(self.text[start:end])
+            if isinstance(value, self.expected_type):
+                self.value, self.complete = value, True
+                return value
+        return None
+
+    def partial(self) -> Any:
+        """완성된 값, 또는 열려 있는 값을 복구한 부분 값 (아직 없으면 None)"""
+        if self.complete:
+            return self.value
+        if not self._scanner.open:
+            return None
+        text = self.text
+        value = _load_open(text[self._scanner.start:], self._scanner.close(text))
+        return value if isinstance(value, self.expected_type) else None
+
+    def completed_items(self, path: Tuple[str, ...], value: Any = None) -> List[Any]:
+        """
+        path(객체 키 경로) 위치 배열에서 지난 호출 이후 새로 닫힌 항목 (닫힌 순서대로 한 번씩)
+
+        값이 완성되기 전에는 괄호가 새로 닫혔을 때만 부분 값을 다시 파싱한다. 스캐너가 배열보다
+        깊은 곳에 있거나 마지막 항목이 객체/배열이 아니면 마지막 항목은 아직 쓰는 중으로 본다.
+        value 를 주면 그 값 기준으로 남은 항목을 모두 돌려준다 (스트림 종료 시).
+        """
+        if value is None:
+            if not self.complete:
+                if self._checked.get(path) == self._scanner.closes:
+                    return []
+                self._checked[path] = self._scanner.closes
+            value = self.partial()
+            items = _walk(value, path)
+            if not isinstance(items, list):
+                return []
+            count = len(items)
+            if not self.complete and count:
+                depth = len(self._scanner.stack)
+                if depth > len(path) + 1 or (depth == len(path) + 1 and not isinstance(items[-1], (dict, list))):
+                    count -= 1
+        else:
+            items = _walk(value, path)
+            if not isinstance(items, list):
+                return []
+            count = len(items)
+        start = self._emitted.get(path, 0)
+        if count <= start:
+            return []
+        self._emitted[path] = count
+        return items[start:count]
+
+
+def _walk(value: Any, path: Tuple[str, ...]) -> Any:
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
 class JSONExtractor:
     """
     다양한 형식의 텍스트에서 JSON 데이터를 추출하는 클래스
@@ -37,66 +418,35 @@ class JSONExtractor:
     
     @staticmethod
     def extract_from_markdown(text: str) -> Optional[str]:
-        """마크다운 코드 블록에서 JSON 추출"""
-        try:
-            json_pattern = r'```(?:json)?\s*([\s\S]*?)\s*```'
-            json_match = re.search(json_pattern, text)
-            if json_match:
-                return json_match.group(1).strip()
-            return None
-        except Exception as e:
-            print(f"[WARNING] 마크다운에서 JSON 추출 실패: {e}")
+        """마크다운 코드 블록에서 JSON 추출 (닫는 ``` 가 없으면 잘린 응답으로 보고 끝까지)"""
+        start = text.find("```")
+        if start < 0:
             return None
+        body = start + 3
+        newline = text.find("\n", body)
+        if newline >= 0 and text[body:newline].strip().isidentifier():
+            body = newline + 1   # ```json 같은 언어 표시 건너뛰기
+        end = text.find("```", body)
+        block = (text[body:end] if end >= 0 else text[body:]).strip()
+        return block or None
     
     @staticmethod
     def extract_json_object(text: str) -> Optional[str]:
-        """텍스트에서 JSON 객체 추출 (가장 바깥쪽 중괄호 기준)"""
-        try:
-            json_block_pattern = r'(\{[\s\S]*\})'
-            json_block_match = re.search(json_block_pattern, text)
-            if json_block_match:
-                return json_block_match.group(1).strip()
-            return None
-        except Exception as e:
-            print(f"[WARNING] JSON 객체 추출 실패: {e}")
-            return None
+        """텍스트에서 첫 번째 최상위 JSON 객체 추출 (괄호 짝 기준)"""
+        spans, _ = JSONScanner.scan(text, "{")
+        return text[spans[0][0]:spans[0][1]] if spans else None
     
     @staticmethod
     def extract_json_array(text: str) -> Optional[str]:
-        """텍스트에서 JSON 배열 추출"""
-        try:
-            array_pattern = r'(\[[\s\S]*\])'
-            array_match = re.search(array_pattern, text)
-            if array_match:
-                return array_match.group(1).strip()
-            return None
-        except Exception as e:
-            print(f"[WARNING] JSON 배열 추출 실패: {e}")
-            return None
+        """텍스트에서 첫 번째 최상위 JSON 배열 추출"""
+        spans, _ = JSONScanner.scan(text, "[")
+        return text[spans[0][0]:spans[0][1]] if spans else None
     
     @staticmethod
     def extract_all_potential_json(text: str) -> List[str]:
-        """텍스트에서 모든 잠재적 JSON 구조 추출"""
-        json_structures = []
-        
-        # JSON 객체 패턴 (중괄호)
-        obj_pattern = r'(\{[\s\S]*?\})'
-        # JSON 배열 패턴 (대괄호)
-        arr_pattern = r'(\[[\s\S]*?\])'
-        
-        try:
-            # 객체 추출
-            for match in re.finditer(obj_pattern, text):
-                json_structures.append(match.group(1))
-            
-            # 배열 추출
-            for match in re.finditer(arr_pattern, text):
-                json_structures.append(match.group(1))
-                
-            return json_structures
-        except Exception as e:
-            print(f"[WARNING] 잠재적 JSON 구조 추출 실패: {e}")
-            return []
+        """텍스트에서 모든 최상위 JSON 구조 추출 (등장 순서)"""
+        spans, _ = JSONScanner.scan(text)
+        return [text[start:end] for start, end in spans]
     
     @staticmethod
     def extract_possible_json_block(text: str) -> Optional[str]:
@@ -106,40 +456,8 @@ class JSONExtractor:
         """
         if not text or not isinstance(text, str):
             return None
-            
-        # 텍스트 내에서 '{' 또는 '[' 시작하는 부분 찾기
-        json_start_idx = -1
-        for i, char in enumerate(text):
-            if char in ['{', '[']:
-                json_start_idx = i
-                break
-                
-        if json_start_idx == -1:
-            return None
-            
-        # 괄호 균형 맞추기
-        bracket_stack = []
-        end_idx = -1
-        
-        for i in range(json_start_idx, len(text)):
-            if text[i] in ['{', '[']:
-                bracket_stack.append(text[i])
-            elif text[i] == '}' and bracket_stack and bracket_stack[-1] == '{':
-                bracket_stack.pop()
-                if not bracket_stack:  # 괄호 짝이 맞음
-                    end_idx = i + 1
-                    break
-            elif text[i] == ']' and bracket_stack and bracket_stack[-1] == '[':
-                bracket_stack.pop()
-                if not bracket_stack:  # 괄호 짝이 맞음
-                    end_idx = i + 1
-                    break
-        
-        if end_idx > json_start_idx:
-            possible_json = text[json_start_idx:end_idx]
-            return possible_json
-        
-        return None
+        spans, _ = JSONScanner.scan(text)
+        return text[spans[0][0]:spans[0][1]] if spans else None
     
     @staticmethod
     def clean_text(text: str) -> str:
@@ -164,7 +482,7 @@ class JSONParser:
         try:
             return json.loads(text)
         except json.JSONDecodeError as e:
-            print(f"[WARNING] JSON 파싱 실패: {e}")
+            logger.warning("JSON 파싱 실패: %s", e)
             raise JSONParseError(f"JSON 파싱 오류: {e}")
     
     @staticmethod
@@ -173,13 +491,17 @@ class JSONParser:
         try:
             return model_class(**data)
         except ValidationError as e:
-            print(f"[WARNING] 모델 변환 실패: {e}")
+            logger.warning("모델 변환 실패: %s", e)
             raise ModelConversionError(f"모델 변환 오류: {e}")
         except Exception as e:
-            print(f"[WARNING] 예기치 않은 모델 변환 오류: {e}")
+            logger.warning("예기치 않은 모델 변환 오류: %s", e)
             raise ModelConversionError(f"예기치 않은 모델 변환 오류: {e}")
 
 
+# 닫히지 않은 설명문 괄호를 건너뛰며 다시 스캔하는 최대 횟수
+MAX_RESCANS = 3
+
+
 class LLMOutputParser:
     """
     LLM 출력을 처리하고 JSON으로 파싱하는 통합 클래스
@@ -192,12 +514,12 @@ class LLMOutputParser:
     def extract_content(self, result: Any) -> str:
         """LLM 결과에서 콘텐츠 추출"""
         if result is None:
-            print("[WARNING] LLM 결과가 None입니다")
+            logger.warning("LLM 결과가 None입니다")
             raise ContentExtractionError("LLM 결과가 None입니다")
         
         # AIMessage 객체인 경우 content 필드 추출
         if hasattr(result, 'content'):
-            print("[DEBUG] AIMessage 객체에서 content 추출")
+            logger.debug("AIMessage 객체에서 content 추출")
             return result.content
         
         # 이미 문자열인 경우 그대로 반환
@@ -209,16 +531,68 @@ class LLMOutputParser:
             try:
                 return json.dumps(result)
             except Exception as e:
-                print(f"[WARNING] 객체 직렬화 실패: {e}")
+                logger.warning("객체 직렬화 실패: %s", e)
                 raise ContentExtractionError(f"객체를 JSON으로 직렬화할 수 없습니다: {e}")
         
         # 기타 타입은 문자열로 변환 시도
         try:
             return str(result)
         except Exception as e:
-            print(f"[WARNING] 결과를 문자열로 변환 실패: {e}")
+            logger.warning("결과를 문자열로 변환 실패: %s", e)
             raise ContentExtractionError(f"결과를 문자열로 변환할 수 없습니다: {e}")
     
+    def _parse_candidate(self, text: str, expected_type: Type) -> Any:
+        """한 번의 스캔으로 찾은 최상위 값을 차례로 파싱 (실패하면 복구), 잘린 마지막 값도 복구"""
+        stripped = text.strip()
+        if stripped[:1] in ("{", "["):
+            try:
+                parsed = _DECODER.decode(stripped)
+            except ValueError:
+                parsed = None
+            if isinstance(parsed, expected_type):
+                logger.debug("전체 콘텐츠를 JSON으로 파싱 성공")
+                return parsed
+
+        opener = _opener_for(expected_type)
+        # 설명문 + 올바른 JSON 인 흔한 경우: 첫 여는 괄호부터 C 디코더로 바로 파싱
+        first = _OPENER_PATTERNS[opener].search(text)
+        if first is None:
+            return None
+        try:
+            parsed, _ = _DECODER.raw_decode(text, first.start())
+            if isinstance(parsed, expected_type):
+                logger.debug("JSON 구조 파싱 성공")
+                return parsed
+        except ValueError:
+            pass
+
+        for _ in range(MAX_RESCANS):
+            scanner = JSONScanner(opener)
+            for start, end in scanner.feed(text):
+                parsed = _loads(text[start:end])
+                if isinstance(parsed, expected_type):
+                    logger.debug("JSON 구조 파싱 성공")
+                    return parsed
+            if not scanner.open:
+                return None
+            parsed = _load_open(text[scanner.start:], scanner.close(text))
+            if isinstance(parsed, expected_type):
+                logger.debug("잘린 JSON 복구 성공")
+                return parsed
+            # 설명문의 닫히지 않은 괄호가 뒤의 JSON 을 감싼 경우: 그 다음 위치부터 다시 스캔
+            text = text[scanner.start + 1:]
+        return None
+
+    def _parse_json_text(self, content: str, expected_type: Type) -> Any:
+        """마크다운 코드 블록을 먼저, 실패하면 전체 콘텐츠를 파싱 (실패 시 None)"""
+        block = self.extractor.extract_from_markdown(content)
+        if block:
+            parsed = self._parse_candidate(block, expected_type)
+            if parsed is not None:
+                logger.debug("마크다운에서 JSON 파싱 성공")
+                return parsed
+        return self._parse_candidate(content, expected_type)
+    
     def parse(self, result: Any, expected_type: Type = dict) -> Any:
         """
         LLM 결과를 파싱하여 지정된 타입(기본값: 딕셔너리)으로 변환
@@ -233,22 +607,24 @@ class LLMOutputParser:
         Raises:
             ParseError: 파싱 중 오류 발생 시
         """
-        # 디버그 정보
+        # 디버그 정보 (DEBUG 레벨이 꺼져 있으면 생략)
         try:
-            if result is None:
-                print("[DEBUG] 입력이 None입니다")
+            if not logger.isEnabledFor(logging.DEBUG):
+                pass
+            elif result is None:
+                logger.debug("입력이 None입니다")
             elif hasattr(result, 'content'):
-                print(f"[DEBUG] 입력이 content 속성을 가진 객체입니다: {type(result).__name__}")
+                logger.debug("입력이 content 속성을 가진 객체입니다: %s", type(result).__name__)
             elif isinstance(result, str):
-                print(f"[DEBUG] 입력이 문자열입니다. 길이: {len(result)}")
+                logger.debug("입력이 문자열입니다. 길이: %s", len(result))
                 if len(result) > 100:
-                    print(f"[DEBUG] 문자열 일부: {result[:50]}...{result[-50:]}")
+                    logger.debug("문자열 일부: %s...%s", result[:50], result[-50:])
             elif isinstance(result, dict):
-                print(f"[DEBUG] 입력이 딕셔너리입니다. 키: {list(result.keys())}")
+                logger.debug("입력이 딕셔너리입니다. 키: %s", list(result.keys()))
             else:
-                print(f"[DEBUG] 입력 타입: {type(result).__name__}")
+                logger.debug("입력 타입: %s", type(result).__name__)
         except Exception as e:
-            print(f"[DEBUG] 입력 정보 출력 중 오류: {e}")
+            logger.debug("입력 정보 출력 중 오류: %s", e)
         
         # 이미 올바른 타입인 경우 바로 반환
         if isinstance(result, expected_type) and not isinstance(result, str):
@@ -260,89 +636,25 @@ class LLMOutputParser:
             
             # 빈 문자열 체크
             if not content.strip():
-                print("[WARNING] 빈 문자열 결과")
+                logger.warning("빈 문자열 결과")
                 return {} if expected_type == dict else []
             
-            # 다양한 방법으로 JSON 추출 시도
-            
-            # 1. 마크다운 코드 블록에서 추출
-            markdown_json = self.extractor.extract_from_markdown(content)
-            if markdown_json:
-                try:
-                    parsed = self.parser.parse_json(markdown_json)
-                    if isinstance(parsed, expected_type):
-                        print("[DEBUG] 마크다운에서 JSON 파싱 성공")
-                        return parsed
-                except JSONParseError:
-                    pass
-            
-            # 2. 기대 타입에 따라 JSON 구조 추출
-            if expected_type == dict:
-                json_obj = self.extractor.extract_json_object(content)
-                if json_obj:
-                    try:
-                        parsed = self.parser.parse_json(json_obj)
-                        if isinstance(parsed, dict):
-                            print("[DEBUG] JSON 객체 파싱 성공")
-                            return parsed
-                    except JSONParseError:
-                        pass
-            elif expected_type == list:
-                json_arr = self.extractor.extract_json_array(content)
-                if json_arr:
-                    try:
-                        parsed = self.parser.parse_json(json_arr)
-                        if isinstance(parsed, list):
-                            print("[DEBUG] JSON 배열 파싱 성공")
-                            return parsed
-                    except JSONParseError:
-                        pass
-            
-            # 3. JSON일 가능성이 높은 블록 추출 시도
-            possible_json = self.extractor.extract_possible_json_block(content)
-            if possible_json:
-                try:
-                    parsed = self.parser.parse_json(possible_json)
-                    if isinstance(parsed, expected_type):
-                        print("[DEBUG] 추출된 JSON 블록 파싱 성공")
-                        return parsed
-                except JSONParseError:
-                    pass
-            
-            # 4. 전체 콘텐츠를 JSON으로 파싱 시도
-            try:
-                parsed = self.parser.parse_json(content)
-                if isinstance(parsed, expected_type):
-                    print("[DEBUG] 전체 콘텐츠를 JSON으로 파싱 성공")
-                    return parsed
-            except JSONParseError:
-                pass
+            # 1~3. 코드 블록 → 최상위 JSON 구간 → 잘린 값 복구 (선형 스캔)
+            parsed = self._parse_json_text(content, expected_type)
+            if parsed is not None:
+                return parsed
             
-            # 5. 정리된 텍스트 파싱 시도
-            clean_content = self.extractor.clean_text(content)
-            try:
-                parsed = self.parser.parse_json(clean_content)
-                if isinstance(parsed, expected_type):
-                    print("[DEBUG] 정리된 텍스트 파싱 성공")
+            # 4. 이스케이프된 JSON 문자열 ({\"key\": ...}) 정리 후 재시도
+            if '\\"' in content:
+                parsed = self._parse_json_text(self.extractor.clean_text(content), expected_type)
+                if parsed is not None:
+                    logger.debug("정리된 텍스트 파싱 성공")
                     return parsed
-            except JSONParseError:
-                pass
-            
-            # 6. 모든 잠재적 JSON 구조 시도
-            potential_jsons = self.extractor.extract_all_potential_json(content)
-            for json_str in potential_jsons:
-                try:
-                    parsed = self.parser.parse_json(json_str)
-                    if isinstance(parsed, expected_type):
-                        print("[DEBUG] 잠재적 JSON 구조 파싱 성공")
-                        return parsed
-                except JSONParseError:
-                    continue
             
-            # 7. 텍스트 직접 처리 시도 (사용자가 제공한 예제 형식 핸들링)
+            # 5. 텍스트 직접 처리 시도 (사용자가 제공한 예제 형식 핸들링)
             if expected_type == dict and isinstance(content, str):
                 try:
-                    print("[DEBUG] 사용자 제공 예제 형식으로 파싱 시도")
+                    logger.debug("사용자 제공 예제 형식으로 파싱 시도")
                     # 범용적인 key-value 패턴 추출
                     user_format = {}
                     for line in content.split('\n'):
@@ -364,19 +676,19 @@ class LLMOutputParser:
                                 user_format[key] = value  # 변환 실패시 문자열로 저장
                     
                     if user_format:  # 파싱된 내용이 있으면 반환
-                        print(f"[DEBUG] 사용자 형식 파싱 성공: {list(user_format.keys())}")
+                        logger.debug("사용자 형식 파싱 성공: %s", list(user_format.keys()))
                         return user_format
                 except Exception as e:
-                    print(f"[DEBUG] 사용자 형식 파싱 실패: {e}")
+                    logger.debug("사용자 형식 파싱 실패: %s", e)
             
             # 모든 시도 실패
-            print("[WARNING] 모든 JSON 추출 시도 실패")
+            logger.warning("모든 JSON 추출 시도 실패")
             if isinstance(content, str) and len(content) > 200:
-                print(f"[DEBUG] 콘텐츠 일부: {content[:100]}...{content[-100:]}")
+                logger.debug("콘텐츠 일부: %s...%s", content[:100], content[-100:])
             return {} if expected_type == dict else []
             
         except Exception as e:
-            print(f"[ERROR] 파싱 중 예기치 않은 오류: {e}")
+            logger.error("파싱 중 예기치 않은 오류: %s", e)
             return {} if expected_type == dict else []
     
     def parse_to_model(self, result: Any, model_class: Type[T]) -> Union[T, Dict[str, Any]]:
@@ -399,12 +711,12 @@ class LLMOutputParser:
                 try:
                     return self.parser.parse_to_model(parsed_dict, model_class)
                 except ModelConversionError as e:
-                    print(f"[WARNING] 모델 변환 실패, 딕셔너리 반환: {e}")
+                    logger.warning("모델 변환 실패, 딕셔너리 반환: %s", e)
                     return parsed_dict
             
             return parsed_dict
         except Exception as e:
-            print(f"[ERROR] 모델 파싱 중 예기치 않은 오류: {e}")
+            logger.error("모델 파싱 중 예기치 않은 오류: %s", e)
             return {}
 
 
@@ -448,7 +760,7 @@ def safe_parse_llm_json_output(result: Any, expected_type: Type = dict, parser:
         # 글로벌 파서 인스턴스 사용
         return _parser.parse(result, expected_type)
     except Exception as e:
-        print(f"[ERROR] 안전한 파싱 실패: {e}")
+        logger.error("안전한 파싱 실패: %s", e)
         return {} if expected_type == dict else []
 
 def extract_markdown_from_text(text: str) -> Optional[str]:
@@ -469,5 +781,5 @@ def extract_markdown_from_text(text: str) -> Optional[str]:
             return markdown_match.group(1).strip()
         return None
     except Exception as e:
-        print(f"[WARNING] 마크다운 추출 실패: {e}")
+        logger.warning("마크다운 추출 실패: %s", e)
         return None 
\ No newline at end of file
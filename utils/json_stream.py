@@ -0,0 +1,98 @@
+"""
+스트리밍 JSON 모듈
+
+LLM 응답을 토큰 스트림으로 받으면서 IncrementalJSONParser 로 이어서 파싱하고,
+지정한 경로의 배열 항목(작도 단계, 계산 작업 등)이 닫히는 즉시 콜백에 넘깁니다.
+후속 단계(명령어 검색, 임베딩)는 모델이 뒤쪽 항목을 쓰는 동안 먼저 시작할 수 있습니다.
+
+- stream_json(runnable, input, on_items): 응답을 스트리밍하며 항목 콜백 호출, 누적 메시지 반환
+- ItemStream: 청크(텍스트 또는 도구 호출 인자)를 받아 항목을 내보내는 상태 객체
+
+콜백은 스트림을 읽는 스레드에서 호출되므로 오래 걸리는 작업은 백그라운드로 넘겨야 하며,
+콜백 오류는 기록만 하고 스트림은 계속 읽는다. 스트림이 끝나면 아직 내보내지 않은 항목을
+최종 값 기준으로 모두 내보낸다.
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from utils.json_parser import IncrementalJSONParser
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ItemPath = Tuple[str, ...]
+ItemCallback = Callable[[Any], None]
+
+
+def _chunk_text(chunk: Any, tool_args: bool) -> str:
+    """청크에서 JSON 텍스트 조각 (도구 호출 모드면 첫 번째 도구 호출의 인자 조각)"""
+    if tool_args:
+        return "".join(tool_chunk.get("args") or ""
+                       for tool_chunk in getattr(chunk, "tool_call_chunks", None) or []
+                       if tool_chunk.get("index") in (None, 0))
+    content = getattr(chunk, "content", chunk)
+    return content if isinstance(content, str) else ""
+
+
+class ItemStream:
+    """청크를 이어서 파싱하고 on_items 경로의 배열 항목이 닫히면 콜백 호출"""
+
+    def __init__(self, on_items: Dict[ItemPath, ItemCallback], tool_args: bool = False):
+        self.on_items = on_items
+        self.tool_args = tool_args
+        self.parser = IncrementalJSONParser(dict)
+        self.emitted = 0
+
+    def feed(self, chunk: Any) -> None:
+        text = _chunk_text(chunk, self.tool_args)
+        if not text:
+            return
+        self.parser.feed(text)
+        for path, callback in self.on_items.items():
+            self._emit(callback, self.parser.completed_items(path))
+
+    def finish(self, message: Any = None) -> None:
+        """남은 항목을 최종 값(완성 값, 도구 호출 인자, 복구한 부분 값 순) 기준으로 모두 내보냄"""
+        value = self.parser.value if self.parser.complete else None
+        if value is None and self.tool_args:
+            for tool_call in getattr(message, "tool_calls", None) or []:
+                value = tool_call.get("args")
+                break
+        if value is None:
+            value = self.parser.partial()
+        if not isinstance(value, dict):
+            return
+        for path, callback in self.on_items.items():
+            self._emit(callback, self.parser.completed_items(path, value))
+
+    def _emit(self, callback: ItemCallback, items: list) -> None:
+        for item in items:
+            self.emitted += 1
+            try:
+                callback(item)
+            except Exception as e:  # 콜백 오류가 응답 수신을 막지 않도록
+                logger.warning("Streaming item callback failed: %s", e)
+
+
+def stream_json(runnable: Any, input: Any, on_items: Dict[ItemPath, ItemCallback],
+                tool_args: bool = False) -> Optional[Any]:
+    """
+    runnable 을 스트리밍으로 실행하며 닫힌 배열 항목을 콜백에 전달
+
+    Args:
+        runnable: 채팅 모델 또는 프롬프트 | 모델 체인 (AIMessageChunk 를 내보내는 것)
+        input: runnable 입력
+        on_items: {객체 키 경로: 콜백}, 예: {("construction_plan", "steps"): prefetch_step_commands}
+        tool_args: True 면 본문 대신 첫 번째 도구 호출 인자를 파싱 (함수 호출 구조화 출력)
+
+    Returns:
+        누적된 메시지 (AIMessageChunk, invoke 결과와 같은 content/tool_calls), 응답이 비면 None
+    """
+    stream = ItemStream(on_items, tool_args)
+    message = None
+    for chunk in runnable.stream(input):
+        message = chunk if message is None else message + chunk
+        stream.feed(chunk)
+    stream.finish(message)
+    logger.debug("Streamed %s items", stream.emitted)
+    return message
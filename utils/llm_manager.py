@@ -9,7 +9,10 @@ from langchain_deepseek import ChatDeepSeek
 from langchain_openai import ChatOpenAI
 from config import DEFAULT_MODEL, DEFAULT_TEMPERATURE, ADVANCED_MODEL
 import os
-import functools
+from utils.concurrency import llm_slot, allm_slot
+from typing import Optional
+from utils.llm_scheduler import llm_scheduler, extract_usage
+from geo_prompts.assembly import identify_prefix, record_prompt_usage
 from geo_prompts import (
     CALCULATION_SYSTEM_MESSAGES, 
     SYSTEM_MESSAGES, 
@@ -18,6 +21,88 @@ from geo_prompts import (
     get_calculation_system_message
 )
 
+class ManagedChatOpenAI(ChatOpenAI):
+    """
+    동시성 제한과 속도 제한 스케줄링이 적용된 ChatOpenAI
+
+    invoke/stream/batch 와 AgentExecutor 호출은 모두 _generate/_stream 계열을 거치므로
+    이 지점에서 스케줄러로 모델 예산(rpm/tpm)을 확보하고,
+    프로필별/전역 LLM 세마포어를 획득한 뒤 호출한다.
+    재시도는 스케줄러가 지터 백오프로 담당한다.
+
+    메시지에 시스템 메시지가 없으면 프로필 시스템 메시지를 맨 앞에 붙이고,
+    첫 메시지로 조립된 프롬프트(geo_prompts.assembly)를 식별해 캐시 적중 통계를 남긴다.
+    """
+
+    profile: str = "default"
+    system_message: Optional[str] = None
+
+    def _prepare(self, messages):
+        if self.system_message and not any(getattr(m, "type", None) == "system" for m in messages):
+            messages = [SystemMessage(content=self.system_message), *messages]
+        prefix = identify_prefix(messages, self.profile)
+        return messages, prefix, {"profile": self.profile, "prompt": prefix.name}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        parent = super()._generate
+        messages, prefix, attributes = self._prepare(messages)
+
+        def call():
+            with llm_slot(self.profile):
+                return parent(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+        result = llm_scheduler.run(self.model_name, messages, call, max_tokens=self.max_tokens,
+                                   attributes=attributes, completions=self.n or 1)
+        record_prompt_usage(prefix, extract_usage(result))
+        return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        parent = super()._agenerate
+        messages, prefix, attributes = self._prepare(messages)
+
+        async def call():
+            async with allm_slot(self.profile):
+                return await parent(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+        result = await llm_scheduler.arun(self.model_name, messages, call, max_tokens=self.max_tokens,
+                                          attributes=attributes, completions=self.n or 1)
+        record_prompt_usage(prefix, extract_usage(result))
+        return result
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        parent = super()._stream
+        messages, prefix, attributes = self._prepare(messages)
+
+        def open_stream():
+            with llm_slot(self.profile):
+                yield from parent(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+        last_chunk = None
+        for chunk in llm_scheduler.stream(self.model_name, messages, open_stream, max_tokens=self.max_tokens,
+                                          attributes=attributes):
+            last_chunk = chunk
+            yield chunk
+        if last_chunk is not None:
+            record_prompt_usage(prefix, extract_usage(getattr(last_chunk, "message", last_chunk)))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        parent = super()._astream
+        messages, prefix, attributes = self._prepare(messages)
+
+        async def open_stream():
+            async with allm_slot(self.profile):
+                async for chunk in parent(messages, stop=stop, run_manager=run_manager, **kwargs):
+                    yield chunk
+
+        last_chunk = None
+        async for chunk in llm_scheduler.astream(self.model_name, messages, open_stream, max_tokens=self.max_tokens,
+                                                 attributes=attributes):
+            last_chunk = chunk
+            yield chunk
+        if last_chunk is not None:
+            record_prompt_usage(prefix, extract_usage(getattr(last_chunk, "message", last_chunk)))
+
+
 class LLMManager:
     """
     LLM 인스턴스를 중앙에서 관리하는 클래스
@@ -106,6 +191,9 @@ class LLMManager:
         # 시스템 메시지 추출
         system_message = config.pop("system_message", DEFAULT_SYSTEM_MESSAGE)
         
+        # 재시도는 LLM 스케줄러가 담당하므로 클라이언트 자체 재시도는 끈다
+        config.setdefault("max_retries", 0)
+        
         # 추가 인자로 설정 덮어쓰기
         config.update(kwargs)
         
@@ -113,8 +201,11 @@ class LLMManager:
         openai_api_key = os.environ.get("OPENAI_API_KEY", "")
         
         # ChatOpenAI 인스턴스 생성
-        llm = ChatOpenAI(
+        # 시스템 메시지는 ManagedChatOpenAI 가 호출 시 메시지 맨 앞에 붙인다
+        llm = ManagedChatOpenAI(
             openai_api_key=openai_api_key,
+            profile=profile,
+            system_message=system_message,
             **config
         )
         
@@ -125,27 +216,6 @@ class LLMManager:
         #     **config
         # )
         
-        # 원래 함수를 저장
-        original_invoke = llm.__call__
-        
-        # 새로운 함수 정의
-        @functools.wraps(original_invoke)
-        def wrapped_invoke(messages, *args, **kwargs):
-            # 시스템 메시지가 이미 있는지 확인
-            has_system = any(m.get("type", "") == "system" or getattr(m, "type", "") == "system" for m in messages)
-            
-            if not has_system:
-                # 시스템 메시지 추가
-                if isinstance(messages[0], dict):
-                    messages = [{"type": "system", "content": system_message}] + messages
-                else:
-                    messages = [SystemMessage(content=system_message)] + messages
-            
-            return original_invoke(messages, *args, **kwargs)
-        
-        # 함수 교체
-        llm.__call__ = wrapped_invoke
-        
         return llm
     
     # === 일반 LLM 인스턴스 ===
@@ -170,6 +240,9 @@ class LLMManager:
             CALCULATION_SYSTEM_MESSAGES["default"]
         )
         
+        # 재시도는 LLM 스케줄러가 담당하므로 클라이언트 자체 재시도는 끈다
+        config.setdefault("max_retries", 0)
+        
         # 추가 인자로 설정 덮어쓰기
         config.update(kwargs)
         
@@ -181,8 +254,10 @@ class LLMManager:
         openai_api_key = os.environ.get("OPENAI_API_KEY", "")
         
         # ChatOpenAI 인스턴스 생성
-        llm = ChatOpenAI(
+        llm = ManagedChatOpenAI(
             openai_api_key=openai_api_key,
+            profile="calculation",
+            system_message=system_message,
             **config
         )
         # deepseek_api_key = os.environ.get("DEEPSEEK_API_KEY", "")
@@ -192,26 +267,6 @@ class LLMManager:
         #     **config
         # )
         
-        # 원래 함수를 저장
-        original_invoke = llm.__call__
-        
-        # 새로운 함수 정의
-        @functools.wraps(original_invoke)
-        def wrapped_invoke(messages, *args, **kwargs):
-            # 시스템 메시지가 이미 있는지 확인
-            has_system = any(m.get("type", "") == "system" or getattr(m, "type", "") == "system" for m in messages)
-            
-            if not has_system:
-                # 시스템 메시지 추가
-                if isinstance(messages[0], dict):
-                    messages = [{"type": "system", "content": system_message}] + messages
-                else:
-                    messages = [SystemMessage(content=system_message)] + messages
-            
-            return original_invoke(messages, *args, **kwargs)
-        
-        # 함수 교체
-        llm.__call__ = wrapped_invoke
         return llm
     
     @classmethod
@@ -0,0 +1,563 @@
+"""
+LLM 호출 스케줄러 모듈
+
+모든 LLM 호출 앞에서 동작하는 속도 제한(rate limit) 인식 스케줄러입니다.
+
+- 전송 전에 프롬프트 토큰 수를 추정
+- 모델별 토큰 버킷(분당 요청 수 / 분당 토큰 수) 예산 관리
+- 우선순위 대기열 (interactive 요청이 bulk 작업보다 먼저)
+- 429/일시적 오류 시 지터가 적용된 지수 백오프 재시도
+- 대기 시간/재시도/토큰 사용량 지표 제공
+- 호출별 추적 스팬 기록 (utils.tracing)
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from config import (
+    MODEL_RATE_LIMITS,
+    LLM_MAX_RETRIES,
+    LLM_BACKOFF_BASE_SECONDS,
+    LLM_BACKOFF_MAX_SECONDS,
+    LLM_EXPECTED_COMPLETION_TOKENS,
+)
+from utils.tracing import KIND_LLM, NOOP_SPAN, start_span
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken 이 없으면 문자 수 기반 추정 사용
+    tiktoken = None
+
+# 우선순위 (값이 작을수록 먼저 처리)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DEFAULT = 1
+PRIORITY_BULK = 2
+
+_priority_var: contextvars.ContextVar[int] = contextvars.ContextVar("llm_priority", default=PRIORITY_DEFAULT)
+_usage_var: contextvars.ContextVar[Optional["UsageAccumulator"]] = contextvars.ContextVar("llm_usage", default=None)
+
+
+# ----------------------------------------------------------------------
+# 토큰 추정
+# ----------------------------------------------------------------------
+_encoders: Dict[str, Any] = {}
+
+
+def _get_encoder(model: str):
+    if tiktoken is None:
+        return None
+    if model not in _encoders:
+        try:
+            try:
+                _encoders[model] = tiktoken.encoding_for_model(model)
+            except KeyError:
+                _encoders[model] = tiktoken.get_encoding("cl100k_base")
+        except Exception:  # 오프라인 등으로 인코딩 파일을 받지 못하면 문자 수 기반 추정 사용
+            _encoders[model] = None
+    return _encoders[model]
+
+
+def _message_text(message: Any) -> str:
+    content = getattr(message, "content", message)
+    if isinstance(content, list):
+        # 멀티모달 메시지: 텍스트 부분만 합산
+        return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+    return str(content)
+
+
+def estimate_tokens(messages: Any, model: str = "") -> int:
+    """
+    프롬프트 토큰 수 추정
+
+    tiktoken 이 설치되어 있으면 정확한 인코딩을 사용하고,
+    없으면 CJK 문자는 1토큰, 그 외 문자는 4자당 1토큰으로 근사한다.
+    """
+    if isinstance(messages, (list, tuple)):
+        texts = [_message_text(m) for m in messages]
+        overhead = 4 * len(messages)  # 메시지별 역할/구분자 토큰
+    else:
+        texts = [_message_text(messages)]
+        overhead = 0
+
+    encoder = _get_encoder(model)
+    if encoder is not None:
+        return overhead + sum(len(encoder.encode(text)) for text in texts)
+
+    total = 0
+    for text in texts:
+        cjk = sum(1 for ch in text if "⺀" <= ch <= "鿿" or "가" <= ch <= "힯")
+        total += cjk + (len(text) - cjk + 3) // 4
+    return overhead + total
+
+
+# ----------------------------------------------------------------------
+# 우선순위 / 사용량 컨텍스트
+# ----------------------------------------------------------------------
+@contextmanager
+def priority_scope(priority: int):
+    """블록 안에서 발생하는 LLM 호출의 우선순위 지정"""
+    token = _priority_var.set(priority)
+    try:
+        yield
+    finally:
+        _priority_var.reset(token)
+
+
+def current_priority() -> int:
+    return _priority_var.get()
+
+
+class UsageAccumulator:
+    """요청(문제) 단위 토큰 사용량 누적기"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_model: Dict[str, Dict[str, int]] = {}
+
+    def add(self, model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0):
+        with self._lock:
+            entry = self.by_model.setdefault(
+                model, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+            )
+            entry["calls"] += 1
+            entry["prompt_tokens"] += prompt_tokens
+            entry["completion_tokens"] += completion_tokens
+            entry["cached_tokens"] += cached_tokens
+
+    def totals(self) -> Dict[str, int]:
+        with self._lock:
+            totals = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+            for entry in self.by_model.values():
+                for key in totals:
+                    totals[key] += entry[key]
+            return totals
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            by_model = {model: dict(entry) for model, entry in self.by_model.items()}
+        return {"by_model": by_model, "totals": self.totals()}
+
+
+@contextmanager
+def usage_scope():
+    """블록 안의 LLM 호출 토큰 사용량을 누적 (스레드 풀로 전파된 컨텍스트 포함)"""
+    accumulator = UsageAccumulator()
+    token = _usage_var.set(accumulator)
+    try:
+        yield accumulator
+    finally:
+        _usage_var.reset(token)
+
+
+def extract_usage(result: Any) -> Dict[str, int]:
+    """ChatResult/AIMessage(Chunk) 에서 실제 토큰 사용량 추출"""
+    usage = {"prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+    llm_output = getattr(result, "llm_output", None) or {}
+    token_usage = llm_output.get("token_usage") if isinstance(llm_output, dict) else None
+    if token_usage:
+        usage["prompt_tokens"] = token_usage.get("prompt_tokens") or 0
+        usage["completion_tokens"] = token_usage.get("completion_tokens") or 0
+        details = token_usage.get("prompt_tokens_details") or {}
+        usage["cached_tokens"] = details.get("cached_tokens") or 0
+        return usage
+
+    messages = []
+    if hasattr(result, "generations"):
+        messages = [getattr(g, "message", None) for g in result.generations]
+    else:
+        messages = [result]
+    for message in messages:
+        metadata = getattr(message, "usage_metadata", None)
+        if metadata:
+            usage["prompt_tokens"] += metadata.get("input_tokens", 0)
+            usage["completion_tokens"] += metadata.get("output_tokens", 0)
+            details = metadata.get("input_token_details") or {}
+            usage["cached_tokens"] += details.get("cache_read", 0) or 0
+    return usage
+
+
+# ----------------------------------------------------------------------
+# 토큰 버킷
+# ----------------------------------------------------------------------
+class TokenBucket:
+    """분당 용량을 초당 속도로 채우는 토큰 버킷 (호출자가 잠금을 관리)"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = float(per_minute) / 60.0
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)  # 용량보다 큰 요청은 가득 찰 때까지만 대기
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= amount
+
+    def adjust(self, delta: float):
+        """실제 사용량과 추정치의 차이를 반영 (음수 잔량은 다음 요청이 기다리며 갚는다)"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + delta)
+
+
+class ModelBudget:
+    """모델 하나의 요청/토큰 버킷과 우선순위 대기열"""
+
+    def __init__(self, model: str, rpm: Optional[int], tpm: Optional[int]):
+        self.model = model
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self._cond = threading.Condition()
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        # 지표
+        self.calls = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failures = 0
+
+    def _time_until(self, tokens: int) -> float:
+        waits = [0.0]
+        if self.requests is not None:
+            waits.append(self.requests.time_until(1))
+        if self.tokens is not None:
+            waits.append(self.tokens.time_until(tokens))
+        return max(waits)
+
+    def acquire(self, tokens: int, priority: int) -> float:
+        """예산이 생길 때까지 우선순위 순서대로 대기하고 대기 시간(초)을 반환"""
+        started = time.perf_counter()
+        entry = (priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._heap, entry)
+            while True:
+                if self._heap[0] == entry:
+                    wait = self._time_until(tokens)
+                    if wait <= 0:
+                        heapq.heappop(self._heap)
+                        if self.requests is not None:
+                            self.requests.consume(1)
+                        if self.tokens is not None:
+                            self.tokens.consume(tokens)
+                        waited = time.perf_counter() - started
+                        self.calls += 1
+                        self.total_wait += waited
+                        self.max_wait = max(self.max_wait, waited)
+                        self._cond.notify_all()
+                        return waited
+                    self._cond.wait(timeout=wait)
+                else:
+                    self._cond.wait(timeout=1.0)
+
+    def reconcile(self, estimated: int, actual: int):
+        if self.tokens is None or actual <= 0:
+            return
+        with self._cond:
+            self.tokens.adjust(estimated - actual)
+            self._cond.notify_all()
+
+    def refund(self, tokens: int):
+        """실패한 호출이 예약한 토큰을 돌려준다"""
+        if self.tokens is None:
+            return
+        with self._cond:
+            self.tokens.adjust(tokens)
+            self._cond.notify_all()
+
+    def penalize(self, seconds: float):
+        """429 응답을 받으면 버킷을 비워 다른 호출도 잠시 멈추게 한다"""
+        with self._cond:
+            if self.requests is not None:
+                self.requests.adjust(-self.requests.rate * seconds)
+            self.rate_limited += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "rpm": self.requests.capacity if self.requests else None,
+                "tpm": self.tokens.capacity if self.tokens else None,
+                "queued": len(self._heap),
+                "calls": self.calls,
+                "avg_queue_wait_seconds": round(self.total_wait / self.calls, 4) if self.calls else 0.0,
+                "max_queue_wait_seconds": round(self.max_wait, 4),
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "failures": self.failures,
+            }
+
+
+# ----------------------------------------------------------------------
+# 재시도 판단
+# ----------------------------------------------------------------------
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+    return status
+
+
+def _is_rate_limit(error: Exception) -> bool:
+    return _status_code(error) == 429 or type(error).__name__ == "RateLimitError"
+
+
+def _is_retryable(error: Exception) -> bool:
+    if _is_rate_limit(error):
+        return True
+    status = _status_code(error)
+    if status is not None:
+        return status >= 500 or status in (408, 409)
+    return type(error).__name__ in ("APITimeoutError", "APIConnectionError", "Timeout", "ConnectionError")
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMScheduler:
+    """모델별 예산을 관리하고 LLM 호출을 재시도와 함께 실행하는 스케줄러"""
+
+    def __init__(
+        self,
+        rate_limits: Dict[str, Dict[str, int]] = MODEL_RATE_LIMITS,
+        max_retries: int = LLM_MAX_RETRIES,
+        backoff_base: float = LLM_BACKOFF_BASE_SECONDS,
+        backoff_max: float = LLM_BACKOFF_MAX_SECONDS,
+        expected_completion_tokens: int = LLM_EXPECTED_COMPLETION_TOKENS,
+    ):
+        self.rate_limits = rate_limits
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.expected_completion_tokens = expected_completion_tokens
+        self._budgets: Dict[str, ModelBudget] = {}
+        self._lock = threading.Lock()
+        self.usage = UsageAccumulator()
+
+    def budget(self, model: str) -> ModelBudget:
+        with self._lock:
+            if model not in self._budgets:
+                limits = self.rate_limits.get(model) or self.rate_limits.get("default", {})
+                self._budgets[model] = ModelBudget(model, limits.get("rpm"), limits.get("tpm"))
+            return self._budgets[model]
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        # full jitter: [0, min(max, base * 2^attempt)]
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _reserve_amount(self, messages: Any, model: str, max_tokens: Optional[int], completions: int = 1) -> int:
+        # 한 호출로 n 개를 생성하면 프롬프트는 한 번, 완성 토큰은 n 배
+        return estimate_tokens(messages, model) + max(1, completions) * (max_tokens or self.expected_completion_tokens)
+
+    def _record(self, budget: ModelBudget, estimated: int, result: Any, call_span: Any = NOOP_SPAN):
+        usage = extract_usage(result)
+        actual = usage["prompt_tokens"] + usage["completion_tokens"]
+        budget.reconcile(estimated, actual)
+        call_span.set(cache_hit=usage["cached_tokens"] > 0, **usage)
+        if actual:
+            self.usage.add(budget.model, usage["prompt_tokens"], usage["completion_tokens"], usage["cached_tokens"])
+            scoped = _usage_var.get()
+            if scoped is not None:
+                scoped.add(budget.model, usage["prompt_tokens"], usage["completion_tokens"], usage["cached_tokens"])
+
+    def _start_span(self, model: str, estimated: int, streaming: bool, attributes: Optional[Dict[str, Any]]):
+        return start_span(f"llm {model}", KIND_LLM, model=model, estimated_tokens=estimated,
+                          streaming=streaming, **(attributes or {}))
+
+    def run(self, model: str, messages: Any, call: Callable[[], Any], max_tokens: Optional[int] = None,
+            attributes: Optional[Dict[str, Any]] = None, completions: int = 1) -> Any:
+        """예산을 확보한 뒤 call() 을 실행하고, 재시도 가능한 오류는 백오프 후 재시도 (completions: 한 호출의 생성 개수 n)"""
+        budget = self.budget(model)
+        estimated = self._reserve_amount(messages, model, max_tokens, completions)
+        priority = current_priority()
+        call_span = self._start_span(model, estimated, False, attributes)
+        attempt = 0
+        while True:
+            call_span.add("queue_wait_ms", budget.acquire(estimated, priority) * 1000)
+            try:
+                result = call()
+            except Exception as e:
+                budget.refund(estimated)
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    budget.failures += 1
+                    call_span.end(error=e)
+                    raise
+                delay = self._backoff(attempt, e)
+                if _is_rate_limit(e):
+                    budget.penalize(delay)
+                budget.retries += 1
+                call_span.add("retries", 1)
+                attempt += 1
+                time.sleep(delay)
+                continue
+            self._record(budget, estimated, result, call_span)
+            call_span.end()
+            return result
+
+    async def arun(self, model: str, messages: Any, call: Callable[[], Any], max_tokens: Optional[int] = None,
+                   attributes: Optional[Dict[str, Any]] = None, completions: int = 1) -> Any:
+        """run 의 비동기 버전 (call 은 코루틴을 반환하는 함수)"""
+        budget = self.budget(model)
+        estimated = self._reserve_amount(messages, model, max_tokens, completions)
+        priority = current_priority()
+        call_span = self._start_span(model, estimated, False, attributes)
+        attempt = 0
+        while True:
+            waited = await asyncio.to_thread(budget.acquire, estimated, priority)
+            call_span.add("queue_wait_ms", waited * 1000)
+            try:
+                result = await call()
+            except Exception as e:
+                budget.refund(estimated)
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    budget.failures += 1
+                    call_span.end(error=e)
+                    raise
+                delay = self._backoff(attempt, e)
+                if _is_rate_limit(e):
+                    budget.penalize(delay)
+                budget.retries += 1
+                call_span.add("retries", 1)
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self._record(budget, estimated, result, call_span)
+            call_span.end()
+            return result
+
+    def stream(self, model: str, messages: Any, open_stream: Callable[[], Any], max_tokens: Optional[int] = None,
+               attributes: Optional[Dict[str, Any]] = None):
+        """
+        스트리밍 호출 스케줄링
+
+        첫 청크를 받기 전의 오류만 재시도한다 (이미 전달된 청크는 되돌릴 수 없음).
+        """
+        budget = self.budget(model)
+        estimated = self._reserve_amount(messages, model, max_tokens)
+        priority = current_priority()
+        call_span = self._start_span(model, estimated, True, attributes)
+        opened = time.perf_counter()
+        attempt = 0
+        try:
+            while True:
+                call_span.add("queue_wait_ms", budget.acquire(estimated, priority) * 1000)
+                started = False
+                last_chunk = None
+                try:
+                    for chunk in open_stream():
+                        if not started:
+                            call_span.set(first_chunk_ms=round((time.perf_counter() - opened) * 1000, 3))
+                        started = True
+                        last_chunk = chunk
+                        yield chunk
+                except Exception as e:
+                    if not started:
+                        budget.refund(estimated)
+                    if started or attempt >= self.max_retries or not _is_retryable(e):
+                        budget.failures += 1
+                        call_span.end(error=e)
+                        raise
+                    delay = self._backoff(attempt, e)
+                    if _is_rate_limit(e):
+                        budget.penalize(delay)
+                    budget.retries += 1
+                    call_span.add("retries", 1)
+                    attempt += 1
+                    time.sleep(delay)
+                    continue
+                # 마지막 청크에 usage_metadata 가 실려 오는 경우 실제 사용량 반영
+                if last_chunk is not None:
+                    self._record(budget, estimated, getattr(last_chunk, "message", last_chunk), call_span)
+                return
+        finally:
+            # 소비자가 스트림을 중간에 닫아도 스팬은 종료
+            call_span.end()
+
+    async def astream(self, model: str, messages: Any, open_stream: Callable[[], Any], max_tokens: Optional[int] = None,
+                      attributes: Optional[Dict[str, Any]] = None):
+        """stream 의 비동기 버전"""
+        budget = self.budget(model)
+        estimated = self._reserve_amount(messages, model, max_tokens)
+        priority = current_priority()
+        call_span = self._start_span(model, estimated, True, attributes)
+        opened = time.perf_counter()
+        attempt = 0
+        try:
+            while True:
+                waited = await asyncio.to_thread(budget.acquire, estimated, priority)
+                call_span.add("queue_wait_ms", waited * 1000)
+                started = False
+                last_chunk = None
+                try:
+                    async for chunk in open_stream():
+                        if not started:
+                            call_span.set(first_chunk_ms=round((time.perf_counter() - opened) * 1000, 3))
+                        started = True
+                        last_chunk = chunk
+                        yield chunk
+                except Exception as e:
+                    if not started:
+                        budget.refund(estimated)
+                    if started or attempt >= self.max_retries or not _is_retryable(e):
+                        budget.failures += 1
+                        call_span.end(error=e)
+                        raise
+                    delay = self._backoff(attempt, e)
+                    if _is_rate_limit(e):
+                        budget.penalize(delay)
+                    budget.retries += 1
+                    call_span.add("retries", 1)
+                    attempt += 1
+                    await asyncio.sleep(delay)
+                    continue
+                if last_chunk is not None:
+                    self._record(budget, estimated, getattr(last_chunk, "message", last_chunk), call_span)
+                return
+        finally:
+            call_span.end()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            budgets = list(self._budgets.values())
+        return {
+            "models": {budget.model: budget.snapshot() for budget in budgets},
+            "usage": self.usage.to_dict(),
+        }
+
+
+# 프로세스 전역 스케줄러
+llm_scheduler = LLMScheduler()
+
+
+def get_scheduler_stats() -> Dict[str, Any]:
+    """모델별 대기 시간/재시도/토큰 사용량 지표"""
+    return llm_scheduler.stats()
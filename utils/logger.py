@@ -0,0 +1,179 @@
+"""
+구조화 로깅 모듈
+
+요청 경로의 print() 를 대신하는 레벨 기반 로깅입니다.
+
+- get_logger(name): 'geo_agent' 아래의 로거 (첫 호출 시 configure_logging 자동 실행)
+- 지연 포맷: logger.debug("... %s", value) 형식을 사용하면 레벨이 꺼져 있을 때 문자열을 만들지 않음
+- lazy(func): 큰 dict 직렬화처럼 비싼 값을 실제로 출력될 때만 계산
+- 디버그 샘플링: DEBUG 레코드는 LOG_DEBUG_SAMPLE_RATE 비율만 남김
+- 비차단 큐 핸들러: 요청 경로에서는 레코드를 큐에 넣기만 하고 출력은 별도 스레드가 담당
+  (큐가 가득 차면 기다리지 않고 버린 뒤 개수만 기록)
+- log_context(**fields): task_id 등 구조화 필드를 블록 안의 모든 레코드에 첨부
+- 형식: text (사람용) 또는 json (한 줄에 레코드 하나)
+"""
+
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict
+
+from config import LOG_LEVEL, LOG_FORMAT, LOG_DEBUG_SAMPLE_RATE, LOG_QUEUE_SIZE
+
+ROOT_LOGGER_NAME = "geo_agent"
+
+_context_var: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar("log_context", default={})
+_configure_lock = threading.Lock()
+_listener = None
+_queue_handler = None
+
+
+class lazy:
+    """출력될 때만 func() 를 호출해 문자열로 바꾸는 로그 인자"""
+
+    __slots__ = ("func",)
+
+    def __init__(self, func: Callable[[], Any]):
+        self.func = func
+
+    def __str__(self) -> str:
+        return str(self.func())
+
+    __repr__ = __str__
+
+
+@contextmanager
+def log_context(**fields: Any):
+    """블록 안에서 기록되는 레코드에 구조화 필드를 첨부"""
+    token = _context_var.set({**_context_var.get(), **fields})
+    try:
+        yield
+    finally:
+        _context_var.reset(token)
+
+
+class DebugSampler(logging.Filter):
+    """DEBUG 레코드를 rate 비율만 통과시키는 필터 (그 외 레벨은 모두 통과)"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    큐가 가득 차면 버리는 QueueHandler
+
+    요청 스레드에서는 메시지 포맷과 컨텍스트 첨부만 하고, 출력 형식(JSON 등)과
+    예외 트레이스백 포맷은 리스너 스레드에서 처리한다.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        # 인자가 나중에 변경될 수 있으므로 메시지는 기록 시점에 확정
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        record.context = _context_var.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄에 레코드 하나인 JSON 형식"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        data.update(getattr(record, "context", None) or {})
+        fields = getattr(record, "fields", None)
+        if fields:
+            data.update(fields)
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """사람이 읽는 한 줄 형식 (컨텍스트 필드는 [key=value] 로 덧붙임)"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s%(context_text)s %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        context = {**(getattr(record, "context", None) or {}), **(getattr(record, "fields", None) or {})}
+        record.context_text = "".join(f" [{key}={value}]" for key, value in context.items())
+        return super().format(record)
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT,
+                      debug_sample_rate: float = LOG_DEBUG_SAMPLE_RATE) -> logging.Logger:
+    """geo_agent 로거에 큐 핸들러와 출력 스레드를 설정 (이미 설정되어 있으면 레벨만 변경)"""
+    global _listener, _queue_handler
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    with _configure_lock:
+        root.setLevel(level.upper())
+        if _queue_handler is not None:
+            return root
+
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+        _queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+        _queue_handler.addFilter(DebugSampler(debug_sample_rate))
+        root.addHandler(_queue_handler)
+        # uvicorn 등 루트 로거 핸들러로 중복 출력되지 않도록 전파 중단
+        root.propagate = False
+
+        _listener = logging.handlers.QueueListener(_queue_handler.queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+    return root
+
+
+def shutdown_logging() -> None:
+    """큐에 남은 레코드를 모두 출력하고 출력 스레드 종료"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def dropped_records() -> int:
+    """큐가 가득 차서 버려진 레코드 수"""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def get_logger(name: str) -> logging.Logger:
+    """모듈 로거 (보통 get_logger(__name__))"""
+    if _queue_handler is None:
+        configure_logging()
+    if name == ROOT_LOGGER_NAME or name.startswith(ROOT_LOGGER_NAME + "."):
+        return logging.getLogger(name)
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
@@ -0,0 +1,364 @@
+"""
+프롬프트 컨텍스트 압축 모듈
+
+에이전트가 상태 값을 str() 로 그대로 프롬프트에 넣는 대신 다음을 적용합니다.
+
+- 에이전트별 투영(projection): 그 에이전트가 실제로 쓰는 필드만 선택
+- 정규화된 간결한 인코딩: None/빈 값 제거, 실수 반올림, 참인 플래그만 나열,
+  집계 표(coordinates 등)와 같은 작업별 중복 좌표 제거, 공백 없는 JSON
+- 에이전트별 토큰 예산: 넘치면 우선순위가 낮은 필드부터 뒤쪽 항목을 잘라냄
+
+사용 예:
+    context = build_prompt_context("explanation", parsed_elements=state.parsed_elements, ...)
+    prompt = EXPLANATION_PROMPT.format(problem=state.input_problem, **context)
+"""
+
+import json
+import logging
+import math
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+from config import PROMPT_CONTEXT_COMPACTION, PROMPT_FLOAT_PRECISION, PROMPT_CONTEXT_BUDGETS
+from utils.llm_scheduler import estimate_tokens
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# 계산 결과의 집계 표 (update_calculation_results 가 채우는 키)
+RESULT_TABLES = ("coordinates", "lengths", "angles", "areas", "exact_values", "geometric_elements", "derived_data")
+
+# 계산 에이전트에 넘기는 작업 필드
+TASK_FIELDS = ("task_id", "task_type", "operation_type", "specific_method", "required_precision",
+               "parameters", "dependencies", "description")
+
+# 잘라낼 때 필드마다 남기는 최소 토큰 수
+MIN_FIELD_TOKENS = 32
+TRUNCATED_MARKER = "…"
+
+
+# ----------------------------------------------------------------------
+# 정규화 / 인코딩
+# ----------------------------------------------------------------------
+def _is_empty(value: Any) -> bool:
+    return value is None or (isinstance(value, (str, list, tuple, dict, set)) and len(value) == 0)
+
+
+def normalize(value: Any, precision: int = PROMPT_FLOAT_PRECISION) -> Any:
+    """None/빈 값 제거, 실수 반올림(정수값은 정수로), 모델/튜플을 JSON 기본형으로 변환"""
+    if hasattr(value, "model_dump"):
+        value = value.model_dump(exclude_none=True)
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            item = normalize(item, precision)
+            if not _is_empty(item):
+                result[str(key)] = item
+        return result
+    if isinstance(value, (list, tuple, set)):
+        return [normalize(item, precision) for item in value if item is not None]
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            return str(value)
+        rounded = round(value, precision)
+        return int(rounded) if rounded == int(rounded) else rounded
+    if isinstance(value, (str, int, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def encode(value: Any, precision: int = PROMPT_FLOAT_PRECISION) -> str:
+    """정규화 후 공백 없는 JSON (문자열은 그대로)"""
+    value = normalize(value, precision)
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _tokens(text: str) -> int:
+    return estimate_tokens(text)
+
+
+# ----------------------------------------------------------------------
+# 투영
+# ----------------------------------------------------------------------
+def _as_dict(value: Any) -> Dict[str, Any]:
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return dict(value) if isinstance(value, dict) else {}
+
+
+def _true_flags(value: Any) -> Any:
+    """{'triangle': True, 'circle': False} -> ['triangle'] (불리언 플래그 사전만 변환)"""
+    if isinstance(value, dict) and value and all(isinstance(v, bool) for v in value.values()):
+        return [k for k, v in value.items() if v]
+    return value
+
+
+def project_task(task: Any) -> Dict[str, Any]:
+    data = _as_dict(task)
+    return {key: data[key] for key in TASK_FIELDS if key in data}
+
+
+def project_parsed_elements(parsed_elements: Any) -> Dict[str, Any]:
+    data = _as_dict(parsed_elements)
+    return {key: _true_flags(value) for key, value in data.items()}
+
+
+def project_problem_analysis(problem_analysis: Any) -> Dict[str, Any]:
+    # 작업 청사진은 계산 관리자만 사용
+    data = _as_dict(problem_analysis)
+    return {key: _true_flags(value) for key, value in data.items()
+            if key not in ("suggested_tasks", "suggested_tasks_blueprint")}
+
+
+def project_calculation_results(results: Any, tables_only: bool = False) -> Dict[str, Any]:
+    """
+    집계 표를 앞에, 작업별 결과를 뒤에 두고 작업별 결과에서 집계 표와 같은 값을 제거
+
+    tables_only: 집계 표가 있으면 작업별 결과는 생략 (계산 에이전트는 의존 결과를 따로 받음)
+    """
+    data = _as_dict(results)
+    tables = {key: data[key] for key in RESULT_TABLES if not _is_empty(data.get(key))}
+    projected: Dict[str, Any] = dict(tables)
+    if tables_only and tables:
+        return projected
+    for key, value in data.items():
+        if key in RESULT_TABLES:
+            continue
+        projected[key] = dedupe_result(value, tables) if isinstance(value, dict) else value
+    return projected
+
+
+def dedupe_result(result: Dict[str, Any], tables: Dict[str, Any]) -> Dict[str, Any]:
+    """작업 결과에서 집계 표와 같은 항목, 기본값(success=True), 엔진 메타데이터를 제거"""
+    deduped = {}
+    for key, value in result.items():
+        if key in ("task_id", "extras") or (key == "success" and value is True):
+            continue
+        if key == "exact_values" and tables.get("exact_values"):
+            continue
+        if key in ("coordinates", "lengths", "angles", "areas") and isinstance(value, dict):
+            table = tables.get(key) or {}
+            value = {name: item for name, item in value.items() if table.get(name) != item}
+        deduped[key] = value
+    return deduped
+
+
+def project_dependencies(dependencies: Any, results: Any) -> Dict[str, Any]:
+    tables = project_calculation_results(results, tables_only=True)
+    return {dep_id: dedupe_result(value, tables) if isinstance(value, dict) else value
+            for dep_id, value in _as_dict(dependencies).items()}
+
+
+def project_validation_summary(validation: Any) -> Dict[str, Any]:
+    data = _as_dict(validation)
+    return {key: data.get(key) for key in ("is_valid", "errors", "warnings")}
+
+
+def project_validation_feedback(validation: Any) -> Dict[str, Any]:
+    # 상세 분석(analysis)은 가장 길기 때문에 맨 뒤에 두어 예산 초과 시 먼저 잘린다
+    data = _as_dict(validation)
+    keys = ("is_valid", "errors", "warnings", "suggestions", "command_by_command_analysis",
+            "construction_plan", "analysis")
+    return {key: data.get(key) for key in keys}
+
+
+def project_queue(queue: Any) -> Dict[str, Any]:
+    data = _as_dict(queue)
+    if isinstance(data.get("tasks"), list):
+        data["tasks"] = [project_task(task) for task in data["tasks"]]
+    return data
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+# ----------------------------------------------------------------------
+# 에이전트별 프로필
+# ----------------------------------------------------------------------
+class PromptProfile(NamedTuple):
+    """필드 이름 -> 투영 함수, 잘라낼 때 보존 우선순위(앞쪽이 높음), 자르지 않는 필드"""
+    fields: Dict[str, Callable[..., Any]]
+    priority: List[str]
+    exempt: Tuple[str, ...] = ()
+
+
+PROMPT_PROFILES: Dict[str, PromptProfile] = {
+    "calculation": PromptProfile(
+        fields={
+            "current_task": project_task,
+            "calculation_results": lambda v: project_calculation_results(v, tables_only=True),
+            "dependencies": _identity,  # build_prompt_context 에서 calculation_results 기준으로 중복 제거
+        },
+        priority=["current_task", "dependencies", "calculation_results"],
+    ),
+    "calculation_manager": PromptProfile(
+        fields={
+            "parsed_elements": project_parsed_elements,
+            "problem_analysis": _identity,
+            "calculation_results": project_calculation_results,
+            "calculation_queue": project_queue,
+        },
+        priority=["parsed_elements", "calculation_queue", "problem_analysis", "calculation_results"],
+    ),
+    "merger": PromptProfile(
+        fields={
+            "completed_tasks": lambda tasks: [dict(project_task(t), result=_as_dict(t).get("result")) for t in tasks],
+            "calculation_results": project_calculation_results,
+            "problem_analysis": project_problem_analysis,
+            "dependency_graph": _identity,
+            "geometric_constraints": _identity,
+            "geogebra_commands": _identity,
+        },
+        priority=["calculation_results", "geogebra_commands", "geometric_constraints",
+                  "problem_analysis", "completed_tasks", "dependency_graph"],
+    ),
+    "geogebra_command": PromptProfile(
+        fields={
+            "problem_analysis": project_problem_analysis,
+            "construction_plan": _identity,
+            "calculations": lambda v: project_calculation_results(v),
+            "retrieved_commands": _identity,
+        },
+        priority=["construction_plan", "calculations", "problem_analysis", "retrieved_commands"],
+        # 작도 계획과 계산 결과는 명령어가 그대로 옮기는 값이므로 자르지 않는다
+        exempt=("construction_plan", "calculations"),
+    ),
+    "command_regeneration": PromptProfile(
+        fields={
+            "original_commands": _identity,
+            "validation_result": project_validation_feedback,
+        },
+        priority=["original_commands", "validation_result"],
+        exempt=("original_commands",),
+    ),
+    "command_repair": PromptProfile(
+        fields={"lines_to_fix": _identity, "context": _identity},
+        priority=["lines_to_fix", "context"],
+        exempt=("lines_to_fix",),
+    ),
+    "validation": PromptProfile(
+        # 검증할 명령어가 잘리면 나머지 줄을 검증하지 못하므로 construction_plan 만 줄인다
+        fields={"commands": _identity, "construction_plan": _identity},
+        priority=["commands", "construction_plan"],
+        exempt=("commands",),
+    ),
+    "explanation": PromptProfile(
+        fields={
+            "parsed_elements": project_parsed_elements,
+            "problem_analysis": project_problem_analysis,
+            "calculations": project_calculation_results,
+            "geogebra_commands": _identity,
+            "validation": project_validation_summary,
+        },
+        priority=["geogebra_commands", "calculations", "parsed_elements", "validation", "problem_analysis"],
+    ),
+}
+
+
+# ----------------------------------------------------------------------
+# 예산 맞추기
+# ----------------------------------------------------------------------
+def _largest_prefix(count: int, fits: Callable[[int], bool]) -> int:
+    """fits(k) 가 참인 가장 큰 k (0..count, fits 는 단조 감소)"""
+    low, high = 0, count
+    while low < high:
+        middle = (low + high + 1) // 2
+        if fits(middle):
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def shrink(value: Any, max_tokens: int) -> Any:
+    """
+    인코딩이 max_tokens 안에 들도록 값을 줄임
+
+    사전/목록은 앞쪽 항목을 남기고 뒤쪽을 잘라 생략 개수를 표시하고,
+    문자열은 뒷부분을 잘라 TRUNCATED_MARKER 를 붙인다.
+    """
+    if _tokens(encode(value)) <= max_tokens:
+        return value
+    if isinstance(value, dict):
+        items = list(value.items())
+
+        def partial(k: int) -> Dict[str, Any]:
+            kept = dict(items[:k])
+            kept[TRUNCATED_MARKER] = f"{len(items) - k} more"
+            return kept
+
+        k = _largest_prefix(len(items), lambda k: _tokens(encode(partial(k))) <= max_tokens)
+        if k == 0 and items:
+            key, first = items[0]
+            return {key: shrink(first, max_tokens - MIN_FIELD_TOKENS // 2), TRUNCATED_MARKER: f"{len(items) - 1} more"}
+        return partial(k)
+    if isinstance(value, (list, tuple)):
+        items = list(value)
+
+        def partial(k: int) -> List[Any]:
+            return items[:k] + [f"{TRUNCATED_MARKER}{len(items) - k} more"]
+
+        k = _largest_prefix(len(items), lambda k: _tokens(encode(partial(k))) <= max_tokens)
+        if k == 0 and items:
+            return [shrink(items[0], max_tokens - MIN_FIELD_TOKENS // 2), f"{TRUNCATED_MARKER}{len(items) - 1} more"]
+        return partial(k)
+    text = value if isinstance(value, str) else encode(value)
+    k = _largest_prefix(len(text), lambda k: _tokens(text[:k] + TRUNCATED_MARKER) <= max_tokens)
+    return text[:k] + TRUNCATED_MARKER
+
+
+def fit_budget(values: Dict[str, Any], budget: int, priority: List[str],
+               exempt: Tuple[str, ...] = ()) -> Dict[str, str]:
+    """전체 토큰이 budget 을 넘으면 우선순위가 낮은 필드부터 줄여 인코딩 (exempt 필드는 그대로 둔다)"""
+    encoded = {name: encode(value) for name, value in values.items()}
+    sizes = {name: _tokens(text) for name, text in encoded.items()}
+    total = sum(sizes.values())
+    if budget <= 0 or total <= budget:
+        return encoded
+
+    order = [name for name in reversed(priority) if name in values]
+    order += [name for name in values if name not in order]
+    for name in (name for name in order if name not in exempt):
+        excess = total - budget
+        if excess <= 0:
+            break
+        allowance = max(sizes[name] - excess, MIN_FIELD_TOKENS)
+        if allowance >= sizes[name]:
+            continue
+        encoded[name] = encode(shrink(normalize(values[name]), allowance))
+        total += _tokens(encoded[name]) - sizes[name]
+        sizes[name] = _tokens(encoded[name])
+    return encoded
+
+
+def build_prompt_context(agent: str, **fields: Any) -> Dict[str, str]:
+    """
+    에이전트 프롬프트 변수용 문자열 생성
+
+    Args:
+        agent: PROMPT_PROFILES 의 키 (예: "calculation", "explanation")
+        **fields: 프롬프트 변수 이름 -> 원본 값
+
+    Returns:
+        프롬프트 변수 이름 -> 압축된 문자열 (PROMPT_CONTEXT_COMPACTION 이 꺼져 있으면 str(원본))
+    """
+    if not PROMPT_CONTEXT_COMPACTION:
+        return {name: str(value) for name, value in fields.items()}
+
+    profile = PROMPT_PROFILES[agent]
+    projected = {}
+    for name, value in fields.items():
+        projector = profile.fields.get(name, _identity)
+        projected[name] = projector(value) if value is not None else None
+    if agent == "calculation" and "dependencies" in fields:
+        projected["dependencies"] = project_dependencies(fields["dependencies"], fields.get("calculation_results"))
+
+    context = fit_budget(projected, PROMPT_CONTEXT_BUDGETS.get(agent, 0), profile.priority, profile.exempt)
+    if logger.isEnabledFor(logging.DEBUG):  # 원본 토큰 수 계산은 디버그 출력 시에만
+        raw_tokens = sum(_tokens(str(value)) for value in fields.values())
+        logger.debug("Prompt context for %s: %s -> %s tokens", agent, raw_tokens,
+                     sum(_tokens(v) for v in context.values()))
+    return context
@@ -0,0 +1,245 @@
+"""
+구조화 출력 모듈
+
+파싱/계획/검증 단계의 LLM 응답을 제공자의 구조화 출력 모드(함수 호출 또는 JSON 스키마)로 받고,
+스키마는 기존 Pydantic 모델에서 생성합니다. 응답이 스키마에 맞지 않으면 모델에 다시 묻지 않고
+로컬에서 복구합니다 (JSON 추출 → 정규화 → 스키마 검증 → 잘못된 항목 제거 후 재검증).
+따라서 단계당 LLM 호출은 한 번입니다.
+
+- invoke_structured(llm, prompt_value, schema, stage): 구조화 출력 호출 + 로컬 복구
+- stream_structured(llm, prompt_value, schema, stage, on_items): 스트리밍 호출, 닫힌 배열 항목을 바로 콜백
+- repair_structured(content, schema): 텍스트/dict 를 스키마에 맞게 로컬 복구
+- record_parse(stage, status): 단계별 파싱 결과 기록 (도구 호출 에이전트처럼 직접 파싱하는 경우)
+- get_structured_output_stats(): 단계별 호출 수와 파싱 실패율
+
+STRUCTURED_OUTPUT_METHOD: function_calling(기본) | json_schema | json_mode | none(일반 텍스트 + 로컬 복구)
+"""
+
+import json
+import threading
+from typing import Any, Callable, Dict, NamedTuple, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+from config import STRUCTURED_OUTPUT_METHOD, STREAMING_PIPELINE
+from utils.json_parser import safe_parse_llm_json_output
+from utils.json_stream import ItemCallback, ItemPath, stream_json
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 파싱 결과 상태
+NATIVE = "native"        # 구조화 출력이 그대로 스키마를 통과
+REPAIRED = "repaired"    # 로컬 복구 후 스키마 통과
+FAILED = "failed"        # 복구 실패 (data 는 추출한 dict 또는 빈 dict)
+
+MAX_PRUNE_ROUNDS = 3
+
+
+class StructuredOutput(NamedTuple):
+    """구조화 출력 결과"""
+    data: Dict[str, Any]
+    status: str
+    text: str            # 원본 응답 텍스트 (복구 실패 시 수동 파싱에 사용)
+
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def record_parse(stage: str, status: str) -> None:
+    """단계별 파싱 결과 기록"""
+    with _stats_lock:
+        counters = _stats.setdefault(stage, {"calls": 0, NATIVE: 0, REPAIRED: 0, FAILED: 0})
+        counters["calls"] += 1
+        counters[status] += 1
+    if status != NATIVE:
+        logger.info("Structured output for %s %s locally", stage,
+                    "was repaired" if status == REPAIRED else "could not be repaired")
+
+
+def get_structured_output_stats() -> Dict[str, Any]:
+    """단계별 호출 수, 복구/실패 수, 파싱 실패율 (구조화 출력이 그대로 통과하지 못한 비율)"""
+    with _stats_lock:
+        stages = {stage: dict(counters) for stage, counters in _stats.items()}
+    for counters in stages.values():
+        calls = counters["calls"]
+        counters["parse_failure_rate"] = round((counters[REPAIRED] + counters[FAILED]) / calls, 4) if calls else 0.0
+        counters["unrecovered_rate"] = round(counters[FAILED] / calls, 4) if calls else 0.0
+    return {"method": STRUCTURED_OUTPUT_METHOD, "stages": stages}
+
+
+# ----------------------------------------------------------------------
+# 로컬 복구
+# ----------------------------------------------------------------------
+def _to_dict(content: Any) -> Dict[str, Any]:
+    if isinstance(content, BaseModel):
+        return content.model_dump()
+    if isinstance(content, dict):
+        return content
+    parsed = safe_parse_llm_json_output(content, dict)
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def _prune(data: Dict[str, Any], error: ValidationError) -> bool:
+    """
+    검증 오류가 난 항목을 제거 (컬렉션 항목 또는 최상위 필드)
+
+    예: geometric_objects.X.type 누락 → geometric_objects["X"] 제거,
+    최상위 필드 타입 오류 → 필드 제거 후 기본값 사용. 제거한 항목이 있으면 True.
+    """
+    removed = False
+    for detail in error.errors():
+        loc = detail.get("loc", ())
+        if not loc or detail.get("type") == "missing" and len(loc) == 1:
+            continue  # 최상위 필수 필드 누락은 제거로 해결할 수 없음
+        path = loc[:2] if len(loc) >= 2 else loc[:1]
+        container: Any = data
+        for key in path[:-1]:
+            container = container.get(key) if isinstance(container, dict) else None
+        last = path[-1]
+        if isinstance(container, dict) and last in container:
+            del container[last]
+            removed = True
+        elif isinstance(container, list) and isinstance(last, int) and last < len(container):
+            container[last] = None
+            removed = True
+    # 리스트에서 표시한 항목 정리
+    for value in data.values():
+        if isinstance(value, list) and None in value:
+            value[:] = [item for item in value if item is not None]
+    return removed
+
+
+def repair_structured(content: Any, schema: Type[BaseModel],
+                      normalize: Optional[Callable[[Dict[str, Any]], None]] = None) -> StructuredOutput:
+    """
+    LLM 응답(텍스트, dict, 모델)을 스키마에 맞게 로컬 복구
+
+    Args:
+        content: 응답 텍스트 또는 도구 호출 인자
+        schema: 대상 Pydantic 모델
+        normalize: 검증 전에 dict 를 고치는 단계별 함수 (예: 리스트 → 문자열)
+
+    Returns:
+        StructuredOutput (검증 통과 시 REPAIRED, 아니면 FAILED 와 추출한 dict)
+    """
+    text = content if isinstance(content, str) else json.dumps(_to_dict(content), ensure_ascii=False, default=str)
+    data = _to_dict(content)
+    if not data:
+        return StructuredOutput({}, FAILED, text)
+    if normalize is not None:
+        normalize(data)
+    candidate = json.loads(json.dumps(data, default=str))
+    for _ in range(MAX_PRUNE_ROUNDS + 1):
+        try:
+            return StructuredOutput(schema.model_validate(candidate).model_dump(), REPAIRED, text)
+        except ValidationError as e:
+            if not _prune(candidate, e):
+                break
+    return StructuredOutput(data, FAILED, text)
+
+
+def _raw_content(message: Any) -> Any:
+    """구조화 출력이 실패한 원본 메시지에서 복구할 내용 (도구 호출 인자 우선)"""
+    for tool_call in getattr(message, "tool_calls", None) or []:
+        if tool_call.get("args"):
+            return tool_call["args"]
+    for tool_call in getattr(message, "invalid_tool_calls", None) or []:
+        if tool_call.get("args"):
+            return tool_call["args"]
+    return getattr(message, "content", message) or ""
+
+
+# ----------------------------------------------------------------------
+# 호출
+# ----------------------------------------------------------------------
+def invoke_structured(llm: Any, prompt_value: Any, schema: Type[BaseModel], stage: str,
+                      normalize: Optional[Callable[[Dict[str, Any]], None]] = None) -> StructuredOutput:
+    """
+    구조화 출력 모드로 LLM 을 한 번 호출하고, 실패하면 로컬에서 복구
+
+    Args:
+        llm: LangChain 채팅 모델 (LLMManager 인스턴스)
+        prompt_value: 프롬프트 값 또는 메시지 목록
+        schema: 응답 스키마 (기존 Pydantic 모델)
+        stage: 통계 키 (parsing, planner, validation 등)
+        normalize: 로컬 복구 시 검증 전에 적용할 정규화 함수
+
+    Returns:
+        StructuredOutput(data, status, text)
+    """
+    if STRUCTURED_OUTPUT_METHOD == "none":
+        message = llm.invoke(prompt_value)
+        output = repair_structured(_raw_content(message), schema, normalize)
+        # 구조화 출력을 쓰지 않을 때는 바로 검증을 통과한 응답을 NATIVE 로 본다
+        if output.status == REPAIRED and _is_plain_json(message):
+            output = output._replace(status=NATIVE)
+        record_parse(stage, output.status)
+        return output
+
+    structured_llm = llm.with_structured_output(schema, method=STRUCTURED_OUTPUT_METHOD, include_raw=True)
+    result = structured_llm.invoke(prompt_value)
+    parsed = result.get("parsed")
+    if parsed is not None:
+        data = parsed.model_dump() if isinstance(parsed, BaseModel) else dict(parsed)
+        output = StructuredOutput(data, NATIVE, json.dumps(data, ensure_ascii=False, default=str))
+    else:
+        if result.get("parsing_error") is not None:
+            logger.warning("Structured output for %s did not match the schema: %s", stage, result["parsing_error"])
+        output = repair_structured(_raw_content(result.get("raw")), schema, normalize)
+    record_parse(stage, output.status)
+    return output
+
+
+def stream_structured(llm: Any, prompt_value: Any, schema: Type[BaseModel], stage: str,
+                      on_items: Dict[ItemPath, ItemCallback],
+                      normalize: Optional[Callable[[Dict[str, Any]], None]] = None) -> StructuredOutput:
+    """
+    invoke_structured 의 스트리밍 버전
+
+    응답을 받는 동안 on_items 경로의 배열 항목이 닫히면 바로 콜백에 넘겨 후속 작업을 먼저 시작한다.
+    function_calling 은 도구 호출 인자 스트림을, json_schema/json_mode 는 JSON 객체 응답 형식의
+    본문 스트림을 파싱한다 (스트리밍 중에는 엄격한 스키마 응답 형식을 쓰지 않으므로 검증은 로컬에서).
+    STREAMING_PIPELINE 이 꺼져 있거나 콜백이 없으면 invoke_structured 와 같다.
+
+    Args:
+        llm, prompt_value, schema, stage, normalize: invoke_structured 와 같음
+        on_items: {객체 키 경로: 콜백}, 예: {("construction_plan", "steps"): prefetch_step_commands}
+
+    Returns:
+        StructuredOutput(data, status, text)
+    """
+    if not STREAMING_PIPELINE or not on_items:
+        return invoke_structured(llm, prompt_value, schema, stage, normalize)
+
+    tool_args = STRUCTURED_OUTPUT_METHOD == "function_calling"
+    if tool_args:
+        runnable = llm.bind_tools([schema], tool_choice=schema.__name__)
+    elif STRUCTURED_OUTPUT_METHOD in ("json_schema", "json_mode"):
+        runnable = llm.bind(response_format={"type": "json_object"})
+    else:
+        runnable = llm
+    message = stream_json(runnable, prompt_value, on_items, tool_args=tool_args)
+
+    content = _raw_content(message)
+    output = None
+    if isinstance(content, dict):
+        try:
+            data = schema.model_validate(content).model_dump()
+            output = StructuredOutput(data, NATIVE, json.dumps(data, ensure_ascii=False, default=str))
+        except ValidationError as e:
+            logger.warning("Structured output for %s did not match the schema: %s", stage, e)
+    if output is None:
+        output = repair_structured(content, schema, normalize)
+        if output.status == REPAIRED and not tool_args and _is_plain_json(message):
+            output = output._replace(status=NATIVE)
+    record_parse(stage, output.status)
+    return output
+
+
+def _is_plain_json(message: Any) -> bool:
+    try:
+        return isinstance(json.loads(getattr(message, "content", "")), dict)
+    except (TypeError, ValueError):
+        return False
@@ -0,0 +1,441 @@
+"""
+요청 단위 추적(tracing) 모듈
+
+요청(task_id) 하나 안에서 일어나는 그래프 노드, LLM 호출, 도구 호출, 검색을
+스팬(span)으로 기록합니다. 스팬에는 실행 시간과 함께 LLM 호출이면 대기열 대기 시간,
+프롬프트/응답 토큰, 캐시 적중, 재시도 횟수가 붙습니다.
+
+- trace_scope(task_id): 요청 하나를 감싸는 추적 범위 (끝나면 싱크로 내보냄)
+- span(name, kind): 하위 작업 스팬 (현재 스팬을 부모로 사용)
+- traced_node / traced / trace_tools: 그래프 노드, 함수, LangChain 도구 래퍼
+- 싱크: 로컬 JSONL 파일(기본, 크기 제한을 넘으면 회전) 또는 OpenTelemetry (opentelemetry 패키지가 있을 때)
+- get_trace(task_id) / summarize_trace(): 요청별 노드 단위 시간/토큰 집계
+
+추적 범위 밖에서는 모든 함수가 아무것도 기록하지 않습니다.
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from config import (
+    TRACING_ENABLED,
+    TRACE_EXPORTER,
+    TRACE_JSONL_PATH,
+    TRACE_RETENTION,
+    TRACE_JSONL_MAX_BYTES,
+    TRACE_JSONL_BACKUPS,
+)
+
+try:
+    from opentelemetry import trace as otel_trace
+    from opentelemetry.trace import Status, StatusCode
+except ImportError:  # OpenTelemetry 는 선택 의존성
+    otel_trace = None
+
+from utils.logger import get_logger, log_context
+
+logger = get_logger(__name__)
+
+
+# 스팬 종류
+KIND_REQUEST = "request"
+KIND_NODE = "node"
+KIND_LLM = "llm"
+KIND_TOOL = "tool"
+KIND_RETRIEVAL = "retrieval"
+
+# 집계 시 합산하는 수치 속성
+SUMMED_ATTRIBUTES = ("prompt_tokens", "completion_tokens", "cached_tokens", "queue_wait_ms", "retries")
+
+
+class Span:
+    """실행 구간 하나 (시작 시각, 소요 시간, 속성)"""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start", "duration_ms",
+                 "attributes", "error", "_started")
+
+    def __init__(self, trace: "Trace", name: str, kind: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.time()
+        self.duration_ms: Optional[float] = None
+        self.attributes = dict(attributes)
+        self.error: Optional[str] = None
+        self._started = time.perf_counter()
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add(self, key: str, amount: float) -> None:
+        """수치 속성 누적 (재시도 횟수, 대기 시간 등)"""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self.duration_ms is not None:
+            return
+        self.duration_ms = (time.perf_counter() - self._started) * 1000
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": self.start,
+            "duration_ms": round(self.duration_ms, 3) if self.duration_ms is not None else None,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """추적 범위 밖에서 반환되는 빈 스팬"""
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def add(self, key: str, amount: float) -> None:
+        pass
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """요청(task_id) 하나의 스팬 모음"""
+
+    def __init__(self, task_id: str, attributes: Optional[Dict[str, Any]] = None):
+        self.task_id = task_id
+        self.attributes = dict(attributes or {})
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def start_span(self, name: str, kind: str, parent_id: Optional[str], attributes: Dict[str, Any]) -> Span:
+        span = Span(self, name, kind, parent_id, attributes)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = [span.to_dict() for span in self.spans]
+        root = spans[0] if spans else {}
+        return {
+            "task_id": self.task_id,
+            "attributes": self.attributes,
+            "start": root.get("start"),
+            "duration_ms": root.get("duration_ms"),
+            "spans": spans,
+        }
+
+
+_trace_var: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("trace", default=None)
+_span_var: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("trace_span", default=None)
+
+# 최근 완료된 추적 (프로세스 메모리, /task/{id}/trace 용)
+_recent: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_recent_lock = threading.Lock()
+_sink_lock = threading.Lock()
+
+
+# ----------------------------------------------------------------------
+# 스팬 API
+# ----------------------------------------------------------------------
+def current_task_id() -> Optional[str]:
+    trace = _trace_var.get()
+    return trace.task_id if trace else None
+
+
+def start_span(name: str, kind: str = KIND_TOOL, **attributes: Any):
+    """
+    현재 스팬 아래에 스팬을 시작 (현재 스팬은 바꾸지 않음)
+
+    LLM 호출처럼 하위 스팬이 없는 구간이나 제너레이터 안에서 사용하고, 끝나면 end() 를 호출한다.
+    추적 범위 밖이면 NOOP_SPAN 을 반환한다.
+    """
+    trace = _trace_var.get()
+    if trace is None:
+        return NOOP_SPAN
+    parent = _span_var.get()
+    return trace.start_span(name, kind, parent.span_id if parent else None, attributes)
+
+
+@contextmanager
+def span(name: str, kind: str = KIND_TOOL, **attributes: Any):
+    """블록을 스팬으로 기록하고, 블록 안에서 시작되는 스팬의 부모로 설정"""
+    current = start_span(name, kind, **attributes)
+    if current is NOOP_SPAN:
+        yield current
+        return
+    token = _span_var.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.end(error=e)
+        raise
+    finally:
+        _span_var.reset(token)
+        current.end()
+
+
+@contextmanager
+def trace_scope(task_id: str, **attributes: Any):
+    """
+    요청 하나를 추적
+
+    블록이 끝나면 추적을 최근 목록에 보관하고 설정된 싱크(JSONL/OpenTelemetry)로 내보낸다.
+    """
+    if not TRACING_ENABLED:
+        yield None
+        return
+    trace = Trace(task_id, attributes)
+    root = trace.start_span("request", KIND_REQUEST, None, {"task_id": task_id})
+    trace_token = _trace_var.set(trace)
+    span_token = _span_var.set(root)
+    try:
+        with log_context(task_id=task_id):
+            yield trace
+    except BaseException as e:
+        root.end(error=e)
+        raise
+    finally:
+        _span_var.reset(span_token)
+        _trace_var.reset(trace_token)
+        root.end()
+        _finish(trace)
+
+
+# ----------------------------------------------------------------------
+# 래퍼
+# ----------------------------------------------------------------------
+def traced_node(name: str, func: Callable) -> Callable:
+    """그래프 노드 함수를 노드 스팬으로 감싼다"""
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_node(state, *args, **kwargs):
+            with span(name, KIND_NODE):
+                return await func(state, *args, **kwargs)
+        return async_node
+
+    @functools.wraps(func)
+    def node(state, *args, **kwargs):
+        with span(name, KIND_NODE):
+            return func(state, *args, **kwargs)
+    return node
+
+
+def traced(name: Optional[str] = None, kind: str = KIND_TOOL):
+    """함수 호출을 스팬으로 기록하는 데코레이터"""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_tools(tools: Iterable[Any]) -> List[Any]:
+    """LangChain 도구의 실행 함수(func/coroutine)를 도구 스팬으로 감싼다 (공유 도구는 한 번만)"""
+    wrapped = []
+    for tool in tools:
+        for attribute in ("func", "coroutine"):
+            function = getattr(tool, attribute, None)
+            if callable(function) and not getattr(function, "_traced", False):
+                traced_function = traced(f"tool {tool.name}", KIND_TOOL)(function)
+                traced_function._traced = True
+                setattr(tool, attribute, traced_function)
+        wrapped.append(tool)
+    return wrapped
+
+
+# ----------------------------------------------------------------------
+# 내보내기 / 조회
+# ----------------------------------------------------------------------
+def _finish(trace: Trace) -> None:
+    data = trace.to_dict()
+    with _recent_lock:
+        _recent[trace.task_id] = data
+        _recent.move_to_end(trace.task_id)
+        while len(_recent) > TRACE_RETENTION:
+            _recent.popitem(last=False)
+    try:
+        if TRACE_EXPORTER == "jsonl":
+            _export_jsonl(data)
+        elif TRACE_EXPORTER == "otel":
+            _export_otel(data)
+    except Exception as e:  # 추적 실패가 요청을 실패시키면 안 된다
+        logger.warning("Trace export failed for %s: %s", trace.task_id, e)
+
+
+def _export_jsonl(data: Dict[str, Any]) -> None:
+    directory = os.path.dirname(TRACE_JSONL_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    line = json.dumps(data, ensure_ascii=False, default=str) + "\n"
+    with _sink_lock:
+        _rotate_jsonl(len(line.encode("utf-8")))
+        with open(TRACE_JSONL_PATH, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def _jsonl_files() -> List[str]:
+    """싱크 파일 목록 (최신 순: traces.jsonl, traces.jsonl.1, ...)"""
+    return [TRACE_JSONL_PATH] + [f"{TRACE_JSONL_PATH}.{n}" for n in range(1, max(TRACE_JSONL_BACKUPS, 0) + 1)]
+
+
+def _rotate_jsonl(incoming: int) -> None:
+    """현재 파일에 incoming 바이트를 더하면 TRACE_JSONL_MAX_BYTES 를 넘을 때 회전 (0 이하이면 제한 없음)"""
+    if TRACE_JSONL_MAX_BYTES <= 0:
+        return
+    try:
+        size = os.path.getsize(TRACE_JSONL_PATH)
+    except OSError:
+        return
+    if size == 0 or size + incoming <= TRACE_JSONL_MAX_BYTES:
+        return
+    files = _jsonl_files()
+    if len(files) == 1:
+        os.remove(TRACE_JSONL_PATH)
+        return
+    for older, newer in zip(reversed(files[1:]), reversed(files[:-1])):
+        if os.path.exists(newer):
+            os.replace(newer, older)
+
+
+def _otel_attributes(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value if isinstance(value, (str, bool, int, float)) else str(value)
+            for key, value in attributes.items() if value is not None}
+
+
+def _export_otel(data: Dict[str, Any]) -> None:
+    """완료된 스팬을 시작/종료 시각 그대로 OpenTelemetry 스팬으로 재생성"""
+    if otel_trace is None:
+        raise RuntimeError("TRACE_EXPORTER=otel requires the opentelemetry-api package")
+    tracer = otel_trace.get_tracer("geo-agent-solver")
+    created = {}
+    for item in data["spans"]:  # 부모가 항상 먼저 시작되므로 순서대로 만들면 된다
+        parent = created.get(item["parent_id"])
+        context = otel_trace.set_span_in_context(parent) if parent is not None else None
+        attributes = _otel_attributes(dict(item["attributes"], task_id=data["task_id"], kind=item["kind"]))
+        start_ns = int(item["start"] * 1e9)
+        otel_span = tracer.start_span(item["name"], context=context, start_time=start_ns, attributes=attributes)
+        if item["error"]:
+            otel_span.set_status(Status(StatusCode.ERROR, item["error"]))
+        created[item["span_id"]] = otel_span
+    for item in reversed(data["spans"]):
+        end_ns = int((item["start"] + (item["duration_ms"] or 0) / 1000) * 1e9)
+        created[item["span_id"]].end(end_time=end_ns)
+
+
+def get_trace(task_id: str) -> Optional[Dict[str, Any]]:
+    """
+    최근 추적(메모리) 또는 JSONL 싱크에서 task_id 의 추적을 찾는다 (큐 워커가 기록한 것 포함)
+
+    싱크는 최신 파일부터 찾으며, 회전 크기 제한 덕분에 한 번에 읽는 양은
+    TRACE_JSONL_MAX_BYTES * (TRACE_JSONL_BACKUPS + 1) 을 넘지 않는다.
+    """
+    with _recent_lock:
+        if task_id in _recent:
+            return _recent[task_id]
+    for path in _jsonl_files():
+        if not os.path.exists(path):
+            continue
+        found = None
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if task_id not in line:
+                    continue
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if data.get("task_id") == task_id:
+                    found = data  # 재시도된 작업은 마지막 기록 사용
+        if found is not None:
+            return found
+    return None
+
+
+def summarize_trace(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    노드별 / 종류별 시간과 토큰 집계
+
+    LLM/도구 스팬은 가장 가까운 노드 스팬에 합산된다.
+    """
+    spans = data.get("spans") or []
+    by_id = {item["span_id"]: item for item in spans}
+
+    def owning_node(item: Dict[str, Any]) -> Optional[str]:
+        parent = by_id.get(item["parent_id"])
+        while parent is not None:
+            if parent["kind"] == KIND_NODE:
+                return parent["name"]
+            parent = by_id.get(parent["parent_id"])
+        return None
+
+    def empty() -> Dict[str, Any]:
+        entry = {"runs": 0, "wall_ms": 0.0, "llm_calls": 0, "llm_ms": 0.0, "tool_calls": 0, "tool_ms": 0.0,
+                 "cache_hits": 0, "errors": 0}
+        entry.update({key: 0 for key in SUMMED_ATTRIBUTES})
+        return entry
+
+    nodes: Dict[str, Dict[str, Any]] = {}
+    totals = empty()
+    for item in spans:
+        duration = item["duration_ms"] or 0.0
+        if item["kind"] == KIND_NODE:
+            entry = nodes.setdefault(item["name"], empty())
+            entry["runs"] += 1
+            entry["wall_ms"] += duration
+            entry["errors"] += 1 if item["error"] else 0
+            continue
+        if item["kind"] == KIND_REQUEST:
+            totals["wall_ms"] += duration
+            continue
+        targets = [totals]
+        node = owning_node(item)
+        if node is not None:
+            targets.append(nodes.setdefault(node, empty()))
+        for entry in targets:
+            if item["kind"] == KIND_LLM:
+                entry["llm_calls"] += 1
+                entry["llm_ms"] += duration
+                entry["cache_hits"] += 1 if item["attributes"].get("cache_hit") else 0
+                for key in SUMMED_ATTRIBUTES:
+                    entry[key] += item["attributes"].get(key, 0) or 0
+            else:
+                entry["tool_calls"] += 1
+                entry["tool_ms"] += duration
+            entry["errors"] += 1 if item["error"] else 0
+
+    for entry in [totals, *nodes.values()]:
+        for key in ("wall_ms", "llm_ms", "tool_ms", "queue_wait_ms"):
+            entry[key] = round(entry[key], 3)
+    ranked = sorted(nodes.items(), key=lambda pair: pair[1]["wall_ms"], reverse=True)
+    return {"totals": totals, "nodes": dict(ranked)}